@@ -1,40 +1,50 @@
+import argparse
+
 import backtrader as bt
 import pandas as pd
 from data_loader import download_data
+from feeds import feed_from_frame
+from instrumentation import enable, disable, instrument
+from metrics import equity_metrics
 from strategy import MomentumStrategy
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest MomentumStrategy sur SPY")
+    parser.add_argument('--profile', metavar='PATH', default=None,
+                        help="profil par phase (temps, mémoire) écrit en JSON dans PATH")
+    args = parser.parse_args()
+    if args.profile:
+        enable()
+
     # 1. Initialisation de Cerebro
     cerebro = bt.Cerebro()
 
     # 2. Téléchargement des données (par défaut SPY, modifiez si besoin)
     df = download_data("SPY", period="2y", interval="1d")
 
-    # 3. Aplatir les colonnes si MultiIndex (niveau 0 = attributs)
-    if hasattr(df.columns, 'nlevels') and df.columns.nlevels > 1:
-        df.columns = df.columns.get_level_values(0)
-
-    # 4. Création du feed Backtrader
-    data = bt.feeds.PandasData(dataname=df)
+    # 3. Création du feed Backtrader (tableaux NumPy, voir feeds.py)
+    data = feed_from_frame(df)
     cerebro.adddata(data)
 
-    # 5. Ajout de la stratégie
+    # 4. Ajout de la stratégie
     cerebro.addstrategy(MomentumStrategy)
 
-    # 6. Initialisation du capital
+    # 5. Initialisation du capital
     cerebro.broker.setcash(100000)
 
-    # 7. Ajout d'analyzers pour les métriques
-    cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe')
-    cerebro.addanalyzer(bt.analyzers.DrawDown,    _name='drawdown')
+    # 6. Ajout d'analyzers : rendements journaliers (métriques calculées comme
+    #    dans l'app, voir metrics.py) et trades
+    cerebro.addanalyzer(bt.analyzers.TimeReturn, timeframe=bt.TimeFrame.Days, _name='timereturn')
     cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trades')
 
-    # 8. Exécution du backtest
+    # 7. Exécution du backtest
+    instrument(cerebro)
     strat = cerebro.run()[0]
 
-    # 9. Récupération des résultats
-    sharpe = strat.analyzers.sharpe.get_analysis().get('sharperatio', None)
-    dd     = strat.analyzers.drawdown.get_analysis()['max']['drawdown']
+    # 8. Récupération des résultats
+    rets   = pd.Series(strat.analyzers.timereturn.get_analysis()).sort_index().astype(float)
+    equity = (1 + rets).cumprod() * 100000
+    stats  = equity_metrics(equity.to_numpy())
     trades_analysis = strat.analyzers.trades.get_analysis()
 
     # Debug : affichage complet pour vérifier la structure
@@ -43,8 +53,17 @@ if __name__ == "__main__":
     # Nombre total de trades fermés
     total_trades = trades_analysis.get('total', {}).get('total', 0)
 
-    # 10. Affichage final
-    print(f"Sharpe Ratio  : {sharpe}")
-    print(f"Max Drawdown  : {dd}%")
+    # 9. Affichage final
+    print(f"Total Return  : {stats['total_return']:.2f}%")
+    print(f"CAGR          : {stats['cagr']:.2f}%")
+    print(f"Volatilité    : {stats['volatility']:.2f}%")
+    print(f"Sharpe Ratio  : {stats['sharpe']:.2f}")
+    print(f"Sortino Ratio : {stats['sortino']:.2f}")
+    print(f"Max Drawdown  : {stats['max_dd']:.2f}% ({stats['max_dd_duration']:.0f} jours sous le plus haut)")
+    print(f"Calmar Ratio  : {stats['calmar']:.2f}")
     print(f"Total Trades   : {total_trades}")
 
+    if args.profile:
+        disable().to_json(args.profile)
+        print(f"Profil écrit dans {args.profile}")
+
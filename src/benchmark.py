@@ -0,0 +1,275 @@
+"""
+Benchmarks reproductibles sur données synthétiques (SyntheticProvider, graine fixe) :
+toutes les stratégies de l'app + Buy & Hold, sur chaque moteur disponible
+(vectorisé ou panel, et backtrader), à plusieurs échelles.
+
+Pour chaque cas : temps par étape (load, indicators, simulation, metrics),
+barres/s, pic de RSS et temps total, enregistrés en JSON pour comparer deux
+commits.
+
+    python src/benchmark.py --out bench.json
+    python src/benchmark.py --scales daily_2y intraday_1m_5y --engines vector panel
+    python src/benchmark.py --compare bench_avant.json bench.json
+
+• load       : lecture du store OHLCV (écrit une fois par échelle, non chronométré)
+  + alignement en panel pour le moteur panel
+• indicators : indicateurs / poids (inclus dans simulation pour backtrader, qui
+  ne les sépare pas)
+• le cache d'indicateurs est désactivé : chaque cas calcule tout
+• backtrader sur un gros univers : seulement les --bt-tickers premiers tickers
+  (le nombre de tickers et de barres réellement traités est dans le JSON)
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, NamedTuple
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+
+import indicator_cache
+import panel_engine
+import vector_engine
+from data_store import OHLCVStore
+from engines import supports_panel, supports_vector
+from feeds import feed_from_frame
+from instrumentation import peak_rss_mb, reset_peak_rss
+from metrics import equity_metrics
+from providers import SyntheticProvider
+from strategy import MomentumStrategy
+from strategy2 import DonchianBreakoutStrategy
+from strategy3 import EnhancedBreakoutStrategy
+from strategy4 import RegimeAwareBreakoutStrategy
+from strategy5 import DynamicSafeRebalance
+from strategy_buyandhold import BuyHoldStrategy
+from strategy_rebalance import WeeklyMomentumRebalance
+
+# Fin fixe : mêmes données d'une machine et d'un jour à l'autre
+END = pd.Timestamp('2025-12-31')
+STAGES = ('load', 'indicators', 'simulation', 'metrics')
+
+
+class Scale(NamedTuple):
+    tickers: int
+    interval: str
+    years: int
+
+
+SCALES = {
+    'daily_2y':       Scale(1, '1d', 2),
+    'universe_20y':   Scale(500, '1d', 20),
+    'intraday_1m_5y': Scale(1, '1m', 5),
+}
+
+# Stratégies de l'app (STRAT_MAP) + Buy & Hold
+STRATEGIES = [MomentumStrategy, DonchianBreakoutStrategy, EnhancedBreakoutStrategy,
+              RegimeAwareBreakoutStrategy, WeeklyMomentumRebalance, DynamicSafeRebalance,
+              BuyHoldStrategy]
+
+
+def engines_for(strat_cls) -> List[str]:
+    if supports_vector(strat_cls):
+        return ['vector', 'backtrader']
+    if supports_panel(strat_cls):
+        return ['panel', 'backtrader']
+    return ['backtrader']
+
+
+def make_data(scale: Scale) -> Dict[str, pd.DataFrame]:
+    """Univers synthétique de l'échelle (T000, T001…), toujours identique."""
+    prov = SyntheticProvider(seed=0, end=END)
+    start = END - pd.DateOffset(years=scale.years)
+    return {f'T{i:03d}': prov.generate(f'T{i:03d}', scale.interval, start) for i in range(scale.tickers)}
+
+
+# --- Mesures ---
+
+class _Timer:
+    def __init__(self):
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self.bars = 0
+
+    def add(self, stage: str, t0: float) -> None:
+        self.stages[stage] += time.perf_counter() - t0
+
+
+# --- Un cas = (échelle, stratégie, moteur) ---
+
+def _load(store: OHLCVStore, tickers: List[str], interval: str, timer: _Timer) -> Dict[str, pd.DataFrame]:
+    t0 = time.perf_counter()
+    data = {tic: store.read(tic, interval) for tic in tickers}
+    timer.add('load', t0)
+    timer.bars = sum(len(df) for df in data.values())
+    return data
+
+
+def _run_vector(store, tickers, interval, strat_cls, timer) -> list:
+    data = _load(store, tickers, interval, timer)
+    params = vector_engine.strategy_params(strat_cls)
+    curves = []
+    for df in data.values():
+        bars = vector_engine.bars_from_df(df)
+        t0 = time.perf_counter()
+        machine = vector_engine.machine_for(strat_cls)(params, bars, vector_engine.Broker(1.0))
+        timer.add('indicators', t0)
+        t0 = time.perf_counter()
+        curves.append(vector_engine.simulate(machine, 0, len(df)))
+        timer.add('simulation', t0)
+    return curves
+
+
+def _run_panel(store, tickers, interval, strat_cls, timer) -> list:
+    data = _load(store, tickers, interval, timer)
+    t0 = time.perf_counter()
+    panel = panel_engine.make_panel(data)
+    timer.add('load', t0)
+    t0 = time.perf_counter()
+    rule = panel_engine.portfolio_for(strat_cls)(panel, vector_engine.strategy_params(strat_cls))
+    weights = rule.pop('weights')
+    timer.add('indicators', t0)
+    t0 = time.perf_counter()
+    values, _, _, _ = panel_engine.simulate(panel, weights, **rule)
+    timer.add('simulation', t0)
+    return [values]
+
+
+def _cerebro_curve(feeds: Dict[str, pd.DataFrame], strat_cls) -> np.ndarray:
+    cerebro = bt.Cerebro(stdstats=False)
+    for tic, df in feeds.items():
+        cerebro.adddata(feed_from_frame(df, tic))
+    cerebro.addstrategy(strat_cls)
+    cerebro.broker.setcash(100000)
+    cerebro.addanalyzer(bt.analyzers.TimeReturn, timeframe=bt.TimeFrame.Days, _name='timereturn')
+    strat = cerebro.run()[0]
+    rets = pd.Series(strat.analyzers.timereturn.get_analysis()).sort_index().astype(float)
+    return (1 + rets).cumprod().to_numpy()
+
+
+def _run_backtrader(store, tickers, interval, strat_cls, timer) -> list:
+    data = _load(store, tickers, interval, timer)
+    t0 = time.perf_counter()
+    if supports_panel(strat_cls):
+        curves = [_cerebro_curve(data, strat_cls)]  # un Cerebro multi-actifs
+    else:
+        curves = [_cerebro_curve({tic: df}, strat_cls) for tic, df in data.items()]
+    timer.add('simulation', t0)
+    return curves
+
+
+RUNNERS = {'vector': _run_vector, 'panel': _run_panel, 'backtrader': _run_backtrader}
+
+
+def run_case(store: OHLCVStore, scale_name: str, strat_cls, engine: str, bt_tickers: int) -> dict:
+    scale = SCALES[scale_name]
+    tickers = store.tickers(scale.interval)
+    if engine == 'backtrader':
+        tickers = tickers[:bt_tickers]
+    per_case_rss = reset_peak_rss()
+    timer = _Timer()
+    t_start = time.perf_counter()
+    curves = RUNNERS[engine](store, tickers, scale.interval, strat_cls, timer)
+    t0 = time.perf_counter()
+    for curve in curves:
+        if len(curve) > 1:
+            equity_metrics(curve)
+    timer.add('metrics', t0)
+    wall = time.perf_counter() - t_start
+    bars = timer.bars
+    compute = timer.stages['indicators'] + timer.stages['simulation']
+    return {
+        'scale': scale_name, 'strategy': strat_cls.__name__, 'engine': engine,
+        'tickers': len(tickers), 'bars': bars,
+        'stages': {k: round(v, 6) for k, v in timer.stages.items()},
+        'wall': round(wall, 6),
+        'bars_per_sec': round(bars / compute, 1) if compute else None,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'peak_rss_scope': 'case' if per_case_rss else 'process',
+    }
+
+
+def _meta() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'date': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__, 'pandas': pd.__version__, 'backtrader': bt.__version__,
+        'platform': platform.platform(), 'cpus': os.cpu_count(),
+    }
+
+
+def run_benchmarks(scales=None, strategies=None, engines=None, bt_tickers: int = 10, log=print) -> dict:
+    """Lance les cas demandés (tous par défaut) ; retourne {'meta': …, 'results': [...]}."""
+    scales = scales or list(SCALES)
+    strategies = strategies or STRATEGIES
+    results = []
+    cache = indicator_cache.get_cache()
+    indicator_cache.set_cache(None)
+    try:
+        for scale_name in scales:
+            scale = SCALES[scale_name]
+            with tempfile.TemporaryDirectory() as root:
+                store = OHLCVStore(root)
+                for tic, df in make_data(scale).items():
+                    store.write(tic, scale.interval, df)
+                for strat_cls in strategies:
+                    for engine in engines_for(strat_cls):
+                        if engines and engine not in engines:
+                            continue
+                        res = run_case(store, scale_name, strat_cls, engine, bt_tickers)
+                        results.append(res)
+                        log(f"{scale_name:15s} {res['strategy']:28s} {engine:10s} "
+                            f"{res['wall']:8.2f}s {res['bars_per_sec'] or 0:>12,.0f} barres/s "
+                            f"{res['peak_rss_mb']:7.0f} Mo")
+    finally:
+        indicator_cache.set_cache(cache)
+    return {'meta': {**_meta(), 'bt_tickers': bt_tickers}, 'results': results}
+
+
+def compare(base: dict, new: dict) -> pd.DataFrame:
+    """Cas communs à deux fichiers : temps total et barres/s, ratio nouveau / ancien."""
+    key = ('scale', 'strategy', 'engine')
+    old = {tuple(r[k] for k in key): r for r in base['results']}
+    rows = []
+    for r in new['results']:
+        o = old.get(tuple(r[k] for k in key))
+        if o is None or o['bars'] != r['bars']:
+            continue
+        rows.append({**{k: r[k] for k in key}, 'wall_avant': o['wall'], 'wall': r['wall'],
+                     'ratio': round(r['wall'] / o['wall'], 3) if o['wall'] else None})
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks sur données synthétiques")
+    parser.add_argument('--scales', nargs='*', choices=list(SCALES), default=None)
+    parser.add_argument('--strategies', nargs='*', choices=[s.__name__ for s in STRATEGIES], default=None)
+    parser.add_argument('--engines', nargs='*', choices=list(RUNNERS), default=None)
+    parser.add_argument('--bt-tickers', type=int, default=10,
+                        help="tickers max pour backtrader (gros univers)")
+    parser.add_argument('--out', default='benchmark.json')
+    parser.add_argument('--compare', nargs=2, metavar=('AVANT', 'APRES'), default=None,
+                        help="compare deux fichiers JSON sans relancer")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f0, open(args.compare[1]) as f1:
+            table = compare(json.load(f0), json.load(f1))
+        print(table.to_string(index=False) if len(table) else "Aucun cas commun")
+        sys.exit(0)
+
+    strategies = [s for s in STRATEGIES if args.strategies is None or s.__name__ in args.strategies]
+    report = run_benchmarks(args.scales, strategies, args.engines, args.bt_tickers)
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"{len(report['results'])} cas → {args.out}")
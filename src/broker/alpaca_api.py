@@ -0,0 +1,123 @@
+"""
+Adaptateur Alpaca (API REST v2 ; compte paper par défaut) pour le runtime live.
+
+• ordres au marché POST /v2/orders (client_order_id = id du runtime), sur une
+  connexion keep-alive réutilisée
+• barres : dernières barres du timeframe pour tous les symboles en une requête
+  (data API), interrogées toutes les `poll` secondes ; une barre est émise
+  quand elle est close
+• exécutions : ordres ouverts interrogés (filled_qty, filled_avg_price) ; une
+  exécution partielle émet la quantité nouvellement exécutée
+
+Identifiants : APCA_API_KEY_ID, APCA_API_SECRET_KEY ; APCA_API_BASE_URL pour le compte réel.
+"""
+import asyncio
+import os
+import time
+
+import pandas as pd
+
+from broker.base import Account, Bar, BrokerAPI, Fill, HTTPSession, Reject, bars_frame
+
+PAPER_URL = 'https://paper-api.alpaca.markets'
+DATA_URL = 'https://data.alpaca.markets'
+TIMEFRAMES = {'1Min': 60, '5Min': 300, '15Min': 900, '1Hour': 3600, '1Day': 86400}
+_DONE = ('filled', 'canceled', 'expired', 'rejected', 'done_for_day')
+
+
+def _epoch(ts: str) -> float:
+    return pd.Timestamp(ts).timestamp()
+
+
+class AlpacaBroker(BrokerAPI):
+    name = 'alpaca'
+
+    def __init__(self, key: str, secret: str, base_url: str = PAPER_URL, data_url: str = DATA_URL,
+                 timeframe: str = '1Day', feed: str = 'iex', poll: float = 1.0):
+        super().__init__()
+        if timeframe not in TIMEFRAMES:
+            raise ValueError(f"Timeframe inconnu : {timeframe} (choix : {', '.join(TIMEFRAMES)})")
+        headers = {'APCA-API-KEY-ID': key, 'APCA-API-SECRET-KEY': secret}
+        self.trading = HTTPSession(base_url, headers)
+        self.data = HTTPSession(data_url, headers)
+        self.timeframe, self.span = timeframe, TIMEFRAMES[timeframe]
+        self.feed = feed
+        self.poll = poll
+        self.symbols = []
+        self._open = {}       # client_order_id → [symbole, sens, quantité déjà exécutée]
+        self._last_bar = {}   # symbole → heure de la dernière barre émise
+
+    @classmethod
+    def from_env(cls, **kw):
+        return cls(os.environ['APCA_API_KEY_ID'], os.environ['APCA_API_SECRET_KEY'],
+                   os.environ.get('APCA_API_BASE_URL', PAPER_URL), **kw)
+
+    async def close(self):
+        await super().close()
+        await self.trading.close()
+        await self.data.close()
+
+    async def account(self) -> Account:
+        acc, positions = await asyncio.gather(self.trading.get('/v2/account'), self.trading.get('/v2/positions'))
+        return Account(float(acc['cash']), {p['symbol']: float(p['qty']) for p in positions})
+
+    def _closed(self, bars):
+        """Barres closes (l'API renvoie aussi la barre en cours)."""
+        now = time.time()
+        return [b for b in bars if _epoch(b['t']) + self.span <= now]
+
+    async def history(self, symbol: str, limit: int):
+        # Plage large (week-ends, nuits) parcourue à rebours, `limit` barres au plus
+        start = pd.Timestamp.now('UTC') - pd.Timedelta(seconds=self.span * limit * 3 + 7 * 86400)
+        d = await self.data.get(f'/v2/stocks/{symbol}/bars', {
+            'timeframe': self.timeframe, 'start': start.isoformat(), 'limit': limit + 1,
+            'sort': 'desc', 'adjustment': 'all', 'feed': self.feed})
+        bars = self._closed(reversed(d.get('bars') or []))[-limit:]
+        return bars_frame((_epoch(b['t']), b['o'], b['h'], b['l'], b['c'], b['v']) for b in bars)
+
+    async def subscribe(self, symbols) -> None:
+        self.symbols = list(symbols)
+        self._poll(self._bars, self.poll)
+        self._poll(self._orders, self.poll)
+
+    async def _bars(self):
+        start = pd.Timestamp.now('UTC') - pd.Timedelta(seconds=self.span * 3 + 4 * 86400)
+        d = await self.data.get('/v2/stocks/bars', {
+            'symbols': ','.join(self.symbols), 'timeframe': self.timeframe, 'start': start.isoformat(),
+            'adjustment': 'all', 'feed': self.feed, 'limit': 10000})
+        for sym, bars in (d.get('bars') or {}).items():
+            bars = self._closed(bars)
+            if not bars:
+                continue
+            b = bars[-1]
+            t = _epoch(b['t'])
+            if t > self._last_bar.get(sym, 0.0):
+                self._last_bar[sym] = t
+                self._emit(Bar(sym, t, b['o'], b['h'], b['l'], b['c'], b['v']))
+
+    async def _orders(self):
+        if not self._open:
+            return
+        coids = list(self._open)
+        states = await asyncio.gather(*(self.trading.get('/v2/orders:by_client_order_id', {'client_order_id': c})
+                                        for c in coids))
+        for coid, o in zip(coids, states):
+            sym, sign, done = self._open[coid]
+            filled = float(o.get('filled_qty') or 0.0)
+            if filled > done:
+                # Prix moyen cumulé : approximation du prix de la tranche pour une exécution partielle
+                self._open[coid][2] = filled
+                self._emit(Fill(coid, sym, sign * (filled - done), float(o['filled_avg_price']),
+                                _epoch(o.get('filled_at') or o['updated_at'])))
+            if o['status'] in _DONE:
+                del self._open[coid]
+                if not filled:
+                    self._emit(Reject(coid, sym, o['status']))
+
+    async def _send(self, order) -> str:
+        d = await self.trading.post('/v2/orders', {
+            'symbol': order.symbol, 'qty': f'{abs(order.qty):.9f}'.rstrip('0').rstrip('.'),
+            'side': 'buy' if order.qty > 0 else 'sell', 'type': 'market', 'time_in_force': 'day',
+            'client_order_id': order.id})
+        self._open[order.id] = [order.symbol, 1.0 if order.qty > 0 else -1.0, 0.0]
+        return d['id']
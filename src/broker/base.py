@@ -0,0 +1,354 @@
+"""
+Interface commune des brokers (live, paper, mock) pour le runtime asyncio (live.py).
+
+• événements : Bar, Fill, Reject, Clock (fin d'un pas de rejeu), End ; un seul
+  flux par broker, lu par `async for received, event in broker.events()`
+• submit(order) ne bloque pas la boucle : requête HTTP asynchrone, l'exécution
+  arrive plus tard comme événement Fill (ou Reject)
+• HTTPSession : client HTTP/1.1 keep-alive minimal sur asyncio (pool de
+  connexions réutilisées par hôte, JSON, flux NDJSON chunked), sans dépendance
+• LatencyTracker : percentiles des latences barre → décision / ordre / ack
+"""
+import asyncio
+import json as _json
+import logging
+import math
+import ssl
+import time
+from collections import defaultdict
+from typing import NamedTuple, Optional
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+
+# --- Événements et ordres ---
+
+class Bar(NamedTuple):
+    symbol: str
+    time: float          # secondes epoch (ouverture de la barre)
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+
+class Order(NamedTuple):
+    """Ordre au marché : qty signée (> 0 achat), price = cours de création (contrôles, plafonds)."""
+    id: str
+    symbol: str
+    qty: float
+    price: float
+
+
+class Fill(NamedTuple):
+    order_id: str
+    symbol: str
+    qty: float           # signée
+    price: float
+    time: float
+    cash: Optional[float] = None  # cash du compte après l'exécution, si le broker le donne
+
+
+class Reject(NamedTuple):
+    order_id: str
+    symbol: str
+    reason: str
+
+
+class Clock(NamedTuple):
+    """Toutes les barres du pas `time` ont été envoyées."""
+    time: float
+
+
+class End(NamedTuple):
+    reason: str = ''
+
+
+class Account(NamedTuple):
+    cash: float
+    positions: dict      # {symbole: quantité}
+
+
+def round_step(qty: float, step: float) -> float:
+    """Quantité tronquée au pas de lot du marché (vers zéro)."""
+    if not step:
+        return qty
+    return math.copysign(math.floor(abs(qty) / step + 1e-9) * step, qty)
+
+
+def bars_frame(rows) -> pd.DataFrame:
+    """DataFrame OHLCV (index date, comme data_loader) depuis des tuples (epoch s, o, h, l, c, v)."""
+    rows = list(rows)
+    a = np.array(rows, dtype=np.float64).reshape(len(rows), 6)
+    return pd.DataFrame(a[:, 1:], columns=['Open', 'High', 'Low', 'Close', 'Volume'],
+                        index=pd.DatetimeIndex(pd.to_datetime(a[:, 0], unit='s'), name='Date'))
+
+
+class BrokerAPI:
+    """
+    Base des adaptateurs. Les sous-classes implémentent account(), history(),
+    subscribe() et _send() ; les barres et les exécutions passent par _emit().
+    """
+    name = 'base'
+
+    def __init__(self):
+        self._queue = asyncio.Queue()
+        self._tasks = []
+
+    async def connect(self):
+        return self
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def account(self) -> Account:
+        raise NotImplementedError
+
+    async def history(self, symbol: str, limit: int) -> pd.DataFrame:
+        """Dernières barres closes (préchauffe des indicateurs)."""
+        raise NotImplementedError
+
+    async def subscribe(self, symbols) -> None:
+        """Démarre le flux de barres des symboles."""
+        raise NotImplementedError
+
+    async def submit(self, order: Order) -> str:
+        """Envoie l'ordre ; renvoie l'identifiant du broker une fois l'ordre accepté (ack)."""
+        try:
+            return await self._send(order)
+        except Exception as exc:
+            self._emit(Reject(order.id, order.symbol, repr(exc)))
+            raise
+
+    async def _send(self, order: Order) -> str:
+        raise NotImplementedError
+
+    async def advance(self) -> None:
+        """Rejeu pas à pas (mock) : autorise le pas suivant. Sans effet en live."""
+
+    def _emit(self, event) -> None:
+        self._queue.put_nowait((time.perf_counter(), event))
+
+    async def events(self):
+        """(instant de réception perf_counter, événement), jusqu'à End."""
+        while True:
+            t, event = await self._queue.get()
+            yield t, event
+            if isinstance(event, End):
+                return
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.ensure_future(coro)
+        self._tasks.append(task)
+        return task
+
+    def _poll(self, fn, interval: float) -> asyncio.Task:
+        """Appelle `await fn()` toutes les `interval` secondes (erreurs journalisées, boucle maintenue)."""
+        async def loop():
+            while True:
+                try:
+                    await fn()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    log.warning("[%s] %s : %r", self.name, fn.__name__, exc)
+                await asyncio.sleep(interval)
+        return self._spawn(loop())
+
+
+# --- HTTP/1.1 keep-alive ---
+
+class HTTPError(Exception):
+    def __init__(self, status: int, body: bytes):
+        super().__init__(f"HTTP {status} : {body[:200].decode(errors='replace')}")
+        self.status = status
+        self.body = body
+
+
+class Response(NamedTuple):
+    status: int
+    headers: dict
+    body: bytes
+
+    def json(self):
+        return _json.loads(self.body) if self.body else None
+
+
+async def read_head(reader: asyncio.StreamReader):
+    """(1re ligne, {en-tête minuscule: valeur}) d'un message HTTP ; (None, {}) si la connexion est fermée."""
+    line = await reader.readline()
+    if not line:
+        return None, {}
+    headers = {}
+    while True:
+        h = await reader.readline()
+        if h in (b'\r\n', b'\n', b''):
+            break
+        k, _, v = h.decode('latin-1').partition(':')
+        headers[k.strip().lower()] = v.strip()
+    return line.decode('latin-1').rstrip('\r\n'), headers
+
+
+async def read_body(reader: asyncio.StreamReader, headers: dict) -> bytes:
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        parts = []
+        async for chunk in read_chunks(reader):
+            parts.append(chunk)
+        return b''.join(parts)
+    n = int(headers.get('content-length', 0))
+    return await reader.readexactly(n) if n else b''
+
+
+async def read_chunks(reader: asyncio.StreamReader):
+    while True:
+        size = int((await reader.readline()).split(b';')[0], 16)
+        if not size:
+            await reader.readline()
+            return
+        chunk = await reader.readexactly(size)
+        await reader.readline()
+        yield chunk
+
+
+def encode_json(obj) -> bytes:
+    return _json.dumps(obj, separators=(',', ':')).encode()
+
+
+class HTTPSession:
+    """
+    Client HTTP/1.1 vers une seule origine, connexions gardées ouvertes et
+    réutilisées (pas de handshake TCP/TLS par ordre). Jusqu'à max_connections
+    requêtes simultanées ; stream() ouvre une connexion dédiée.
+    """
+
+    def __init__(self, base_url: str, headers: dict = None, max_connections: int = 8,
+                 timeout: float = 10.0, verify: bool = True):
+        url = urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == 'https' else 80)
+        self.prefix = url.path.rstrip('/')
+        self.headers = {'Host': url.netloc, 'Accept': 'application/json', **(headers or {})}
+        self.timeout = timeout
+        self.ssl = None
+        if url.scheme == 'https':
+            self.ssl = ssl.create_default_context()
+            if not verify:  # passerelle locale à certificat autosigné (IB)
+                self.ssl.check_hostname = False
+                self.ssl.verify_mode = ssl.CERT_NONE
+        self._idle = []
+        self._slots = asyncio.Semaphore(max_connections)
+        self.opened = 0  # connexions ouvertes depuis le début (contrôle de la réutilisation)
+
+    async def _connect(self):
+        self.opened += 1
+        return await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+
+    def _encode(self, method, path, params, body, headers) -> bytes:
+        target = self.prefix + path + ('?' + urlencode(params) if params else '')
+        lines = [f'{method} {target} HTTP/1.1']
+        lines += [f'{k}: {v}' for k, v in {**self.headers, **(headers or {})}.items()]
+        if body is not None or method in ('POST', 'PUT'):
+            lines.append(f'Content-Length: {len(body or b"")}')
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + (body or b'')
+
+    async def request(self, method: str, path: str, params: dict = None, json=None,
+                      data: bytes = None, headers: dict = None) -> Response:
+        if json is not None:
+            data = encode_json(json)
+            headers = {'Content-Type': 'application/json', **(headers or {})}
+        payload = self._encode(method, path, params, data, headers)
+        async with self._slots:
+            for attempt in (0, 1):
+                reused = bool(self._idle)
+                reader, writer = self._idle.pop() if reused else await self._connect()
+                try:
+                    writer.write(payload)
+                    head, h = await asyncio.wait_for(read_head(reader), self.timeout)
+                    if head is None:
+                        raise ConnectionResetError('connexion fermée par le serveur')
+                    body = await asyncio.wait_for(read_body(reader, h), self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if reused and not attempt:
+                        continue  # connexion inactive fermée côté serveur : une nouvelle
+                    raise
+                except BaseException:
+                    writer.close()
+                    raise
+                if h.get('connection', '').lower() == 'close':
+                    writer.close()
+                else:
+                    self._idle.append((reader, writer))
+                status = int(head.split()[1])
+                if status >= 400:
+                    raise HTTPError(status, body)
+                return Response(status, h, body)
+
+    async def get(self, path, params=None, **kw):
+        return (await self.request('GET', path, params, **kw)).json()
+
+    async def post(self, path, json=None, params=None, **kw):
+        return (await self.request('POST', path, params, json=json, **kw)).json()
+
+    async def delete(self, path, params=None, **kw):
+        return (await self.request('DELETE', path, params, **kw)).json()
+
+    async def stream(self, path: str, params: dict = None):
+        """Lignes JSON (NDJSON) d'une réponse chunked sans fin, sur une connexion dédiée."""
+        reader, writer = await self._connect()
+        try:
+            writer.write(self._encode('GET', path, params, None, None))
+            head, h = await read_head(reader)
+            if head is None or int(head.split()[1]) >= 400:
+                raise HTTPError(int(head.split()[1]) if head else 0, await read_body(reader, h))
+            buf = b''
+            async for chunk in read_chunks(reader):
+                buf += chunk
+                *lines, buf = buf.split(b'\n')
+                for line in lines:
+                    if line:
+                        yield _json.loads(line)
+        finally:
+            writer.close()
+
+    async def close(self):
+        for _, writer in self._idle:
+            writer.close()
+        self._idle = []
+
+
+# --- Latences ---
+
+class LatencyTracker:
+    """Latences par catégorie (secondes) ; report() en millisecondes."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.samples[name].append(seconds)
+
+    def since(self, name: str, t0: float) -> None:
+        self.samples[name].append(time.perf_counter() - t0)
+
+    def report(self) -> pd.DataFrame:
+        rows = {}
+        for name, s in self.samples.items():
+            a = np.asarray(s) * 1e3
+            p50, p95, p99 = np.percentile(a, [50, 95, 99])
+            rows[name] = {'n': len(a), 'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'max_ms': a.max()}
+        return pd.DataFrame.from_dict(rows, orient='index')
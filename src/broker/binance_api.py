@@ -0,0 +1,118 @@
+"""
+Adaptateur Binance spot (API REST v3 ; testnet par défaut) pour le runtime live.
+
+• tickers du dépôt ('BTC-USD') traduits en paires Binance ('BTCUSDT')
+• ordres au marché signés HMAC-SHA256, réponse FULL : les exécutions arrivent
+  avec l'ack, sans interrogation ; quantité tronquée au pas de lot (LOT_SIZE)
+• barres : klines closes, interrogées toutes les `poll` secondes pour tous les
+  symboles en parallèle sur les connexions keep-alive
+• cash = solde libre de l'actif de cotation (USDT) ; commissions non déduites
+  du miroir local entre deux appels à account()
+
+Identifiants : BINANCE_API_KEY, BINANCE_API_SECRET ; BINANCE_BASE_URL pour le compte réel.
+"""
+import asyncio
+import hashlib
+import hmac
+import os
+import time
+from urllib.parse import urlencode
+
+from broker.base import Account, Bar, BrokerAPI, Fill, HTTPSession, bars_frame, round_step
+
+BASE_URL = 'https://api.binance.com'
+TESTNET_URL = 'https://testnet.binance.vision'
+INTERVALS = ('1m', '5m', '15m', '1h', '4h', '1d')
+
+
+def binance_symbol(ticker: str, quote: str = 'USDT') -> str:
+    """'BTC-USD' → 'BTCUSDT' (dollar = stablecoin de cotation) ; sinon tirets retirés."""
+    base, _, q = ticker.partition('-')
+    return base + (quote if q in ('USD', '') else q)
+
+
+class BinanceBroker(BrokerAPI):
+    name = 'binance'
+
+    def __init__(self, key: str, secret: str, base_url: str = TESTNET_URL, interval: str = '1d',
+                 quote: str = 'USDT', poll: float = 1.0, recv_window: int = 5000):
+        super().__init__()
+        if interval not in INTERVALS:
+            raise ValueError(f"Intervalle inconnu : {interval} (choix : {', '.join(INTERVALS)})")
+        self.session = HTTPSession(base_url, {'X-MBX-APIKEY': key})
+        self.secret = secret.encode()
+        self.interval = interval
+        self.quote = quote
+        self.poll = poll
+        self.recv_window = recv_window
+        self.symbols = []
+        self._steps = {}      # paire → pas de lot
+        self._last_bar = {}
+
+    @classmethod
+    def from_env(cls, **kw):
+        return cls(os.environ['BINANCE_API_KEY'], os.environ['BINANCE_API_SECRET'],
+                   os.environ.get('BINANCE_BASE_URL', TESTNET_URL), **kw)
+
+    async def close(self):
+        await super().close()
+        await self.session.close()
+
+    async def _signed(self, method: str, path: str, params: dict):
+        params = {**params, 'recvWindow': self.recv_window, 'timestamp': int(time.time() * 1000)}
+        params['signature'] = hmac.new(self.secret, urlencode(params).encode(), hashlib.sha256).hexdigest()
+        return (await self.session.request(method, path, params)).json()
+
+    async def account(self) -> Account:
+        d = await self._signed('GET', '/api/v3/account', {})
+        balances = {b['asset']: float(b['free']) + float(b['locked']) for b in d['balances']}
+        cash = next((float(b['free']) for b in d['balances'] if b['asset'] == self.quote), 0.0)
+        # Positions au format du dépôt : 'BTC' → 'BTC-USD'
+        return Account(cash, {f'{a}-USD': v for a, v in balances.items() if v and a != self.quote})
+
+    async def history(self, symbol: str, limit: int):
+        rows = await self.session.get('/api/v3/klines', {'symbol': binance_symbol(symbol, self.quote),
+                                                         'interval': self.interval, 'limit': limit + 1})
+        now = time.time() * 1000
+        rows = [r for r in rows if r[6] < now][-limit:]  # klines closes seulement
+        return bars_frame((r[0] / 1000, float(r[1]), float(r[2]), float(r[3]), float(r[4]), float(r[5]))
+                          for r in rows)
+
+    async def subscribe(self, symbols) -> None:
+        self.symbols = list(symbols)
+        info = await self.session.get('/api/v3/exchangeInfo', {
+            'symbols': '[' + ','.join(f'"{binance_symbol(s, self.quote)}"' for s in self.symbols) + ']'})
+        for s in info['symbols']:
+            lot = next((f for f in s['filters'] if f['filterType'] == 'LOT_SIZE'), None)
+            self._steps[s['symbol']] = float(lot['stepSize']) if lot else 0.0
+        self._poll(self._bars, self.poll)
+
+    async def _bars(self):
+        now = time.time() * 1000
+        replies = await asyncio.gather(*(self.session.get('/api/v3/klines', {
+            'symbol': binance_symbol(s, self.quote), 'interval': self.interval, 'limit': 2})
+            for s in self.symbols))
+        for sym, rows in zip(self.symbols, replies):
+            closed = [r for r in rows if r[6] < now]
+            if not closed:
+                continue
+            r = closed[-1]
+            t = r[0] / 1000
+            if t > self._last_bar.get(sym, 0.0):
+                self._last_bar[sym] = t
+                self._emit(Bar(sym, t, float(r[1]), float(r[2]), float(r[3]), float(r[4]), float(r[5])))
+
+    async def _send(self, order) -> str:
+        pair = binance_symbol(order.symbol, self.quote)
+        qty = round_step(abs(order.qty), self._steps.get(pair, 0.0))
+        if qty <= 0:
+            raise ValueError(f"Quantité {abs(order.qty)} sous le pas de lot de {pair}")
+        sign = 1.0 if order.qty > 0 else -1.0
+        d = await self._signed('POST', '/api/v3/order', {
+            'symbol': pair, 'side': 'BUY' if sign > 0 else 'SELL', 'type': 'MARKET',
+            'quantity': f'{qty:.8f}'.rstrip('0').rstrip('.'), 'newClientOrderId': order.id,
+            'newOrderRespType': 'FULL'})
+        t = d.get('transactTime', time.time() * 1000) / 1000
+        for f in d.get('fills', []):
+            self._emit(Fill(order.id, order.symbol, sign * float(f['qty']), float(f['price']), t))
+        return str(d['orderId'])
@@ -0,0 +1,134 @@
+"""
+Adaptateur Interactive Brokers via la passerelle Client Portal (API REST locale,
+certificat autosigné) pour le runtime live.
+
+• conid de chaque symbole résolu une fois (secdef/search), puis gardé
+• ordres au marché POST /iserver/account/{compte}/orders (cOID = id du
+  runtime) ; les questions de confirmation de la passerelle sont acceptées
+• barres : historique court interrogé toutes les `poll` secondes, dernière
+  barre close émise ; exécutions : /iserver/account/trades
+• session entretenue par /tickle ; la passerelle limite le débit : peu de
+  connexions simultanées
+
+Identifiants : session ouverte dans la passerelle ; IB_ACCOUNT (sinon 1er compte), IB_GATEWAY_URL.
+"""
+import asyncio
+import math
+import os
+import time
+
+from broker.base import Account, Bar, BrokerAPI, Fill, HTTPSession, bars_frame, round_step
+
+GATEWAY_URL = 'https://localhost:5000/v1/api'
+BARS = {'1min': 60, '5min': 300, '15min': 900, '1h': 3600, '1d': 86400}
+
+
+def _period(bar: str, limit: int) -> str:
+    """Période d'historique couvrant `limit` barres (jours de bourse, nuits)."""
+    seconds = BARS[bar] * limit
+    if BARS[bar] >= 86400:
+        return f'{min(math.ceil(seconds / 86400 * 1.5) + 5, 1000)}d'
+    return f'{math.ceil(seconds / 3600 * 3) + 24}h'
+
+
+class IBBroker(BrokerAPI):
+    name = 'ib'
+
+    def __init__(self, account_id: str = None, base_url: str = GATEWAY_URL, bar: str = '1d',
+                 poll: float = 2.0, lot: float = 1.0, verify: bool = False):
+        super().__init__()
+        if bar not in BARS:
+            raise ValueError(f"Barre inconnue : {bar} (choix : {', '.join(BARS)})")
+        self.session = HTTPSession(base_url, max_connections=4, verify=verify)
+        self.account_id = account_id
+        self.bar = bar
+        self.poll = poll
+        self.lot = lot        # pas de quantité (1 action ; 0 si fractions autorisées)
+        self.symbols = []
+        self._conids = {}
+        self._open = {}       # cOID → symbole
+        self._seen = set()    # exécutions déjà émises
+        self._last_bar = {}
+
+    @classmethod
+    def from_env(cls, **kw):
+        return cls(os.environ.get('IB_ACCOUNT'), os.environ.get('IB_GATEWAY_URL', GATEWAY_URL), **kw)
+
+    async def connect(self):
+        d = await self.session.get('/iserver/accounts')
+        if self.account_id is None:
+            self.account_id = d['accounts'][0]
+        self._poll(self._tickle, 55.0)
+        return self
+
+    async def _tickle(self):
+        await self.session.post('/tickle')
+
+    async def close(self):
+        await super().close()
+        await self.session.close()
+
+    async def conid(self, symbol: str) -> int:
+        if symbol not in self._conids:
+            found = await self.session.get('/iserver/secdef/search', {'symbol': symbol, 'secType': 'STK'})
+            self._conids[symbol] = int(found[0]['conid'])
+        return self._conids[symbol]
+
+    async def account(self) -> Account:
+        summary, positions = await asyncio.gather(
+            self.session.get(f'/portfolio/{self.account_id}/summary'),
+            self.session.get(f'/portfolio/{self.account_id}/positions/0'))
+        return Account(float(summary['totalcashvalue']['amount']),
+                       {p.get('ticker') or p['contractDesc']: float(p['position']) for p in positions or []})
+
+    async def _history(self, symbol: str, period: str):
+        d = await self.session.get('/iserver/marketdata/history', {
+            'conid': await self.conid(symbol), 'period': period, 'bar': self.bar, 'outsideRth': 'false'})
+        now = time.time()
+        return [b for b in d.get('data', []) if b['t'] / 1000 + BARS[self.bar] <= now]
+
+    async def history(self, symbol: str, limit: int):
+        bars = (await self._history(symbol, _period(self.bar, limit)))[-limit:]
+        return bars_frame((b['t'] / 1000, b['o'], b['h'], b['l'], b['c'], b['v']) for b in bars)
+
+    async def subscribe(self, symbols) -> None:
+        self.symbols = list(symbols)
+        await asyncio.gather(*(self.conid(s) for s in self.symbols))
+        self._poll(self._bars, self.poll)
+        self._poll(self._trades, self.poll)
+
+    async def _bars(self):
+        replies = await asyncio.gather(*(self._history(s, _period(self.bar, 3)) for s in self.symbols))
+        for sym, bars in zip(self.symbols, replies):
+            if not bars:
+                continue
+            b = bars[-1]
+            t = b['t'] / 1000
+            if t > self._last_bar.get(sym, 0.0):
+                self._last_bar[sym] = t
+                self._emit(Bar(sym, t, b['o'], b['h'], b['l'], b['c'], b['v']))
+
+    async def _trades(self):
+        if not self._open:
+            return
+        for e in await self.session.get('/iserver/account/trades') or []:
+            coid, eid = e.get('order_ref'), e['execution_id']
+            if coid not in self._open or eid in self._seen:
+                continue
+            self._seen.add(eid)
+            sign = 1.0 if e['side'] in ('B', 'BUY') else -1.0
+            self._emit(Fill(coid, self._open[coid], sign * float(e['size']), float(e['price']),
+                            float(e.get('trade_time_r', time.time() * 1000)) / 1000))
+
+    async def _send(self, order) -> str:
+        qty = round_step(abs(order.qty), self.lot)
+        if qty <= 0:
+            raise ValueError(f"Quantité {abs(order.qty)} sous le lot minimal ({self.lot})")
+        reply = await self.session.post(f'/iserver/account/{self.account_id}/orders', {'orders': [{
+            'conid': await self.conid(order.symbol), 'orderType': 'MKT', 'tif': 'DAY',
+            'side': 'BUY' if order.qty > 0 else 'SELL', 'quantity': qty, 'cOID': order.id}]})
+        # Avertissements de la passerelle (taille, marché fermé…) : confirmés un par un
+        while reply and 'order_id' not in reply[0]:
+            reply = await self.session.post(f"/iserver/reply/{reply[0]['id']}", {'confirmed': True})
+        self._open[order.id] = order.symbol
+        return str(reply[0]['order_id'])
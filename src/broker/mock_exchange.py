@@ -0,0 +1,365 @@
+"""
+Bourse simulée locale (HTTP + flux NDJSON) pour tester le runtime live hors ligne.
+
+MockExchange rejoue des DataFrames OHLCV sur l'union de leurs calendriers :
+un pas toutes les `interval` secondes (ou à la demande, lockstep=True), avec
+un compte (cash partagé, positions) et des exécutions simulées.
+
+Routes :
+  GET  /v1/account                 → {"cash", "positions"}
+  GET  /v1/bars?symbol=&limit=     → barres antérieures au rejeu (préchauffe)
+  POST /v1/orders                  → {"id", "status": "accepted"} ; exécution par le flux
+  POST /v1/advance                 → pas suivant (lockstep)
+  GET  /v1/stream?symbols=A,B      → NDJSON chunked : bar, fill, reject, clock, end
+
+Exécutions :
+• fill='next_open' : comme le BackBroker backtrader (et vector_engine.PortfolioBroker) :
+  ordres contrôlés au pas suivant au cours de création (cash cumulé dans l'ordre
+  de soumission), puis exécutés à l'ouverture de la prochaine barre du symbole,
+  avec un nouveau contrôle de cash ; exécutions envoyées avant les barres du pas
+• fill='immediate' : au dernier cours de clôture dès réception de l'ordre
+slippage_bps s'applique au prix d'exécution dans les deux modes.
+
+MockBroker : le client (interface broker.base.BrokerAPI) de ce serveur.
+
+En script :
+    python src/broker/mock_exchange.py SPY QQQ BTC-USD --provider synthetic --interval 0.5
+"""
+import asyncio
+import json
+import os
+import sys
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+if __name__ == "__main__":  # lancé en script : src/ dans le chemin, comme les autres modules
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from broker.base import (Account, Bar, BrokerAPI, Clock, End, Fill, HTTPSession, Reject,
+                         bars_frame, encode_json, read_body, read_head)
+from data_store import to_epoch_seconds
+from vector_engine import _update
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found'}
+
+
+class _Account:
+    """Compte du mock : cash commun, (taille, prix moyen) par symbole, mêmes calculs que PortfolioBroker."""
+
+    def __init__(self, cash: float):
+        self.cash = cash
+        self.positions = {}
+        self.submitted = []  # (id, symbole, qty, prix de création), contrôlés au pas suivant
+        self.pending = []    # (id, symbole, qty) acceptés, en attente d'une barre du symbole
+
+    def check(self):
+        cash, clones, events = self.cash, {}, []
+        for oid, sym, qty, created in self.submitted:
+            psize, pprice = clones.get(sym) or self.positions.get(sym, (0.0, 0.0))
+            psize, pprice, opened, closed = _update(psize, pprice, qty, created)
+            clones[sym] = (psize, pprice)
+            if closed:
+                cash += -closed * created
+            if opened:
+                cash -= opened * created
+            if cash >= 0.0:
+                self.pending.append((oid, sym, qty))
+            else:
+                events.append({'type': 'reject', 'id': oid, 'symbol': sym, 'reason': 'margin'})
+        self.submitted = []
+        return events
+
+    def fill(self, oid, sym, qty, price, time):
+        """Exécution au prix donné (partie ouverture annulée si le cash manque)."""
+        size, pprice_orig = self.positions.get(sym, (0.0, 0.0))
+        _, _, opened, closed = _update(size, pprice_orig, qty, price)
+        pnl = -closed * (price - pprice_orig) * 1.0
+        cash = self.cash
+        if closed:
+            cash += -closed * pprice_orig + pnl
+            self.cash = cash
+        if opened:
+            cash -= opened * price
+            if cash < 0.0:
+                opened = 0
+            else:
+                self.cash = cash
+        execsize = closed + opened
+        if not execsize:
+            return {'type': 'reject', 'id': oid, 'symbol': sym, 'reason': 'cash'}
+        new, avg, _, _ = _update(size, pprice_orig, execsize, price)
+        self.positions[sym] = (new, avg)
+        return {'type': 'fill', 'id': oid, 'symbol': sym, 'qty': execsize, 'price': price,
+                'time': time, 'cash': self.cash}
+
+    def execute(self, opens: dict, time, slip):
+        events, waiting = [], []
+        for oid, sym, qty in self.pending:
+            price = opens.get(sym)
+            if price is None:
+                waiting.append((oid, sym, qty))
+            else:
+                events.append(self.fill(oid, sym, qty, slip(price, qty), time))
+        self.pending = waiting
+        return events
+
+
+class MockExchange:
+    """Serveur HTTP asyncio ; start() renvoie l'URL de base (port libre par défaut)."""
+
+    def __init__(self, data: dict, cash: float = 100_000.0, warmup: int = 0, interval: float = 0.0,
+                 fill: str = 'next_open', slippage_bps: float = 0.0, lockstep: bool = False,
+                 host: str = '127.0.0.1', port: int = 0):
+        if fill not in ('next_open', 'immediate'):
+            raise ValueError(f"Mode d'exécution inconnu : {fill} (next_open ou immediate)")
+        self.symbols = list(data)
+        self.stamps = {s: to_epoch_seconds(df.index) for s, df in data.items()}
+        self.rows = {s: df[['Open', 'High', 'Low', 'Close', 'Volume']].to_numpy(dtype=np.float64).tolist()
+                     for s, df in data.items()}
+        self.calendar = np.unique(np.concatenate(list(self.stamps.values()))).tolist()
+        self.warmup = warmup
+        self.interval = interval
+        self.fill_mode = fill
+        self.slippage = slippage_bps / 1e4
+        self.lockstep = lockstep
+        self.host, self.port = host, port
+        self.account = _Account(cash)
+        self.last = {}            # dernière clôture publiée par symbole
+        self.subscribers = []     # (symboles ou None, file)
+        self._advance = asyncio.Event()
+        self._replay = None
+        self._server = None
+        self._clients = {}        # tâche de connexion → writer
+        self._ids = 0
+        self._step = warmup
+        self.url = None
+
+    def _slip(self, price: float, qty: float) -> float:
+        return price * (1.0 + self.slippage) if qty > 0 else price * (1.0 - self.slippage)
+
+    # --- Serveur ---
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f'http://{self.host}:{port}'
+        return self.url
+
+    async def stop(self):
+        if self._replay is not None:
+            self._replay.cancel()
+        if self._server is None:
+            return
+        # Flux et connexions keep-alive terminés proprement avant la fermeture
+        self._publish({'type': 'end', 'reason': 'arrêt du serveur'})
+        self._server.close()
+        for writer in self._clients.values():
+            writer.close()
+        await asyncio.gather(*self._clients, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._clients[task] = writer
+        try:
+            while True:
+                head, headers = await read_head(reader)
+                if head is None:
+                    break
+                method, target, _ = head.split(' ', 2)
+                body = await read_body(reader, headers)
+                url = urlsplit(target)
+                params = dict(parse_qsl(url.query))
+                if url.path == '/v1/stream':
+                    await self._stream(writer, params)
+                    break
+                status, obj = self._route(method, url.path, params, body)
+                payload = encode_json(obj)
+                writer.write(f'HTTP/1.1 {status} {_REASONS[status]}\r\nContent-Type: application/json\r\n'
+                             f'Content-Length: {len(payload)}\r\n\r\n'.encode() + payload)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            del self._clients[task]
+
+    def _route(self, method, path, params, body):
+        if method == 'GET' and path == '/v1/account':
+            return 200, {'cash': self.account.cash,
+                         'positions': {s: p[0] for s, p in self.account.positions.items() if p[0]}}
+        if method == 'GET' and path == '/v1/bars':
+            sym = params.get('symbol')
+            if sym not in self.rows:
+                return 404, {'error': f'symbole inconnu : {sym}'}
+            n = self._first(sym)
+            lo = max(n - int(params.get('limit', n)), 0)
+            return 200, {'bars': [[self.stamps[sym][k]] + self.rows[sym][k] for k in range(lo, n)]}
+        if method == 'POST' and path == '/v1/orders':
+            return self._order(json.loads(body))
+        if method == 'POST' and path == '/v1/advance':
+            self._advance.set()
+            return 200, {}
+        return 404, {'error': f'route inconnue : {method} {path}'}
+
+    def _order(self, o):
+        sym, qty = o.get('symbol'), float(o.get('qty', 0))
+        if sym not in self.rows or not qty:
+            return 400, {'error': f'ordre invalide : {o}'}
+        self._ids += 1
+        oid = o.get('id') or f'mock-{self._ids}'
+        if self.fill_mode == 'immediate':
+            price = self.last.get(sym)
+            event = ({'type': 'reject', 'id': oid, 'symbol': sym, 'reason': 'pas de cours'} if price is None
+                     else self.account.fill(oid, sym, qty, self._slip(price, qty), self._now))
+            # Après l'ack, comme une vraie place
+            asyncio.get_running_loop().call_soon(self._publish, event)
+        else:
+            self.account.submitted.append((oid, sym, qty, float(o.get('price', 0.0))))
+        return 200, {'id': oid, 'status': 'accepted'}
+
+    async def _stream(self, writer, params):
+        symbols = set(params['symbols'].split(',')) if params.get('symbols') else None
+        queue = asyncio.Queue()
+        self.subscribers.append((symbols, queue))
+        writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n'
+                     b'Transfer-Encoding: chunked\r\n\r\n')
+        if self._replay is None:
+            self._replay = asyncio.ensure_future(self._run())
+        try:
+            while True:
+                events = [await queue.get()]
+                while not queue.empty():  # un seul chunk pour les événements d'un même pas
+                    events.append(queue.get_nowait())
+                data = b''.join(encode_json(e) + b'\n' for e in events)
+                writer.write(b'%x\r\n%s\r\n' % (len(data), data))
+                await writer.drain()
+                if events[-1]['type'] == 'end':
+                    writer.write(b'0\r\n\r\n')
+                    await writer.drain()
+                    return
+        finally:
+            self.subscribers.remove((symbols, queue))
+
+    def _publish(self, event):
+        sym = event.get('symbol')
+        for symbols, queue in self.subscribers:
+            if sym is None or symbols is None or sym in symbols:
+                queue.put_nowait(event)
+
+    # --- Rejeu ---
+
+    @property
+    def _now(self):
+        return self.calendar[min(self._step, len(self.calendar) - 1)] if self.calendar else 0.0
+
+    def _first(self, sym) -> int:
+        """Indice de la 1re barre rejouée du symbole (les précédentes servent à la préchauffe)."""
+        if self.warmup >= len(self.calendar):
+            return len(self.stamps[sym])
+        return int(np.searchsorted(self.stamps[sym], self.calendar[self.warmup]))
+
+    async def _run(self):
+        acc = self.account
+        pos = {s: self._first(s) for s in self.symbols}
+        for step in range(self.warmup, len(self.calendar)):
+            self._step = step
+            t = self.calendar[step]
+            due = [s for s in self.symbols if pos[s] < len(self.stamps[s]) and self.stamps[s][pos[s]] == t]
+            if self.fill_mode == 'next_open':
+                for event in acc.check():
+                    self._publish(event)
+                if acc.pending:
+                    opens = {s: self.rows[s][pos[s]][0] for s in due}
+                    for event in acc.execute(opens, t, self._slip):
+                        self._publish(event)
+            for s in due:
+                o, h, l, c, v = self.rows[s][pos[s]]
+                self.last[s] = c
+                pos[s] += 1
+                self._publish({'type': 'bar', 'symbol': s, 'time': t,
+                               'open': o, 'high': h, 'low': l, 'close': c, 'volume': v})
+            self._publish({'type': 'clock', 'time': t})
+            if self.lockstep:
+                await self._advance.wait()
+                self._advance.clear()
+            else:
+                await asyncio.sleep(self.interval)
+        self._publish({'type': 'end', 'reason': 'fin du rejeu'})
+
+
+def _event(d: dict):
+    kind = d['type']
+    if kind == 'bar':
+        return Bar(d['symbol'], d['time'], d['open'], d['high'], d['low'], d['close'], d['volume'])
+    if kind == 'fill':
+        return Fill(d['id'], d['symbol'], d['qty'], d['price'], d['time'], d.get('cash'))
+    if kind == 'reject':
+        return Reject(d['id'], d['symbol'], d['reason'])
+    if kind == 'clock':
+        return Clock(d['time'])
+    return End(d.get('reason', ''))
+
+
+class MockBroker(BrokerAPI):
+    """Client du MockExchange : ordres en HTTP keep-alive, barres et exécutions par le flux NDJSON."""
+    name = 'mock'
+
+    def __init__(self, url: str, max_connections: int = 8):
+        super().__init__()
+        self.session = HTTPSession(url, max_connections=max_connections)
+
+    async def close(self):
+        await super().close()
+        await self.session.close()
+
+    async def account(self) -> Account:
+        d = await self.session.get('/v1/account')
+        return Account(d['cash'], d['positions'])
+
+    async def history(self, symbol: str, limit: int):
+        d = await self.session.get('/v1/bars', {'symbol': symbol, 'limit': limit})
+        return bars_frame(d['bars'])
+
+    async def subscribe(self, symbols) -> None:
+        async def pump():
+            async for d in self.session.stream('/v1/stream', {'symbols': ','.join(symbols)}):
+                self._emit(_event(d))
+        self._spawn(pump())
+
+    async def _send(self, order) -> str:
+        d = await self.session.post('/v1/orders', {'id': order.id, 'symbol': order.symbol,
+                                                   'qty': order.qty, 'price': order.price})
+        return d['id']
+
+    async def advance(self) -> None:
+        await self.session.post('/v1/advance')
+
+
+if __name__ == "__main__":
+    import argparse
+    from data_loader import load_many
+    from providers import make_provider
+
+    parser = argparse.ArgumentParser(description="Bourse simulée (rejeu HTTP / NDJSON)")
+    parser.add_argument('tickers', nargs='+')
+    parser.add_argument('--period', default='2y')
+    parser.add_argument('--provider', default='store', help="store (data_loader), synthetic, yfinance, replay:<dossier>")
+    parser.add_argument('--warmup', type=int, default=250, help="pas du calendrier réservés à la préchauffe")
+    parser.add_argument('--interval', type=float, default=1.0, help="secondes entre deux pas")
+    parser.add_argument('--fill', default='next_open', choices=('next_open', 'immediate'))
+    parser.add_argument('--slippage-bps', type=float, default=0.0)
+    parser.add_argument('--cash', type=float, default=100_000.0)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    data = (load_many(args.tickers, period=args.period) if args.provider == 'store'
+            else make_provider(args.provider).fetch(args.tickers, period=args.period))
+
+    async def main():
+        ex = MockExchange(data, args.cash, args.warmup, args.interval, args.fill, args.slippage_bps, port=args.port)
+        print(f"Mock exchange sur {await ex.start()} ({len(ex.calendar) - args.warmup} pas à rejouer)")
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
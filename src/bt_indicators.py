@@ -0,0 +1,75 @@
+"""
+Indicateurs des stratégies backtrader adossés au cache partagé (indicator_cache) :
+bt_indicator() sert le tableau précalculé (CachedLine, valeurs identiques à
+bt.ind.* via vector_indicators) quand le feed contient toutes ses barres, sinon
+l'indicateur bt.ind équivalent.
+"""
+from typing import Optional
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+
+import vector_indicators as vi
+from indicator_cache import INDICATORS, OHLCV, fingerprint, get_cache
+
+# Équivalents backtrader quand le cache ne peut pas servir (feed live, cache désactivé)
+BT_INDICATORS = {
+    'sma':     lambda d, n: bt.ind.SMA(d.close, period=n),
+    'ema':     lambda d, n: bt.ind.EMA(d.close, period=n),
+    'rsi':     lambda d, n: bt.ind.RSI(d.close, period=n),
+    'atr':     lambda d, n: bt.ind.ATR(d, period=n),
+    'adx':     lambda d, n: bt.ind.AverageDirectionalMovementIndex(d, period=n),
+    'vol_sma': lambda d, n: bt.ind.SMA(d.volume, period=n),
+    'dc_up':   lambda d, n: bt.ind.Highest(d.high(-1), period=n, subplot=False),
+    'dc_down': lambda d, n: bt.ind.Lowest(d.low(-1), period=n, subplot=False),
+}
+
+
+class CachedLine(bt.Indicator):
+    """Ligne backtrader servie par un tableau précalculé (une valeur par barre du feed)."""
+    lines = ('value',)
+    params = (('values', None),)
+
+    def __init__(self):
+        self.addminperiod(vi._first_valid(self.p.values) + 1)
+
+    def next(self):
+        self.lines.value[0] = float(self.p.values[len(self) - 1])
+
+    def once(self, start, end):
+        dst = self.lines.value.array
+        dst[start:end] = type(dst)('d', self.p.values[start:end].tolist())
+
+    oncestart = once
+
+
+def _feed_bars(data) -> Optional[tuple]:
+    """
+    (empreinte, {colonne: tableau}) des barres intégralement chargées par le feed
+    (DataFrame de PandasData ou buffers de feeds.ArrayData), sinon None (feed
+    live, filtré, borné…).
+    """
+    if data.p.fromdate is not None or data.p.todate is not None or getattr(data, '_filters', None):
+        return None
+    source = getattr(data, 'source_bars', None)
+    if source is not None:
+        return source()
+    df = getattr(data.p, 'dataname', None)
+    if not isinstance(df, pd.DataFrame):
+        return None
+    return fingerprint(df), {col: df[col].to_numpy(dtype=np.float64) for col in OHLCV}
+
+
+def bt_indicator(data, name: str, period: int):
+    """
+    Indicateur `name` pour une stratégie backtrader : servi par le cache si le
+    feed contient toutes ses barres, sinon l'indicateur bt.ind équivalent.
+    """
+    cache = get_cache()
+    source = _feed_bars(data) if cache is not None else None
+    if source is None:
+        return BT_INDICATORS[name](data, period)
+    fp, bars = source
+    values = cache.compute((fp, name, period), INDICATORS[name], bars, period)
+    return CachedLine(data, values=values)
@@ -0,0 +1,335 @@
+"""
+Checkpoints des backtests pour les rafraîchissements incrémentaux : l'état
+complet est sauvegardé en fin de passage ; quand le store a reçu de nouvelles
+barres, le backtest reprend de là et ne simule que la queue.
+
+• mono-actif (moteur vectorisé) : indicateurs incrémentaux (indicators.*Stream,
+  mêmes valeurs que vector_indicators), état de la machine (stop_price ou
+  PositionTracker : bar_exec, prix d'entrée, stop, plus haut, scaling), broker
+  (cash, position, prix moyen, ordres en attente), courbe et exécutions
+• rééquilibrages (moteur panel) : broker (cash, positions, ordres soumis ou
+  en attente, exécutions), last_bar, peak_value ; poids recalculés en bloc
+  (vectorisés), seule la simulation date par date reprend
+• clé = stratégie et code (sources de la stratégie et de ses parents, moteur,
+  indicateurs incrémentaux, ce module), paramètres, tickers, capital : modifier
+  le code change la clé, un checkpoint périmé n'est jamais repris
+• le checkpoint s'arrête avant la dernière barre (store.append la remplace au
+  rafraîchissement suivant) ; préfixe vérifié par empreinte : barres révisées,
+  autres paramètres ou autre capital → passage complet
+• fenêtre à début fixe (`start`, ou tout l'historique du store) : une fenêtre
+  glissante ('2y') change toutes les graines des indicateurs
+• courbe de valeur identique bit à bit à un passage complet
+
+Fichiers : data/checkpoints/<clé>.pkl (CHECKPOINT_DIR pour un autre dossier).
+
+En script (après la synchronisation du soir) :
+    python src/checkpoint.py MomentumStrategy DonchianBreakoutStrategy --tickers SPY QQQ IWM
+    python src/checkpoint.py --offline                 # toutes les stratégies × tout le store
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import time
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+import panel_engine
+import price_panel
+from data_loader import get_store
+from data_store import COLUMNS, OHLCVStore, from_epoch_seconds
+from indicator_cache import fingerprint_bars
+from position_tracker import PositionTracker
+from result_cache import ENGINE_MODULES, _source_hash, _strategy_sources
+from vector_engine import STREAMS, Broker, machine_for, simulate, strategy_params, trade_count, traded_value
+
+CHECKPOINT_DIR = os.environ.get('CHECKPOINT_DIR') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'checkpoints')
+# Code dont dépend l'état sauvegardé, par type de checkpoint
+CHECKPOINT_MODULES = {
+    'single': ENGINE_MODULES['vector'] + ('indicators', 'checkpoint'),
+    'panel':  ENGINE_MODULES['panel'] + ('checkpoint',),
+}
+
+
+class Refresh(NamedTuple):
+    returns: pd.Series      # rendements à chaque barre (TimeReturn)
+    equity: pd.Series       # valeur à chaque clôture, sur tout l'historique
+    trades: int
+    traded: float           # montant total échangé
+    processed: int          # barres simulées par cet appel
+    resumed: bool           # reprise d'un checkpoint
+
+
+class CheckpointStore:
+    """Un fichier pickle par backtest (stratégie, paramètres, données, capital) ; écriture atomique."""
+
+    def __init__(self, root: str = CHECKPOINT_DIR):
+        self.root = root
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, f'{key}.pkl')
+
+    def load(self, key: str) -> Optional[dict]:
+        try:
+            with open(self.path(key), 'rb') as f:
+                state = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+        return state
+
+    def save(self, key: str, state: dict) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self.path(key) + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path(key))
+
+
+_default = None
+
+
+def get_checkpoints() -> CheckpointStore:
+    global _default
+    if _default is None:
+        _default = CheckpointStore()
+    return _default
+
+
+def checkpoint_key(kind: str, strat_cls, p: dict, tickers, interval: str, start, cash: float, **extra) -> str:
+    payload = json.dumps({'kind': kind, 'strategy': [strat_cls.__name__, _strategy_sources(strat_cls)],
+                          'code': [(m, _source_hash(m)) for m in CHECKPOINT_MODULES[kind]],
+                          'params': p, 'tickers': list(tickers),
+                          'interval': interval, 'start': None if start is None else str(pd.Timestamp(start)),
+                          'cash': cash, **extra},
+                         sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def _result(values: np.ndarray, stamps: np.ndarray, cash: float, trades: int, traded: float,
+            processed: int, resumed: bool) -> Refresh:
+    index = pd.DatetimeIndex(from_epoch_seconds(stamps), name='Date')
+    prev = np.empty_like(values)
+    prev[:1] = cash
+    prev[1:] = values[:-1]
+    return Refresh(pd.Series(values / prev - 1.0, index=index), pd.Series(values, index=index),
+                   trades, traded, processed, resumed)
+
+
+# --- Mono-actif ---
+
+def _machine_state(machine) -> dict:
+    """stop_price (Momentum) ou PositionTracker (breakouts)."""
+    state = {}
+    for name in ('stop_price', 'pos'):
+        if name in type(machine).__slots__:
+            v = getattr(machine, name)
+            state[name] = {s: getattr(v, s) for s in PositionTracker.__slots__} if isinstance(v, PositionTracker) else v
+    return state
+
+
+def _restore_machine(machine, state: dict) -> None:
+    for name, v in state.items():
+        if isinstance(v, dict):
+            pos = getattr(machine, name)
+            for s, x in v.items():
+                setattr(pos, s, x)
+        else:
+            setattr(machine, name, v)
+
+
+class _SingleRun:
+    """Machine, broker et indicateurs incrémentaux d'un backtest mono-actif, avancés par tronçons."""
+
+    def __init__(self, strat_cls, p: dict, cash: float, bars: dict):
+        self.cls = machine_for(strat_cls)
+        self.p = p
+        self.bars = bars
+        names, self.update, self.streams = STREAMS[self.cls](p)
+        self.names = names
+        self.broker = Broker(cash)
+        self.segments = []
+        self.start = None
+
+    def fresh(self, hi: int) -> None:
+        """Passage vectorisé sur [0, hi), puis indicateurs incrémentaux chauffés sur les mêmes barres."""
+        head = {k: v[:hi] for k, v in self.bars.items()}
+        self.machine = self.cls(self.p, head, self.broker)
+        if hi:
+            self.segments.append(simulate(self.machine, 0, hi))
+        for row in zip(*(head[k].tolist() for k in COLUMNS)):
+            self.update(*row)
+        self.lists = [getattr(self.machine, name) for name in self.names]
+        self.start = self.machine.start if self.machine.start < hi else None
+
+    def restore(self, ck: dict) -> None:
+        b = self.broker
+        b.cash, b.size, b.price = ck['broker']['cash'], ck['broker']['size'], ck['broker']['price']
+        b.pending = list(ck['broker']['pending'])
+        b.fills = list(ck['fills'])
+        self.machine = self.cls(self.p, {k: np.empty(0) for k in COLUMNS}, b)
+        _restore_machine(self.machine, ck['machine'])
+        for stream, state in zip(self.streams, ck['streams']):
+            stream.restore(state)
+        # Les machines lisent leurs listes à l'indice absolu de la barre
+        self.lists = [getattr(self.machine, name) for name in self.names]
+        for lst in self.lists:
+            lst.extend([np.nan] * ck['n'])
+        self.start = ck['start']
+        self.segments.append(ck['values'])
+
+    def advance(self, lo: int, hi: int) -> None:
+        """Barres [lo, hi) une à une : indicateurs, exécution à l'ouverture, décision à la clôture."""
+        b, m, lists = self.broker, self.machine, self.lists
+        b.states = [(lo, b.cash, b.size, b.price)]
+        rows = zip(*(self.bars[k][lo:hi].tolist() for k in COLUMNS))
+        for i, row in enumerate(rows, start=lo):
+            values = self.update(*row)
+            for lst, v in zip(lists, values):
+                lst.append(v)
+            if self.start is None and all(v == v for v in values):
+                self.start = i
+            if b.pending:
+                b.execute(i, row[0])
+            if self.start is not None:
+                m.step(i)
+        if hi > lo:
+            self.segments.append(b.values(self.bars['Close'][lo:hi], lo))
+
+    def snapshot(self, n: int, fp: str) -> dict:
+        b = self.broker
+        return dict(n=n, fp=fp, start=self.start,
+                    streams=[s.snapshot() for s in self.streams], machine=_machine_state(self.machine),
+                    broker=dict(cash=b.cash, size=b.size, price=b.price, pending=list(b.pending)),
+                    fills=list(b.fills), values=self.values())
+
+    def values(self) -> np.ndarray:
+        return np.concatenate(self.segments) if self.segments else np.empty(0)
+
+
+def refresh(strat_cls, ticker: str, params=None, cash: float = 1.0, interval: str = '1d', start=None,
+            store: Optional[OHLCVStore] = None, checkpoints: Optional[CheckpointStore] = None) -> Refresh:
+    """
+    Backtest mono-actif (moteur vectorisé) de `ticker` depuis `start` sur les
+    barres du store, repris du checkpoint quand il est valide ; nouveau
+    checkpoint avant la dernière barre.
+    """
+    store = store or get_store()
+    checkpoints = checkpoints or get_checkpoints()
+    p = strategy_params(strat_cls, params)
+    arr = store.arrays(ticker, interval, start)
+    n = arr.shape[1]
+    ts = np.array(arr[0])
+    bars = {k: np.array(arr[i]) for i, k in enumerate(COLUMNS, start=1)}
+    key = checkpoint_key('single', strat_cls, p, [ticker], interval, start, cash)
+    k = max(n - 1, 0)
+
+    run = _SingleRun(strat_cls, p, cash, bars)
+    ck = checkpoints.load(key)
+    if ck is not None and ck['n'] <= k and ck['fp'] == fingerprint_bars(ts[:ck['n']], {c: v[:ck['n']] for c, v in bars.items()}):
+        run.restore(ck)
+        run.advance(ck['n'], k)
+        lo = ck['n']
+    else:
+        ck = None
+        run.fresh(k)
+        lo = 0
+    if ck is None or k > ck['n']:
+        checkpoints.save(key, run.snapshot(k, fingerprint_bars(ts[:k], {c: v[:k] for c, v in bars.items()})))
+    run.advance(k, n)
+    fills = run.broker.fills
+    return _result(run.values(), ts, cash, trade_count(fills), traded_value(fills), n - lo, ck is not None)
+
+
+# --- Rééquilibrages ---
+
+def _panel_fingerprint(panel, n: int) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps(panel.tickers).encode())
+    h.update(np.ascontiguousarray(panel.stamps[:n]).view(np.uint8))
+    h.update(np.ascontiguousarray(panel.block[:, :n]).view(np.uint8))
+    return h.hexdigest()
+
+
+def refresh_panel(strat_cls, tickers, params=None, cash: float = 100_000.0, interval: str = '1d', start=None,
+                  calendar: str = 'union', store: Optional[OHLCVStore] = None,
+                  checkpoints: Optional[CheckpointStore] = None) -> Refresh:
+    """Même chose pour une stratégie de rééquilibrage (moteur panel) sur l'univers `tickers`."""
+    store = store or get_store()
+    checkpoints = checkpoints or get_checkpoints()
+    p = strategy_params(strat_cls, params)
+    columns = {}
+    for tic in tickers:
+        arr = store.arrays(tic, interval, start)
+        columns[tic] = (np.array(arr[0]), {f: np.array(arr[i]) for i, f in enumerate(COLUMNS, start=1)})
+    panel = price_panel.from_arrays(columns, calendar)
+    rule = panel_engine.portfolio_for(strat_cls)(panel, p)
+    weights = rule.pop('weights')
+    n = len(panel.stamps)
+    key = checkpoint_key('panel', strat_cls, p, tickers, interval, start, cash, calendar=calendar)
+    k = max(n - 1, 0)
+
+    ck = checkpoints.load(key)
+    if ck is not None and ck['n'] <= k and ck['fp'] == _panel_fingerprint(panel, ck['n']):
+        state, segments, lo = ck['state'], [ck['values']], ck['n']
+    else:
+        ck = None
+        state, segments, lo = {}, [], 0
+
+    def advance(a, b):
+        segments.append(panel_engine.simulate(panel, weights, cash=cash, lo=a, hi=b, state=state, **rule)[0])
+
+    advance(lo, k)
+    if ck is None or k > ck['n']:
+        checkpoints.save(key, dict(n=k, fp=_panel_fingerprint(panel, k), state=state,
+                                   values=np.concatenate(segments)))
+    advance(k, n)
+    return _result(np.concatenate(segments), panel.stamps, cash, state['trades'], state['traded'],
+                   n - lo, ck is not None)
+
+
+if __name__ == "__main__":
+    import strategy, strategy2, strategy3, strategy4, strategy5, strategy_rebalance
+    from data_loader import sync
+
+    classes = {cls.__name__: cls for cls in (strategy.MomentumStrategy,
+                                             strategy2.DonchianBreakoutStrategy,
+                                             strategy3.EnhancedBreakoutStrategy,
+                                             strategy4.RegimeAwareBreakoutStrategy,
+                                             strategy_rebalance.WeeklyMomentumRebalance,
+                                             strategy5.DynamicSafeRebalance)}
+    parser = argparse.ArgumentParser(description="Rafraîchissement incrémental des backtests (checkpoints)")
+    parser.add_argument('strategies', nargs='*', help=f"défaut : toutes ({', '.join(classes)})")
+    parser.add_argument('--tickers', nargs='+', default=None, help="défaut : tous les tickers du store")
+    parser.add_argument('--interval', default='1d')
+    parser.add_argument('--start', default=None, help="début fixe des backtests (défaut : tout le store)")
+    parser.add_argument('--period', default='2y', help="historique téléchargé pour un nouveau ticker")
+    parser.add_argument('--cash', type=float, default=100_000.0)
+    parser.add_argument('--offline', action='store_true', help="pas de synchronisation du store")
+    args = parser.parse_args()
+    unknown = set(args.strategies) - set(classes)
+    if unknown:
+        parser.error(f"stratégie inconnue : {', '.join(sorted(unknown))}")
+
+    tickers = args.tickers or get_store().tickers(args.interval)
+    if not args.offline:
+        sync(tickers, args.period, args.interval)
+    t0 = time.perf_counter()
+    runs = resumed = bars = 0
+    for name in args.strategies or list(classes):
+        cls = classes[name]
+        if cls in (strategy_rebalance.WeeklyMomentumRebalance, strategy5.DynamicSafeRebalance):
+            results = [refresh_panel(cls, tickers, cash=args.cash, interval=args.interval, start=args.start)]
+        else:
+            results = [refresh(cls, tic, cash=args.cash, interval=args.interval, start=args.start) for tic in tickers]
+        for res in results:
+            runs += 1
+            resumed += res.resumed
+            bars += res.processed
+        print(f"{name:30s} {len(results):5d} backtests, valeur finale moyenne "
+              f"{np.mean([r.equity.iloc[-1] for r in results if len(r.equity)] or [np.nan]):,.0f}")
+    print(f"\n{runs} backtests ({resumed} repris d'un checkpoint), {bars} barres simulées "
+          f"en {time.perf_counter() - t0:.2f}s")
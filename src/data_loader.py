@@ -1,33 +1,140 @@
-import yfinance as yf
-import pandas as pd
 import os
+import time
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from data_store import STORE_DIR, OHLCVStore, to_epoch_seconds
+from instrumentation import phase
+from providers import DataProvider, make_provider
+
+# Durée d'une bougie par intervalle yfinance (secondes) : sert à décider si le
+# store est assez frais pour éviter tout appel réseau
+INTERVAL_SECONDS = {
+    '1m': 60, '2m': 120, '5m': 300, '15m': 900, '30m': 1800,
+    '60m': 3600, '90m': 5400, '1h': 3600,
+    '1d': 86400, '5d': 5 * 86400, '1wk': 7 * 86400, '1mo': 30 * 86400, '3mo': 91 * 86400,
+}
+
+_provider = make_provider(os.environ.get('DATA_PROVIDER', 'yfinance'))
+# Les données hors yfinance (synthétiques, rejeu) vivent dans leur propre sous-store
+_store = OHLCVStore() if _provider.name == 'yfinance' else OHLCVStore(os.path.join(STORE_DIR, _provider.name))
+
+
+def get_store() -> OHLCVStore:
+    return _store
+
+
+def set_store(store: OHLCVStore) -> None:
+    """Remplace le store par défaut (ex. un autre répertoire)."""
+    global _store
+    _store = store
+
+
+def get_provider() -> DataProvider:
+    return _provider
+
 
-def download_data(ticker: str, period: str = '2y', interval: str = '1d') -> pd.DataFrame:
+def set_provider(provider: DataProvider) -> None:
+    """Remplace le fournisseur de données (yfinance, synthétique, rejeu…)."""
+    global _provider
+    _provider = provider
+
+
+def period_start(period: str, now: Optional[pd.Timestamp] = None) -> Optional[pd.Timestamp]:
     """
-    Télécharge les données OHLCV pour un ticker donné via yfinance,
-    les nettoie et les enregistre dans data/raw/.
+    Début de la fenêtre yfinance ('5d', '6mo', '1y', '2y', 'ytd', 'max'…).
+    None pour 'max'.
     """
-    # 1. Récupération
-    df = yf.download(ticker, period=period, interval=interval)
-    if df.empty:
-        raise ValueError(f"Aucune donnée pour le ticker {ticker} (période={period}, interval={interval})")
+    now = pd.Timestamp.now().normalize() if now is None else now
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return pd.Timestamp(year=now.year, month=1, day=1)
+    units = {'d': 'days', 'wk': 'weeks', 'mo': 'months', 'y': 'years'}
+    for suffix, unit in units.items():
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return now - pd.DateOffset(**{unit: int(period[:-len(suffix)])})
+    raise ValueError(f"Période inconnue : {period}")
 
-    # 2. Nettoyage
-    df.dropna(inplace=True)
 
-    # 3. Création du dossier s'il n'existe pas
-    os.makedirs(os.path.join('..', 'data', 'raw'), exist_ok=True)
+def sync(tickers: List[str], period: str = '2y', interval: str = '1d',
+         max_age: Optional[float] = None) -> None:
+    """
+    Met le store à jour pour tous les tickers, en requêtes groupées :
+    • store absent ou trop court : un seul fetch pour tous ces tickers sur `period`
+    • store périmé (plus vieux que max_age, par défaut une bougie) : fetch de la
+      queue seulement, un appel par date de départ commune
+    """
+    store, provider = get_store(), get_provider()
+    start = period_start(period)
+    start_s = None if start is None else float(to_epoch_seconds(pd.DatetimeIndex([start]))[0])
+    max_age = INTERVAL_SECONDS.get(interval, 86400) if max_age is None else max_age
 
-    # 4. Sauvegarde CSV
-    out_path = os.path.join('..', 'data', 'raw', f'{ticker}.csv')
-    df.to_csv(out_path)
-    print(f"Données enregistrées dans {out_path}")
+    full, tails = [], {}
+    for tic in dict.fromkeys(tickers):
+        meta = store.meta(tic, interval)
+        covered = meta is not None and meta['rows'] and (
+            meta['covered_from'] is None or (start_s is not None and meta['covered_from'] <= start_s)
+        )
+        if not covered:
+            full.append(tic)
+        elif time.time() - meta['fetched_at'] > max_age:
+            last = pd.Timestamp(meta['last_ts'], unit='s').strftime('%Y-%m-%d')
+            tails.setdefault(last, []).append(tic)
 
-    return df
+    if full:
+        # 1. Récupération complète
+        with phase('data.download'):
+            fetched = provider.fetch(full, interval, period=period)
+        for tic, df in fetched.items():
+            store.write(tic, interval, df, covered_from=start_s)
+        if len(fetched) == 1:
+            print(f"Données enregistrées dans {store.path(next(iter(fetched)), interval)}")
+        elif fetched:
+            print(f"{len(fetched)} tickers enregistrés dans {store._dir(interval)}")
+    for last, group in tails.items():
+        # 2. Mise à jour incrémentale : uniquement la queue manquante
+        with phase('data.download'):
+            fetched = provider.fetch(group, interval, start=last)
+        for tic in group:
+            if tic in fetched:
+                store.append(tic, interval, fetched[tic])
+            else:
+                store.touch(tic, interval)
+
+
+def load_many(tickers: List[str], period: str = '2y', interval: str = '1d',
+              offline: bool = False, max_age: Optional[float] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Retourne {ticker: DataFrame OHLCV} sur `period`, servis par le store local
+    après une synchronisation groupée (offline=True : aucun appel réseau).
+    """
+    if not offline:
+        sync(tickers, period, interval, max_age)
+    store = get_store()
+    start = period_start(period)
+    out = {}
+    with phase('data.load'):
+        for tic in tickers:
+            df = store.read(tic, interval, start=start) if store.meta(tic, interval) is not None else None
+            if df is None or df.empty:
+                raise ValueError(f"Aucune donnée pour le ticker {tic} (période={period}, interval={interval})")
+            out[tic] = df
+    return out
+
+
+def download_data(ticker: str, period: str = '2y', interval: str = '1d',
+                  offline: bool = False, max_age: Optional[float] = None) -> pd.DataFrame:
+    """
+    Retourne les données OHLCV normalisées d'un ticker sur `period`, servies par le
+    store local (voir load_many).
+    """
+    return load_many([ticker], period, interval, offline, max_age)[ticker]
 
 # Test rapide si ce fichier est exécuté directement
 if __name__ == "__main__":
     # Exemple : télécharger 1 an de données journalières pour SPY
     df = download_data("SPY", period="1y", interval="1d")
     print(df.head())
-
+    print(f"Dernière bougie stockée : {get_store().last_bar('SPY', '1d')}")
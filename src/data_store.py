@@ -0,0 +1,177 @@
+import json
+import os
+import time
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Racine par défaut du store (data/store/ à la racine du dépôt)
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'store')
+
+# Ordre des colonnes dans le fichier : ligne 0 = horodatage (secondes epoch UTC)
+COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+
+def to_epoch_seconds(index: pd.DatetimeIndex) -> np.ndarray:
+    """
+    Convertit un DatetimeIndex (naïf = UTC, ou tz-aware) en secondes epoch float64.
+    Les bougies journalières et minute tiennent exactement dans un float64.
+    """
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index.values.astype('datetime64[s]').astype(np.int64).astype(np.float64)
+
+
+def from_epoch_seconds(ts: np.ndarray) -> pd.DatetimeIndex:
+    """Inverse de to_epoch_seconds : index naïf (UTC)."""
+    return pd.to_datetime(np.asarray(ts, dtype=np.int64), unit='s')
+
+
+class OHLCVStore:
+    """
+    Store local colonnaire des bougies OHLCV :
+    • un fichier .npy par (ticker, intervalle), tableau float64 de forme (6, n)
+      – une colonne par ligne, donc chaque série est contiguë et memory-mappable
+    • un fichier .json à côté qui mémorise la dernière bougie, la couverture et
+      l'heure du dernier téléchargement
+    • lecture par plage de dates via searchsorted sur l'horodatage mappé,
+      sans parser tout l'historique
+    """
+
+    def __init__(self, root: str = STORE_DIR):
+        self.root = root
+
+    # --- Chemins ---
+
+    def _dir(self, interval: str) -> str:
+        return os.path.join(self.root, interval)
+
+    def path(self, ticker: str, interval: str = '1d') -> str:
+        return os.path.join(self._dir(interval), f'{ticker}.npy')
+
+    def _meta_path(self, ticker: str, interval: str) -> str:
+        return os.path.join(self._dir(interval), f'{ticker}.json')
+
+    # --- Métadonnées ---
+
+    def meta(self, ticker: str, interval: str = '1d') -> Optional[dict]:
+        """Métadonnées du ticker, ou None s'il n'est pas dans le store."""
+        try:
+            with open(self._meta_path(ticker, interval)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_meta(self, ticker: str, interval: str, meta: dict) -> None:
+        path = self._meta_path(ticker, interval)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, path)
+
+    def touch(self, ticker: str, interval: str = '1d') -> None:
+        """Marque le ticker comme fraîchement synchronisé (aucune nouvelle bougie)."""
+        meta = self.meta(ticker, interval)
+        if meta is not None:
+            meta['fetched_at'] = time.time()
+            self._write_meta(ticker, interval, meta)
+
+    def last_bar(self, ticker: str, interval: str = '1d') -> Optional[pd.Timestamp]:
+        """Horodatage de la dernière bougie stockée."""
+        meta = self.meta(ticker, interval)
+        if meta is None:
+            return None
+        return pd.Timestamp(meta['last_ts'], unit='s')
+
+    def tickers(self, interval: str = '1d') -> list[str]:
+        """Liste des tickers présents pour un intervalle."""
+        try:
+            names = os.listdir(self._dir(interval))
+        except FileNotFoundError:
+            return []
+        return sorted(n[:-4] for n in names if n.endswith('.npy'))
+
+    # --- Écriture ---
+
+    def write(self, ticker: str, interval: str, df: pd.DataFrame, covered_from: Optional[float] = None) -> int:
+        """
+        Remplace tout l'historique du ticker par df (index datetime, colonnes OHLCV).
+        covered_from : début de la période demandée (secondes epoch), None = 'max'.
+        """
+        arr = self._to_array(df)
+        self._save(ticker, interval, arr, covered_from)
+        return arr.shape[1]
+
+    def append(self, ticker: str, interval: str, df: pd.DataFrame) -> int:
+        """
+        Ajoute la queue df à l'historique existant. Les bougies stockées à partir
+        de la première date de df sont remplacées (la dernière bougie pouvait être
+        incomplète). Retourne le nombre de bougies nouvelles.
+        """
+        meta = self.meta(ticker, interval)
+        if meta is None:
+            return self.write(ticker, interval, df)
+        new = self._to_array(df)
+        if new.shape[1] == 0:
+            self.touch(ticker, interval)
+            return 0
+        old = np.load(self.path(ticker, interval), mmap_mode='r')
+        keep = np.searchsorted(old[0], new[0, 0], side='left')
+        arr = np.concatenate([old[:, :keep], new], axis=1)
+        added = arr.shape[1] - old.shape[1]
+        del old
+        self._save(ticker, interval, arr, meta.get('covered_from'))
+        return added
+
+    def _to_array(self, df: pd.DataFrame) -> np.ndarray:
+        df = df.sort_index()
+        df = df[~df.index.duplicated(keep='last')]
+        arr = np.empty((1 + len(COLUMNS), len(df)), dtype=np.float64)
+        arr[0] = to_epoch_seconds(df.index)
+        for i, col in enumerate(COLUMNS, start=1):
+            arr[i] = df[col].to_numpy(dtype=np.float64) if col in df else np.nan
+        return arr
+
+    def _save(self, ticker: str, interval: str, arr: np.ndarray, covered_from: Optional[float]) -> None:
+        os.makedirs(self._dir(interval), exist_ok=True)
+        path = self.path(ticker, interval)
+        # Écriture atomique : les lecteurs mappés gardent l'ancien fichier
+        tmp = path + '.tmp.npy'
+        np.save(tmp, np.ascontiguousarray(arr))
+        os.replace(tmp, path)
+        self._write_meta(ticker, interval, {
+            'first_ts':     float(arr[0, 0]) if arr.shape[1] else None,
+            'last_ts':      float(arr[0, -1]) if arr.shape[1] else None,
+            'rows':         int(arr.shape[1]),
+            'covered_from': covered_from,
+            'fetched_at':   time.time(),
+        })
+
+    # --- Lecture ---
+
+    def arrays(self, ticker: str, interval: str = '1d', start=None, end=None) -> np.ndarray:
+        """
+        Vue mappée (6, k) sur la plage [start, end] : ligne 0 = horodatage,
+        puis Open, High, Low, Close, Volume. Aucune copie.
+        """
+        arr = np.load(self.path(ticker, interval), mmap_mode='r')
+        lo = 0 if start is None else np.searchsorted(arr[0], _seconds(start), side='left')
+        hi = arr.shape[1] if end is None else np.searchsorted(arr[0], _seconds(end), side='right')
+        return arr[:, lo:hi]
+
+    def read(self, ticker: str, interval: str = '1d', start=None, end=None) -> pd.DataFrame:
+        """DataFrame OHLCV (index datetime naïf) sur la plage [start, end]."""
+        arr = self.arrays(ticker, interval, start, end)
+        return pd.DataFrame(
+            {col: np.array(arr[i]) for i, col in enumerate(COLUMNS, start=1)},
+            index=pd.Index(from_epoch_seconds(arr[0]), name='Date'),
+        )
+
+
+def _seconds(ts) -> float:
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    return ts.value / 10**9
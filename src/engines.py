@@ -0,0 +1,139 @@
+"""
+Choix du moteur de backtest pour les stratégies mono-actif :
+• 'backtrader' : Cerebro classique, barre par barre
+• 'vector'     : moteur NumPy (vector_engine), mêmes ordres et même courbe
+Mode portefeuille (portfolio_backtest) : tous les actifs en un seul passage,
+capital commun, sur l'un ou l'autre moteur.
+Les rendements calculés sont conservés dans le cache de résultats (result_cache).
+"""
+from typing import Dict, Optional
+
+import backtrader as bt
+import pandas as pd
+
+import panel_engine
+import vector_engine
+from feeds import feed_from_frame
+from indicator_cache import memo_for
+from instrumentation import instrument, phase
+from multi_asset import portfolio_strategy
+from result_cache import Result, cached_result, get_result_cache, result_key
+from risk import RiskLimits
+
+ENGINES = ('backtrader', 'vector')
+
+
+def supports_vector(strat_cls) -> bool:
+    """True si la stratégie a un équivalent dans le moteur vectorisé."""
+    try:
+        vector_engine.machine_for(strat_cls)
+    except ValueError:
+        return False
+    return True
+
+
+def supports_panel(strat_cls) -> bool:
+    """True si la stratégie de rééquilibrage a un équivalent dans le moteur panel."""
+    try:
+        panel_engine.portfolio_for(strat_cls)
+    except ValueError:
+        return False
+    return True
+
+
+def supports_numpy(strat_cls, data) -> bool:
+    """
+    True si un moteur NumPy donne la courbe de backtrader sur l'univers `data` :
+    vectorisé pour le mono-actif ; panel pour les rebalances seulement quand tous
+    les actifs cotent les mêmes jours (sinon lookbacks comptés en dates du
+    calendrier commun, pas en barres de l'actif).
+    """
+    return supports_vector(strat_cls) or (supports_panel(strat_cls) and panel_engine.same_calendar(data))
+
+
+def warm_indicators(df: pd.DataFrame, strat_cls, params=None) -> None:
+    """
+    Calcule d'avance, dans le cache d'indicateurs, ceux dont la stratégie a besoin
+    (ex. avant de lancer un pool : les workers forkés en héritent).
+    """
+    memo = memo_for(df)
+    if memo is not None and supports_vector(strat_cls):
+        vector_engine.machine_for(strat_cls)(vector_engine.strategy_params(strat_cls, params),
+                                             vector_engine.bars_from_df(df), vector_engine.Broker(cash=1.0), memo)
+
+
+def cached_returns(df: pd.DataFrame, strat_cls, params=None, cash: float = 1.0,
+                   engine: str = 'backtrader') -> Optional[pd.Series]:
+    """Rendements déjà dans le cache de résultats, sans rien calculer (None sinon)."""
+    cache = get_result_cache()
+    if cache is None:
+        return None
+    res = cache.get(result_key(strat_cls, params, df, engine, cash=cash))
+    return None if res is None else res.series()
+
+
+def backtest_returns(df: pd.DataFrame, strat_cls, params=None, cash: float = 1.0,
+                     engine: str = 'backtrader') -> pd.Series:
+    """Rendements journaliers (TimeReturn) d'une stratégie mono-actif sur df."""
+    if engine not in ENGINES:
+        raise ValueError(f"Moteur inconnu : {engine} (choix : {', '.join(ENGINES)})")
+    res = cached_result(strat_cls, params, df, engine,
+                        lambda: Result.from_series(_returns(df, strat_cls, params, cash, engine)), cash=cash)
+    return res.series()
+
+
+def _returns(df: pd.DataFrame, strat_cls, params, cash: float, engine: str) -> pd.Series:
+    if engine == 'vector':
+        return vector_engine.run(df, strat_cls, params, cash, memo_for(df)).returns
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(feed_from_frame(df))
+    cerebro.addstrategy(strat_cls, **(params or {}))
+    cerebro.broker.setcash(cash)
+    cerebro.addanalyzer(
+        bt.analyzers.TimeReturn,
+        timeframe=bt.TimeFrame.Days,
+        _name="timereturn"
+    )
+    instrument(cerebro)
+    with phase('backtrader.run'):
+        result = cerebro.run()[0]
+    ret = result.analyzers.timereturn.get_analysis()
+    return pd.Series(ret).sort_index().astype(float)
+
+
+def portfolio_backtest(universe: Dict[str, pd.DataFrame], strat_cls, params=None, cash: float = 1.0,
+                       engine: str = 'backtrader', limits: Optional[RiskLimits] = None) -> Result:
+    """
+    Stratégie mono-actif en mode portefeuille sur {ticker: DataFrame} : un seul
+    passage sur l'union des calendriers, broker et capital communs.
+    limits : plafonds d'exposition du book (risk.RiskLimits), mêmes ordres sur les deux moteurs.
+    Result : rendements journaliers (series()), meta['traded'] = montant échangé.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Moteur inconnu : {engine} (choix : {', '.join(ENGINES)})")
+    limits = limits if limits and any(v is not None for v in limits) else None
+    return cached_result(strat_cls, params, universe, engine,
+                         lambda: _portfolio(universe, strat_cls, params, cash, engine, limits),
+                         cash=cash, mode='portfolio', limits=limits)
+
+
+def _portfolio(universe: Dict[str, pd.DataFrame], strat_cls, params, cash: float, engine: str,
+               limits: Optional[RiskLimits]) -> Result:
+    if engine == 'vector':
+        res = vector_engine.run_portfolio(universe, strat_cls, params, cash,
+                                          {tic: memo_for(df) for tic, df in universe.items()}, limits)
+        return Result.from_series(res.returns, traded=res.traded)
+    cerebro = bt.Cerebro(stdstats=False)
+    for tic, df in universe.items():
+        cerebro.adddata(feed_from_frame(df, tic))
+    cerebro.addstrategy(portfolio_strategy(strat_cls), risk_limits=limits, **(params or {}))
+    cerebro.broker.setcash(cash)
+    cerebro.addanalyzer(bt.analyzers.TimeReturn, timeframe=bt.TimeFrame.Days, _name='timereturn')
+    cerebro.addanalyzer(bt.analyzers.Transactions, _name='transactions')
+    instrument(cerebro)
+    with phase('backtrader.run'):
+        result = cerebro.run()[0]
+    rets = pd.Series(result.analyzers.timereturn.get_analysis()).sort_index().astype(float)
+    # Transactions : {date: [[taille, prix, sid, symbole, valeur], ...]}
+    traded = sum(abs(tx[4]) for txs in result.analyzers.transactions.get_analysis().values() for tx in txs)
+    return Result.from_series(rets, traded=float(traded))
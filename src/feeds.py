@@ -0,0 +1,176 @@
+"""
+Feed backtrader servi par des tableaux NumPy, à la place de bt.feeds.PandasData.
+
+PandasData relit le DataFrame ligne par ligne à chaque backtest (itertuples,
+date2num d'un datetime Python par barre, une écriture de ligne par champ).
+Ici, tout est converti une seule fois :
+
+• horodatages → nombres de date backtrader en bloc (mêmes valeurs que date2num)
+• chaque colonne → un array('d') prêt à servir de buffer de ligne
+• buffers partagés entre tous les Cerebro du processus (LRU borné, clé =
+  empreinte des barres) : le préchargement d'un feed se réduit à brancher
+  ces buffers, sans copie ni croissance mémoire d'un run à l'autre
+
+Sources : DataFrame, tableaux (float64 ou float32) ou store local (memory map).
+Les filtres, fromdate / todate, tzinput et le lookahead repassent par le
+chargement barre à barre classique, sur les mêmes buffers.
+
+Les lignes d'un feed préchargé sont partagées : une stratégie ne doit pas y écrire.
+"""
+import datetime
+import math
+import os
+from array import array
+from typing import Dict, Optional
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+from backtrader.utils import date2num
+
+from data_loader import get_store
+from data_store import OHLCVStore, to_epoch_seconds
+from indicator_cache import OHLCV, IndicatorCache, fingerprint_bars
+
+# Jours entre l'origine de date2num (0001-01-01) et l'epoch Unix
+EPOCH_ORDINAL = 719163
+_EPOCH = datetime.datetime(1970, 1, 1)
+# Ordinaux de [2**19, 2**20) (années 1436 à 2871) : même pas de grille pour la fraction de jour
+_BINADE = (2 ** 19, 2 ** 20)
+
+LINES = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume'}
+
+
+def bt_datenums(ts: np.ndarray) -> np.ndarray:
+    """
+    Secondes epoch (UTC) → nombres de date backtrader, identiques bit à bit à
+    date2num(datetime) : date2num fait un fsum(ordinal, h/24, m/1440, s/86400),
+    qui ne dépend de l'ordinal que par son binade ; la fraction de jour arrondie
+    est donc calculée une fois par heure de la journée distincte.
+    """
+    secs = np.asarray(ts, dtype=np.float64).astype(np.int64)
+    days, tod = np.divmod(secs, 86400)
+    ordinal = days + EPOCH_ORDINAL
+    if len(secs) and (ordinal.min() < _BINADE[0] or ordinal.max() >= _BINADE[1]):
+        # Hors du binade courant : conversion classique, barre par barre
+        return np.array([date2num(_EPOCH + datetime.timedelta(seconds=s)) for s in secs.tolist()])
+    uniq, inv = np.unique(tod, return_inverse=True)
+    base = float(_BINADE[0])
+    frac = np.array([math.fsum((base, t // 3600 / 24.0, t // 60 % 60 / 1440.0, t % 60 / 86400.0)) - base
+                     for t in uniq.tolist()])
+    return ordinal.astype(np.float64) + frac[inv]
+
+
+class FeedBuffers:
+    """Buffers de lignes d'un jeu de barres, prêts à être branchés sur un feed."""
+    __slots__ = ('fp', 'lines', 'bars', 'nbytes')
+
+    def __init__(self, fp: str, ts: np.ndarray, bars: Dict[str, np.ndarray]):
+        self.fp = fp
+        n = len(ts)
+        self.lines = {'datetime': array('d', bt_datenums(ts).tobytes()),
+                      'openinterest': array('d', np.full(n, np.nan).tobytes())}
+        self.bars = {}
+        for line, col in LINES.items():
+            self.lines[line] = array('d', np.ascontiguousarray(bars[col], dtype=np.float64).tobytes())
+            # Vue NumPy sur le même buffer (pas de 2e copie) ; tant qu'elle existe,
+            # le buffer ne peut plus être agrandi : un append égaré lève BufferError
+            view = np.frombuffer(self.lines[line], dtype=np.float64)
+            view.flags.writeable = False
+            self.bars[col] = view
+        self.nbytes = 8 * n * len(self.lines)
+
+    def __len__(self) -> int:
+        return len(self.lines['datetime'])
+
+
+_buffers: Optional[IndicatorCache] = IndicatorCache(int(os.environ.get('FEED_CACHE_MB', 512)) * 2**20)
+
+
+def get_buffers_cache() -> Optional[IndicatorCache]:
+    return _buffers
+
+
+def set_buffers_cache(cache: Optional[IndicatorCache]) -> None:
+    """Remplace le cache des buffers ; None : chaque feed convertit ses propres barres."""
+    global _buffers
+    _buffers = cache
+
+
+def buffers_for(ts: np.ndarray, bars) -> FeedBuffers:
+    """Buffers des barres (horodatages en secondes epoch + {colonne: tableau}), partagés si possible."""
+    fp = fingerprint_bars(ts, bars)
+    if _buffers is None:
+        return FeedBuffers(fp, ts, bars)
+    return _buffers.compute(fp, FeedBuffers, fp, ts, bars)
+
+
+class ArrayData(bt.feed.DataBase):
+    """
+    Feed sur des FeedBuffers. Préchargé (cas normal de Cerebro) : les buffers
+    deviennent les lignes du feed. Sinon, chargement barre à barre.
+    """
+    params = (('buffers', None),)
+
+    def start(self):
+        super().start()
+        self._row = 0
+        self._shared = False
+
+    def _direct(self) -> bool:
+        """Rien entre les barres et les lignes : ni filtre, ni bornes, ni fuseau d'entrée, ni lookahead."""
+        return (not self._filters and not self._ffilters and self.p.fromdate is None
+                and self.p.todate is None and not self._tzinput
+                and not any(line.extension for line in self.lines))
+
+    def preload(self):
+        if not self._direct():
+            return super().preload()
+        buffers = self.p.buffers.lines
+        for alias in self.lines.getlinealiases():
+            getattr(self.lines, alias).array = buffers[alias]
+        self._shared = True
+        self.home()
+
+    def next(self, datamaster=None, ticks=True):
+        # Fin des barres préchargées : ne pas laisser load() ajouter puis retirer
+        # une case aux buffers partagés
+        if self._shared and len(self) >= self.buflen():
+            if ticks:
+                self._tick_nullify()
+            return False
+        return super().next(datamaster, ticks)
+
+    def _load(self):
+        i = self._row
+        buffers = self.p.buffers.lines
+        if i >= len(buffers['datetime']):
+            return False
+        for alias in self.lines.getlinealiases():
+            getattr(self.lines, alias)[0] = buffers[alias][i]
+        self._row = i + 1
+        return True
+
+    def source_bars(self):
+        """(empreinte, {colonne: tableau}) des barres du feed, pour le cache d'indicateurs."""
+        return self.p.buffers.fp, self.p.buffers.bars
+
+
+def feed_from_arrays(ts: np.ndarray, bars, name: Optional[str] = None, **kwargs) -> ArrayData:
+    """Feed sur des tableaux : horodatages en secondes epoch + {colonne: tableau float64/float32}."""
+    return ArrayData(buffers=buffers_for(ts, bars), name=name, **kwargs)
+
+
+def feed_from_frame(df: pd.DataFrame, name: Optional[str] = None, **kwargs) -> ArrayData:
+    """Remplaçant de bt.feeds.PandasData(dataname=df) (index datetime, colonnes OHLCV)."""
+    bars = {col: df[col].to_numpy() for col in OHLCV}
+    return feed_from_arrays(to_epoch_seconds(df.index), bars, name, **kwargs)
+
+
+def feed_from_store(ticker: str, interval: str = '1d', start=None, end=None,
+                    store: Optional[OHLCVStore] = None, **kwargs) -> ArrayData:
+    """Feed lu directement dans le memory map du store, sans passer par un DataFrame."""
+    store = store or get_store()
+    arr = store.arrays(ticker, interval, start, end)
+    bars = {col: arr[i] for i, col in enumerate(OHLCV, start=1)}
+    return feed_from_arrays(arr[0], bars, kwargs.pop('name', ticker), **kwargs)
@@ -0,0 +1,153 @@
+"""
+Cache mémoire des indicateurs, partagé par le moteur vectorisé, les stratégies
+backtrader, le screener et l'app.
+
+• clé = (empreinte des données OHLCV, indicateur, paramètres) : ATR(14) de SPY est
+  calculé une fois, quelle que soit la stratégie qui le demande ensuite
+• taille bornée (octets) avec éviction LRU, thread-safe (Streamlit)
+• côté backtrader (bt_indicators.py), CachedLine sert le tableau précalculé
+  comme une ligne d'indicateur ; ce module-ci n'importe pas backtrader
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+import vector_indicators as vi
+from data_store import to_epoch_seconds
+
+OHLCV = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+
+def fingerprint(df: pd.DataFrame) -> str:
+    """Empreinte du contenu OHLCV + index (les colonnes ajoutées ensuite n'y changent rien)."""
+    return fingerprint_bars(to_epoch_seconds(df.index), df)
+
+
+def fingerprint_bars(ts: np.ndarray, bars) -> str:
+    """
+    Même chose pour des tableaux : horodatages en secondes epoch + {colonne: tableau}.
+    Un DataFrame et sa copie en mémoire partagée ont la même empreinte.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(ts, dtype=np.float64).view(np.uint8))
+    for col in OHLCV:
+        h.update(np.ascontiguousarray(bars[col], dtype=np.float64).view(np.uint8))
+    return h.hexdigest()
+
+
+class IndicatorCache:
+    """LRU borné en octets : {clé: tableau NumPy ou Series}."""
+
+    def __init__(self, max_bytes: int = 256 * 2**20):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def __setitem__(self, key, value) -> None:
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False  # partagé : personne ne doit le modifier
+        size = int(getattr(value, 'nbytes', 0))
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.nbytes -= int(getattr(old, 'nbytes', 0))
+            self._data[key] = value
+            self.nbytes += size
+            while self.nbytes > self.max_bytes and len(self._data) > 1:
+                _, evicted = self._data.popitem(last=False)
+                self.nbytes -= int(getattr(evicted, 'nbytes', 0))
+                self.evictions += 1
+
+    def compute(self, key, fn, *args):
+        """Valeur en cache, sinon fn(*args) mise en cache."""
+        value = self.get(key)
+        if value is None:
+            value = fn(*args)
+            self[key] = value
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict:
+        return {'entries': len(self._data), 'bytes': self.nbytes, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
+
+class TickerMemo:
+    """
+    Vue du cache pour un jeu de barres, avec l'interface dict (get / [clé] = …)
+    attendue par le paramètre `memo` du moteur vectorisé.
+    """
+    __slots__ = ('cache', 'fp')
+
+    def __init__(self, cache: IndicatorCache, fp: str):
+        self.cache = cache
+        self.fp = fp
+
+    def get(self, key):
+        return self.cache.get((self.fp,) + key)
+
+    def __setitem__(self, key, value) -> None:
+        self.cache[(self.fp,) + key] = value
+
+
+_cache: Optional[IndicatorCache] = IndicatorCache(int(os.environ.get('INDICATOR_CACHE_MB', 256)) * 2**20)
+
+
+def get_cache() -> Optional[IndicatorCache]:
+    return _cache
+
+
+def set_cache(cache: Optional[IndicatorCache]) -> None:
+    """Remplace le cache global ; None le désactive."""
+    global _cache
+    _cache = cache
+
+
+def memo_for(df: pd.DataFrame):
+    """memo du moteur vectorisé adossé au cache global (None si désactivé)."""
+    return None if _cache is None else TickerMemo(_cache, fingerprint(df))
+
+
+def cached(df: pd.DataFrame, key: tuple, fn, *args):
+    """fn(*args) mis en cache sous (empreinte de df,) + key."""
+    if _cache is None:
+        return fn(*args)
+    return _cache.compute((fingerprint(df),) + key, fn, *args)
+
+
+# --- Catalogue : mêmes noms de clés que les machines de vector_engine ---
+
+INDICATORS = {
+    'sma':     lambda b, n: vi.sma(b['Close'], n),
+    'ema':     lambda b, n: vi.ema(b['Close'], n),
+    'rsi':     lambda b, n: vi.rsi(b['Close'], n),
+    'atr':     lambda b, n: vi.atr(b['High'], b['Low'], b['Close'], n),
+    'adx':     lambda b, n: vi.adx(b['High'], b['Low'], b['Close'], n),
+    'vol_sma': lambda b, n: vi.sma(b['Volume'], n),
+    'dc_up':   lambda b, n: vi.highest(vi.delay(b['High']), n),
+    'dc_down': lambda b, n: vi.lowest(vi.delay(b['Low']), n),
+}
@@ -1,31 +1,334 @@
+"""
+Indicateurs des stratégies, mêmes définitions partout : EMA / RSI / ATR en
+Series pandas (debug_signals, affichage) et versions incrémentales *Stream
+(live, checkpoints) donnent les valeurs de vector_indicators, donc de bt.ind.*
+— ce sur quoi les stratégies tradent.
+"""
+import math
+import operator
+from collections import deque
+
+import numpy as np
 import pandas as pd
 
+from indicator_cache import INDICATORS, OHLCV, cached
+
+
+# Colonnes lues par chaque indicateur
+_USES = {'ema': ('Close',), 'rsi': ('Close',), 'atr': ('High', 'Low', 'Close')}
+
+
+def _indicator(df: pd.DataFrame, name: str, period: int) -> pd.Series:
+    if all(col in df for col in OHLCV):
+        # Même entrée de cache que bt_indicator : calculé une fois pour l'app et les stratégies
+        bars = {col: df[col].to_numpy(dtype=np.float64) for col in OHLCV}
+        values = cached(df, (name, period), INDICATORS[name], bars, period)
+    else:
+        # OHLCV incomplet (ex. 'Close' seule) : pas d'empreinte commune, calcul direct
+        bars = {col: df[col].to_numpy(dtype=np.float64) for col in _USES[name]}
+        values = INDICATORS[name](bars, period)
+    return pd.Series(values, index=df.index)
+
 def EMA(df: pd.DataFrame, period: int) -> pd.Series:
     """
-    Moyenne mobile exponentielle sur la série 'Close'.
+    Moyenne mobile exponentielle sur la série 'Close' (bt.ind.EMA : graine =
+    SMA des `period` premières clôtures, NaN avant).
     """
-    return df['Close'].ewm(span=period, adjust=False).mean()
+    return _indicator(df, 'ema', period)
 
 def RSI(df: pd.DataFrame, period: int = 14) -> pd.Series:
     """
-    Relative Strength Index sur 'Close'.
+    Relative Strength Index sur 'Close' (bt.ind.RSI, lissage de Wilder).
     Achat si RSI > 55, vente si RSI < 45 selon notre stratégie.
     """
-    delta = df['Close'].diff()
-    up = delta.clip(lower=0)
-    down = -delta.clip(upper=0)
-    ma_up = up.ewm(span=period, adjust=False).mean()
-    ma_down = down.ewm(span=period, adjust=False).mean()
-    rs = ma_up / ma_down
-    return 100 - (100 / (1 + rs))
+    return _indicator(df, 'rsi', period)
 
 def ATR(df: pd.DataFrame, period: int = 14) -> pd.Series:
     """
-    Average True Range sur le dataframe OHLCV.
+    Average True Range sur le dataframe OHLCV (bt.ind.ATR, lissage de Wilder).
     """
-    high_low   = df['High'] - df['Low']
-    high_close = (df['High'] - df['Close'].shift()).abs()
-    low_close  = (df['Low']  - df['Close'].shift()).abs()
-    tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-    return tr.rolling(window=period).mean()
+    return _indicator(df, 'atr', period)
+
+
+# --- Versions incrémentales : O(1) par nouvelle barre ---
+#
+# Pour le live ou un store qu'on complète : on reprend l'état au lieu de tout
+# recalculer. Mêmes graines et mêmes valeurs que vector_indicators / backtrader
+# et que les versions pandas ci-dessus.
+# update(...) renvoie la valeur courante (NaN pendant la période de chauffe),
+# snapshot() / restore() sauvegardent et reprennent l'état.
+
+_SCALE = 2 ** 1074  # tout float fini × 2**1074 est un entier : somme exacte
+
+
+def _fixed(v: float) -> int:
+    num, den = v.as_integer_ratio()
+    return num * (_SCALE // den)
+
+
+def _div(a: float, b: float) -> float:
+    # Division à la NumPy : x / 0 → ±inf, 0 / 0 → NaN
+    if b:
+        return a / b
+    if a != a or a == 0:
+        return math.nan
+    return math.copysign(math.inf, a) * math.copysign(1.0, b)
+
+
+class _Incremental:
+    __slots__ = ('value',)
+
+    def _state_names(self):
+        for cls in type(self).__mro__:
+            yield from getattr(cls, '__slots__', ())
+
+    def extend(self, *columns) -> float:
+        """update() barre par barre sur des séries (ex. tout l'historique)."""
+        for row in zip(*columns):
+            self.update(*row)
+        return self.value
+
+    def snapshot(self) -> dict:
+        """État courant (dict de valeurs simples, picklable)."""
+        state = {}
+        for name in self._state_names():
+            v = getattr(self, name)
+            if isinstance(v, _Incremental):
+                v = v.snapshot()
+            elif isinstance(v, deque):
+                v = list(v)
+            state[name] = v
+        return state
+
+    def restore(self, state: dict):
+        """Reprend un état produit par snapshot() (même indicateur, mêmes paramètres)."""
+        for name in self._state_names():
+            v, cur = state[name], getattr(self, name)
+            if isinstance(cur, _Incremental):
+                cur.restore(v)
+            elif isinstance(cur, deque):
+                setattr(self, name, deque(v))
+            else:
+                setattr(self, name, v)
+        return self
+
+
+class SMAStream(_Incremental):
+    """bt.ind.SMA : fsum(fenêtre) / period, via une somme entière exacte."""
+    __slots__ = ('period', 'window', 'total', 'bad')
+
+    def __init__(self, period: int):
+        self.period = period
+        self.window = deque()
+        self.total = 0
+        self.bad = 0  # valeurs non finies dans la fenêtre
+        self.value = math.nan
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        f = _fixed(x) if math.isfinite(x) else None
+        self.window.append(f)
+        if f is None:
+            self.bad += 1
+        else:
+            self.total += f
+        if len(self.window) > self.period:
+            old = self.window.popleft()
+            if old is None:
+                self.bad -= 1
+            else:
+                self.total -= old
+        if len(self.window) == self.period:
+            self.value = math.nan if self.bad else (self.total / _SCALE) / self.period
+        return self.value
+
+
+class _ExpSmoothingStream(_Incremental):
+    """bt.ind.ExponentialSmoothing : graine = SMA des `period` premières valeurs."""
+    __slots__ = ('alpha', 'alpha1', 'seed')
+
+    def __init__(self, period: int, alpha: float):
+        self.alpha = alpha
+        self.alpha1 = 1.0 - alpha
+        self.seed = SMAStream(period)
+        self.value = math.nan
+
+    def update(self, x: float) -> float:
+        if self.value == self.value:
+            self.value = self.value * self.alpha1 + x * self.alpha
+        elif len(self.seed.window) < self.seed.period:
+            self.value = self.seed.update(x)
+        else:
+            self.value = math.nan  # NaN propagé, comme en batch
+        return self.value
+
+
+class EMAStream(_ExpSmoothingStream):
+    """bt.ind.EMA (alpha = 2 / (1 + period))."""
+    __slots__ = ()
+
+    def __init__(self, period: int):
+        super().__init__(period, 2.0 / (1.0 + period))
+
+
+class SMMAStream(_ExpSmoothingStream):
+    """Moyenne lissée de Wilder (alpha = 1 / period)."""
+    __slots__ = ()
+
+    def __init__(self, period: int):
+        super().__init__(period, 1.0 / period)
+
+
+class RSIStream(_Incremental):
+    """bt.ind.RSI sur les clôtures successives."""
+    __slots__ = ('prev', 'up', 'down')
+
+    def __init__(self, period: int = 14):
+        self.prev = None
+        self.up = SMMAStream(period)
+        self.down = SMMAStream(period)
+        self.value = math.nan
+
+    def update(self, close: float) -> float:
+        if self.prev is not None:
+            up = self.up.update(max(close - self.prev, 0.0))
+            down = self.down.update(max(self.prev - close, 0.0))
+            self.value = 100.0 - _div(100.0, 1.0 + _div(up, down))
+        self.prev = close
+        return self.value
+
+
+class ATRStream(_Incremental):
+    """bt.ind.ATR : SMMA du True Range ; update(high, low, close)."""
+    __slots__ = ('prev_close', 'tr')
+
+    def __init__(self, period: int = 14):
+        self.prev_close = None
+        self.tr = SMMAStream(period)
+        self.value = math.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        if self.prev_close is not None:
+            self.value = self.tr.update(max(high, self.prev_close) - min(low, self.prev_close))
+        self.prev_close = close
+        return self.value
+
+
+class StdDevStream(_Incremental):
+    """bt.ind.StdDev : pow(|SMA(x²) − SMA(x)²|, 0.5)."""
+    __slots__ = ('mean', 'mean_sq')
+
+    def __init__(self, period: int):
+        self.mean = SMAStream(period)
+        self.mean_sq = SMAStream(period)
+        self.value = math.nan
+
+    def update(self, x: float) -> float:
+        m = self.mean.update(x)
+        m2 = self.mean_sq.update(x ** 2)
+        self.value = abs(m2 - m ** 2) ** 0.5
+        return self.value
+
+
+class ADXStream(_Incremental):
+    """bt.ind.ADX : 100 × SMMA(|+DI − −DI| / (+DI + −DI)) ; update(high, low, close)."""
+    __slots__ = ('prev_high', 'prev_low', 'atr', 'plus_dm', 'minus_dm', 'dx')
+
+    def __init__(self, period: int = 14):
+        self.prev_high = self.prev_low = None
+        self.atr = ATRStream(period)
+        self.plus_dm = SMMAStream(period)
+        self.minus_dm = SMMAStream(period)
+        self.dx = SMMAStream(period)
+        self.value = math.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        av_tr = self.atr.update(high, low, close)
+        if self.prev_high is not None:
+            upmove, downmove = high - self.prev_high, self.prev_low - low
+            plus = self.plus_dm.update(upmove if upmove > downmove and upmove > 0.0 else 0.0)
+            minus = self.minus_dm.update(downmove if downmove > upmove and downmove > 0.0 else 0.0)
+            if plus == plus and av_tr == av_tr:
+                di_plus = _div(100.0 * plus, av_tr)
+                di_minus = _div(100.0 * minus, av_tr)
+                self.value = 100.0 * self.dx.update(_div(abs(di_plus - di_minus), di_plus + di_minus))
+        self.prev_high, self.prev_low = high, low
+        return self.value
+
+
+class _ExtremeStream(_Incremental):
+    # File monotone de (indice, valeur) : la tête est l'extrême de la fenêtre
+    __slots__ = ('period', 'count', 'queue')
+    _dominates = None  # comparateur (nouvelle, ancienne) : l'ancienne ne peut plus être l'extrême
+
+    def __init__(self, period: int):
+        self.period = period
+        self.count = 0
+        self.queue = deque()
+        self.value = math.nan
+
+    def update(self, x: float) -> float:
+        q = self.queue
+        while q and self._dominates(x, q[-1][1]):
+            q.pop()
+        q.append((self.count, x))
+        self.count += 1
+        if q[0][0] <= self.count - 1 - self.period:
+            q.popleft()
+        if self.count >= self.period:
+            self.value = q[0][1]
+        return self.value
+
+    def restore(self, state: dict):
+        super().restore(state)
+        self.queue = deque(tuple(item) for item in self.queue)
+        return self
+
+
+class HighestStream(_ExtremeStream):
+    """bt.ind.Highest : max des `period` dernières valeurs."""
+    __slots__ = ()
+    _dominates = staticmethod(operator.ge)
+
+
+class LowestStream(_ExtremeStream):
+    """bt.ind.Lowest : min des `period` dernières valeurs."""
+    __slots__ = ()
+    _dominates = staticmethod(operator.le)
+
+
+class CrossOverStream(_Incremental):
+    """bt.ind.CrossOver : +1 / -1 / 0 ; update(a, b), référence = dernière différence non nulle."""
+    __slots__ = ('nzd',)
+
+    def __init__(self):
+        self.nzd = None
+        self.value = math.nan
+
+    def update(self, a: float, b: float) -> float:
+        d = a - b
+        if d != d:
+            return self.value
+        if self.nzd is not None:
+            nzd = self.nzd
+            self.value = float((nzd < 0.0 and a > b)) - float((nzd > 0.0 and a < b))
+            if d != 0.0:
+                self.nzd = d
+        else:
+            self.nzd = d  # 1re différence définie, même nulle
+        return self.value
+
+
+class DelayStream(_Incremental):
+    """line(-1) : valeur de la barre précédente (NaN à la 1re barre)."""
+    __slots__ = ('prev', 'count')
+
+    def __init__(self):
+        self.prev = math.nan
+        self.count = 0
+        self.value = math.nan
 
+    def update(self, x: float) -> float:
+        self.value, self.prev = self.prev, float(x)
+        self.count += 1
+        return self.value
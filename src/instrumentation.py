@@ -0,0 +1,265 @@
+"""
+Instrumentation optionnelle des backtests : où passe le temps ?
+
+• phases chronométrées (nombre d'appels, secondes, pic de RSS à la sortie) :
+  data.download, data.load, feed.preload, indicators.init, indicators.compute,
+  strategy.next, broker, analyzers, vector.indicators, vector.simulation,
+  panel.align, panel.weights, panel.simulation…
+• côté backtrader, instrument(cerebro) branche les mesures sur les feeds, le
+  broker, chaque stratégie (next()), ses indicateurs et ses analyzers
+• export en dict / JSON
+
+Désactivée par défaut : phase() renvoie alors un contexte vide partagé et
+instrument() ne touche à rien, le surcoût est la lecture d'une ContextVar.
+Profil propre à chaque exécution : enable() ne vaut que pour le thread (ou la
+tâche asyncio) qui l'appelle, deux sessions Streamlit profilées en même temps
+ne mélangent pas leurs mesures.
+
+    with profiling() as prof:
+        ...                      # backtests
+    prof.to_json('profile.json')
+
+Sans toucher au code : BACKTEST_PROFILE=profile.json python src/backtest.py
+(profil écrit à la fin du processus ; les workers d'un pool ne remontent pas le leur).
+"""
+import atexit
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+# backtrader et resource importés à l'usage : data_loader, vector_engine ou
+# panel_engine importent phase() sans charger backtrader
+
+
+# --- Mémoire ---
+
+def reset_peak_rss() -> bool:
+    """Remet à zéro le pic de RSS du processus (Linux) ; False si impossible."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> float:
+    """Pic de RSS (Mo) depuis le début du processus ou le dernier reset_peak_rss()."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 1024
+
+
+# --- Profil ---
+
+class Profile:
+    """Compteurs par phase : {nom: [appels, secondes, pic RSS Mo]}."""
+
+    def __init__(self):
+        self.phases = {}
+        self.started = time.time()
+        self.wall = None
+
+    def record(self, name: str, seconds: float, calls: int = 1, rss: float = None) -> None:
+        stat = self.phases.get(name)
+        if stat is None:
+            stat = self.phases[name] = [0, 0.0, None]
+        stat[0] += calls
+        stat[1] += seconds
+        if rss is not None and (stat[2] is None or rss > stat[2]):
+            stat[2] = rss
+
+    def to_dict(self) -> dict:
+        return {
+            'started': self.started,
+            'wall': self.wall,
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+            'phases': {name: {'calls': c, 'seconds': round(s, 6),
+                              'peak_rss_mb': None if r is None else round(r, 1)}
+                       for name, (c, s, r) in sorted(self.phases.items(), key=lambda kv: -kv[1][1])},
+        }
+
+    def to_json(self, path: str) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+# Profil de l'exécution en cours (un nouveau thread part sans profil)
+_profile: ContextVar[Optional[Profile]] = ContextVar('profile', default=None)
+
+
+def enabled() -> bool:
+    return _profile.get() is not None
+
+
+def current() -> Optional[Profile]:
+    return _profile.get()
+
+
+def enable() -> Profile:
+    """Démarre un nouveau profil dans le contexte courant (remplace le précédent)."""
+    prof = Profile()
+    _profile.set(prof)
+    return prof
+
+
+def disable() -> Optional[Profile]:
+    """Arrête la collecte dans le contexte courant et renvoie le profil terminé."""
+    prof = _profile.get()
+    _profile.set(None)
+    if prof is not None:
+        prof.wall = time.time() - prof.started
+    return prof
+
+
+@contextmanager
+def profiling():
+    prof = enable()
+    try:
+        yield prof
+    finally:
+        disable()
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+class _Phase:
+    __slots__ = ('prof', 'name', 't0')
+
+    def __init__(self, prof: Profile, name: str):
+        self.prof = prof
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.prof.record(self.name, time.perf_counter() - self.t0, rss=peak_rss_mb())
+        return False
+
+
+def phase(name: str):
+    """Contexte chronométré (contexte vide si l'instrumentation est désactivée)."""
+    prof = _profile.get()
+    return _NO_PHASE if prof is None else _Phase(prof, name)
+
+
+def timed(name: str, fn, rss: bool = False):
+    """
+    fn enveloppée : chaque appel est compté et chronométré sous `name` dans le
+    profil courant (rss : relever aussi le pic mémoire, pour les appels rares).
+    """
+    prof = _profile.get()
+    clock = time.perf_counter
+
+    def wrapper(*args, **kwargs):
+        t0 = clock()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            prof.record(name, clock() - t0, rss=peak_rss_mb() if rss else None)
+    return wrapper
+
+
+# --- Backtrader ---
+
+_profiled_classes = {}
+
+
+def profiled_strategy(strat_cls):
+    """
+    Sous-classe de la stratégie qui chronomètre __init__ (construction des
+    indicateurs), le calcul des indicateurs, next() et les analyzers.
+    """
+    cls = _profiled_classes.get(strat_cls)
+    if cls is not None:
+        return cls
+    import backtrader as bt
+    name = strat_cls.__name__
+
+    def __init__(self, *args, **kwargs):
+        with phase('indicators.init'):
+            strat_cls.__init__(self, *args, **kwargs)
+        if _profile.get() is None:
+            return
+        for ind in self._lineiterators[bt.LineIterator.IndType]:
+            label = f'indicators.compute.{type(ind).__name__}'
+            ind._once = timed(label, ind._once)
+            ind._next = timed(label, ind._next)
+
+    def _start(self):
+        strat_cls._start(self)
+        if _profile.get() is None:
+            return
+        for an in self.analyzers:
+            label = f'analyzers.{type(an).__name__}'
+            an._next = timed(label, an._next)
+            an._notify_cashvalue = timed(label, an._notify_cashvalue)
+            an._notify_fund = timed(label, an._notify_fund)
+
+    def next(self):
+        prof = _profile.get()
+        if prof is None:
+            return strat_cls.next(self)
+        t0 = time.perf_counter()
+        strat_cls.next(self)
+        prof.record(label, time.perf_counter() - t0)
+
+    label = f'strategy.next.{name}'
+    # Métaclasse de backtrader : params, lignes et enregistrement comme l'original
+    cls = type(strat_cls)(name, (strat_cls,), {'__init__': __init__, '_start': _start, 'next': next,
+                                               '__module__': strat_cls.__module__})
+    _profiled_classes[strat_cls] = cls
+    return cls
+
+
+def instrument(cerebro):
+    """
+    Branche l'instrumentation sur un bt.Cerebro prêt à tourner (feeds et
+    stratégies ajoutés) et le renvoie. Sans effet si elle est désactivée.
+    """
+    if _profile.get() is None:
+        return cerebro
+    for data in cerebro.datas:
+        data.preload = timed('feed.preload', data.preload, rss=True)
+    # Traitement des ordres à chaque barre
+    cerebro.broker.next = timed('broker', cerebro.broker.next)
+    cerebro.strats = [[(profiled_strategy(cls), args, kwargs) for cls, args, kwargs in group]
+                      for group in cerebro.strats]
+    return cerebro
+
+
+# --- Profil piloté par l'environnement (scripts, runs headless) ---
+
+def _dump_env_profile(path: str) -> None:
+    prof = disable()
+    if prof is not None:
+        prof.to_json(path)
+
+
+if os.environ.get('BACKTEST_PROFILE'):
+    enable()
+    atexit.register(_dump_env_profile, os.environ['BACKTEST_PROFILE'])
@@ -0,0 +1,320 @@
+"""
+Runtime live / paper asyncio des stratégies mono-actif.
+
+Les machines à états de vector_engine (mêmes décisions que les stratégies
+backtrader) sont alimentées barre par barre depuis un broker (broker.base) :
+
+• préchauffe : historique demandé au broker pour tous les symboles en même
+  temps, indicateurs vectorisés sur l'historique puis versions incrémentales
+  (indicators.*Stream) reprises à la dernière barre : O(1) par nouvelle barre
+• une seule boucle d'événements pour tous les symboles : barre → décision
+  en quelques dizaines de µs, ordres envoyés en tâches de fond (submit ne
+  bloque pas les barres suivantes), connexions HTTP réutilisées par le broker
+• miroir local du compte (cash commun, positions) tenu à jour par les
+  exécutions ; un symbole avec un ordre en cours ne décide pas
+• plafonds d'exposition optionnels (risk.RiskLimits), comme en backtest
+• latences mesurées depuis la réception de la barre : décision, envoi de
+  l'ordre, ack du broker, exécution (LatencyTracker, en ms)
+
+Avec le MockExchange en lockstep et fill='next_open', les exécutions sont
+celles de vector_engine.run_portfolio sur les mêmes barres.
+
+En script (bourse simulée locale, aucun appel réseau avec --provider synthetic) :
+    python src/live.py MomentumStrategy SPY QQQ GLD BTC-USD --provider synthetic --interval 0
+    python src/live.py DonchianBreakoutStrategy SPY QQQ --broker alpaca   # clés APCA_API_KEY_ID / APCA_API_SECRET_KEY
+"""
+import argparse
+import asyncio
+import itertools
+import logging
+import time
+import uuid
+
+from broker.base import Bar, Clock, End, Fill, LatencyTracker, Order, Reject
+from risk import RiskBook, RiskLimits
+from vector_engine import STREAMS, bars_from_df, machine_for, strategy_params
+
+log = logging.getLogger(__name__)
+
+
+class _Desk:
+    """Broker vu par une machine : cash et position du miroir local, ordres confiés au runtime."""
+    __slots__ = ('rt', 'symbol', 'asset')
+
+    def __init__(self, rt: 'Runtime', symbol: str, asset: int):
+        self.rt = rt
+        self.symbol = symbol
+        self.asset = asset
+
+    @property
+    def cash(self):
+        return self.rt.cash
+
+    @property
+    def size(self):
+        return self.rt.sizes[self.symbol]
+
+    def buy(self, size, created_price):
+        book = self.rt.book
+        if book is not None and size:
+            size = book.cap(self.asset, size, created_price, self.rt.cash)
+            if size:
+                book.commit(self.asset, size, created_price)
+        if size:
+            self.rt.order(self.symbol, size, created_price)
+
+    def close(self, created_price, size=None):
+        possize = self.size
+        size = abs(size if size is not None else possize)
+        if possize > 0:
+            self.rt.order(self.symbol, -size, created_price)
+        elif possize < 0:
+            self.rt.order(self.symbol, size, created_price)
+
+
+class LiveStrategy:
+    """Machine à états d'un symbole, préchauffée sur l'historique puis alimentée barre par barre."""
+    __slots__ = ('machine', 'update', 'lists', 'n', 'start')
+
+    def __init__(self, strat_cls, p: dict, history, desk):
+        bars = bars_from_df(history)
+        cls = machine_for(strat_cls)
+        self.machine = cls(p, bars, desk)
+        names, self.update, _ = STREAMS[cls](p)
+        self.lists = [getattr(self.machine, name) for name in names]
+        for row in zip(*(bars[k].tolist() for k in ('Open', 'High', 'Low', 'Close', 'Volume'))):
+            self.update(*row)
+        self.n = len(bars['Close'])
+        # Indicateurs pas encore chauds : 1re barre où toutes les valeurs sont définies
+        self.start = self.machine.start if self.machine.start < self.n else None
+
+    def on_bar(self, bar: Bar, decide: bool = True) -> None:
+        values = self.update(bar.open, bar.high, bar.low, bar.close, bar.volume)
+        for lst, v in zip(self.lists, values):
+            lst.append(v)
+        i = self.n
+        self.n += 1
+        if self.start is None and all(v == v for v in values):
+            self.start = i
+        if decide and self.start is not None:
+            self.machine.step(i)
+
+
+class Runtime:
+    """
+    Une stratégie sur plusieurs symboles, un broker, une boucle d'événements.
+    lockstep : rejeu pas à pas (MockExchange(lockstep=True)) : après chaque pas,
+    attend les acks des ordres puis demande le pas suivant.
+    """
+
+    def __init__(self, broker, strat_cls, symbols, params=None, warmup: int = 500,
+                 limits: RiskLimits = None, lockstep: bool = False):
+        self.broker = broker
+        self.strat_cls = strat_cls
+        self.symbols = list(symbols)
+        self.p = strategy_params(strat_cls, params)
+        self.warmup = warmup
+        self.book = RiskBook(len(self.symbols), limits) if limits else None
+        self.lockstep = lockstep
+        self.latency = LatencyTracker()
+        self.cash = 0.0
+        self.sizes = {s: 0.0 for s in self.symbols}
+        self.last = {}
+        self.strategies = {}
+        self.pending = {}     # symbole → id de l'ordre en cours
+        self.orders = {}      # id → (symbole, réception de la barre)
+        self.fills = []       # (heure de la barre, symbole, qty, prix)
+        self.rejects = []
+        self.bars = 0
+        # Ids uniques d'un lancement à l'autre (client_order_id d'Alpaca, newClientOrderId de Binance)
+        self._run = uuid.uuid4().hex[:8]
+        self._ids = itertools.count(1)
+        self._inflight = set()
+        self._t0 = 0.0
+
+    async def start(self):
+        """Compte, historiques (en parallèle, connexions réutilisées), préchauffe, abonnement."""
+        await self.broker.connect()
+        acc = await self.broker.account()
+        self.cash = acc.cash
+        for s in self.symbols:
+            self.sizes[s] = float(acc.positions.get(s, 0.0))
+        histories = await asyncio.gather(*(self.broker.history(s, self.warmup) for s in self.symbols))
+        for asset, (s, hist) in enumerate(zip(self.symbols, histories)):
+            self.strategies[s] = LiveStrategy(self.strat_cls, self.p, hist, _Desk(self, s, asset))
+            if len(hist):
+                self.last[s] = float(hist['Close'].iloc[-1])
+        await self.broker.subscribe(self.symbols)
+
+    async def run(self, max_bars: int = None):
+        """Traite les événements jusqu'à la fin du flux (ou max_bars barres) ; renvoie report()."""
+        await self.start()
+        try:
+            async for t0, event in self.broker.events():
+                if isinstance(event, Bar):
+                    self.on_bar(event, t0)
+                    if max_bars is not None and self.bars >= max_bars:
+                        break
+                elif isinstance(event, Fill):
+                    self.on_fill(event)
+                elif isinstance(event, Reject):
+                    self.on_reject(event)
+                elif isinstance(event, Clock):
+                    if self.lockstep:
+                        await self.flush()
+                        await self.broker.advance()
+                elif isinstance(event, End):
+                    break
+            await self.flush()
+        finally:
+            await self.broker.close()
+        return self.report()
+
+    async def flush(self):
+        """Attend les ordres en cours d'envoi."""
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    # --- Événements ---
+
+    def on_bar(self, bar: Bar, t0: float) -> None:
+        strat = self.strategies.get(bar.symbol)
+        if strat is None:
+            return
+        self.bars += 1
+        self.last[bar.symbol] = bar.close
+        if self.book is not None:
+            a = self.symbols.index(bar.symbol)
+            self.book.mark(a, self.sizes[bar.symbol], bar.close)
+        self._t0 = t0
+        strat.on_bar(bar, decide=bar.symbol not in self.pending)
+        self.latency.since('barre→décision', t0)
+
+    def on_fill(self, fill: Fill) -> None:
+        sym = fill.symbol
+        self.sizes[sym] += fill.qty
+        self.cash = fill.cash if fill.cash is not None else self.cash - fill.qty * fill.price
+        self.fills.append((fill.time, sym, fill.qty, fill.price))
+        _, t0 = self.orders.get(fill.order_id, (sym, None))
+        if t0 is not None:
+            self.latency.since('barre→exécution', t0)
+        self._done(sym, fill.order_id)
+
+    def on_reject(self, reject: Reject) -> None:
+        self.rejects.append(reject)
+        self._done(reject.symbol, reject.order_id)
+
+    def _done(self, sym, order_id):
+        if self.pending.get(sym) == order_id:
+            del self.pending[sym]
+            if self.book is not None:
+                self.book.release(self.symbols.index(sym))
+
+    # --- Ordres ---
+
+    def order(self, symbol: str, qty: float, price: float) -> None:
+        """Appelé par la machine pendant sa décision : l'envoi part en tâche de fond."""
+        oid = f'{self._run}-{symbol}-{next(self._ids)}'
+        self.pending[symbol] = oid
+        self.orders[oid] = (symbol, self._t0)
+        task = asyncio.ensure_future(self._submit(Order(oid, symbol, qty, price), self._t0))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _submit(self, order: Order, t0: float):
+        self.latency.since('barre→envoi', t0)
+        try:
+            await self.broker.submit(order)
+        except Exception as exc:
+            # Le broker a déjà émis le Reject (on_reject), ici seulement la trace
+            log.debug("Ordre %s refusé : %r", order.id, exc)
+            return
+        self.latency.since('barre→ack', t0)
+
+    # --- Bilan ---
+
+    def equity(self) -> float:
+        return self.cash + sum(size * self.last.get(s, 0.0) for s, size in self.sizes.items())
+
+    def report(self) -> dict:
+        return {'bars': self.bars, 'orders': len(self.orders), 'fills': len(self.fills),
+                'rejects': len(self.rejects), 'cash': self.cash, 'equity': self.equity(),
+                'positions': {s: v for s, v in self.sizes.items() if v},
+                'latency': self.latency.report()}
+
+
+async def paper(data: dict, strat_cls, params=None, cash: float = 100_000.0, warmup: int = 250,
+                interval: float = 0.0, fill: str = 'next_open', slippage_bps: float = 0.0,
+                limits: RiskLimits = None, lockstep: bool = True):
+    """
+    Paper trading hors ligne : MockExchange local sur {ticker: DataFrame}, les
+    `warmup` premiers pas du calendrier servant de préchauffe. Renvoie (runtime, report).
+    """
+    from broker.mock_exchange import MockBroker, MockExchange
+    ex = MockExchange(data, cash, warmup, interval, fill, slippage_bps, lockstep)
+    url = await ex.start()
+    try:
+        rt = Runtime(MockBroker(url), strat_cls, list(data), params, warmup, limits, lockstep)
+        report = await rt.run()
+    finally:
+        await ex.stop()
+    return rt, report
+
+
+def make_broker(name: str):
+    """Adaptateur par nom : 'alpaca', 'binance' ou 'ib' (identifiants dans l'environnement)."""
+    if name == 'alpaca':
+        from broker.alpaca_api import AlpacaBroker
+        return AlpacaBroker.from_env()
+    if name == 'binance':
+        from broker.binance_api import BinanceBroker
+        return BinanceBroker.from_env()
+    if name == 'ib':
+        from broker.ib_api import IBBroker
+        return IBBroker.from_env()
+    raise ValueError(f"Broker inconnu : {name}")
+
+
+if __name__ == "__main__":
+    import strategy, strategy2, strategy3, strategy4
+    from data_loader import load_many
+    from providers import make_provider
+
+    classes = {cls.__name__: cls for cls in (strategy.MomentumStrategy,
+                                             strategy2.DonchianBreakoutStrategy,
+                                             strategy3.EnhancedBreakoutStrategy,
+                                             strategy4.RegimeAwareBreakoutStrategy)}
+    parser = argparse.ArgumentParser(description="Runtime live / paper (asyncio)")
+    parser.add_argument('strategy', choices=sorted(classes))
+    parser.add_argument('tickers', nargs='+')
+    parser.add_argument('--broker', default='mock', choices=('mock', 'alpaca', 'binance', 'ib'))
+    parser.add_argument('--provider', default='store', help="données du mock : store, synthetic, yfinance, replay:<dossier>")
+    parser.add_argument('--period', default='3y')
+    parser.add_argument('--warmup', type=int, default=250)
+    parser.add_argument('--interval', type=float, default=0.0, help="mock : secondes entre deux pas (0 = lockstep)")
+    parser.add_argument('--fill', default='next_open', choices=('next_open', 'immediate'))
+    parser.add_argument('--slippage-bps', type=float, default=0.0)
+    parser.add_argument('--cash', type=float, default=100_000.0)
+    parser.add_argument('-v', '--verbose', action='store_true', help="journal détaillé (ordres refusés…)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING,
+                        format='%(asctime)s %(name)s %(levelname)s %(message)s')
+
+    strat_cls = classes[args.strategy]
+    t_start = time.perf_counter()
+    if args.broker == 'mock':
+        data = (load_many(args.tickers, period=args.period) if args.provider == 'store'
+                else make_provider(args.provider).fetch(args.tickers, period=args.period))
+        rt, report = asyncio.run(paper(data, strat_cls, cash=args.cash, warmup=args.warmup,
+                                       interval=args.interval, fill=args.fill, slippage_bps=args.slippage_bps,
+                                       lockstep=args.interval == 0))
+    else:
+        rt = Runtime(make_broker(args.broker), strat_cls, args.tickers, warmup=args.warmup)
+        try:
+            report = asyncio.run(rt.run())
+        except KeyboardInterrupt:
+            report = rt.report()
+    print(report.pop('latency').to_string(float_format=lambda v: f"{v:.3f}"))
+    for k, v in report.items():
+        print(f"{k:>9} : {v}")
+    print(f"en {time.perf_counter() - t_start:.1f}s")
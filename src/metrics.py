@@ -0,0 +1,121 @@
+"""
+Métriques de performance, communes à l'app, backtest.py, sweep, walk-forward
+et benchmark : mêmes formules partout, donc mêmes chiffres.
+
+Tout est calculé d'un bloc sur une matrice (courbes × barres) : un balayage de
+milliers de combinaisons se résume sans boucle Python par courbe.
+
+• rendements simples barre à barre, annualisation sur TRADING_DAYS barres
+• total_return, cagr, volatility, max_dd en % ; sharpe, sortino, calmar sans unité
+• max_dd_duration : plus longue période (en barres) passée sous un plus haut
+• turnover : montant échangé par an / 2 / capital moyen (1 = portefeuille
+  entièrement renouvelé une fois par an), si le montant échangé est connu
+"""
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+METRICS = ('total_return', 'cagr', 'volatility', 'sharpe', 'sortino',
+           'max_dd', 'max_dd_duration', 'calmar', 'turnover')
+
+
+def _matrix(equity) -> np.ndarray:
+    """Courbe(s) en matrice float64 (courbes × barres)."""
+    return np.atleast_2d(np.asarray(equity, dtype=np.float64))
+
+
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """num / den, NaN là où den est nul ou NaN."""
+    with np.errstate(invalid='ignore'):
+        ok = den > 0
+    return np.divide(num, den, out=np.full(np.broadcast(num, den).shape, np.nan), where=ok)
+
+
+def returns(equity) -> np.ndarray:
+    """Rendements barre à barre (courbes × barres-1)."""
+    eq = _matrix(equity)
+    return eq[:, 1:] / eq[:, :-1] - 1.0
+
+
+def drawdown(equity) -> np.ndarray:
+    """Baisse depuis le plus haut, en fraction (courbes × barres)."""
+    eq = _matrix(equity)
+    peak = np.maximum.accumulate(eq, axis=1)
+    return (peak - eq) / peak
+
+
+def drawdown_duration(equity) -> np.ndarray:
+    """Nombre de barres écoulées depuis le dernier plus haut, à chaque barre."""
+    eq = _matrix(equity)
+    bars = np.arange(eq.shape[1])
+    at_peak = eq >= np.maximum.accumulate(eq, axis=1)
+    last_peak = np.maximum.accumulate(np.where(at_peak, bars, 0), axis=1)
+    return bars - last_peak
+
+
+def rolling_sharpe(equity, window: int = 63, periods: int = TRADING_DAYS) -> np.ndarray:
+    """
+    Sharpe annualisé sur les `window` derniers rendements (courbes × barres-1),
+    NaN tant que la fenêtre n'est pas pleine. Sommes cumulées sur les rendements
+    centrés : O(barres) quelle que soit la fenêtre.
+    """
+    r = returns(equity)
+    out = np.full_like(r, np.nan)
+    if window < 2 or r.shape[1] < window:
+        return out
+    center = r.mean(axis=1, keepdims=True)
+    rc = r - center
+    pad = np.zeros((r.shape[0], 1))
+    c1 = np.concatenate([pad, np.cumsum(rc, axis=1)], axis=1)
+    c2 = np.concatenate([pad, np.cumsum(rc * rc, axis=1)], axis=1)
+    s1 = c1[:, window:] - c1[:, :-window]
+    s2 = c2[:, window:] - c2[:, :-window]
+    var = np.maximum(s2 - s1 * s1 / window, 0.0) / (window - 1)
+    out[:, window - 1:] = _ratio(s1 / window + center, np.sqrt(var)) * np.sqrt(periods)
+    return out
+
+
+def batch_metrics(equity, periods: int = TRADING_DAYS, traded=None) -> Dict[str, np.ndarray]:
+    """
+    Toutes les métriques de chaque courbe (lignes de `equity`), une valeur par
+    courbe. traded : montant total échangé par courbe (même unité que la
+    courbe), pour le turnover ; NaN sinon.
+    """
+    eq = _matrix(equity)
+    n = eq.shape[1]
+    first, last = eq[:, 0], eq[:, -1]
+    r = returns(eq)
+    mean = r.mean(axis=1) if n > 1 else np.full(len(eq), np.nan)
+    std = r.std(axis=1, ddof=1) if n > 2 else np.full(len(eq), np.nan)
+    downside = np.sqrt((np.minimum(r, 0.0) ** 2).mean(axis=1)) if n > 1 else np.full(len(eq), np.nan)
+    years = n / periods
+    cagr = ((last / first) ** (1 / years) - 1) * 100
+    max_dd = drawdown(eq).max(axis=1) * 100
+    if traded is None:
+        turnover = np.full(len(eq), np.nan)
+    else:
+        turnover = _ratio(np.asarray(traded, dtype=np.float64) / 2 / years, eq.mean(axis=1))
+    return {
+        'total_return':    (last / first - 1) * 100,
+        'cagr':            cagr,
+        'volatility':      std * np.sqrt(periods) * 100,
+        'sharpe':          _ratio(mean, std) * np.sqrt(periods),
+        'sortino':         _ratio(mean, downside) * np.sqrt(periods),
+        'max_dd':          max_dd,
+        'max_dd_duration': drawdown_duration(eq).max(axis=1),
+        'calmar':          _ratio(cagr, max_dd),
+        'turnover':        turnover,
+    }
+
+
+def equity_metrics(equity, periods: int = TRADING_DAYS, traded: Optional[float] = None) -> dict:
+    """batch_metrics d'une seule courbe : {métrique: float}."""
+    return {k: float(v[0]) for k, v in batch_metrics(equity, periods, None if traded is None else [traded]).items()}
+
+
+def metrics_table(curves: pd.DataFrame, periods: int = TRADING_DAYS, traded=None) -> pd.DataFrame:
+    """Une ligne de métriques par colonne de `curves` (courbes alignées, sans trou)."""
+    stats = batch_metrics(curves.to_numpy(dtype=np.float64).T, periods, traded)
+    return pd.DataFrame(stats, index=curves.columns)
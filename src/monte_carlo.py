@@ -0,0 +1,265 @@
+"""
+Monte Carlo d'un backtest : des dizaines de milliers de trajectoires
+rééchantillonnées à partir d'un seul historique, pour juger de la fragilité
+d'une stratégie (stop-loss de DynamicSafeRebalance, breakouts…).
+
+Méthodes :
+• 'block'   : bootstrap par blocs circulaires des rendements barre à barre ;
+  des blocs de `block` barres gardent l'autocorrélation courte et les séries de pertes
+• 'shuffle' : trades fermés dans un ordre tiré au hasard (capital final
+  inchangé, seuls le chemin, le drawdown et le Sharpe varient)
+• 'trades'  : trades fermés tirés avec remise
+En mode trades, une « barre » est un trade : le Sharpe est annualisé au nombre
+de trades par an de l'historique.
+
+Distributions : capital final, max drawdown (%), Sharpe (formules de metrics.py).
+
+• trajectoires générées par lots NumPy (trajectoires × barres), jamais toutes
+  en mémoire : un lot tient dans memory_mb, seules 3 valeurs par trajectoire
+  sont gardées
+• paquets de BATCH trajectoires répartis sur un pool de processus, une graine
+  (SeedSequence) par paquet : mêmes tirages quels que soient le nombre de
+  workers et la taille des lots
+
+En script :
+    python src/monte_carlo.py DynamicSafeRebalance SPY QQQ GLD --period 10y -n 20000
+    python src/monte_carlo.py DonchianBreakoutStrategy SPY QQQ --method trades -n 50000
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from metrics import TRADING_DAYS, _ratio, drawdown
+
+BATCH = 1024   # trajectoires par graine
+METHODS = ('block', 'shuffle', 'trades')
+STATS = ('final', 'max_dd', 'sharpe')
+# Tableaux (trajectoires × barres) vivants en même temps dans un lot :
+# indices, rendements, 1 + rendements, capital, plus haut, drawdown
+_ARRAYS = 6
+
+
+class MonteCarloResult(NamedTuple):
+    final: np.ndarray     # capital final de chaque trajectoire
+    max_dd: np.ndarray    # max drawdown (%)
+    sharpe: np.ndarray    # Sharpe annualisé
+    historical: dict      # mêmes mesures sur l'historique
+    method: str
+
+
+# --- Trades fermés d'un backtest ---
+
+def position_from_fills(n: int, fills) -> np.ndarray:
+    """Position à chaque clôture (n barres) d'après les exécutions (barre, taille, prix) du moteur vectorisé."""
+    delta = np.zeros(n)
+    np.add.at(delta, [f[0] for f in fills], [f[1] for f in fills])
+    return np.cumsum(delta)
+
+
+def trade_bounds(position) -> tuple:
+    """(barre d'entrée, barre de sortie) de chaque trade fermé : barres où s'exécutent l'achat et la vente."""
+    held = np.asarray(position) != 0
+    flat_before = np.concatenate([[True], ~held[:-1]])
+    starts = np.flatnonzero(held & flat_before)
+    ends = np.flatnonzero(~held[1:] & held[:-1]) + 1
+    return starts[:len(ends)], ends
+
+
+def trade_returns(equity, position) -> np.ndarray:
+    """
+    Rendement composé de chaque trade fermé, de la barre d'entrée à la barre de
+    sortie comprises (exécutions à l'ouverture). Un trade encore ouvert à la fin est ignoré.
+    """
+    eq = np.asarray(equity, dtype=np.float64)
+    starts, ends = trade_bounds(position)
+    if not len(starts):
+        return np.empty(0)
+    growth = np.concatenate([[1.0], eq[1:] / eq[:-1], [1.0]])
+    return np.multiply.reduceat(growth, np.column_stack([starts, ends + 1]).ravel())[::2] - 1.0
+
+
+# --- Trajectoires ---
+
+def _paths(rng: np.random.Generator, source: np.ndarray, rows: int, method: str, block: int) -> np.ndarray:
+    """rows trajectoires de rendements (rows × barres) ; tirages ligne par ligne, donc découpables."""
+    n = len(source)
+    if method == 'block':
+        nb = -(-n // block)
+        idx = (rng.integers(0, n, size=(rows, nb))[:, :, None] + np.arange(block)).reshape(rows, -1)[:, :n]
+        return source[idx % n]
+    if method == 'shuffle':
+        return rng.permuted(np.tile(source, (rows, 1)), axis=1)
+    return source[rng.integers(0, n, size=(rows, n))]
+
+
+def path_stats(rets: np.ndarray, periods: int = TRADING_DAYS, capital: float = 1.0) -> Dict[str, np.ndarray]:
+    """Capital final, max drawdown (%) et Sharpe de chaque ligne de rendements (trajectoires × barres)."""
+    rets = np.atleast_2d(rets)
+    rows, n = rets.shape
+    eq = np.empty((rows, n + 1))
+    eq[:, 0] = capital
+    np.cumprod(1.0 + rets, axis=1, out=eq[:, 1:])
+    eq[:, 1:] *= capital
+    mean = rets.mean(axis=1) if n else np.full(rows, np.nan)
+    std = rets.std(axis=1, ddof=1) if n > 1 else np.full(rows, np.nan)
+    return {
+        'final':  eq[:, -1].copy(),
+        'max_dd': drawdown(eq).max(axis=1) * 100,
+        'sharpe': _ratio(mean, std) * np.sqrt(periods),
+    }
+
+
+# --- Côté worker ---
+
+_source = None
+
+
+def _init(source: np.ndarray) -> None:
+    global _source
+    _source = source
+
+
+def _run_batch(spec: tuple):
+    """Un paquet de trajectoires (une graine), traité par lots de `rows` lignes."""
+    count, seed, method, block, periods, capital, rows = spec
+    rng = np.random.default_rng(seed)
+    out = {k: np.empty(count) for k in STATS}
+    for lo in range(0, count, rows):
+        hi = min(lo + rows, count)
+        stats = path_stats(_paths(rng, _source, hi - lo, method, block), periods, capital)
+        for k in STATS:
+            out[k][lo:hi] = stats[k]
+    return out
+
+
+# --- API ---
+
+def batch_rows(n_bars: int, memory_mb: float) -> int:
+    """Trajectoires par lot pour rester sous memory_mb."""
+    return max(1, int(memory_mb * 2**20) // (8 * _ARRAYS * (n_bars + 1)))
+
+
+def simulate(source, n_paths: int = 10000, method: str = 'block', block: int = 20,
+             periods: int = TRADING_DAYS, capital: float = 1.0, seed: int = 0,
+             memory_mb: float = 256, max_workers: Optional[int] = None) -> MonteCarloResult:
+    """
+    n_paths trajectoires rééchantillonnées de source : rendements barre à barre
+    ('block') ou rendements des trades fermés ('shuffle', 'trades').
+    memory_mb : mémoire des lots, tous workers confondus. max_workers=1 : dans ce processus.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Méthode inconnue : {method} (choix : {', '.join(METHODS)})")
+    source = np.nan_to_num(np.asarray(source, dtype=np.float64))
+    if len(source) < 2:
+        raise ValueError("Pas assez de rendements (ou de trades) à rééchantillonner")
+    if n_paths < 1:
+        raise ValueError("n_paths doit valoir au moins 1")
+    if method == 'block' and block < 1:
+        raise ValueError("block doit valoir au moins 1")
+    counts = [min(BATCH, n_paths - lo) for lo in range(0, n_paths, BATCH)]
+    seeds = np.random.SeedSequence(seed).spawn(len(counts))
+    workers = min(max_workers or os.cpu_count() or 1, len(counts))
+    rows = batch_rows(len(source), memory_mb / max(workers, 1))
+    specs = [(c, s, method, block, periods, capital, rows) for c, s in zip(counts, seeds)]
+    if workers <= 1:
+        _init(source)
+        try:
+            parts = [_run_batch(spec) for spec in specs]
+        finally:
+            _init(None)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init, initargs=(source,)) as pool:
+            parts = list(pool.map(_run_batch, specs))
+    out = {k: np.concatenate([part[k] for part in parts]) for k in STATS}
+    hist = {k: float(v[0]) for k, v in path_stats(source, periods, capital).items()}
+    return MonteCarloResult(out['final'], out['max_dd'], out['sharpe'], hist, method)
+
+
+def summary(res: MonteCarloResult, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)) -> pd.DataFrame:
+    """
+    Une ligne par mesure : valeur historique, moyenne, quantiles des trajectoires
+    et part des trajectoires sous l'historique.
+    """
+    rows = {}
+    for k in STATS:
+        v = getattr(res, k)
+        v = v[np.isfinite(v)]
+        rows[k] = {'historique': res.historical[k], 'moyenne': v.mean() if len(v) else np.nan,
+                   **{f'q{round(q * 100)}': np.quantile(v, q) if len(v) else np.nan for q in quantiles},
+                   'sous historique': (v < res.historical[k]).mean() if len(v) else np.nan}
+    return pd.DataFrame(rows).T
+
+
+def backtest_source(data: Dict[str, pd.DataFrame], strat_cls, params: Optional[dict] = None,
+                    method: str = 'block'):
+    """
+    (source, barres par an) d'un backtest sur l'univers, comme dans sweep
+    (capital 1, portefeuille équipondéré) : rendements du portefeuille pour
+    'block', trades fermés de tous les tickers (par date de sortie) sinon.
+    """
+    import parallel_runner as pr
+    import sweep
+    from data_store import to_epoch_seconds
+    from engines import supports_numpy, supports_vector
+    from vector_engine import bars_from_df, run_bars
+
+    params = params or {}
+    if method == 'block':
+        vector = supports_numpy(strat_cls, data)
+        ts, equity, _, _ = next(pr.imap_shared(data, sweep.curve, [params], strat_cls, vector,
+                                               sweep.INITIAL_CAPITAL, max_workers=1))
+        years = (ts[-1] - ts[0]) / (365.25 * 86400) if len(ts) > 1 else 0
+        return equity[1:] / equity[:-1] - 1.0, max(int(round((len(ts) - 1) / years)), 1) if years else TRADING_DAYS
+    if not supports_vector(strat_cls):
+        raise ValueError(f"{strat_cls.__name__} : trades fermés seulement pour les stratégies mono-actif")
+    trades, exits, first, last = [], [], np.inf, -np.inf
+    for df in data.values():
+        values, broker = run_bars(bars_from_df(df), strat_cls, params)
+        position = position_from_fills(len(values), broker.fills)
+        ts = to_epoch_seconds(df.index)
+        trades.append(trade_returns(values, position))
+        exits.append(ts[trade_bounds(position)[1]])
+        if len(ts):
+            first, last = min(first, ts[0]), max(last, ts[-1])
+    trades, exits = np.concatenate(trades), np.concatenate(exits)
+    years = (last - first) / (365.25 * 86400) if last > first else 0
+    per_year = max(int(round(len(trades) / years)), 1) if years else TRADING_DAYS
+    return trades[np.argsort(exits, kind='stable')], per_year
+
+
+if __name__ == "__main__":
+    import time
+
+    import strategy, strategy2, strategy3, strategy4, strategy5, strategy_rebalance
+    from data_loader import load_many
+
+    classes = {cls.__name__: cls for cls in (strategy.MomentumStrategy,
+                                             strategy2.DonchianBreakoutStrategy,
+                                             strategy3.EnhancedBreakoutStrategy,
+                                             strategy4.RegimeAwareBreakoutStrategy,
+                                             strategy_rebalance.WeeklyMomentumRebalance,
+                                             strategy5.DynamicSafeRebalance)}
+    parser = argparse.ArgumentParser(description="Monte Carlo d'un backtest (bootstrap)")
+    parser.add_argument('strategy', choices=sorted(classes))
+    parser.add_argument('tickers', nargs='+')
+    parser.add_argument('--period', default='5y')
+    parser.add_argument('--method', default='block', choices=METHODS)
+    parser.add_argument('-n', '--paths', type=int, default=10000)
+    parser.add_argument('--block', type=int, default=20, help="taille des blocs (barres)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--memory-mb', type=float, default=256)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    data = load_many(args.tickers, period=args.period)
+    source, periods = backtest_source(data, classes[args.strategy], method=args.method)
+    t0 = time.perf_counter()
+    res = simulate(source, args.paths, args.method, args.block, periods, seed=args.seed,
+                   memory_mb=args.memory_mb, max_workers=args.workers)
+    print(summary(res).to_string(float_format=lambda v: f"{v:.3f}"))
+    print(f"{args.paths} trajectoires de {len(source)} {'barres' if args.method == 'block' else 'trades'} "
+          f"en {time.perf_counter() - t0:.1f}s")
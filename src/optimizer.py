@@ -0,0 +1,166 @@
+"""
+Optimisation adaptative (successive halving) pour les espaces trop grands pour
+une grille complète (les 10 paramètres d'EnhancedBreakoutStrategy, les 4 de
+DynamicSafeRebalance…).
+
+• toutes les candidates (grille ou tirage aléatoire de sweep.py) sont d'abord
+  évaluées sur une tranche courte de fin d'historique (min_fraction) ; seul le
+  meilleur 1/eta passe à la tranche eta fois plus longue, et ainsi de suite
+  jusqu'à la période complète
+• tranches prises à la fin : les indicateurs sont calculés sur tout
+  l'historique (moteurs vectorisé et panel), donc déjà chauds au début de la tranche
+• chaque palier part dans la file commune d'un pool gardé d'un palier à l'autre
+  (parallel_runner.SharedPool) : les indicateurs mis en cache par un worker au
+  1er palier resservent aux suivants
+• rapport : évaluations et barres simulées, comparées à la grille complète ;
+  --compare lance aussi la grille complète (rang réel de la combinaison retenue)
+
+En script :
+    python src/optimizer.py EnhancedBreakoutStrategy SPY QQQ IWM --period 5y \
+        --random sma_period=10:50 adx_period=5:30 trend_adx=15:40 tp1_atr=0.5:3.0 -n 500
+    python src/optimizer.py DynamicSafeRebalance SPY QQQ GLD TLT --period 5y \
+        --grid lookback_days=5,10,20,40 vol_lookback=10,20,40 rebalance_period=5,10,21 --compare
+"""
+import argparse
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+import parallel_runner as pr
+import sweep
+from data_store import to_epoch_seconds
+from engines import supports_numpy
+from metrics import equity_metrics
+from vector_engine import strategy_params
+
+
+class HalvingResult(NamedTuple):
+    table: pd.DataFrame   # une ligne par candidate : params, score à chaque palier atteint, métriques finales
+    best: dict            # paramètres retenus (meilleur score sur la période complète)
+    report: dict          # paliers, évaluations, barres simulées, part d'une grille complète, durée
+
+
+def rungs(n_bars: int, min_fraction: float, eta: float) -> List[int]:
+    """Longueurs (en barres) des tranches de fin d'historique : min_fraction·n, × eta…, jusqu'à n."""
+    sizes = []
+    size = max(int(np.ceil(min_fraction * n_bars)), 2)
+    while size < n_bars:
+        sizes.append(size)
+        size = int(np.ceil(size * eta))
+    return sizes + [n_bars]
+
+
+def _evaluate(params: dict, strat_cls, vector: bool, cash: float, window) -> dict:
+    _, equity, trades, traded = sweep.curve(params, strat_cls, vector, cash, window)
+    if len(equity) < 2:
+        return {'trades': trades}
+    return {**equity_metrics(equity, traded=traded), 'trades': trades}
+
+
+def _score(metrics: dict, metric: str) -> float:
+    value = metrics.get(metric)
+    return -np.inf if value is None or np.isnan(value) else value
+
+
+def successive_halving(data: Dict[str, pd.DataFrame], strat_cls, combos: List[dict], metric: str = 'sharpe',
+                       eta: float = 3, min_fraction: float = 1 / 9, max_workers: Optional[int] = None,
+                       cash: float = sweep.INITIAL_CAPITAL) -> HalvingResult:
+    """
+    Successive halving des combinaisons sur l'univers `data` ; metric : colonne
+    de metrics.equity_metrics à maximiser.
+    """
+    if eta <= 1:
+        raise ValueError(f"eta doit être > 1 : {eta}")
+    for combo in combos:
+        strategy_params(strat_cls, combo)  # paramètre inconnu → ValueError tout de suite
+    vector = supports_numpy(strat_cls, data)
+    calendar = np.unique(np.concatenate([to_epoch_seconds(df.index) for df in data.values()]))
+    n = len(calendar)
+    sizes = rungs(n, min_fraction, eta)
+
+    alive = list(range(len(combos)))
+    scores = [{} for _ in combos]   # palier → score
+    final = {}
+    evaluations = bars = 0
+    t0 = time.perf_counter()
+    with pr.SharedPool(data, max_workers) as pool:
+        for r, size in enumerate(sizes):
+            window = None if size >= n else (calendar[n - size], calendar[-1])
+            results = pool.map(_evaluate, [combos[i] for i in alive], strat_cls, vector, cash, window)
+            evaluations += len(alive)
+            bars += len(alive) * size
+            for i, m in zip(alive, results):
+                scores[i][r] = _score(m, metric)
+            if r == len(sizes) - 1:
+                final = dict(zip(alive, results))
+                break
+            # Tri stable : à score égal, l'ordre des combinaisons départage
+            keep = max(1, int(np.ceil(len(alive) / eta)))
+            alive = sorted(alive, key=lambda i: -scores[i][r])[:keep]
+    seconds = time.perf_counter() - t0
+
+    rows = []
+    for i, combo in enumerate(combos):
+        rows.append({**combo, 'rung': max(scores[i]),
+                     **{f'{metric}@{sizes[r]}': s for r, s in scores[i].items()},
+                     **final.get(i, {})})
+    table = (pd.DataFrame(rows)
+             .sort_values(['rung', f'{metric}@{n}'], ascending=False, kind='stable', na_position='last')
+             .reset_index(drop=True))
+    best = combos[max(final, key=lambda i: scores[i][len(sizes) - 1])]
+    grid_bars = len(combos) * n
+    report = {'candidates': len(combos), 'rungs': sizes, 'evaluations': evaluations,
+              'bars': bars, 'grid_bars': grid_bars, 'fraction': bars / grid_bars, 'seconds': seconds}
+    return HalvingResult(table, best, report)
+
+
+if __name__ == "__main__":
+    import strategy, strategy2, strategy3, strategy4, strategy5, strategy_rebalance
+    from data_loader import load_many
+
+    classes = {cls.__name__: cls for cls in (strategy.MomentumStrategy,
+                                             strategy2.DonchianBreakoutStrategy,
+                                             strategy3.EnhancedBreakoutStrategy,
+                                             strategy4.RegimeAwareBreakoutStrategy,
+                                             strategy_rebalance.WeeklyMomentumRebalance,
+                                             strategy5.DynamicSafeRebalance)}
+    parser = argparse.ArgumentParser(description="Optimisation adaptative (successive halving)")
+    parser.add_argument('strategy', choices=sorted(classes))
+    parser.add_argument('tickers', nargs='+')
+    parser.add_argument('--period', default='5y')
+    parser.add_argument('--grid', nargs='*', default=[], metavar='NOM=V1,V2')
+    parser.add_argument('--random', nargs='*', default=[], metavar='NOM=LO:HI')
+    parser.add_argument('-n', '--samples', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--eta', type=float, default=3, help="part éliminée à chaque palier : 1 - 1/eta")
+    parser.add_argument('--min-fraction', type=float, default=1 / 9, help="tranche du 1er palier")
+    parser.add_argument('--metric', default='sharpe')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--compare', action='store_true', help="lance aussi la grille complète")
+    args = parser.parse_args()
+
+    strat_cls = classes[args.strategy]
+    defaults = sweep.param_space(strat_cls)
+    if args.random:
+        combos = sweep.random_sample(sweep.parse_space(args.random, defaults, True), args.samples, args.seed)
+    else:
+        combos = sweep.grid(sweep.parse_space(args.grid, defaults, False))
+    data = load_many(args.tickers, period=args.period)
+
+    res = successive_halving(data, strat_cls, combos, args.metric, args.eta, args.min_fraction, args.workers)
+    rep = res.report
+    print(res.table.head(20).to_string(index=False))
+    print(f"\nPaliers (barres) : {' → '.join(map(str, rep['rungs']))}")
+    print(f"{rep['candidates']} candidates, {rep['evaluations']} évaluations, {rep['bars']:,} barres simulées "
+          f"= {rep['fraction']:.1%} d'une grille complète ({rep['grid_bars']:,}), {rep['seconds']:.1f}s")
+    print(f"Retenu : {res.best}")
+    if args.compare:
+        t0 = time.perf_counter()
+        full = sweep.sweep_table(data, strat_cls, combos, args.workers, sort_by=args.metric)
+        seconds = time.perf_counter() - t0
+        names = list(combos[0])
+        rank = int(np.flatnonzero((full[names] == pd.Series(res.best)).all(axis=1))[0]) + 1
+        print(f"Grille complète : {seconds:.1f}s ; retenu au rang {rank}/{len(full)}, "
+              f"{args.metric} {full[args.metric].iloc[rank - 1]:.3f} contre {full[args.metric].iloc[0]:.3f} au mieux")
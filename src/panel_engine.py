@@ -0,0 +1,300 @@
+"""
+Moteur « panel » pour les stratégies de rééquilibrage multi-actifs
+(WeeklyMomentumRebalance, DynamicSafeRebalance).
+
+• ouvertures / clôtures alignées en matrices (dates × actifs) par price_panel, sur
+  le calendrier maître choisi (union par défaut)
+• rendements sur lookback et volatilité glissante de chaque actif calculés d'un bloc
+  (mêmes opérations que les stratégies bt : vector_indicators.stddev, sommes
+  dans l'ordre des actifs)
+• poids cibles de toutes les dates en une seule passe vectorisée ; seule la
+  simulation (dates de rebalance, stop-loss sur drawdown) avance date par date
+• exécution de backtrader (vector_engine.PortfolioBroker) : order_target_percent
+  en actions entières au cours de clôture, ventes soumises avant les achats,
+  contrôle du cash dans l'ordre de soumission, exécution à l'ouverture suivante
+• même courbe que backtrader, bit à bit, quand chaque actif a une barre à
+  chaque date (calendrier 'intersection', ou univers d'une seule classe
+  d'actifs). Dates sans barre pour un actif : lookback et volatilité comptés
+  en dates du calendrier et non en barres de l'actif → approximation
+• un actif pas encore coté a un poids nul
+"""
+from collections import namedtuple
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+import price_panel
+import vector_indicators as vi
+from instrumentation import phase
+from price_panel import PricePanel as Panel
+from vector_engine import PortfolioBroker, strategy_params
+
+PanelResult = namedtuple('PanelResult', ['returns', 'equity', 'weights', 'trades', 'traded'])
+
+
+def make_panel(data: Dict[str, pd.DataFrame], calendar: str = 'union') -> Panel:
+    """
+    Aligne l'univers sur le calendrier maître (voir price_panel). Un jour sans
+    barre pour un actif : dernière clôture connue (ouverture comprise).
+    """
+    return price_panel.from_frames(data, calendar)
+
+
+# --- Signaux, toutes dates et tous actifs d'un coup ---
+
+def same_calendar(data) -> bool:
+    """True si tous les actifs ({ticker: DataFrame} ou Panel) ont les mêmes dates : le moteur panel est alors exact."""
+    if isinstance(data, Panel):
+        return bool(data.bar.all())
+    frames = list(data.values())
+    return all(df.index.equals(frames[0].index) for df in frames[1:])
+
+
+def lookback_returns(close: np.ndarray, lookback: int) -> np.ndarray:
+    """close[t] / close[t - lookback] - 1 (NaN sur les `lookback` premières dates)."""
+    out = np.full_like(close, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[lookback:] = close[lookback:] / close[:-lookback] - 1.0
+    return out
+
+
+def rolling_vol(close: np.ndarray, period: int) -> np.ndarray:
+    """bt.ind.StdDev(bt.ind.PctChange(close, period=1), period) de chaque actif."""
+    rets = lookback_returns(close, 1)
+    out = np.empty_like(rets)
+    for j in range(rets.shape[1]):
+        out[:, j] = vi.stddev(rets[:, j], period)
+    return out
+
+
+def _row_sum(x: np.ndarray) -> np.ndarray:
+    # sum() de Python sur les actifs, de gauche à droite (pas la somme par paires de NumPy)
+    total = np.zeros(len(x))
+    for j in range(x.shape[1]):
+        total = total + x[:, j]
+    return total[:, None]
+
+
+def momentum_weights(close: np.ndarray, lookback: int) -> np.ndarray:
+    """WeeklyMomentumRebalance : poids ∝ max(rendement, 0), tout en cash si aucun n'est positif."""
+    r = np.nan_to_num(np.maximum(lookback_returns(close, lookback), 0.0))
+    total = _row_sum(r)
+    return np.divide(r, total, out=np.zeros_like(r), where=total != 0)
+
+
+def risk_adjusted_weights(close: np.ndarray, lookback: int, vol_lookback: int, refuge: int) -> np.ndarray:
+    """
+    DynamicSafeRebalance : poids des actifs risqués ∝ max(rendement, 0) / volatilité
+    propre à chaque actif (plancher 1e-6) ; 100 % refuge si aucun n'est positif.
+    """
+    risky = np.ones(close.shape[1], dtype=bool)
+    risky[refuge] = False
+    risky_close = close[:, risky]
+    r = np.nan_to_num(np.maximum(lookback_returns(risky_close, lookback), 0.0))
+    vol = rolling_vol(risky_close, vol_lookback)
+    scored = r / np.where(vol > 0, vol, 1e-6)
+    total = _row_sum(scored)
+    weights = np.zeros_like(close)
+    weights[:, risky] = np.divide(scored, total, out=np.zeros_like(scored), where=total > 0)
+    weights[total[:, 0] <= 0, refuge] = 1.0
+    return weights
+
+
+# --- Simulation ---
+
+def _value(broker: PortfolioBroker, held: list, close: list) -> float:
+    # BackBroker._get_value : positions dans l'ordre où la stratégie les a créées
+    pos = 0.0
+    for j in held:
+        size, c = broker.sizes[j], close[j]
+        dvalue = size * c
+        unrealized = size * (c - broker.prices[j])
+        pos = (pos + (dvalue - unrealized)) + unrealized if dvalue > 0 else pos + dvalue
+    return broker.cash + pos
+
+
+def _submit_targets(broker: PortfolioBroker, order: list, target: np.ndarray, value: float, close: list) -> None:
+    # strategy_rebalance.order_target_weights : order_target_percent actif par
+    # actif, réductions d'abord, tailles en actions entières au cours de clôture
+    cuts, adds = [], []
+    for j in order:
+        goal, current = float(target[j]) * value, broker.sizes[j] * close[j]
+        (cuts if goal < current else adds).append((j, goal, current))
+    for j, goal, current in cuts + adds:
+        size, price = broker.sizes[j], close[j]
+        if not goal and size:
+            broker.submit(j, -size, price)
+        elif price <= 0:
+            continue  # pas encore coté
+        elif goal > current:
+            n = int((goal - current) // price)
+            if n:
+                broker.submit(j, n, price)
+        elif goal < current:
+            n = int((current - goal) // price)
+            if n:
+                broker.submit(j, -n, price)
+
+
+def _fill_stats(fills, n_assets: int):
+    """(nb d'ouvertures de position, montant échangé) des exécutions (pas, actif, taille, prix)."""
+    sizes = [0] * n_assets
+    trades, traded = 0, 0.0
+    for _, j, size, price in fills:
+        if not sizes[j]:
+            trades += 1
+        sizes[j] += size
+        traded += abs(size) * price
+    return trades, traded
+
+
+def simulate(panel: Panel, weights: np.ndarray, period: int, warmup: int, order: list,
+             cash: float = 100_000.0, stoploss: float = None, refuge: int = None, lo: int = 0, hi: int = None,
+             state: dict = None):
+    """
+    Portefeuille sur les dates [lo, hi) : à la clôture de t ≥ warmup, tous les
+    `period` jours, ordres vers les poids weights[t] (order : ordre de
+    soumission des actifs, celui de la stratégie), exécutés à l'ouverture de
+    t+1. Actions entières : il faut un vrai capital.
+    stoploss : drawdown de la valeur au-delà duquel tout part dans `refuge`
+    (et le rebalance du jour est sauté), comme DynamicSafeRebalance.
+    state : reprise (checkpoint.py) ; dict vide = départ de zéro, sinon état de
+    fin d'un passage arrêté en lo (broker, last_bar, peak_value). Mis à jour en
+    place à la fin du passage ; les compteurs renvoyés sont alors cumulés
+    depuis le début.
+    Retourne (valeurs aux clôtures, dates de rebalance, nb d'ouvertures de
+    position, montant total échangé).
+    """
+    hi = len(panel.dates) if hi is None else hi
+    opens, closes, bar = np.nan_to_num(panel.open), np.nan_to_num(panel.close), panel.bar
+    n_assets = closes.shape[1]
+    values = np.empty(hi - lo)
+    safe = None
+    if stoploss is not None:
+        safe = np.zeros(n_assets)
+        safe[refuge] = 1.0
+    broker, last, peak = PortfolioBroker(cash, n_assets), None, None
+    if state:
+        broker, last, peak = state['broker'], state['last_bar'], state['peak_value']
+    held = [j for j in order if broker.sizes[j]]
+    rebalances = []
+    for t in range(lo, hi):
+        if broker.submitted:
+            broker.check_submitted()
+        if broker.pending:
+            broker.execute(t, {j: float(opens[t, j]) for j, _ in broker.pending if bar[t, j]})
+            held = [j for j in order if broker.sizes[j]]
+        close = closes[t].tolist()
+        value = _value(broker, held, close)
+        values[t - lo] = value
+        if safe is not None:
+            if peak is None or value > peak:
+                peak = value
+            if peak and (peak - value) / peak > stoploss:
+                _submit_targets(broker, order, safe, value, close)
+                continue
+        if t < warmup:
+            continue
+        if last is None or t - last >= period:
+            _submit_targets(broker, order, weights[t], value, close)
+            last = t
+            rebalances.append(t)
+    trades, traded = _fill_stats(broker.fills, n_assets)
+    if state is not None:
+        state.update(broker=broker, last_bar=last, peak_value=peak, trades=trades, traded=traded)
+    return values, np.array(rebalances, dtype=int), trades, traded
+
+
+# --- Stratégies ---
+
+def _weekly(panel: Panel, p: dict) -> dict:
+    return dict(weights=momentum_weights(panel.close, p['lookback_days']),
+                period=p['rebalance_period'], warmup=max(p['lookback_days'], 1),
+                order=list(range(len(panel.tickers))))
+
+
+def _dynamic_safe(panel: Panel, p: dict) -> dict:
+    # Refuge : l'actif nommé safe_asset, sinon le dernier (comme la stratégie bt)
+    refuge = panel.tickers.index(p['safe_asset']) if p['safe_asset'] in panel.tickers else len(panel.tickers) - 1
+    return dict(weights=risk_adjusted_weights(panel.close, p['lookback_days'], p['vol_lookback'], refuge),
+                period=p['rebalance_period'], warmup=max(p['lookback_days'], p['vol_lookback'], 1),
+                stoploss=p['stoploss_pct'], refuge=refuge,
+                order=[j for j in range(len(panel.tickers)) if j != refuge] + [refuge])
+
+
+PORTFOLIOS = {
+    'WeeklyMomentumRebalance': _weekly,
+    'DynamicSafeRebalance':    _dynamic_safe,
+}
+
+
+def portfolio_for(strat_cls):
+    """Règle de pondération correspondant à une stratégie de rééquilibrage (ou à un parent)."""
+    for cls in strat_cls.__mro__:
+        if cls.__name__ in PORTFOLIOS:
+            return PORTFOLIOS[cls.__name__]
+    raise ValueError(f"Stratégie non supportée par le moteur panel : {strat_cls.__name__}")
+
+
+def run_panel(panel: Panel, strat_cls, params=None, cash: float = 100_000.0, window=None):
+    """
+    Version Panel de run() : (valeurs, dates de rebalance, poids cibles, nb de
+    trades, montant échangé).
+    """
+    with phase('panel.weights'):
+        rule = portfolio_for(strat_cls)(panel, strategy_params(strat_cls, params))
+    weights = rule.pop('weights')
+    lo, hi = window if window is not None else (0, len(panel.dates))
+    with phase('panel.simulation'):
+        values, rebalances, trades, traded = simulate(panel, weights, cash=cash, lo=lo, hi=hi, **rule)
+    return values, rebalances, weights, trades, traded
+
+
+def run(data, strat_cls, params=None, cash: float = 100_000.0, calendar: str = 'union') -> PanelResult:
+    """
+    Backtest d'une stratégie de rééquilibrage sur l'univers `data` : {ticker:
+    DataFrame} (ordre des colonnes = ordre de data, aligné sur `calendar`) ou
+    Panel déjà aligné.
+    returns : rendements journaliers du portefeuille
+    equity  : valeur à chaque clôture
+    weights : poids cibles décidés à chaque date de rebalance
+    trades  : nombre d'ouvertures de position (par actif)
+    traded  : montant total échangé (achats + ventes)
+    """
+    if isinstance(data, Panel):
+        panel = data
+    else:
+        with phase('panel.align'):
+            panel = make_panel(data, calendar)
+    values, rebalances, weights, trades, traded = run_panel(panel, strat_cls, params, cash)
+    prev = np.empty_like(values)
+    prev[0] = cash
+    prev[1:] = values[:-1]
+    return PanelResult(
+        returns=pd.Series(values / prev - 1.0, index=panel.dates),
+        equity=pd.Series(values, index=panel.dates),
+        weights=pd.DataFrame(weights[rebalances], index=panel.dates[rebalances], columns=panel.tickers),
+        trades=trades,
+        traded=traded,
+    )
+
+
+if __name__ == "__main__":
+    # Chronométrage sur un gros univers synthétique : python src/panel_engine.py 500
+    import sys
+    import time
+
+    import strategy5
+    from providers import SyntheticProvider
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    prov = SyntheticProvider()
+    data = {f'T{i:03d}': prov.generate(f'T{i:03d}', start='2015-01-01') for i in range(n)}
+    t0 = time.perf_counter()
+    panel = make_panel(data)
+    t1 = time.perf_counter()
+    res = run_panel(panel, strategy5.DynamicSafeRebalance, {'safe_asset': 'T000'})
+    t2 = time.perf_counter()
+    print(f"{n} actifs × {len(panel.dates)} dates : alignement {t1 - t0:.2f}s, "
+          f"poids + simulation {t2 - t1:.3f}s, {len(res[1])} rebalances")
@@ -0,0 +1,250 @@
+"""
+Exécution parallèle des backtests mono-actif : un job = (ticker, stratégie, params).
+
+• les OHLCV de tout l'univers sont copiés une seule fois dans un bloc de mémoire
+  partagée (même disposition (6, n) que le store : horodatage + OHLCV) ; les
+  workers s'y attachent au démarrage, aucun DataFrame n'est sérialisé par job
+• les jobs sont répartis par paquets sur un pool de processus
+• les séries TimeReturn reviennent dans l'ordre des jobs
+
+Utilisable depuis l'app Streamlit ou en script :
+    python src/parallel_runner.py MomentumStrategy SPY QQQ IWM --engine vector
+"""
+import argparse
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_store import COLUMNS, from_epoch_seconds, to_epoch_seconds
+from engines import backtest_returns, cached_returns, warm_indicators
+
+
+class Job(NamedTuple):
+    ticker: str
+    strat_cls: type
+    params: Optional[dict] = None
+
+
+class SharedOHLCV:
+    """
+    Univers OHLCV dans un seul bloc de mémoire partagée.
+    layout : {ticker: (début, fin)} dans la 2e dimension du tableau (6, total).
+    """
+
+    def __init__(self, data: Dict[str, pd.DataFrame]):
+        self.layout, pos = {}, 0
+        for tic, df in data.items():
+            self.layout[tic] = (pos, pos + len(df))
+            pos += len(df)
+        self.shape = (1 + len(COLUMNS), pos)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(8 * self.shape[0] * pos, 1))
+        arr = np.ndarray(self.shape, dtype=np.float64, buffer=self.shm.buf)
+        for tic, df in data.items():
+            lo, hi = self.layout[tic]
+            arr[0, lo:hi] = to_epoch_seconds(df.index)
+            for i, col in enumerate(COLUMNS, start=1):
+                arr[i, lo:hi] = df[col].to_numpy(dtype=np.float64)
+        del arr
+
+    @property
+    def spec(self) -> tuple:
+        """Ce qu'il faut transmettre à un worker pour s'attacher au bloc."""
+        return self.shm.name, self.shape, self.layout
+
+    def close(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+
+# --- Côté worker ---
+
+_shm = None
+_arr = None
+_layout = {}
+# Cache propre au worker (indicateurs, calendriers…), vidé à chaque attachement
+worker_cache = {}
+
+
+def _attach(name: str, shape: tuple, layout: dict) -> None:
+    global _shm, _arr, _layout
+    _shm = shared_memory.SharedMemory(name=name)
+    _arr = np.ndarray(shape, dtype=np.float64, buffer=_shm.buf)
+    _layout = layout
+    worker_cache.clear()
+
+
+def _detach() -> None:
+    global _shm, _arr, _layout
+    _arr, _layout = None, {}
+    worker_cache.clear()
+    _shm.close()
+    _shm = None
+
+
+def shared_tickers() -> List[str]:
+    """Tickers de l'univers partagé, dans l'ordre d'origine."""
+    return list(_layout)
+
+
+def shared_bars(ticker: str):
+    """(horodatages, {colonne: tableau}) : vues sur la mémoire partagée, sans copie."""
+    lo, hi = _layout[ticker]
+    block = _arr[:, lo:hi]
+    return block[0], {col: block[i] for i, col in enumerate(COLUMNS, start=1)}
+
+
+def shared_frame(ticker: str) -> pd.DataFrame:
+    """DataFrame OHLCV (copie) d'un ticker de l'univers partagé."""
+    ts, bars = shared_bars(ticker)
+    return pd.DataFrame({col: a.copy() for col, a in bars.items()},
+                        index=pd.Index(from_epoch_seconds(ts), name='Date'))
+
+
+def _run_job(job: Job, engine: str, cash: float) -> pd.Series:
+    return backtest_returns(shared_frame(job.ticker), job.strat_cls, job.params, cash, engine)
+
+
+def _run_chunk(func, items: list, args: tuple) -> list:
+    return [func(item, *args) for item in items]
+
+
+# --- API ---
+
+def imap_shared(data: Dict[str, pd.DataFrame], func, items: list, *args,
+                max_workers: Optional[int] = None):
+    """
+    Applique func(item, *args) à chaque item dans des workers attachés à l'univers
+    partagé (func lit les données via shared_bars / shared_frame). func doit être
+    une fonction de module. Générateur : résultats dans l'ordre des items, au fil
+    des paquets terminés. max_workers=1 : dans le processus courant.
+    """
+    items = list(items)
+    max_workers = min(max_workers or os.cpu_count() or 1, len(items))
+    shared = SharedOHLCV(data)
+    try:
+        if max_workers <= 1:
+            _attach(*shared.spec)
+            try:
+                for item in items:
+                    yield func(item, *args)
+            finally:
+                _detach()
+            return
+        # Paquets d'items consécutifs : ~4 paquets par worker pour équilibrer la charge
+        size = max(1, -(-len(items) // (max_workers * 4)))
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_attach,
+                                 initargs=shared.spec) as pool:
+            for part in pool.map(_run_chunk, [func] * len(chunks), chunks, [args] * len(chunks)):
+                yield from part
+    finally:
+        shared.close()
+
+
+class SharedPool:
+    """
+    Pool de workers attachés une fois à l'univers partagé, pour plusieurs vagues
+    de tâches qui dépendent des précédentes (optimizer.py) : une tâche par item
+    dans la file commune, chaque worker prend la suivante dès qu'il est libre ;
+    ses caches (indicateurs, panel…) restent d'une vague à l'autre.
+    max_workers=1 : dans le processus courant.
+    """
+
+    def __init__(self, data: Dict[str, pd.DataFrame], max_workers: Optional[int] = None):
+        self.shared = SharedOHLCV(data)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.pool = None
+        if self.max_workers <= 1:
+            _attach(*self.shared.spec)
+        else:
+            self.pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_attach,
+                                            initargs=self.shared.spec)
+
+    def map(self, func, items: list, *args) -> list:
+        """[func(item, *args)] dans l'ordre des items."""
+        if self.pool is None:
+            return [func(item, *args) for item in items]
+        futures = [self.pool.submit(func, item, *args) for item in items]
+        return [f.result() for f in futures]
+
+    def close(self) -> None:
+        if self.pool is None:
+            _detach()
+        else:
+            self.pool.shutdown()
+        self.shared.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_jobs(data: Dict[str, pd.DataFrame], jobs: List[Job], engine: str = 'backtrader',
+             cash: float = 1.0, max_workers: Optional[int] = None) -> List[pd.Series]:
+    """
+    Exécute les jobs sur un pool de processus et retourne les séries de
+    rendements journaliers dans l'ordre des jobs.
+    max_workers=1 : exécution dans le processus courant (pas de pool).
+    Les jobs déjà dans le cache de résultats ne partent pas dans le pool.
+    """
+    jobs = [Job(*j) for j in jobs]
+    out = [cached_returns(data[j.ticker], j.strat_cls, j.params, cash, engine) for j in jobs]
+    todo = [i for i, ret in enumerate(out) if ret is None]
+    if min(max_workers or os.cpu_count() or 1, len(todo)) <= 1:
+        for i in todo:
+            j = jobs[i]
+            out[i] = backtest_returns(data[j.ticker], j.strat_cls, j.params, cash, engine)
+        return out
+    pending = [jobs[i] for i in todo]
+    universe = {tic: data[tic] for tic in dict.fromkeys(j.ticker for j in pending)}
+    if engine == 'backtrader' and multiprocessing.get_start_method() == 'fork':
+        # Indicateurs calculés ici une fois : les workers forkés héritent du cache
+        # (en spawn / forkserver, ils repartent de zéro : travail perdu)
+        for j in pending:
+            warm_indicators(data[j.ticker], j.strat_cls, j.params)
+    for i, ret in zip(todo, imap_shared(universe, _run_job, pending, engine, cash, max_workers=max_workers)):
+        out[i] = ret
+    return out
+
+
+def backtest_universe(data: Dict[str, pd.DataFrame], strat_cls, params: Optional[dict] = None,
+                      engine: str = 'backtrader', cash: float = 1.0,
+                      max_workers: Optional[int] = None) -> Dict[str, pd.Series]:
+    """Une stratégie sur tout l'univers : {ticker: rendements}, dans l'ordre de data."""
+    tickers = list(data)
+    returns = run_jobs(data, [Job(tic, strat_cls, params) for tic in tickers], engine, cash, max_workers)
+    return dict(zip(tickers, returns))
+
+
+if __name__ == "__main__":
+    import time
+
+    import strategy, strategy2, strategy3, strategy4
+    from data_loader import load_many
+
+    classes = {cls.__name__: cls for cls in (strategy.MomentumStrategy,
+                                             strategy2.DonchianBreakoutStrategy,
+                                             strategy3.EnhancedBreakoutStrategy,
+                                             strategy4.RegimeAwareBreakoutStrategy)}
+    parser = argparse.ArgumentParser(description="Backtests mono-actif en parallèle")
+    parser.add_argument('strategy', choices=sorted(classes))
+    parser.add_argument('tickers', nargs='+')
+    parser.add_argument('--period', default='2y')
+    parser.add_argument('--engine', default='backtrader', choices=['backtrader', 'vector'])
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    data = load_many(args.tickers, period=args.period)
+    t0 = time.perf_counter()
+    results = backtest_universe(data, classes[args.strategy], engine=args.engine, max_workers=args.workers)
+    elapsed = time.perf_counter() - t0
+    for tic, ret in results.items():
+        print(f"{tic:10s} rendement total : {((1 + ret).prod() - 1) * 100:7.2f}%")
+    print(f"{len(results)} backtests en {elapsed:.2f}s")
@@ -0,0 +1,92 @@
+"""
+Suivi incrémental d'une position, commun aux stratégies breakout (backtrader et
+machines du moteur vectorisé) : barre d'entrée, prix d'entrée, stop initial,
+plus haut courant pour le trailing stop, prise de profit partielle.
+
+Tout est mis à jour en O(1) par barre : plus de max(high.get(size=days_held+1))
+qui relit toute la fenêtre de détention à chaque bougie.
+
+Micro-benchmark (coût par barre selon la durée de détention) :
+    python src/position_tracker.py
+"""
+
+
+class PositionTracker:
+    """
+    État de la position en cours. Les barres sont comptées comme len(self) côté
+    backtrader (i + 1 côté moteur vectorisé).
+    """
+    __slots__ = ('bar_exec', 'entry_price', 'stop_price', 'peak', 'scaled')
+
+    def __init__(self):
+        self.bar_exec = 0
+        self.entry_price = None
+        self.stop_price = None
+        self.peak = None
+        self.scaled = False
+
+    def open(self, bar: int, price: float, stop: float, peak: float = None) -> None:
+        """
+        Nouvelle entrée au signal de la barre `bar`. peak : première valeur du
+        plus haut suivi (le high de la barre pour un trailing sur les plus hauts),
+        price par défaut.
+        """
+        self.bar_exec = bar
+        self.entry_price = price
+        self.stop_price = stop
+        self.peak = price if peak is None else peak
+        self.scaled = False
+
+    def days_held(self, bar: int) -> int:
+        return bar - self.bar_exec
+
+    def mark(self, value: float) -> float:
+        """Intègre la barre courante au plus haut depuis l'entrée et le renvoie."""
+        if value > self.peak:
+            self.peak = value
+        return self.peak
+
+    def trail_stop(self, offset: float) -> float:
+        """Trailing stop : plus haut depuis l'entrée moins offset."""
+        return self.peak - offset
+
+    def stopped(self, price: float) -> bool:
+        """Sous le stop initial."""
+        return price < self.stop_price
+
+    def scale_out(self) -> None:
+        self.scaled = True
+
+
+if __name__ == "__main__":
+    # Coût par barre en position : ancien scan de la fenêtre vs suivi incrémental,
+    # sur des barres intraday simulées, pour des détentions de plus en plus longues
+    import math
+    import random
+    import time
+
+    rng = random.Random(0)
+    n = 100_000
+    highs, price = [], 100.0
+    for _ in range(n):
+        price *= math.exp(rng.gauss(0, 0.001))
+        highs.append(price * 1.0005)
+
+    print(f"{'max_hold':>9} {'scan µs/barre':>14} {'tracker µs/barre':>17}")
+    for hold in (20, 100, 1_000, 10_000, 50_000):
+        t = time.perf_counter()
+        for i in range(n):
+            days_held = i % hold  # on ressort au time-stop et on reprend aussitôt
+            high_since = max(highs[i - days_held:i + 1])
+        scan = (time.perf_counter() - t) / n * 1e6
+
+        tracker = PositionTracker()
+        t = time.perf_counter()
+        for i in range(n):
+            if i % hold == 0:
+                tracker.open(i + 1, highs[i], highs[i] * 0.98, highs[i])
+            else:
+                tracker.mark(highs[i])
+                trail_stop = tracker.trail_stop(0.5)
+        incr = (time.perf_counter() - t) / n * 1e6
+        print(f"{hold:>9} {scan:>14.3f} {incr:>17.3f}")
@@ -0,0 +1,170 @@
+"""
+Panel de prix aligné une seule fois : tous les tickers sélectionnés sur un
+calendrier maître, OHLCV dans un seul bloc (champs × dates × actifs).
+
+Politiques de calendrier :
+• 'union'        : toute date où au moins un actif cote (crypto 7 j/7 et actions 5 j/7 mêlées)
+• 'intersection' : seulement les dates où tous les actifs cotent (l'actif le plus
+  récent fixe le début de l'historique)
+• 'asset_class'  : union à l'intérieur de chaque classe d'actifs, intersection
+  entre classes : jours de bourse quand actions et cryptos sont mêlées, sans
+  tronquer l'historique à cause d'un actif récent
+
+Date sans barre pour un actif déjà coté : dernière clôture (open = high = low =
+close, volume nul). Avant sa première barre : NaN.
+
+Vues sans copie : panel.close (dates × actifs), panel.column('SPY'),
+panel.frame('Close'), panel.series('SPY'). Le bloc est en lecture seule : un
+même panel peut être partagé (cache de l'app, moteur panel, buy & hold…).
+"""
+from functools import reduce
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_store import from_epoch_seconds, to_epoch_seconds
+from metrics import TRADING_DAYS
+
+FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+CALENDARS = ('union', 'intersection', 'asset_class')
+
+
+def asset_class(ticker: str) -> str:
+    """Classe d'actifs d'un ticker (même règle que les calendriers de SyntheticProvider)."""
+    return 'crypto' if ticker.endswith('-USD') else 'equity'
+
+
+def master_calendar(stamps: Dict[str, np.ndarray], policy: str = 'union') -> np.ndarray:
+    """Calendrier maître (secondes epoch triées) de {ticker: horodatages} selon la politique."""
+    if policy not in CALENDARS:
+        raise ValueError(f"Calendrier inconnu : {policy} (choix : {', '.join(CALENDARS)})")
+    if not stamps:
+        return np.empty(0)
+    if policy == 'union':
+        return np.unique(np.concatenate(list(stamps.values())))
+    if policy == 'intersection':
+        return reduce(np.intersect1d, stamps.values())
+    classes = {}
+    for tic, ts in stamps.items():
+        classes.setdefault(asset_class(tic), []).append(ts)
+    return reduce(np.intersect1d, (np.unique(np.concatenate(group)) for group in classes.values()))
+
+
+class PricePanel:
+    """
+    Univers aligné. stamps / dates : calendrier maître ; block[k] : champ
+    FIELDS[k] (dates × actifs) ; last[t, j] : indice de la dernière barre de
+    l'actif j à la date t (-1 avant sa cotation) ; bar[t, j] : barre propre ce jour-là.
+    """
+    __slots__ = ('stamps', 'dates', 'tickers', 'policy', 'block', 'last', 'bar', '_col')
+
+    def __init__(self, stamps, tickers, block, last, bar, policy='union'):
+        self.stamps = stamps
+        self.dates = from_epoch_seconds(stamps)
+        self.tickers = list(tickers)
+        self.policy = policy
+        self.block = block
+        self.last = last
+        self.bar = bar
+        self._col = {tic: j for j, tic in enumerate(self.tickers)}
+        for a in (block, last, bar):
+            a.flags.writeable = False
+
+    # --- Vues ---
+
+    open = property(lambda self: self.block[0])
+    high = property(lambda self: self.block[1])
+    low = property(lambda self: self.block[2])
+    close = property(lambda self: self.block[3])
+    volume = property(lambda self: self.block[4])
+
+    @property
+    def listed(self) -> np.ndarray:
+        """(dates × actifs) : actif déjà coté."""
+        return self.last >= 0
+
+    def column(self, ticker: str, field: str = 'Close') -> np.ndarray:
+        return self.block[FIELDS.index(field)][:, self._col[ticker]]
+
+    def series(self, ticker: str, field: str = 'Close') -> pd.Series:
+        return pd.Series(self.column(ticker, field), index=self.dates, name=ticker, copy=False)
+
+    def frame(self, field: str = 'Close') -> pd.DataFrame:
+        return pd.DataFrame(self.block[FIELDS.index(field)], index=self.dates, columns=self.tickers, copy=False)
+
+    def bars(self, ticker: str):
+        """(horodatages, {champ: tableau}) des barres propres de l'actif sur le calendrier maître (pour un feed)."""
+        j = self._col[ticker]
+        mask = self.bar[:, j]
+        return self.stamps[mask], {f: self.block[k][mask, j] for k, f in enumerate(FIELDS)}
+
+    # --- Alignement de séries calculées ailleurs ---
+
+    def take(self, values, ticker: str) -> np.ndarray:
+        """Valeurs données sur les barres d'origine du ticker → calendrier maître (report, NaN avant cotation)."""
+        values = np.asarray(values, dtype=np.float64)
+        last = self.last[:, self._col[ticker]]
+        return np.where(last >= 0, values[np.maximum(last, 0)] if len(values) else np.nan, np.nan)
+
+    def sample(self, series: pd.Series) -> np.ndarray:
+        """Série quelconque → dernière valeur connue à chaque date du calendrier maître (NaN avant)."""
+        pos = np.searchsorted(to_epoch_seconds(series.index), self.stamps, side='right') - 1
+        values = series.to_numpy(dtype=np.float64)
+        return np.where(pos >= 0, values[np.maximum(pos, 0)] if len(values) else np.nan, np.nan)
+
+    # --- Dérivés ---
+
+    @property
+    def periods_per_year(self) -> int:
+        """Barres par an du calendrier maître (annualisation des métriques) : ~252 en actions, ~365 en union crypto."""
+        if len(self.stamps) < 2:
+            return TRADING_DAYS
+        years = (self.stamps[-1] - self.stamps[0]) / (365.25 * 86400)
+        return max(int(round((len(self.stamps) - 1) / years)), 1)
+
+    def buy_and_hold(self, capital: float = 1.0) -> np.ndarray:
+        """Valeur (dates × actifs) de capital / n investi dans chaque actif à sa première clôture."""
+        close = self.close
+        first = np.argmax(self.listed, axis=0)
+        base = close[first, np.arange(close.shape[1])]
+        with np.errstate(invalid='ignore'):
+            return close / base * (capital / max(close.shape[1], 1))
+
+
+def from_arrays(columns: Dict[str, tuple], policy: str = 'union',
+                calendar: Optional[np.ndarray] = None) -> PricePanel:
+    """
+    Panel depuis {ticker: (horodatages en secondes epoch, {champ: tableau})}
+    (mémoire partagée des workers, store…). calendar : calendrier maître imposé.
+    """
+    tickers = list(columns)
+    if calendar is None:
+        calendar = master_calendar({tic: np.asarray(columns[tic][0], dtype=np.float64) for tic in tickers}, policy)
+    n, m = len(calendar), len(tickers)
+    block = np.full((len(FIELDS), n, m), np.nan)
+    last = np.empty((n, m), dtype=np.int64)
+    bar = np.empty((n, m), dtype=bool)
+    for j, tic in enumerate(tickers):
+        ts, arrays = columns[tic]
+        pos = np.searchsorted(ts, calendar, side='right') - 1
+        last[:, j] = pos
+        if not len(ts):
+            bar[:, j] = False
+            continue
+        listed = pos >= 0
+        safe = np.maximum(pos, 0)
+        exact = listed & (ts[safe] == calendar)
+        bar[:, j] = exact
+        close = np.where(listed, arrays['Close'][safe], np.nan)
+        block[3, :, j] = close
+        for k, field in ((0, 'Open'), (1, 'High'), (2, 'Low')):
+            block[k, :, j] = np.where(exact, arrays[field][safe], close)
+        block[4, :, j] = np.where(exact, arrays['Volume'][safe], np.where(listed, 0.0, np.nan))
+    return PricePanel(calendar, tickers, block, last, bar, policy)
+
+
+def from_frames(data: Dict[str, pd.DataFrame], policy: str = 'union') -> PricePanel:
+    """Panel de {ticker: DataFrame OHLCV} ; ordre des colonnes = ordre de data."""
+    return from_arrays({tic: (to_epoch_seconds(df.index), {f: df[f].to_numpy(dtype=np.float64) for f in FIELDS})
+                        for tic, df in data.items()}, policy)
@@ -0,0 +1,252 @@
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def normalize_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalisation unique des données OHLCV, quelle que soit la source :
+    • colonnes MultiIndex yfinance aplaties (on garde le niveau des attributs)
+    • index datetime trié, sans doublons, naïf en UTC
+    • colonnes Open/High/Low/Close/Volume en float64, lignes incomplètes retirées
+    """
+    df = df.copy()
+    if hasattr(df.columns, 'nlevels') and df.columns.nlevels > 1:
+        # niveau 0 = attributs (yfinance mono-ticker) ou tickers (group_by='ticker')
+        level = 0 if 'Close' in df.columns.get_level_values(0) else df.columns.nlevels - 1
+        df.columns = df.columns.get_level_values(level)
+    df.index = pd.to_datetime(df.index, errors='coerce')
+    df = df[df.index.notna()]
+    if df.index.tz is not None:
+        df.index = df.index.tz_convert('UTC').tz_localize(None)
+    df.index.name = 'Date'
+    if 'Volume' not in df:
+        df['Volume'] = 0.0
+    df = df[OHLCV].apply(pd.to_numeric, errors='coerce').astype(np.float64)
+    df = df.dropna()
+    df = df[~df.index.duplicated(keep='last')]
+    return df.sort_index()
+
+
+class RateLimiter:
+    """Espace les appels d'au moins `min_interval` secondes (thread-safe)."""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.min_interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class DataProvider:
+    """
+    Interface d'un fournisseur de données OHLCV.
+    fetch() retourne {ticker: DataFrame normalisé} ; les tickers sans données
+    sont absents du dictionnaire.
+    """
+    name = 'base'
+
+    def fetch(self, tickers: Iterable[str], interval: str = '1d',
+              period: Optional[str] = None, start=None) -> Dict[str, pd.DataFrame]:
+        raise NotImplementedError
+
+
+class YFinanceProvider(DataProvider):
+    """
+    Fournisseur yfinance en masse :
+    • les tickers sont regroupés par lots de `batch_size` dans un seul yf.download
+    • les lots partent dans un pool borné de `max_workers` threads
+    • chaque requête passe par un rate limiter et est retentée `retries` fois
+      avec backoff exponentiel
+    """
+    name = 'yfinance'
+
+    def __init__(self, batch_size: int = 50, max_workers: int = 4, retries: int = 3,
+                 backoff: float = 1.0, min_interval: float = 0.5):
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.limiter = RateLimiter(min_interval)
+
+    def fetch(self, tickers, interval='1d', period=None, start=None):
+        tickers = list(dict.fromkeys(tickers))
+        batches = [tickers[i:i + self.batch_size] for i in range(0, len(tickers), self.batch_size)]
+        out = {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches)) or 1) as pool:
+            for part in pool.map(lambda b: self._fetch_batch(b, interval, period, start), batches):
+                out.update(part)
+        return out
+
+    def _fetch_batch(self, batch: List[str], interval, period, start) -> Dict[str, pd.DataFrame]:
+        import yfinance as yf
+
+        kwargs = dict(interval=interval, group_by='ticker', threads=False, progress=False)
+        if start is not None:
+            kwargs['start'] = start
+        else:
+            kwargs['period'] = period
+        for attempt in range(self.retries + 1):
+            self.limiter.wait()
+            try:
+                raw = yf.download(batch, **kwargs)
+                break
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+        out = {}
+        for tic in batch:
+            df = _select_ticker(raw, tic, len(batch))
+            if df is not None:
+                df = normalize_ohlcv(df)
+                if not df.empty:
+                    out[tic] = df
+        return out
+
+
+def _select_ticker(raw: pd.DataFrame, ticker: str, n: int) -> Optional[pd.DataFrame]:
+    """Extrait les colonnes d'un ticker d'un téléchargement groupé."""
+    if raw is None or raw.empty:
+        return None
+    if getattr(raw.columns, 'nlevels', 1) == 1:
+        return raw if n == 1 else None
+    for level in range(raw.columns.nlevels):
+        if ticker in raw.columns.get_level_values(level):
+            return raw.xs(ticker, axis=1, level=level)
+    return None
+
+
+class SyntheticProvider(DataProvider):
+    """
+    Fournisseur hors-ligne déterministe : marche aléatoire géométrique propre à
+    chaque ticker (graine = seed + crc32 du ticker). La série est toujours générée
+    depuis la même ancre, donc une requête de queue prolonge exactement l'historique
+    déjà servi. Calendrier 7j/7 pour les cryptos (suffixe -USD), jours ouvrés sinon.
+    """
+    name = 'synthetic'
+
+    DAILY_ANCHOR = pd.Timestamp('1995-01-02')
+    INTRADAY_ANCHOR = pd.Timestamp('2018-01-02')
+
+    def __init__(self, seed: int = 0, end=None):
+        self.seed = seed
+        self.end = pd.Timestamp.now().normalize() if end is None else pd.Timestamp(end)
+
+    def fetch(self, tickers, interval='1d', period=None, start=None):
+        from data_loader import period_start
+
+        if start is None and period is not None:
+            start = period_start(period, self.end)
+        return {tic: self.generate(tic, interval, start) for tic in tickers}
+
+    def calendar(self, ticker: str, interval: str = '1d') -> pd.DatetimeIndex:
+        anchor = self.DAILY_ANCHOR if interval == '1d' else self.INTRADAY_ANCHOR
+        days = np.arange(anchor.date(), (self.end + pd.Timedelta(days=1)).date(), dtype='datetime64[D]')
+        if not ticker.endswith('-USD'):
+            days = days[np.is_busday(days)]
+        if interval == '1d':
+            return pd.DatetimeIndex(days.astype('datetime64[ns]'))
+        offsets = self._offsets(ticker, interval).astype('timedelta64[m]')
+        return pd.DatetimeIndex((days[:, None] + offsets[None, :]).ravel().astype('datetime64[ns]'))
+
+    @staticmethod
+    def _offsets(ticker: str, interval: str) -> np.ndarray:
+        """Minutes de chaque bougie intraday depuis minuit UTC."""
+        if not interval[:-1].isdigit() or interval[-1] not in 'mh':
+            raise ValueError(f"Intervalle non supporté par SyntheticProvider : {interval}")
+        step = int(interval[:-1]) * (60 if interval.endswith('h') else 1)
+        if ticker.endswith('-USD'):
+            return np.arange(0, 24 * 60, step)
+        return np.arange(14 * 60 + 30, 21 * 60, step)  # 9h30–16h New York
+
+    def generate(self, ticker: str, interval: str = '1d', start=None) -> pd.DataFrame:
+        index = self.calendar(ticker, interval)
+        n = len(index)
+        rng = np.random.default_rng([self.seed, zlib.crc32(ticker.encode())])
+        bars_per_year = 252.0 if not ticker.endswith('-USD') else 365.0
+        if interval != '1d':
+            bars_per_year *= len(self._offsets(ticker, interval))
+        vol = rng.uniform(0.15, 0.6) / np.sqrt(bars_per_year)
+        drift = rng.uniform(-0.05, 0.2) / bars_per_year
+        price0 = rng.uniform(20.0, 500.0)
+
+        ret = drift - 0.5 * vol**2 + vol * rng.standard_normal(n)
+        close = price0 * np.exp(np.cumsum(ret))
+        gap = 0.25 * vol * rng.standard_normal(n)
+        open_ = np.empty(n)
+        open_[0] = price0
+        open_[1:] = close[:-1] * np.exp(gap[1:])
+        wick = np.abs(0.5 * vol * rng.standard_normal((2, n)))
+        high = np.maximum(open_, close) * np.exp(wick[0])
+        low = np.minimum(open_, close) * np.exp(-wick[1])
+        volume = np.round(rng.lognormal(mean=13.0, sigma=0.4, size=n))
+
+        df = pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume},
+                          index=pd.Index(index, name='Date'))
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        return df
+
+
+class ReplayProvider(DataProvider):
+    """
+    Rejoue des données déjà sur disque, sans réseau :
+    • {root}/{ticker}.csv (ex. anciens exports data/raw/), ou
+    • un OHLCVStore situé dans root
+    """
+    name = 'replay'
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def fetch(self, tickers, interval='1d', period=None, start=None):
+        from data_loader import period_start
+        from data_store import OHLCVStore
+
+        store = OHLCVStore(self.root)
+        if start is None and period is not None:
+            start = period_start(period)
+        out = {}
+        for tic in tickers:
+            csv_path = os.path.join(self.root, f'{tic}.csv')
+            if os.path.exists(csv_path):
+                raw = pd.read_csv(csv_path, index_col=0)
+                # les exports yfinance ont des lignes d'en-tête en plus (Ticker, Date)
+                raw = raw[raw.index.astype(str).str.match(r'\d{4}-\d{2}-\d{2}')]
+                df = normalize_ohlcv(raw)
+                if start is not None:
+                    df = df[df.index >= pd.Timestamp(start)]
+            elif store.meta(tic, interval) is not None:
+                df = store.read(tic, interval, start=start)
+            else:
+                continue
+            if not df.empty:
+                out[tic] = df
+        return out
+
+
+def make_provider(name: str) -> DataProvider:
+    """Instancie un fournisseur par nom : 'yfinance', 'synthetic' ou 'replay:<dossier>'."""
+    if name == 'yfinance':
+        return YFinanceProvider()
+    if name == 'synthetic':
+        return SyntheticProvider()
+    if name.startswith('replay:'):
+        return ReplayProvider(name.split(':', 1)[1])
+    raise ValueError(f"Fournisseur inconnu : {name}")
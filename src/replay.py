@@ -0,0 +1,255 @@
+"""
+Rejeu accéléré d'événements : paper trading des stratégies backtrader telles
+quelles, barre par barre, comme si les barres arrivaient en temps réel
+(≠ un run Cerebro en bloc, préchargé et vectorisé).
+
+• barres lues dans le store local par un générateur : blocs de `chunk` barres
+  copiés depuis le memory map, jamais de DataFrame complet ; Cerebro en
+  exactbars=1 ne garde que les barres utiles aux indicateurs → des mois de
+  1 min sur de nombreux symboles en mémoire bornée
+• vitesse : speed × le temps réel (60 : une barre 1 min par seconde) ; 0 = au
+  plus vite
+• latence des ordres (temps simulé) : un ordre n'est exécutable que `latency`
+  secondes après sa barre de décision, à l'ouverture de la 1re barre qui le
+  permet (la suivante tant que la latence est plus courte qu'une barre)
+• exécutions partielles : au plus fill_pct % du volume de chaque barre (filler
+  FixedBarPerc de backtrader), le reste aux barres suivantes ; les stratégies
+  attendent la fin de l'ordre comme en backtest
+• mesures (ms) : décision de la stratégie (son next) à chaque pas, travail du
+  moteur entre deux pas (feeds, indicateurs, broker), retard sur l'horloge du rejeu
+Plusieurs symboles : capital partagé (multi_asset.portfolio_strategy).
+
+En script :
+    python src/replay.py MomentumStrategy SPY QQQ --interval 1m --period 1mo --speed 600
+    DATA_PROVIDER=synthetic python src/replay.py DonchianBreakoutStrategy SPY QQQ IWM --interval 5m --speed 0 --fill-pct 1
+"""
+import argparse
+import time
+from array import array
+from typing import NamedTuple, Optional
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+
+from broker.base import LatencyTracker
+from data_loader import get_store
+from data_store import OHLCVStore, from_epoch_seconds
+from feeds import EPOCH_ORDINAL, bt_datenums
+from multi_asset import portfolio_strategy
+
+CHUNK = 4096
+
+
+class ReplayResult(NamedTuple):
+    equity: pd.Series       # valeur du portefeuille à chaque pas
+    fills: pd.DataFrame     # Date, Ticker, Size, Price, Delay (s simulées depuis la décision), Partial
+    latency: pd.DataFrame   # LatencyTracker.report() : décision, moteur, retard
+    wall: float             # durée réelle du rejeu (s)
+
+
+# --- Barres ---
+
+def store_chunks(ticker: str, interval: str = '1m', start=None, end=None,
+                 store: Optional[OHLCVStore] = None, chunk: int = CHUNK):
+    """Générateur de blocs (6, ≤ chunk) : horodatage puis OHLCV, copiés depuis le memory map du store."""
+    store = store or get_store()
+    arr = store.arrays(ticker, interval, start, end)
+    for lo in range(0, arr.shape[1], chunk):
+        yield np.array(arr[:, lo:lo + chunk])
+
+
+class StreamData(bt.feed.DataBase):
+    """Feed non préchargé alimenté par un générateur de blocs (store_chunks) : une barre par _load."""
+    params = (('chunks', None),)
+
+    def start(self):
+        super().start()
+        self._rows = iter(())
+        self._pushed = None
+
+    # Calendriers différents (crypto 7 j, actions 5 j) : Cerebro charge la barre
+    # suivante de chaque feed et rembobine celles en avance sur l'horloge. En
+    # exactbars=1 (buffers circulaires), rewind ne recule pas l'index : la barre
+    # future resterait visible en [0] et serait sautée au pas suivant. On retire
+    # donc vraiment la barre (une case de plus par ligne garde l'historique) et
+    # _load la ressert.
+
+    def qbuffer(self, savemem=0, replaying=False):
+        super().qbuffer(savemem, replaying=True)
+
+    def rewind(self, size=1):
+        if len(self) <= size:
+            return super().rewind(size)  # 1re barre : rien avant, le rembobinage classique suffit
+        l = self.lines
+        self._pushed = (l.datetime[0], l.open[0], l.high[0], l.low[0], l.close[0], l.volume[0])
+        self.lines.backwards(size, force=True)
+
+    def _load(self):
+        row, self._pushed = self._pushed, None
+        if row is None:
+            row = next(self._rows, None)
+        if row is None:
+            block = next(self.p.chunks, None)
+            if block is None or not block.shape[1]:
+                return False
+            # Dates backtrader converties par bloc, identiques à date2num
+            self._rows = zip(bt_datenums(block[0]).tolist(), *block[1:].tolist())
+            row = next(self._rows)
+        l = self.lines
+        l.datetime[0], l.open[0], l.high[0], l.low[0], l.close[0], l.volume[0] = row
+        l.openinterest[0] = 0.0
+        return True
+
+
+def _epoch(num: float) -> float:
+    """Nombre de date backtrader → secondes epoch."""
+    return (num - EPOCH_ORDINAL) * 86400.0
+
+
+# --- Broker : latence et exécutions partielles ---
+
+class ReplayBroker(bt.brokers.BackBroker):
+    """BackBroker dont les ordres ne deviennent exécutables que `latency` secondes (simulées) après leur création."""
+    params = (('latency', 0.0),)
+
+    def _try_exec(self, order):
+        if self.p.latency and order.data.datetime[0] < order.created.dt + self.p.latency / 86400.0:
+            return  # pas encore arrivé au marché
+        super()._try_exec(order)
+
+
+# --- Horloge et stratégie instrumentée ---
+
+class _Session:
+    """État partagé du rejeu : horloge, mesures, exécutions, courbe."""
+
+    def __init__(self, speed: float):
+        self.speed = speed
+        self.sim0 = self.wall0 = None
+        self.latency = LatencyTracker()
+        self.fills = []
+        self.stamps = array('d')
+        self.values = array('d')
+        self.t_end = None
+
+    def wait(self, sim_t: float) -> float:
+        """Attend l'heure réelle du pas `sim_t` ; renvoie le retard (s) si on est en retard."""
+        now = time.perf_counter()
+        if not self.speed:
+            return 0.0
+        if self.sim0 is None:
+            self.sim0, self.wall0 = sim_t, now
+            return 0.0
+        target = self.wall0 + (sim_t - self.sim0) / self.speed
+        if target > now:
+            time.sleep(target - now)
+            return 0.0
+        return now - target
+
+
+_replay_classes = {}
+
+
+def replay_strategy(strat_cls):
+    """Version « rejeu » de la stratégie : mode portefeuille, rythme de l'horloge, next() chronométré."""
+    cls = _replay_classes.get(strat_cls)
+    if cls is not None:
+        return cls
+    base = portfolio_strategy(strat_cls)
+
+    def next(self):
+        s = self.p.replay
+        t_in = time.perf_counter()
+        if s.t_end is not None:
+            s.latency.add('moteur', t_in - s.t_end)
+        sim_t = _epoch(max(d.datetime[0] for d in self.datas if len(d)))
+        s.latency.add('retard', s.wait(sim_t))
+        t0 = time.perf_counter()
+        base.next(self)
+        s.latency.since('décision', t0)
+        s.stamps.append(sim_t)
+        s.values.append(self.broker.getvalue())
+        s.t_end = time.perf_counter()
+
+    def notify_order(self, order):
+        if order.status in (order.Partial, order.Completed):
+            for bit in order.executed.iterpending():
+                self.p.replay.fills.append((_epoch(bit.dt), order.data._name, bit.size, bit.price,
+                                            (bit.dt - order.created.dt) * 86400.0,
+                                            order.status == order.Partial))
+        base.notify_order(self, order)
+
+    cls = type(base)(f'{strat_cls.__name__}Replay', (base,), {
+        'next': next, 'prenext': next, 'nextstart': next, 'notify_order': notify_order,
+        'params': (('replay', None),), '__module__': strat_cls.__module__,
+    })
+    _replay_classes[strat_cls] = cls
+    return cls
+
+
+def replay(strat_cls, tickers, interval: str = '1m', start=None, end=None, params=None,
+           cash: float = 100_000.0, speed: float = 0.0, latency: float = 0.0,
+           fill_pct: Optional[float] = None, store: Optional[OHLCVStore] = None,
+           chunk: int = CHUNK) -> ReplayResult:
+    """
+    Rejoue [start, end] des barres `interval` du store pour `tickers`.
+    speed : multiplicateur du temps réel (0 = au plus vite) ; latency : secondes
+    simulées entre la décision et l'arrivée de l'ordre ; fill_pct : % max du
+    volume d'une barre exécutable par ordre (None = tout).
+    """
+    cerebro = bt.Cerebro(stdstats=False, exactbars=1)
+    broker = ReplayBroker(latency=latency)
+    if fill_pct is not None:
+        broker.set_filler(bt.broker.fillers.FixedBarPerc(perc=fill_pct))
+    broker.setcash(cash)
+    cerebro.broker = broker
+    for tic in tickers:
+        cerebro.adddata(StreamData(chunks=store_chunks(tic, interval, start, end, store, chunk)), name=tic)
+    session = _Session(speed)
+    cerebro.addstrategy(replay_strategy(strat_cls), replay=session, **(params or {}))
+    t0 = time.perf_counter()
+    cerebro.run()
+    wall = time.perf_counter() - t0
+    fills = pd.DataFrame(session.fills, columns=['Date', 'Ticker', 'Size', 'Price', 'Delay', 'Partial'])
+    fills['Date'] = from_epoch_seconds(fills['Date'].to_numpy())
+    return ReplayResult(
+        equity=pd.Series(np.frombuffer(session.values), index=from_epoch_seconds(np.frombuffer(session.stamps))),
+        fills=fills,
+        latency=session.latency.report(),
+        wall=wall,
+    )
+
+
+if __name__ == "__main__":
+    import strategy, strategy2, strategy3, strategy4
+    from data_loader import period_start, sync
+    from instrumentation import peak_rss_mb
+
+    classes = {cls.__name__: cls for cls in (strategy.MomentumStrategy,
+                                             strategy2.DonchianBreakoutStrategy,
+                                             strategy3.EnhancedBreakoutStrategy,
+                                             strategy4.RegimeAwareBreakoutStrategy)}
+    parser = argparse.ArgumentParser(description="Rejeu accéléré (paper trading barre par barre)")
+    parser.add_argument('strategy', choices=sorted(classes))
+    parser.add_argument('tickers', nargs='+')
+    parser.add_argument('--interval', default='1m')
+    parser.add_argument('--period', default='1mo', help="fenêtre rejouée (et synchronisée) si --start absent")
+    parser.add_argument('--start', default=None)
+    parser.add_argument('--end', default=None)
+    parser.add_argument('--speed', type=float, default=0.0, help="× temps réel ; 0 = au plus vite")
+    parser.add_argument('--latency', type=float, default=0.0, help="secondes simulées avant l'arrivée d'un ordre")
+    parser.add_argument('--fill-pct', type=float, default=None, help="%% max du volume d'une barre par ordre")
+    parser.add_argument('--cash', type=float, default=100_000.0)
+    parser.add_argument('--offline', action='store_true', help="pas de synchronisation du store")
+    args = parser.parse_args()
+
+    if not args.offline:
+        sync(args.tickers, args.period, args.interval)
+    start = args.start if args.start is not None else period_start(args.period)
+    res = replay(classes[args.strategy], args.tickers, args.interval, start, args.end, cash=args.cash,
+                 speed=args.speed, latency=args.latency, fill_pct=args.fill_pct)
+    print(res.latency.to_string(float_format=lambda v: f"{v:.3f}"))
+    partial = int(res.fills['Partial'].sum()) if len(res.fills) else 0
+    print(f"{len(res.equity)} pas en {res.wall:.1f}s, {len(res.fills)} exécutions (dont {partial} partielles), "
+          f"valeur finale {res.equity.iloc[-1]:.2f}, pic RSS {peak_rss_mb():.0f} Mo")
@@ -0,0 +1,282 @@
+"""
+Cache disque des résultats de backtest, adressé par contenu.
+
+• clé = hash de (code source de la stratégie, de ses parents et des modules du
+  projet qu'ils importent, paramètres complétés par les valeurs par défaut,
+  empreinte des données, code du moteur et des entrées, capital…) : modifier
+  la stratégie, un helper, le moteur ou les données change la clé, rien n'est
+  jamais servi périmé
+• un fichier .npz par résultat (horodatages + séries float64, métadonnées JSON :
+  trades, métriques, ligne de sweep…), sans pickle
+• taille bornée (octets) avec éviction LRU sur la date d'accès des fichiers ;
+  plusieurs processus (workers, app) peuvent partager le même répertoire
+
+Désactivable : RESULT_CACHE_MB=0 ou set_result_cache(None).
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+import types
+from typing import Callable, Dict, NamedTuple, Optional, Union
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+
+from data_store import from_epoch_seconds, to_epoch_seconds
+from indicator_cache import fingerprint
+from vector_engine import strategy_params
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(SRC_DIR, '..', 'data', 'results')
+
+# Modules dont le code fait partie du « moteur » : les modifier invalide ses résultats
+ENGINE_MODULES = {
+    'backtrader': ('bt_indicators', 'engines', 'feeds', 'indicator_cache', 'indicators', 'multi_asset',
+                   'position_tracker', 'risk'),
+    'vector':     ('engines', 'vector_engine', 'vector_indicators', 'position_tracker', 'risk'),
+    'panel':      ('panel_engine', 'price_panel', 'vector_engine', 'vector_indicators'),
+}
+# Entrées de tous les moteurs (barres, panel aligné) et métriques
+COMMON_MODULES = ('data_store', 'metrics', 'price_panel')
+
+
+class Result(NamedTuple):
+    stamps: np.ndarray    # secondes epoch
+    values: np.ndarray    # (séries × barres)
+    columns: list
+    meta: dict            # JSON : trades, métriques, nom de l'index…
+
+    @classmethod
+    def from_series(cls, s: pd.Series, **meta) -> 'Result':
+        return cls(to_epoch_seconds(s.index), s.to_numpy(dtype=np.float64)[None, :],
+                   [s.name], {**meta, 'index_name': s.index.name})
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, **meta) -> 'Result':
+        return cls(to_epoch_seconds(df.index), df.to_numpy(dtype=np.float64).T,
+                   list(df.columns), {**meta, 'index_name': df.index.name})
+
+    def _index(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(from_epoch_seconds(self.stamps), name=self.meta.get('index_name'))
+
+    def series(self) -> pd.Series:
+        return pd.Series(self.values[0], index=self._index(), name=self.columns[0])
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.values.T, index=self._index(), columns=self.columns)
+
+
+# --- Clés ---
+
+_sources = {}
+
+
+def _source_hash(module_name: str) -> str:
+    """Hash du fichier source d'un module (une fois par processus)."""
+    digest = _sources.get(module_name)
+    if digest is None:
+        module = sys.modules.get(module_name) or __import__(module_name)
+        path = getattr(module, '__file__', None)
+        if path is None:
+            # Module sans fichier (session interactive) : rien à suivre
+            digest = module_name
+        else:
+            with open(path, 'rb') as f:
+                digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+        _sources[module_name] = digest
+    return digest
+
+
+def _is_project(module_name: str) -> bool:
+    path = getattr(sys.modules.get(module_name), '__file__', None)
+    return path is not None and os.path.abspath(path).startswith(SRC_DIR + os.sep)
+
+
+def _project_imports(module) -> list:
+    """Modules de src/ d'où viennent les globales de `module` (modules importés, fonctions, classes)."""
+    names = []
+    for value in vars(module).values():
+        name = value.__name__ if isinstance(value, types.ModuleType) else getattr(value, '__module__', None)
+        if isinstance(name, str) and name not in names and _is_project(name):
+            names.append(name)
+    return names
+
+
+def _strategy_sources(strat_cls) -> list:
+    """
+    Modules de la stratégie et de ses parents, hors backtrader, puis de proche
+    en proche ceux du projet qu'ils importent (helpers de rééquilibrage,
+    indicateurs…).
+    """
+    modules = []
+    for cls in strat_cls.__mro__:
+        name = cls.__module__
+        if name.split('.')[0] not in ('backtrader', 'builtins') and name not in modules:
+            modules.append(name)
+    i = 0
+    while i < len(modules):
+        module = sys.modules.get(modules[i])
+        for name in _project_imports(module) if module is not None else ():
+            if name not in modules:
+                modules.append(name)
+        i += 1
+    return [(name, _source_hash(name)) for name in modules]
+
+
+def result_key(strat_cls, params, data: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
+               engine: str, **extra) -> str:
+    """
+    Clé d'un résultat. data : un DataFrame (mono-actif, le nom du ticker
+    n'intervient pas) ou {ticker: DataFrame} (ordre et noms comptent).
+    extra : tout ce qui change le résultat en plus (capital, type de résultat…).
+    """
+    if isinstance(data, pd.DataFrame):
+        fps = fingerprint(data)
+    else:
+        fps = [(tic, fingerprint(df)) for tic, df in data.items()]
+    payload = {
+        'strategy': [strat_cls.__qualname__, _strategy_sources(strat_cls)],
+        'params':   strategy_params(strat_cls, params),
+        'data':     fps,
+        'engine':   [engine, bt.__version__,
+                     [(m, _source_hash(m)) for m in dict.fromkeys(ENGINE_MODULES.get(engine, ()) + COMMON_MODULES)]],
+        'extra':    extra,
+    }
+    blob = json.dumps(payload, sort_keys=True, default=repr).encode()
+    return hashlib.blake2b(blob, digest_size=20).hexdigest()
+
+
+# --- Stockage ---
+
+class ResultCache:
+    """Répertoire de fichiers <clé>.npz, borné en octets (LRU sur la date d'accès)."""
+
+    def __init__(self, root: str = RESULTS_DIR, max_bytes: int = 512 * 2**20):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.evictions = 0
+        self._nbytes = None  # inventaire fait au premier put
+        self._lock = threading.Lock()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, f'{key}.npz')
+
+    def get(self, key: str) -> Optional[Result]:
+        path = self.path(key)
+        try:
+            with np.load(path) as z:
+                res = Result(z['stamps'], z['values'], json.loads(z['columns'].tobytes()),
+                             json.loads(z['meta'].tobytes()))
+            os.utime(path)  # accès récent : dernier à être évincé
+        except (FileNotFoundError, OSError, ValueError, KeyError):
+            # Absent, évincé par un autre processus entre-temps, ou fichier tronqué
+            self.misses += 1
+            return None
+        self.hits += 1
+        return res
+
+    def put(self, key: str, res: Result) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        path = self.path(key)
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, stamps=np.asarray(res.stamps, dtype=np.float64),
+                     values=np.atleast_2d(np.asarray(res.values, dtype=np.float64)),
+                     columns=_json_bytes(res.columns), meta=_json_bytes(res.meta))
+        size = os.path.getsize(tmp)
+        os.replace(tmp, path)  # atomique : un lecteur voit l'ancien fichier ou le nouveau
+        with self._lock:
+            if self._nbytes is None:
+                self._nbytes = self._scan()[1]
+            else:
+                self._nbytes += size
+            if self._nbytes > self.max_bytes:
+                self._evict()
+
+    def _scan(self):
+        """[(date d'accès, taille, chemin)] du répertoire et taille totale."""
+        entries = []
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return entries, 0
+        for name in names:
+            if name.endswith('.npz'):
+                try:
+                    st = os.stat(os.path.join(self.root, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, os.path.join(self.root, name)))
+        return entries, sum(e[1] for e in entries)
+
+    def _evict(self) -> None:
+        # Inventaire réel : d'autres processus écrivent peut-être dans le même répertoire
+        entries, total = self._scan()
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._nbytes = total
+
+    def compute(self, key: str, fn: Callable[[], Result]) -> Result:
+        """Résultat en cache, sinon fn() mis en cache."""
+        res = self.get(key)
+        if res is None:
+            res = fn()
+            self.put(key, res)
+        return res
+
+    def clear(self) -> None:
+        for _, _, path in self._scan()[0]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._nbytes = 0
+
+    def stats(self) -> dict:
+        entries, total = self._scan()
+        return {'entries': len(entries), 'bytes': total, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
+
+def _json_bytes(obj) -> np.ndarray:
+    return np.frombuffer(json.dumps(obj, default=_json_default).encode(), dtype=np.uint8)
+
+
+def _json_default(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (pd.Timestamp, np.datetime64)):
+        return str(obj)
+    raise TypeError(f"Non sérialisable dans le cache : {type(obj).__name__}")
+
+
+_mb = int(os.environ.get('RESULT_CACHE_MB', 512))
+_cache: Optional[ResultCache] = ResultCache(max_bytes=_mb * 2**20) if _mb > 0 else None
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    return _cache
+
+
+def set_result_cache(cache: Optional[ResultCache]) -> None:
+    """Remplace le cache global ; None le désactive."""
+    global _cache
+    _cache = cache
+
+
+def cached_result(strat_cls, params, data, engine: str, fn: Callable[[], Result], **extra) -> Result:
+    """fn() servi depuis le cache global s'il est actif (clé : voir result_key)."""
+    if _cache is None:
+        return fn()
+    return _cache.compute(result_key(strat_cls, params, data, engine, **extra), fn)
@@ -0,0 +1,200 @@
+"""
+Gestion du risque, commune aux stratégies backtrader et aux moteurs NumPy.
+
+• taille de position : risque fixe sur 1 ATR (cash * risk / atr), en scalaire
+  (une décision par barre) ou pour tout un panel d'actifs d'un coup
+• plafonds d'exposition en fraction du capital : brute (somme des |valeurs|),
+  nette (somme des valeurs) et par position ; réduction des ordres qui les
+  dépasseraient
+• VaR / CVaR historiques et paramétriques (loi normale), pour un ou plusieurs
+  portefeuilles (books × actifs) en une seule opération matricielle
+• RiskBook : book de N actifs pour les contrôles en ligne (quelques µs par
+  ordre sur 500 actifs) ; branché sur le mode portefeuille des deux moteurs
+  (multi_asset, vector_engine.run_portfolio) via RiskLimits
+
+Pertes (VaR, CVaR) en valeurs positives, dans l'unité des rendements (fraction).
+"""
+import math
+from statistics import NormalDist
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+
+# --- Taille de position ---
+
+def atr_size(cash, risk, atr):
+    """
+    Taille qui risque `risk` du cash sur 1 ATR ; 0 si l'ATR est nul ou indéfini.
+    Scalaires (chemin Python pur, appel par barre) ou tableaux (panel).
+    """
+    if isinstance(atr, (float, int)):
+        return (cash * risk) / atr if atr > 0 else 0.0 * cash
+    num = np.asarray(cash, dtype=np.float64) * risk
+    atr = np.asarray(atr, dtype=np.float64)
+    shape = np.broadcast(num, atr).shape
+    with np.errstate(invalid='ignore'):
+        return np.divide(num, atr, out=np.zeros(shape), where=atr > 0)
+
+
+# --- Exposition ---
+
+def exposure(sizes, prices, equity):
+    """(brute, nette) en fraction du capital, par book (dernier axe = actifs)."""
+    values = np.asarray(sizes, dtype=np.float64) * prices
+    equity = np.asarray(equity, dtype=np.float64)
+    return np.abs(values).sum(axis=-1) / equity, values.sum(axis=-1) / equity
+
+
+def cap_scale(sizes, prices, equity, max_gross=None, max_net=None) -> np.ndarray:
+    """Facteur (≤ 1) à appliquer à chaque book pour respecter les plafonds brut et net."""
+    gross, net = exposure(sizes, prices, equity)
+    scale = np.ones(np.shape(gross))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if max_gross is not None:
+            scale = np.minimum(scale, np.where(gross > max_gross, max_gross / gross, 1.0))
+        if max_net is not None:
+            scale = np.minimum(scale, np.where(np.abs(net) > max_net, max_net / np.abs(net), 1.0))
+    return scale
+
+
+class RiskLimits(NamedTuple):
+    """Plafonds en fraction du capital (None : pas de plafond)."""
+    max_gross: Optional[float] = None
+    max_net: Optional[float] = None
+    max_position: Optional[float] = None
+
+
+def _room(current: float, delta: float, cap: float) -> float:
+    """Plus grande fraction s de l'ordre delta telle que |current + s·delta| - |current| ≤ cap."""
+    if delta == 0.0:
+        return 1.0
+    if current == 0.0 or (current > 0) == (delta > 0):
+        return cap / abs(delta)
+    # Sens opposé : l'ordre réduit d'abord l'exposition, puis la retourne
+    return max((cap + 2 * abs(current)) / abs(delta), min(abs(current) / abs(delta), 1.0))
+
+
+class RiskBook:
+    """
+    État d'un book de n actifs pour les contrôles par ordre : positions, derniers
+    prix, valeur des ordres d'ouverture pas encore exécutés. Capital = cash +
+    positions valorisées aux derniers prix ; plafonds appliqués par cap().
+    """
+    __slots__ = ('sizes', 'prices', 'committed', 'limits', '_buf', '_ones')
+
+    def __init__(self, n: int, limits: RiskLimits = RiskLimits()):
+        self.sizes = np.zeros(n)
+        self.prices = np.zeros(n)
+        self.committed = np.zeros(n)
+        self.limits = limits
+        self._buf = np.empty(n)
+        self._ones = np.ones(n)
+
+    def mark(self, asset: int, size: float, price: float) -> None:
+        """Position et dernier prix d'un actif (à chaque nouvelle barre)."""
+        self.sizes[asset] = size
+        self.prices[asset] = price
+
+    def equity(self, cash: float) -> float:
+        return cash + float(self.sizes.dot(self.prices))
+
+    def exposures(self):
+        """(valeurs par actif ordres compris, brute, nette), en montant."""
+        values = self.sizes * self.prices + self.committed
+        return values, float(np.abs(values).sum()), float(values.sum())
+
+    def cap(self, asset: int, size: float, price: float, cash: float) -> float:
+        """Taille de l'ordre ramenée dans les plafonds (inchangée si elle y tient)."""
+        lim = self.limits
+        delta = size * price
+        if not delta:
+            return size
+        # Tampon préalloué et sommes par produit scalaire : quelques µs sur 500 actifs
+        equity = self.equity(cash)
+        buf, ones = self._buf, self._ones
+        np.multiply(self.sizes, self.prices, out=buf)
+        buf += self.committed
+        current = float(buf[asset])
+        net = float(buf.dot(ones))
+        gross = float(np.abs(buf, out=buf).dot(ones))
+        s = 1.0
+        if lim.max_gross is not None:
+            s = min(s, _room(current, delta, lim.max_gross * equity - gross))
+        if lim.max_net is not None:
+            s = min(s, (lim.max_net * equity - (net if delta > 0 else -net)) / abs(delta))
+        if lim.max_position is not None:
+            s = min(s, _room(current, delta, lim.max_position * equity - abs(current)))
+        if s >= 1.0:
+            return size
+        return size * max(s, 0.0)
+
+    def commit(self, asset: int, size: float, price: float) -> None:
+        """Ordre soumis : compte dans l'exposition jusqu'à son exécution ou son refus."""
+        self.committed[asset] += size * price
+
+    def release(self, asset: int) -> None:
+        """Plus d'ordre d'ouverture en cours sur l'actif (les stratégies n'en ont qu'un à la fois)."""
+        self.committed[asset] = 0.0
+
+    def var(self, cov: np.ndarray, alpha: float = 0.95, equity: float = None) -> float:
+        """VaR paramétrique du book (montant, ou fraction si equity) : cov = covariance des rendements des actifs."""
+        values = self.sizes * self.prices
+        loss = -NormalDist().inv_cdf(1 - alpha) * math.sqrt(max(float(values @ cov @ values), 0.0))
+        return loss / equity if equity else loss
+
+
+# --- VaR / CVaR ---
+
+def portfolio_returns(returns: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Rendements (dates × books) de portefeuilles (books × actifs) sur des rendements d'actifs (dates × actifs)."""
+    return np.nan_to_num(returns) @ np.atleast_2d(weights).T
+
+
+def _tail(pnl: np.ndarray, alpha: float):
+    """Rendements triés par colonne et nombre d'observations dans la queue 1 - alpha."""
+    pnl = np.sort(np.asarray(pnl, dtype=np.float64), axis=0)
+    k = max(int(math.floor(len(pnl) * (1 - alpha))), 1)
+    return pnl, k
+
+
+def historical_var(pnl, alpha: float = 0.95) -> np.ndarray:
+    """VaR historique de chaque colonne de pnl (dates × books) : k-ième pire rendement."""
+    pnl, k = _tail(pnl, alpha)
+    return -pnl[k - 1]
+
+
+def historical_cvar(pnl, alpha: float = 0.95) -> np.ndarray:
+    """CVaR (expected shortfall) historique : moyenne des k pires rendements."""
+    pnl, k = _tail(pnl, alpha)
+    return -pnl[:k].mean(axis=0)
+
+
+def parametric_var(mu, sigma, alpha: float = 0.95):
+    """VaR normale : -(mu + z·sigma), z quantile 1 - alpha."""
+    return -(np.asarray(mu) + NormalDist().inv_cdf(1 - alpha) * np.asarray(sigma))
+
+
+def parametric_cvar(mu, sigma, alpha: float = 0.95):
+    """CVaR normale : -(mu - sigma·φ(z) / (1 - alpha))."""
+    z = NormalDist().inv_cdf(1 - alpha)
+    return -(np.asarray(mu) - np.asarray(sigma) * NormalDist().pdf(z) / (1 - alpha))
+
+
+def var_cvar(returns: np.ndarray, weights: np.ndarray, alpha: float = 0.95, method: str = 'historical'):
+    """
+    (VaR, CVaR) sur une barre de chaque portefeuille (books × actifs), à partir
+    des rendements des actifs (dates × actifs). method : 'historical' ou
+    'parametric' (moyenne et covariance des actifs, w·Σ·w par book).
+    """
+    weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    returns = np.nan_to_num(np.asarray(returns, dtype=np.float64))
+    if method == 'historical':
+        pnl = portfolio_returns(returns, weights)
+        return historical_var(pnl, alpha), historical_cvar(pnl, alpha)
+    if method != 'parametric':
+        raise ValueError(f"Méthode de VaR inconnue : {method} (historical ou parametric)")
+    mu = weights @ returns.mean(axis=0)
+    cov = np.atleast_2d(np.cov(returns, rowvar=False))
+    sigma = np.sqrt(np.maximum(np.einsum('ij,jk,ik->i', weights, cov, weights), 0.0))
+    return parametric_var(mu, sigma, alpha), parametric_cvar(mu, sigma, alpha)
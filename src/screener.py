@@ -0,0 +1,218 @@
+"""
+Screener multi-tickers : conditions d'entrée et de sortie de chaque stratégie
+sur la dernière barre de tout l'univers du store local, tableau classé.
+Version « univers » de debug_signals.py (un ticker, tous les jours).
+
+• les `window` dernières barres de chaque ticker (memory map du store) rangées
+  en matrices (barres × tickers) alignées sur la dernière barre de chacun : pas
+  de calendrier commun, un historique plus court est complété par des NaN
+• indicateurs calculés d'un bloc sur toute la matrice par vector_indicators
+  (mêmes fonctions que le moteur vectorisé, colonne = ticker) ; EMA / RSI /
+  ATR / ADX amorcés à la 1re barre de la fenêtre : identiques au moteur si la
+  fenêtre couvre tout l'historique, écart négligeable à 400 barres pour les
+  périodes usuelles
+• entrée : conditions d'entrée de la stratégie à la dernière barre (à plat)
+• sortie : sorties sur indicateurs d'une position ouverte (croisement
+  baissier, cassure basse, régime baissier) ; stops, trailing et time-stops
+  dépendent du prix d'entrée (runtime live)
+• score : distance au seuil d'entrée en ATR, pour le classement
+
+En script :
+    python src/screener.py                                   # tout le store 1d, toutes les stratégies
+    python src/screener.py MomentumStrategy --top 50 --all   # lignes sans signal comprises
+"""
+import argparse
+import time
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+import vector_indicators as vi
+from data_loader import get_store
+from data_store import OHLCVStore, from_epoch_seconds
+from vector_engine import strategy_params
+
+WINDOW = 400
+FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+
+# --- Panel des dernières barres ---
+
+def load_window(tickers, interval: str = '1d', window: int = WINDOW,
+                store: Optional[OHLCVStore] = None):
+    """
+    (tickers présents, horodatage de leur dernière barre, {champ: matrice (window, n)}) ;
+    ligne -1 = dernière barre de chaque ticker.
+    """
+    store = store or get_store()
+    kept, last, cols = [], [], []
+    for tic in tickers:
+        try:
+            arr = store.arrays(tic, interval)
+        except FileNotFoundError:
+            continue
+        if not arr.shape[1]:
+            continue
+        kept.append(tic)
+        last.append(arr[0, -1])
+        cols.append(arr[1:, -window:])
+    block = np.full((len(FIELDS), window, len(kept)), np.nan)
+    for j, a in enumerate(cols):
+        block[:, window - a.shape[1]:, j] = a
+    return kept, np.array(last), dict(zip(FIELDS, block))
+
+
+# --- Indicateurs sur matrices (barres × tickers) : vector_indicators colonne par colonne ---
+
+class _Indicators:
+    """Indicateurs de l'univers calculés à la demande, partagés entre stratégies (clés du moteur vectorisé)."""
+
+    def __init__(self, f: Dict[str, np.ndarray]):
+        self.f = f
+        self.memo = {}
+
+    def get(self, key: tuple, fn, *args) -> np.ndarray:
+        out = self.memo.get(key)
+        if out is None:
+            out = self.memo[key] = fn(*args)
+        return out
+
+    def ema(self, n):
+        return self.get(('ema', n), vi.ema, self.f['Close'], n)
+
+    def sma(self, n):
+        return self.get(('sma', n), vi.sma, self.f['Close'], n)
+
+    def vol_sma(self, n):
+        return self.get(('vol_sma', n), vi.sma, self.f['Volume'], n)
+
+    def rsi(self, n):
+        return self.get(('rsi', n), vi.rsi, self.f['Close'], n)
+
+    def atr(self, n):
+        return self.get(('atr', n), vi.atr, self.f['High'], self.f['Low'], self.f['Close'], n)
+
+    def adx(self, n):
+        return self.get(('adx', n), vi.adx, self.f['High'], self.f['Low'], self.f['Close'], n, self.atr(n))
+
+    def dc_up(self, n):
+        return self.get(('dc_up', n), lambda: vi.highest(vi.delay(self.f['High']), n))
+
+    def dc_down(self, n):
+        return self.get(('dc_down', n), lambda: vi.lowest(vi.delay(self.f['Low']), n))
+
+    def crossover(self, fast, slow):
+        return self.get(('crossover', fast, slow), lambda: vi.crossover(self.ema(fast), self.ema(slow)))
+
+
+# --- Conditions par stratégie : (entrée, sortie, score) à la dernière barre ---
+
+def _momentum(p, f, ind):
+    fast, slow = ind.ema(p['ema_fast']), ind.ema(p['ema_slow'])
+    cross = ind.crossover(p['ema_fast'], p['ema_slow'])[-1]
+    rsi, atr = ind.rsi(p['rsi_period'])[-1], ind.atr(p['atr_period'])[-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return ((cross > 0) & (rsi > p['rsi_buy']),
+                (cross < 0) | (rsi < p['rsi_sell']),
+                (fast[-1] - slow[-1]) / atr)
+
+
+def _donchian(p, f, ind):
+    n = p['donchian_period']
+    c, up, down = f['Close'][-1], ind.dc_up(n)[-1], ind.dc_down(n)[-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return c > up, c < down, (c - up) / ind.atr(p['atr_period'])[-1]
+
+
+def _enhanced(p, f, ind):
+    atr = ind.atr(p['atr_period'])[-1]
+    upper = ind.sma(p['sma_period'])[-1] + p['tp2_atr'] * atr
+    c = f['Close'][-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        entry = ((ind.adx(p['adx_period'])[-1] > p['trend_adx'])
+                 & (f['Volume'][-1] > p['vol_multiplier'] * ind.vol_sma(p['vol_period'])[-1])
+                 & (c > upper))
+        # Sorties uniquement liées à la position (objectifs, trailing, stop, durée)
+        return entry, np.zeros_like(entry), (c - upper) / atr
+
+
+def _regime(p, f, ind):
+    atr = ind.atr(p['atr_period'])[-1]
+    c, long_ = f['Close'][-1], ind.sma(p['sma_long'])[-1]
+    upper = ind.sma(p['sma_short'])[-1] + atr
+    with np.errstate(invalid='ignore', divide='ignore'):
+        entry = (c >= long_) & (c > upper) & (p['risk_bull'] > 0) & (atr > 0)
+        return entry, c < long_, (c - upper) / atr
+
+
+SCREENS = {
+    'MomentumStrategy':            _momentum,
+    'DonchianBreakoutStrategy':    _donchian,
+    'EnhancedBreakoutStrategy':    _enhanced,
+    'RegimeAwareBreakoutStrategy': _regime,
+}
+
+
+def screen_for(strat_cls):
+    """Conditions correspondant à une classe de stratégie (ou à un parent)."""
+    for cls in strat_cls.__mro__:
+        if cls.__name__ in SCREENS:
+            return SCREENS[cls.__name__]
+    raise ValueError(f"Stratégie non supportée par le screener : {strat_cls.__name__}")
+
+
+def screen(strategies, tickers=None, interval: str = '1d', params: Optional[dict] = None,
+           window: int = WINDOW, store: Optional[OHLCVStore] = None, signals_only: bool = True) -> pd.DataFrame:
+    """
+    Évalue `strategies` (classes backtrader) sur la dernière barre de `tickers`
+    (défaut : tout le store pour l'intervalle). params : {nom de stratégie: {param: valeur}}.
+    Colonnes : Ticker, Strategy, Date, Close, Entry, Exit, Score ; entrées d'abord,
+    puis sorties, par score décroissant. signals_only : lignes sans signal retirées.
+    """
+    store = store or get_store()
+    tickers = store.tickers(interval) if tickers is None else list(tickers)
+    kept, last, f = load_window(tickers, interval, window, store)
+    ind = _Indicators(f)
+    frames = []
+    for cls in strategies:
+        p = strategy_params(cls, (params or {}).get(cls.__name__))
+        entry, exit_, score = screen_for(cls)(p, f, ind)
+        frames.append(pd.DataFrame({
+            'Ticker': kept, 'Strategy': cls.__name__, 'Date': from_epoch_seconds(last),
+            'Close': f['Close'][-1], 'Entry': entry, 'Exit': exit_, 'Score': score,
+        }))
+    table = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+        columns=['Ticker', 'Strategy', 'Date', 'Close', 'Entry', 'Exit', 'Score'])
+    if signals_only:
+        table = table[table['Entry'] | table['Exit']]
+    return table.sort_values(['Entry', 'Exit', 'Score'], ascending=False, na_position='last').reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    import strategy, strategy2, strategy3, strategy4
+
+    classes = {cls.__name__: cls for cls in (strategy.MomentumStrategy,
+                                             strategy2.DonchianBreakoutStrategy,
+                                             strategy3.EnhancedBreakoutStrategy,
+                                             strategy4.RegimeAwareBreakoutStrategy)}
+    parser = argparse.ArgumentParser(description="Screener : signaux de la dernière barre sur l'univers du store")
+    parser.add_argument('strategies', nargs='*', help=f"défaut : toutes ({', '.join(sorted(classes))})")
+    parser.add_argument('--tickers', nargs='+', default=None, help="défaut : tous les tickers du store")
+    parser.add_argument('--interval', default='1d')
+    parser.add_argument('--window', type=int, default=WINDOW, help="barres chargées par ticker")
+    parser.add_argument('--top', type=int, default=30)
+    parser.add_argument('--all', action='store_true', help="garder les lignes sans signal")
+    args = parser.parse_args()
+    unknown = set(args.strategies) - set(classes)
+    if unknown:
+        parser.error(f"stratégie inconnue : {', '.join(sorted(unknown))}")
+
+    t0 = time.perf_counter()
+    table = screen([classes[s] for s in args.strategies or sorted(classes)], args.tickers, args.interval,
+                   window=args.window, signals_only=not args.all)
+    elapsed = time.perf_counter() - t0
+    with pd.option_context('display.width', 160):
+        print(table.head(args.top).to_string(float_format=lambda v: f"{v:.2f}"))
+    print(f"\n{int(table['Entry'].sum())} entrées, {int(table['Exit'].sum())} sorties "
+          f"({table['Ticker'].nunique()} tickers) en {elapsed:.2f}s")
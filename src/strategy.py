@@ -1,5 +1,8 @@
 import backtrader as bt
 
+from bt_indicators import bt_indicator
+from risk import atr_size
+
 class MomentumStrategy(bt.Strategy):
     params = (
         ('ema_fast', 20),
@@ -12,25 +15,30 @@ class MomentumStrategy(bt.Strategy):
     )
 
     def __init__(self):
-        # EMA rapides et lentes
-        self.ema_fast = bt.ind.EMA(self.data.close, period=self.p.ema_fast)
-        self.ema_slow = bt.ind.EMA(self.data.close, period=self.p.ema_slow)
+        # EMA rapides et lentes (servies par le cache d'indicateurs)
+        self.ema_fast = bt_indicator(self.data, 'ema', self.p.ema_fast)
+        self.ema_slow = bt_indicator(self.data, 'ema', self.p.ema_slow)
         # CrossOver (>0 quand ema_fast croise au-dessus de ema_slow)
         self.crossover = bt.ind.CrossOver(self.ema_fast, self.ema_slow)
         # RSI & ATR
-        self.rsi = bt.ind.RSI(self.data.close, period=self.p.rsi_period)
-        self.atr = bt.ind.ATR(self.data, period=self.p.atr_period)
+        self.rsi = bt_indicator(self.data, 'rsi', self.p.rsi_period)
+        self.atr = bt_indicator(self.data, 'atr', self.p.atr_period)
         # Pour suivre l’ordre en cours et le prix de stop
         self.order = None
         self.stop_price = None
 
+    def notify_order(self, order):
+        # Ordre terminé (exécuté, annulé, rejeté) : on peut de nouveau agir
+        if not order.alive():
+            self.order = None
+
     def next(self):
         # si un ordre est en cours, on ne fait rien
         if self.order:
             return
 
         cash = self.broker.getcash()
-        size = (cash * self.p.risk_per_trade) / self.atr[0]
+        size = atr_size(cash, self.p.risk_per_trade, self.atr[0])
 
         # --- Pas de position : on achète sur croisement haussier + RSI > seuil
         if not self.position:
@@ -1,5 +1,9 @@
 import backtrader as bt
 
+from bt_indicators import bt_indicator
+from position_tracker import PositionTracker
+from risk import atr_size
+
 class DonchianBreakoutStrategy(bt.Strategy):
     """
     Stratégie de breakout Donchian corrigée :
@@ -16,25 +20,19 @@ class DonchianBreakoutStrategy(bt.Strategy):
     )
 
     def __init__(self):
-        # Canal Donchian des N jours **précédents** (shift de 1)
-        self.dc_up   = bt.indicators.Highest(
-            self.data.high(-1),
-            period=self.p.donchian_period,
-            subplot=False
-        )
-        self.dc_down = bt.indicators.Lowest(
-            self.data.low(-1),
-            period=self.p.donchian_period,
-            subplot=False
-        )
+        # Canal Donchian des N jours **précédents** (shift de 1), via le cache
+        self.dc_up   = bt_indicator(self.data, 'dc_up', self.p.donchian_period)
+        self.dc_down = bt_indicator(self.data, 'dc_down', self.p.donchian_period)
         # ATR pour stop‑loss
-        self.atr     = bt.indicators.ATR(
-            self.data,
-            period=self.p.atr_period
-        )
-        self.order      = None
-        self.stop_price = None
-        self.bar_exec   = 0
+        self.atr     = bt_indicator(self.data, 'atr', self.p.atr_period)
+        self.order = None
+        # Barre d'entrée et stop de la position en cours
+        self.pos   = PositionTracker()
+
+    def notify_order(self, order):
+        # Ordre terminé (exécuté, annulé, rejeté) : on peut de nouveau agir
+        if not order.alive():
+            self.order = None
 
     def next(self):
         # Ne pas agir tant qu'on n'a pas N+1 bougies
@@ -46,24 +44,23 @@ class DonchianBreakoutStrategy(bt.Strategy):
             return
 
         cash = self.broker.getcash()
-        size = (cash * self.p.risk_per_trade) / self.atr[0]
+        size = atr_size(cash, self.p.risk_per_trade, self.atr[0])
 
         # --- Entrée : breakout haussier sur les N derniers jours (hors jour courant)
         if not self.position and self.data.close[0] > self.dc_up[0]:
             self.order = self.buy(size=size)
-            self.bar_exec   = len(self)
-            self.stop_price = self.data.close[0] - self.atr[0]
+            self.pos.open(len(self), self.data.close[0], self.data.close[0] - self.atr[0])
 
         # --- Sorties
         elif self.position:
-            days_held = len(self) - self.bar_exec
+            days_held = self.pos.days_held(len(self))
 
             # 1) breakout baissier
             if self.data.close[0] < self.dc_down[0]:
                 self.order = self.close()
 
             # 2) stop‑loss
-            elif self.data.close[0] < self.stop_price:
+            elif self.pos.stopped(self.data.close[0]):
                 self.order = self.close()
 
             # 3) time‑stop
@@ -1,5 +1,9 @@
 import backtrader as bt
 
+from bt_indicators import bt_indicator
+from position_tracker import PositionTracker
+from risk import atr_size
+
 class EnhancedBreakoutStrategy(bt.Strategy):
     """
     Stratégie de breakout enrichie pour retail :
@@ -24,23 +28,26 @@ class EnhancedBreakoutStrategy(bt.Strategy):
     )
 
     def __init__(self):
-        # Moyenne mobile
-        self.sma = bt.ind.SMA(self.data.close, period=self.p.sma_period)
+        # Moyenne mobile (indicateurs servis par le cache)
+        self.sma = bt_indicator(self.data, 'sma', self.p.sma_period)
         # ATR
-        self.atr = bt.ind.ATR(self.data, period=self.p.atr_period)
+        self.atr = bt_indicator(self.data, 'atr', self.p.atr_period)
         # ADX pour tendance
-        self.adx = bt.ind.AverageDirectionalMovementIndex(self.data, period=self.p.adx_period)
+        self.adx = bt_indicator(self.data, 'adx', self.p.adx_period)
         # Volume moyen
-        self.vol_ma = bt.ind.SMA(self.data.volume, period=self.p.vol_period)
+        self.vol_ma = bt_indicator(self.data, 'vol_sma', self.p.vol_period)
         # Bandes ATR
         self.upper = self.sma + self.p.tp2_atr * self.atr
         self.lower = self.sma - self.p.tp2_atr * self.atr
 
         self.order = None
-        self.entry_price = None
-        self.stop_price  = None
-        self.bar_exec    = 0
-        self.scaled      = False
+        # Entrée, stop, plus haut depuis l'entrée, scaling (mis à jour en O(1))
+        self.pos = PositionTracker()
+
+    def notify_order(self, order):
+        # Ordre terminé (exécuté, annulé, rejeté) : on peut de nouveau agir
+        if not order.alive():
+            self.order = None
 
     def next(self):
         # Attendre assez de données
@@ -52,7 +59,7 @@ class EnhancedBreakoutStrategy(bt.Strategy):
             return
 
         cash = self.broker.getcash()
-        size = (cash * self.p.risk_per_trade) / self.atr[0]
+        size = atr_size(cash, self.p.risk_per_trade, self.atr[0])
 
         # Conditions d'entrée
         if not self.position:
@@ -62,33 +69,31 @@ class EnhancedBreakoutStrategy(bt.Strategy):
             if cond_trend and cond_vol and cond_price:
                 # Entrée full position
                 self.order = self.buy(size=size)
-                self.entry_price = self.data.close[0]
-                self.stop_price  = self.entry_price - self.atr[0]
-                self.bar_exec    = len(self)
-                self.scaled      = False
+                entry = self.data.close[0]
+                self.pos.open(len(self), entry, entry - self.atr[0], peak=self.data.high[0])
         else:
-            days_held = len(self) - self.bar_exec
+            pos       = self.pos
+            days_held = pos.days_held(len(self))
             price     = self.data.close[0]
+            # Plus haut depuis la barre du signal, tenu à jour barre par barre
+            pos.mark(self.data.high[0])
 
             # 1) Partial scaling à +1×ATR
-            if not self.scaled and price >= self.entry_price + self.p.tp1_atr * self.atr[0]:
+            if not pos.scaled and price >= pos.entry_price + self.p.tp1_atr * self.atr[0]:
                 # Fermer 50% de la position
                 self.close(size=self.position.size * 0.5)
-                self.scaled = True
+                pos.scale_out()
 
             # 2) Sortie totale à +2×ATR
-            elif price >= self.entry_price + self.p.tp2_atr * self.atr[0]:
+            elif price >= pos.entry_price + self.p.tp2_atr * self.atr[0]:
                 self.order = self.close()
 
             # 3) Trailing stop sur plus haut depuis entrée moins 1×ATR
-            else:
-                high_since = max(self.data.high.get(size=days_held+1))
-                trail_stop = high_since - self.atr[0]
-                if price < trail_stop:
-                    self.order = self.close()
+            elif price < pos.trail_stop(self.atr[0]):
+                self.order = self.close()
 
             # 4) Stop-loss initial
-            if self.order is None and price < self.stop_price:
+            if self.order is None and pos.stopped(price):
                 self.order = self.close()
 
             # 5) Time-stop
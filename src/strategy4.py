@@ -1,5 +1,9 @@
 import backtrader as bt
 
+from bt_indicators import bt_indicator
+from position_tracker import PositionTracker
+from risk import atr_size
+
 class RegimeAwareBreakoutStrategy(bt.Strategy):
     """
     • Trade only if price > SMA200 (bull); liquidate if price < SMA200 (bear).
@@ -18,17 +22,19 @@ class RegimeAwareBreakoutStrategy(bt.Strategy):
 
     def __init__(self):
         # Long‐term trend filter
-        self.sma_long   = bt.ind.SMA(self.data.close, period=self.p.sma_long)
-        # ATR breakout channel
-        self.sma_short  = bt.ind.SMA(self.data.close, period=self.p.sma_short)
-        self.atr        = bt.ind.ATR(self.data, period=self.p.atr_period)
+        self.sma_long   = bt_indicator(self.data, 'sma', self.p.sma_long)
+        # ATR breakout channel (indicators served by the shared cache)
+        self.sma_short  = bt_indicator(self.data, 'sma', self.p.sma_short)
+        self.atr        = bt_indicator(self.data, 'atr', self.p.atr_period)
         self.upper      = self.sma_short + self.atr
-        # State
+        # State (entry, stop and running peak close, updated in O(1))
         self.order      = None
-        self.entry_price= None
-        self.stop_price = None
-        self.bar_exec   = 0
-        self.peak_price = None
+        self.pos        = PositionTracker()
+
+    def notify_order(self, order):
+        # Ordre terminé (exécuté, annulé, rejeté) : on peut de nouveau agir
+        if not order.alive():
+            self.order = None
 
     def next(self):
         price = self.data.close[0]
@@ -46,28 +52,25 @@ class RegimeAwareBreakoutStrategy(bt.Strategy):
         cash = self.broker.getcash()
         # Dynamic sizing: 2% in bull, else 0
         risk_pct = self.p.risk_bull
-        size = (cash * risk_pct) / self.atr[0] if self.atr[0] > 0 else 0
+        size = atr_size(cash, risk_pct, self.atr[0])
 
         # --- Entry: breakout above short‑term channel
         if not self.position and price > self.upper[0] and size>0:
-            self.order       = self.buy(size=size)
-            self.entry_price = price
-            self.stop_price  = price - self.atr[0]
-            self.bar_exec    = len(self)
-            self.peak_price  = price
+            self.order = self.buy(size=size)
+            self.pos.open(len(self), price, price - self.atr[0])
 
         # --- Exit logic
         elif self.position:
-            days_held = len(self) - self.bar_exec
+            days_held = self.pos.days_held(len(self))
             # Update peak
-            self.peak_price = max(self.peak_price, price)
+            self.pos.mark(price)
 
             # 1) Trailing stop at 1×ATR off highest high
-            if price < (self.peak_price - self.atr[0]):
+            if price < self.pos.trail_stop(self.atr[0]):
                 self.order = self.close()
 
             # 2) Initial stop‑loss
-            elif price < self.stop_price:
+            elif self.pos.stopped(price):
                 self.order = self.close()
 
             # 3) Time‑stop
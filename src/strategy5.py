@@ -1,10 +1,12 @@
 import backtrader as bt
 
+from strategy_rebalance import order_target_weights
+
 class DynamicSafeRebalance(bt.Strategy):
     """
     Portefeuille momentum hebdo enrichi :
     • Actifs risqués + actif refuge (paramétrable)
-    • Allocation dynamique : poids ∝ rendement / volatilité sur lookback
+    • Allocation dynamique : poids ∝ rendement / volatilité (propre à chaque actif)
     • Rebalance tous les rebalance_period jours
     • Stop‑loss global : si drawdown > threshold, 100% en actif refuge
     """
@@ -20,9 +22,6 @@ class DynamicSafeRebalance(bt.Strategy):
         self.last_bar   = None
         self.peak_value = None
 
-        # Indicateur de volatilité sur vols lookback
-        self.stddev = bt.ind.StdDev(self.data.close, period=self.p.vol_lookback)
-
         # Identification des feeds risqués et du refuge
         self.risky_data = []
         self.refuge_data = None
@@ -36,6 +35,11 @@ class DynamicSafeRebalance(bt.Strategy):
         # Si l'actif refuge introuvable, on prend le dernier feed
         if self.refuge_data is None and self.datas:
             self.refuge_data = self.datas[-1]
+            self.risky_data = self.datas[:-1]
+
+        # Volatilité de chaque actif risqué : écart-type des rendements journaliers
+        self.vols = [bt.ind.StdDev(bt.ind.PctChange(d.close, period=1), period=self.p.vol_lookback)
+                     for d in self.risky_data]
 
     def next(self):
         # Update peak value
@@ -46,9 +50,7 @@ class DynamicSafeRebalance(bt.Strategy):
         # Global stop-loss drawdown
         if self.peak_value and (self.peak_value - value) / self.peak_value > self.p.stoploss_pct:
             # Passer 100% en refuge
-            for d in self.risky_data:
-                self.order_target_percent(d, target=0.0)
-            self.order_target_percent(self.refuge_data, target=1.0)
+            order_target_weights(self, [(d, 0.0) for d in self.risky_data] + [(self.refuge_data, 1.0)])
             return
 
         # Attendre assez de données
@@ -63,13 +65,13 @@ class DynamicSafeRebalance(bt.Strategy):
         # Calcul rendements et volatilité
         returns = []
         vols    = []
-        for d in self.risky_data:
+        for d, vol in zip(self.risky_data, self.vols):
             past = d.close[-self.p.lookback_days]
             now  = d.close[0]
             r = max((now / past) - 1.0, 0.0)
             returns.append(r)
 
-            v = self.stddev[0]
+            v = vol[0]
             vols.append(v if v > 0 else 1e-6)
 
         # Poids dynamiques
@@ -78,15 +80,12 @@ class DynamicSafeRebalance(bt.Strategy):
 
         if total_w <= 0:
             # tout en refuge
-            for d in self.risky_data:
-                self.order_target_percent(d, target=0.0)
-            self.order_target_percent(self.refuge_data, target=1.0)
+            targets = [(d, 0.0) for d in self.risky_data] + [(self.refuge_data, 1.0)]
         else:
-            # appliquer poids aux risqués
-            for d, w in zip(self.risky_data, weighted):
-                self.order_target_percent(d, target=(w/total_w))
-            # et rester 0% refuge
-            self.order_target_percent(self.refuge_data, target=0.0)
+            # poids aux risqués, et rester 0% refuge
+            targets = [(d, w/total_w) for d, w in zip(self.risky_data, weighted)] + [(self.refuge_data, 0.0)]
+        # Ventes avant achats : sinon les achats sont rejetés faute de cash
+        order_target_weights(self, targets)
 
         self.last_bar = len(self)
 
@@ -1,5 +1,21 @@
 import backtrader as bt
 
+
+def order_target_weights(strategy, targets):
+    """
+    order_target_percent sur plusieurs actifs, réductions d'abord : le broker
+    contrôle le cash ordre par ordre dans l'ordre de soumission, un achat passé
+    avant les ventes qui le financent serait rejeté (marge).
+    targets : [(data, poids)] ; l'ordre est conservé dans chaque groupe.
+    """
+    value = strategy.broker.getvalue()
+    current = [strategy.broker.getvalue(datas=[d]) for d, _ in targets]
+    cuts = [(d, w) for (d, w), cur in zip(targets, current) if w * value < cur]
+    adds = [(d, w) for (d, w), cur in zip(targets, current) if not w * value < cur]
+    for d, w in cuts + adds:
+        strategy.order_target_percent(d, target=w)
+
+
 class WeeklyMomentumRebalance(bt.Strategy):
     """
     Portefeuille momentum rééquilibré tous les rebalance_period jours :
@@ -39,14 +55,12 @@ class WeeklyMomentumRebalance(bt.Strategy):
         total_pos = sum(rets)
         # Si aucun rendement positif, mettre tout en cash
         if total_pos == 0:
-            for d in self.datas:
-                self.order_target_percent(d, target=0.0)
+            order_target_weights(self, [(d, 0.0) for d in self.datas])
             self.last_bar = len(self)
             return
 
-        # Sinon, rééquilibrer selon les poids ∝ rendement
-        for d, r in zip(self.datas, rets):
-            self.order_target_percent(d, target=(r/total_pos))
+        # Sinon, rééquilibrer selon les poids ∝ rendement (ventes avant achats)
+        order_target_weights(self, [(d, r/total_pos) for d, r in zip(self.datas, rets)])
 
         # Mémoriser le bar de rebalance
         self.last_bar = len(self)
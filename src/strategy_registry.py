@@ -0,0 +1,192 @@
+"""
+Registre des stratégies pour l'app : découverte et schéma des paramètres sans
+importer backtrader ni les modules de stratégie.
+
+• modules src/strategy*.py lus en AST : classes dérivées de bt.Strategy (ou
+  d'une stratégie déjà trouvée), valeurs littérales de leurs `params`
+• stratégie de portefeuille (rééquilibrage) : la classe lit self.datas
+• NUMPY_ENGINES : moteur NumPy qui reproduit la stratégie (ou un parent),
+  pour choisir le moteur sans importer engines / vector_engine / panel_engine
+• SLIDERS : libellé et bornes du curseur de l'app pour les paramètres exposés
+  (les autres gardent leur valeur par défaut)
+• load(spec) importe le module à la 1re sélection ; la classe reste en cache
+  dans ce module, donc d'un rerun Streamlit à l'autre
+"""
+import ast
+import glob
+import importlib
+import os
+from typing import Dict, NamedTuple, Optional
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class Slider(NamedTuple):
+    """Curseur en unités affichées : valeur du paramètre = valeur affichée / scale."""
+    label: str
+    lo: float
+    hi: float
+    step: float
+    scale: float = 1
+
+
+class Param(NamedTuple):
+    name: str
+    default: object
+    slider: Optional[Slider] = None
+
+
+class StrategySpec(NamedTuple):
+    name: str            # classe backtrader
+    label: str           # nom affiché
+    module: str
+    params: tuple        # Param, dans l'ordre de la classe
+    portfolio: bool      # rééquilibrage multi-actifs (tous les feeds à la fois)
+    lineage: tuple = ()  # la classe puis ses parents trouvés dans src/
+
+    def defaults(self) -> dict:
+        return {p.name: p.default for p in self.params}
+
+    def numpy_engine(self) -> Optional[str]:
+        """'vector' ou 'panel' si un moteur NumPy reproduit la stratégie, sinon None."""
+        for name in self.lineage:
+            if name in NUMPY_ENGINES:
+                return NUMPY_ENGINES[name]
+        return None
+
+
+# Libellés affichés, dans l'ordre du sélecteur (les stratégies absentes suivent sous leur nom de classe)
+LABELS = {
+    'MomentumStrategy':            "Momentum",
+    'DonchianBreakoutStrategy':    "Donchian Breakout",
+    'EnhancedBreakoutStrategy':    "Enhanced Breakout",
+    'RegimeAwareBreakoutStrategy': "Regime‑Aware Breakout",
+    'WeeklyMomentumRebalance':     "Weekly Rebalance",
+    'DynamicSafeRebalance':        "Dynamic Safe Rebalance",
+}
+
+# Clés de vector_engine.MACHINES et de panel_engine.PORTFOLIOS (vérifié par les tests)
+NUMPY_ENGINES = {
+    'MomentumStrategy':            'vector',
+    'DonchianBreakoutStrategy':    'vector',
+    'EnhancedBreakoutStrategy':    'vector',
+    'RegimeAwareBreakoutStrategy': 'vector',
+    'WeeklyMomentumRebalance':     'panel',
+    'DynamicSafeRebalance':        'panel',
+}
+
+# Stratégies de référence des benchmarks, pas proposées dans l'app (le buy & hold y est déjà tracé)
+HIDDEN = {'BuyHoldStrategy'}
+
+SLIDERS = {
+    # Rééquilibrages
+    'lookback_days':    Slider("Fenêtre rendement (jours)", 1, 63, 1),
+    'rebalance_period': Slider("Fréquence rebalance (jours)", 1, 63, 1),
+    'vol_lookback':     Slider("Fenêtre vol (jours)", 5, 63, 1),
+    'stoploss_pct':     Slider("Stop‑loss drawdown (%)", 1, 20, 1, 100),
+    # Mono-actif
+    'ema_fast':         Slider("EMA rapide", 5, 50, 1),
+    'ema_slow':         Slider("EMA lente", 20, 200, 5),
+    'rsi_period':       Slider("Période RSI", 5, 30, 1),
+    'rsi_buy':          Slider("RSI d'achat", 50, 70, 1),
+    'rsi_sell':         Slider("RSI de vente", 30, 50, 1),
+    'donchian_period':  Slider("Canal Donchian (jours)", 5, 60, 1),
+    'sma_period':       Slider("SMA des bandes", 10, 50, 1),
+    'sma_short':        Slider("SMA courte", 10, 50, 1),
+    'sma_long':         Slider("SMA longue (régime)", 100, 300, 10),
+    'adx_period':       Slider("Période ADX", 5, 30, 1),
+    'trend_adx':        Slider("ADX de tendance", 15, 40, 1),
+    'vol_period':       Slider("Volume moyen (jours)", 10, 50, 1),
+    'vol_multiplier':   Slider("Multiple de volume", 1.0, 3.0, 0.1),
+    'tp1_atr':          Slider("1er objectif (ATR)", 0.5, 3.0, 0.25),
+    'tp2_atr':          Slider("Bandes / 2e objectif (ATR)", 1.0, 5.0, 0.25),
+    'atr_period':       Slider("Période ATR", 5, 30, 1),
+    'risk_per_trade':   Slider("Risque par trade (%)", 0.25, 5.0, 0.25, 100),
+    'risk_bull':        Slider("Risque en régime haussier (%)", 0.25, 5.0, 0.25, 100),
+    'max_hold_days':    Slider("Durée max de détention (jours)", 5, 60, 1),
+}
+
+
+# --- Découverte (AST) ---
+
+def _params(node: ast.ClassDef) -> Optional[list]:
+    """[(nom, défaut)] de `params = dict(...)` ou `params = (('nom', défaut), ...)` ; None si absent."""
+    for stmt in node.body:
+        if not (isinstance(stmt, ast.Assign) and any(isinstance(t, ast.Name) and t.id == 'params'
+                                                     for t in stmt.targets)):
+            continue
+        value = stmt.value
+        if isinstance(value, ast.Call) and isinstance(value.func, ast.Name) and value.func.id == 'dict':
+            return [(kw.arg, ast.literal_eval(kw.value)) for kw in value.keywords]
+        return [tuple(pair) for pair in ast.literal_eval(value)]
+    return None
+
+
+def _reads_datas(node: ast.ClassDef) -> bool:
+    return any(isinstance(n, ast.Attribute) and n.attr == 'datas' for n in ast.walk(node))
+
+
+def _base_names(node: ast.ClassDef):
+    for base in node.bases:
+        if isinstance(base, ast.Attribute):
+            yield base.attr
+        elif isinstance(base, ast.Name):
+            yield base.id
+
+
+def discover(src_dir: str = SRC_DIR) -> Dict[str, StrategySpec]:
+    """{libellé: StrategySpec} des stratégies de src_dir, sans rien importer."""
+    found = {}  # classe → (module, params, portfolio, lineage)
+    for path in sorted(glob.glob(os.path.join(src_dir, 'strategy*.py'))):
+        module = os.path.splitext(os.path.basename(path))[0]
+        with open(path, encoding='utf-8') as f:
+            tree = ast.parse(f.read(), path)
+        for node in tree.body:
+            if not isinstance(node, ast.ClassDef):
+                continue
+            parents = [found[b] for b in _base_names(node) if b in found]
+            if not parents and 'Strategy' not in _base_names(node):
+                continue
+            # Paramètres hérités puis surchargés, comme la métaclasse de backtrader
+            params = dict(parents[0][1]) if parents else {}
+            params.update(_params(node) or [])
+            found[node.name] = (module, params, _reads_datas(node) or any(p[2] for p in parents),
+                                (node.name,) + (parents[0][3] if parents else ()))
+    order = list(LABELS) + sorted(set(found) - set(LABELS))
+    specs = {}
+    for name in order:
+        if name not in found or name in HIDDEN:
+            continue
+        module, params, portfolio, lineage = found[name]
+        specs[LABELS.get(name, name)] = StrategySpec(
+            name, LABELS.get(name, name), module,
+            tuple(Param(k, v, SLIDERS.get(k)) for k, v in params.items()), portfolio, lineage)
+    return specs
+
+
+_specs = None
+_classes = {}
+
+
+def specs() -> Dict[str, StrategySpec]:
+    """discover() une seule fois par process."""
+    global _specs
+    if _specs is None:
+        _specs = discover()
+    return _specs
+
+
+def load(spec: StrategySpec):
+    """Classe backtrader de la stratégie (module importé à la première demande)."""
+    cls = _classes.get(spec.name)
+    if cls is None:
+        cls = _classes[spec.name] = getattr(importlib.import_module(spec.module), spec.name)
+    return cls
+
+
+if __name__ == "__main__":
+    for label, spec in specs().items():
+        kind = "portefeuille" if spec.portfolio else "mono-actif"
+        print(f"{label} ({spec.module}.{spec.name}, {kind}, moteur NumPy : {spec.numpy_engine() or 'aucun'})")
+        for p in spec.params:
+            print(f"    {p.name} = {p.default!r}" + (f"  [{p.slider.label}]" if p.slider else ""))
@@ -0,0 +1,284 @@
+"""
+Balayage de paramètres (grid search / tirage aléatoire) pour toutes les stratégies.
+
+• l'espace de recherche part des `params` de la classe backtrader
+  (MomentumStrategy.params, DynamicSafeRebalance.params…)
+• les données sont chargées une fois et partagées entre les workers
+  (parallel_runner, mémoire partagée)
+• stratégies mono-actif : moteur vectorisé, indicateurs mémoïsés par ticker dans
+  chaque worker → EMA(20) n'est calculée qu'une fois quelles que soient les
+  autres valeurs (seuils RSI, risque…) ; portefeuille équipondéré comme dans l'app
+• rebalances : moteur panel (matrices dates × actifs, poids vectorisés, même
+  courbe que backtrader) quand tous les actifs cotent les mêmes jours, sinon
+  backtrader ; le panel est construit une fois par worker
+• combinaisons déjà évaluées sur les mêmes données servies par le cache de
+  résultats (result_cache) : relancer un balayage élargi ne calcule que les nouvelles
+• résultats au fil de l'eau : métriques de metrics.py (Sharpe, CAGR, max drawdown,
+  turnover…) et nombre de trades
+
+En script :
+    python src/sweep.py MomentumStrategy SPY QQQ IWM --grid ema_fast=10,20,30 ema_slow=50,100
+    python src/sweep.py DynamicSafeRebalance SPY QQQ GLD --random lookback_days=2:20 stoploss_pct=0.02:0.1 -n 200
+"""
+import argparse
+import itertools
+import random
+from typing import Dict, Iterator, List, Optional
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+
+import parallel_runner as pr
+from data_store import to_epoch_seconds
+from engines import supports_numpy, supports_panel
+from feeds import feed_from_arrays
+from indicator_cache import TickerMemo, fingerprint_bars, get_cache
+from metrics import equity_metrics
+from panel_engine import run_panel
+from price_panel import from_arrays as panel_from_arrays
+from result_cache import Result, get_result_cache, result_key
+from vector_engine import run_bars, strategy_params, trade_count, traded_value
+
+INITIAL_CAPITAL = 100000
+
+
+# --- Espace de recherche ---
+
+def param_space(strat_cls) -> dict:
+    """Paramètres par défaut de la stratégie : {nom: valeur}."""
+    return dict(strat_cls.params._getpairs())
+
+
+def grid(space: Dict[str, list]) -> List[dict]:
+    """Produit cartésien : {'ema_fast': [10, 20], 'ema_slow': [50, 100]} → 4 combinaisons."""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+
+def random_sample(space: dict, n: int, seed: int = 0) -> List[dict]:
+    """
+    n combinaisons distinctes tirées au hasard. Pour chaque paramètre :
+    • liste → choix parmi les valeurs
+    • (lo, hi) → entier si les bornes sont entières, réel uniforme sinon
+    """
+    rng = random.Random(seed)
+
+    def draw(spec):
+        if isinstance(spec, tuple):
+            lo, hi = spec
+            if isinstance(lo, int) and isinstance(hi, int):
+                return rng.randint(lo, hi)
+            return rng.uniform(lo, hi)
+        return rng.choice(spec)
+
+    seen, out = set(), []
+    for _ in range(n * 20):
+        combo = {name: draw(spec) for name, spec in space.items()}
+        key = tuple(combo.values())
+        if key not in seen:
+            seen.add(key)
+            out.append(combo)
+            if len(out) == n:
+                break
+    # Regrouper les combinaisons qui partagent les mêmes premiers paramètres :
+    # un worker reçoit des paquets consécutifs et réutilise ses indicateurs
+    return sorted(out, key=lambda c: tuple(c.values()))
+
+
+# --- Côté worker ---
+
+def _calendar():
+    """Calendrier union de l'univers et position de chaque barre dessus (caché par worker)."""
+    cal = pr.worker_cache.get('calendar')
+    if cal is None:
+        tickers = pr.shared_tickers()
+        stamps = {tic: np.array(pr.shared_bars(tic)[0]) for tic in tickers}
+        union = np.unique(np.concatenate(list(stamps.values())))
+        # Dernière barre connue de chaque ticker à chaque date du calendrier (-1 : pas encore coté)
+        pos = {tic: np.searchsorted(ts, union, side='right') - 1 for tic, ts in stamps.items()}
+        cal = pr.worker_cache['calendar'] = (union, pos)
+    return cal
+
+
+def _bounds(ts: np.ndarray, window) -> tuple:
+    """Indices [lo, hi) des horodatages dans window = (début, fin) inclus, en secondes epoch."""
+    if window is None:
+        return 0, len(ts)
+    return int(np.searchsorted(ts, window[0], 'left')), int(np.searchsorted(ts, window[1], 'right'))
+
+
+def _curve_vector(params: dict, strat_cls, window=None):
+    """
+    Courbe du portefeuille équipondéré (capital 1) sur le calendrier commun, nb
+    de trades et montant échangé.
+    """
+    tickers = pr.shared_tickers()
+    union, pos = _calendar()
+    ulo, uhi = _bounds(union, window)
+    memos = pr.worker_cache.get('memos')
+    if memos is None:
+        # Indicateurs du worker dans le cache LRU borné (clé = empreinte des barres)
+        memos = pr.worker_cache['memos'] = {tic: TickerMemo(get_cache(), fingerprint_bars(*pr.shared_bars(tic)))
+                                           if get_cache() is not None else {} for tic in tickers}
+    share = 1.0 / len(tickers)
+    equity = np.zeros(uhi - ulo)
+    trades, traded = 0, 0.0
+    for tic in tickers:
+        ts, bars = pr.shared_bars(tic)
+        lo, hi = _bounds(ts, window)
+        # Indicateurs calculés une fois sur tout l'historique, seule la fenêtre est tradée
+        values, broker = run_bars(bars, strat_cls, params, 1.0, memos[tic], (lo, hi))
+        p = pos[tic][ulo:uhi] - lo
+        # Valeur reportée sur le calendrier commun (avant la 1re barre : capital initial)
+        equity += np.where(p >= 0, values[np.maximum(p, 0)] if hi > lo else 1.0, 1.0) * share
+        trades += trade_count(broker.fills)
+        traded += traded_value(broker.fills) * share
+    return union[ulo:uhi], equity, trades, traded
+
+
+def _curve_panel(params: dict, strat_cls, cash: float, window=None):
+    """Stratégie de rééquilibrage sur le panel de l'univers (actions entières : vrai capital, courbe ramenée à 1)."""
+    union, _ = _calendar()
+    panel = pr.worker_cache.get('panel')
+    if panel is None:
+        columns = {tic: pr.shared_bars(tic) for tic in pr.shared_tickers()}
+        panel = pr.worker_cache['panel'] = panel_from_arrays(columns, calendar=union)
+    ulo, uhi = _bounds(union, window)
+    values, _, _, trades, traded = run_panel(panel, strat_cls, params, cash, (ulo, uhi))
+    return union[ulo:uhi], values / cash, trades, traded / cash
+
+
+def _curve_backtrader(params: dict, strat_cls, cash: float, window=None):
+    cerebro = bt.Cerebro(stdstats=False)
+    for tic in pr.shared_tickers():
+        # Feed directement sur la mémoire partagée ; buffers convertis une fois par fenêtre
+        ts, bars = pr.shared_bars(tic)
+        lo, hi = _bounds(ts, window)
+        cerebro.adddata(feed_from_arrays(ts[lo:hi], {col: v[lo:hi] for col, v in bars.items()}, tic))
+    cerebro.addstrategy(strat_cls, **params)
+    cerebro.broker.setcash(cash)  # ordres en actions entières : il faut un vrai capital
+    cerebro.addanalyzer(bt.analyzers.TimeReturn, timeframe=bt.TimeFrame.Days, _name='timereturn')
+    cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trades')
+    strat = cerebro.run()[0]
+    rets = pd.Series(strat.analyzers.timereturn.get_analysis()).sort_index().astype(float)
+    trades = strat.analyzers.trades.get_analysis().get('total', {}).get('total', 0)
+    return to_epoch_seconds(pd.DatetimeIndex(rets.index)), (1 + rets).cumprod().to_numpy(), trades, None
+
+
+def curve(params: dict, strat_cls, vector: bool, cash: float, window=None):
+    """
+    (horodatages, courbe de capital partant de 1, nb de trades, montant échangé
+    ou None) d'une combinaison, côté worker, éventuellement restreinte à
+    window = (début, fin) en secondes epoch.
+    Moteur vectorisé : tailles fractionnaires, la courbe ne dépend pas du capital ;
+    moteur panel : actions entières comme backtrader, sur le capital `cash`.
+    """
+    if vector:
+        if supports_panel(strat_cls):
+            return _curve_panel(params, strat_cls, cash, window)
+        return _curve_vector(params, strat_cls, window)
+    return _curve_backtrader(params, strat_cls, cash, window)
+
+
+def _evaluate(params: dict, strat_cls, vector: bool, cash: float) -> dict:
+    _, equity, trades, traded = curve(params, strat_cls, vector, cash)
+    return {**params, **equity_metrics(equity, traded=traded), 'trades': trades}
+
+
+# --- API ---
+
+def sweep(data: Dict[str, pd.DataFrame], strat_cls, combos: List[dict],
+          max_workers: Optional[int] = None, cash: float = INITIAL_CAPITAL) -> Iterator[dict]:
+    """
+    Évalue chaque combinaison (dict de paramètres, complété par les valeurs par
+    défaut) sur tout l'univers. Générateur : une ligne par combinaison, dans l'ordre.
+    """
+    for combo in combos:
+        strategy_params(strat_cls, combo)  # paramètre inconnu → ValueError tout de suite
+    vector = supports_numpy(strat_cls, data)
+    cache = get_result_cache()
+    if cache is None:
+        yield from pr.imap_shared(data, _evaluate, combos, strat_cls, vector, cash, max_workers=max_workers)
+        return
+    engine = ('panel' if supports_panel(strat_cls) else 'vector') if vector else 'backtrader'
+    keys = [result_key(strat_cls, combo, data, engine, cash=cash, kind='sweep') for combo in combos]
+    rows = [cache.get(key) for key in keys]
+    todo = [combo for combo, row in zip(combos, rows) if row is None]
+    fresh = pr.imap_shared(data, _evaluate, todo, strat_cls, vector, cash, max_workers=max_workers) if todo else None
+    for combo, key, row in zip(combos, keys, rows):
+        if row is None:
+            row = next(fresh)
+            stats = {k: v for k, v in row.items() if k not in combo}
+            cache.put(key, Result(np.empty(0), np.empty((0, 0)), [], {'stats': stats}))
+            yield row
+        else:
+            yield {**combo, **row.meta['stats']}
+
+
+def sweep_table(data: Dict[str, pd.DataFrame], strat_cls, combos: List[dict],
+                max_workers: Optional[int] = None, cash: float = INITIAL_CAPITAL,
+                sort_by: str = 'sharpe') -> pd.DataFrame:
+    """Tableau complet du balayage, trié par `sort_by` décroissant."""
+    rows = list(sweep(data, strat_cls, combos, max_workers, cash))
+    return pd.DataFrame(rows).sort_values(sort_by, ascending=False, na_position='last').reset_index(drop=True)
+
+
+def parse_space(specs: List[str], defaults: dict, ranges: bool) -> dict:
+    """'nom=v1,v2' (liste) ou 'nom=lo:hi' (plage, tirage aléatoire)."""
+    space = {}
+    for spec in specs:
+        name, _, values = spec.partition('=')
+        if name not in defaults:
+            raise SystemExit(f"Paramètre inconnu : {name} (choix : {', '.join(defaults)})")
+        cast = type(defaults[name])
+        if ranges and ':' in values:
+            lo, hi = values.split(':')
+            space[name] = (cast(lo), cast(hi))
+        else:
+            space[name] = [cast(v) for v in values.split(',')]
+    return space
+
+
+if __name__ == "__main__":
+    import time
+
+    import strategy, strategy2, strategy3, strategy4, strategy5, strategy_rebalance
+    from data_loader import load_many
+
+    classes = {cls.__name__: cls for cls in (strategy.MomentumStrategy,
+                                             strategy2.DonchianBreakoutStrategy,
+                                             strategy3.EnhancedBreakoutStrategy,
+                                             strategy4.RegimeAwareBreakoutStrategy,
+                                             strategy_rebalance.WeeklyMomentumRebalance,
+                                             strategy5.DynamicSafeRebalance)}
+    parser = argparse.ArgumentParser(description="Balayage de paramètres")
+    parser.add_argument('strategy', choices=sorted(classes))
+    parser.add_argument('tickers', nargs='+')
+    parser.add_argument('--period', default='2y')
+    parser.add_argument('--grid', nargs='*', default=[], metavar='NOM=V1,V2')
+    parser.add_argument('--random', nargs='*', default=[], metavar='NOM=LO:HI')
+    parser.add_argument('-n', '--samples', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--out', default=None, help="CSV écrit au fil de l'eau")
+    args = parser.parse_args()
+
+    strat_cls = classes[args.strategy]
+    defaults = param_space(strat_cls)
+    if args.random:
+        combos = random_sample(parse_space(args.random, defaults, True), args.samples, args.seed)
+    else:
+        combos = grid(parse_space(args.grid, defaults, False))
+    data = load_many(args.tickers, period=args.period)
+
+    t0 = time.perf_counter()
+    rows = []
+    for k, row in enumerate(sweep(data, strat_cls, combos, args.workers), start=1):
+        rows.append(row)
+        if args.out:
+            pd.DataFrame([row]).to_csv(args.out, mode='a' if k > 1 else 'w', header=k == 1, index=False)
+        if k % 50 == 0 or k == len(combos):
+            print(f"{k}/{len(combos)} combinaisons ({time.perf_counter() - t0:.1f}s)")
+    table = pd.DataFrame(rows).sort_values('sharpe', ascending=False)
+    print(table.head(20).to_string(index=False))
@@ -0,0 +1,765 @@
+"""
+Moteur de backtest vectorisé pour les stratégies mono-actif
+(Momentum, Donchian, Enhanced Breakout, Regime-Aware Breakout).
+
+• les indicateurs sont calculés une fois en NumPy (vector_indicators)
+• la logique de chaque stratégie est une petite machine à états qui ne
+  parcourt barre par barre que les périodes en position ; hors position on
+  saute directement au prochain signal d'entrée candidat
+• le broker reproduit le BackBroker de backtrader (ordres au marché exécutés
+  à l'ouverture suivante, contrôle de cash à la soumission puis à l'exécution,
+  pas de commission) : mêmes ordres, même courbe de valeur, mêmes TimeReturn
+• mode portefeuille (run_portfolio) : tous les actifs en un seul passage sur
+  le calendrier commun, cash partagé, comme multi_asset.portfolio_strategy
+"""
+import heapq
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+import vector_indicators as vi
+from indicators import (ADXStream, ATRStream, CrossOverStream, DelayStream, EMAStream, HighestStream,
+                        LowestStream, RSIStream, SMAStream)
+from instrumentation import phase
+from position_tracker import PositionTracker
+from risk import RiskBook, RiskLimits, atr_size
+
+VectorResult = namedtuple('VectorResult', ['returns', 'equity', 'fills'])
+PortfolioResult = namedtuple('PortfolioResult', ['returns', 'equity', 'fills', 'traded'])
+
+
+def _update(size, price, delta, exec_price):
+    """Position.update de backtrader : (taille, prix moyen, ouvert, fermé)."""
+    new = size + delta
+    if not new:
+        return new, 0.0, 0, delta
+    if not size:
+        return new, exec_price, delta, 0
+    if size > 0:
+        if delta > 0:
+            return new, (price * size + delta * exec_price) / new, delta, 0
+        if new > 0:
+            return new, price, 0, delta
+        return new, exec_price, new, -size
+    if delta < 0:
+        return new, (price * size + delta * exec_price) / new, delta, 0
+    if new < 0:
+        return new, price, 0, delta
+    return new, exec_price, new, -size
+
+
+class Broker:
+    """
+    BackBroker backtrader réduit à un actif (actions, shortcash, sans commission).
+    Les ordres soumis à la barre i sont contrôlés au cours de clôture de création
+    puis exécutés à l'ouverture de la barre i+1.
+    """
+    __slots__ = ('cash', 'size', 'price', 'pending', 'fills', 'states')
+
+    def __init__(self, cash: float):
+        self.cash = cash
+        self.size = 0.0
+        self.price = 0.0
+        self.pending = []
+        self.fills = []
+        # (barre, cash, taille, prix moyen) après chaque exécution : l'état est
+        # constant entre deux exécutions, la valorisation se fait en bloc
+        self.states = [(0, cash, 0.0, 0.0)]
+
+    def buy(self, size, created_price):
+        if size:
+            self.pending.append((size, created_price))
+
+    def close(self, created_price, size=None):
+        possize = self.size
+        size = abs(size if size is not None else possize)
+        if possize > 0:
+            self.pending.append((-size, created_price))
+        elif possize < 0:
+            self.pending.append((size, created_price))
+
+    def execute(self, i, price):
+        # 1. check_submitted : pseudo-exécution au prix de création, cash cumulé
+        cash, psize, pprice = self.cash, self.size, self.price
+        accepted = []
+        for size, created in self.pending:
+            psize, pprice, opened, closed = _update(psize, pprice, size, created)
+            if closed:
+                cash += -closed * created
+            if opened:
+                cash -= opened * created
+            if cash >= 0.0:
+                accepted.append(size)
+        self.pending = []
+
+        # 2. exécution réelle à l'ouverture
+        for size in accepted:
+            pprice_orig = self.price
+            _, _, opened, closed = _update(self.size, self.price, size, price)
+            pnl = -closed * (price - pprice_orig) * 1.0
+            cash = self.cash
+            if closed:
+                cash += -closed * pprice_orig + pnl
+                self.cash = cash
+            if opened:
+                cash -= opened * price
+                if cash < 0.0:
+                    opened = 0  # pas assez de cash : partie ouverture annulée
+                else:
+                    self.cash = cash
+            execsize = closed + opened
+            if execsize:
+                self.size, self.price, _, _ = _update(self.size, self.price, execsize, price)
+                self.fills.append((i, execsize, price))
+        if self.states[-1][0] == i:
+            self.states.pop()
+        self.states.append((i, self.cash, self.size, self.price))
+
+    def values(self, close: np.ndarray, offset: int = 0) -> np.ndarray:
+        """
+        Valeur du portefeuille à chaque clôture (close commence à la barre
+        `offset`), mêmes opérations flottantes que BackBroker.getvalue
+        (position longue : cash + (dvalue - pnl) + pnl).
+        """
+        bars, cash, size, price = (np.array(col) for col in zip(*self.states))
+        lengths = np.diff(np.append(bars - offset, len(close)))
+        cash, size, price = (np.repeat(a, lengths) for a in (cash, size, price))
+        dvalue = size * close
+        unrealized = size * (close - price)
+        return np.where(dvalue > 0, cash + ((dvalue - unrealized) + unrealized), cash + dvalue)
+
+
+class PortfolioBroker:
+    """
+    BackBroker backtrader à plusieurs actifs : cash commun, une position par
+    actif. Les ordres soumis à un pas du calendrier commun sont contrôlés au pas
+    suivant (cash cumulé dans l'ordre de soumission, tous actifs confondus), puis
+    chacun s'exécute à l'ouverture de la prochaine barre de son actif.
+    """
+    __slots__ = ('cash', 'sizes', 'prices', 'submitted', 'pending', 'open_orders',
+                 'fills', 'cash_states', 'positions', 'book')
+
+    def __init__(self, cash: float, n: int, limits: RiskLimits = None):
+        self.cash = cash
+        self.sizes = [0.0] * n
+        self.prices = [0.0] * n
+        self.submitted = []         # (actif, taille, prix de création), pas encore contrôlés
+        self.pending = []           # (actif, taille) acceptés, en attente d'une barre de l'actif
+        self.open_orders = [0] * n  # ordres soumis ou en attente, par actif
+        self.fills = []             # (pas, actif, taille, prix)
+        # Comme Broker.states : cash après chaque pas avec exécutions, et
+        # (pas, taille, prix moyen) après chaque changement de position
+        self.cash_states = [(0, cash)]
+        self.positions = [[(0, 0.0, 0.0)] for _ in range(n)]
+        # Plafonds d'exposition (risk.RiskBook), comme multi_asset avec risk_limits
+        self.book = RiskBook(n, limits) if limits else None
+
+    def view(self, asset: int) -> '_AssetBroker':
+        return _AssetBroker(self, asset)
+
+    def submit(self, asset, size, created_price):
+        self.submitted.append((asset, size, created_price))
+        self.open_orders[asset] += 1
+
+    def check_submitted(self):
+        cash = self.cash
+        clones = {}
+        for asset, size, created in self.submitted:
+            psize, pprice = clones.get(asset) or (self.sizes[asset], self.prices[asset])
+            psize, pprice, opened, closed = _update(psize, pprice, size, created)
+            clones[asset] = (psize, pprice)
+            if closed:
+                cash += -closed * created
+            if opened:
+                cash -= opened * created
+            if cash >= 0.0:
+                self.pending.append((asset, size))
+            else:
+                self.open_orders[asset] -= 1  # refusé (marge)
+                if self.book is not None:
+                    self.book.release(asset)
+        self.submitted = []
+
+    def execute(self, step, opens):
+        """Exécute les ordres en attente des actifs qui ont une barre à ce pas (opens : {actif: ouverture})."""
+        waiting = []
+        for asset, size in self.pending:
+            price = opens.get(asset)
+            if price is None:
+                waiting.append((asset, size))
+                continue
+            self.open_orders[asset] -= 1
+            if self.book is not None:
+                self.book.release(asset)
+            pprice_orig = self.prices[asset]
+            _, _, opened, closed = _update(self.sizes[asset], pprice_orig, size, price)
+            pnl = -closed * (price - pprice_orig) * 1.0
+            cash = self.cash
+            if closed:
+                cash += -closed * pprice_orig + pnl
+                self.cash = cash
+            if opened:
+                cash -= opened * price
+                if cash < 0.0:
+                    opened = 0
+                else:
+                    self.cash = cash
+            execsize = closed + opened
+            if execsize:
+                new, avg, _, _ = _update(self.sizes[asset], pprice_orig, execsize, price)
+                self.sizes[asset], self.prices[asset] = new, avg
+                self.fills.append((step, asset, execsize, price))
+                states = self.positions[asset]
+                if states[-1][0] == step:
+                    states.pop()
+                states.append((step, new, avg))
+        self.pending = waiting
+        if self.cash_states[-1][0] == step:
+            self.cash_states.pop()
+        self.cash_states.append((step, self.cash))
+
+    def values(self, n_steps: int, closes) -> np.ndarray:
+        """
+        Valeur du portefeuille à chaque pas ; closes(actif) : dernière clôture
+        connue de l'actif à chaque pas. Positions additionnées dans l'ordre des
+        actifs, avec les mêmes opérations que BackBroker._get_value.
+        """
+        def expand(states):
+            bars = np.array([s[0] for s in states])
+            lengths = np.diff(np.append(bars, n_steps))
+            return [np.repeat(np.array([s[k] for s in states]), lengths) for k in range(1, len(states[0]))]
+
+        (cash,) = expand(self.cash_states)
+        held = np.zeros(n_steps)
+        for asset, states in enumerate(self.positions):
+            if len(states) == 1:
+                continue  # jamais tradé
+            size, price = expand(states)
+            close = closes(asset)
+            dvalue = size * close
+            unrealized = size * (close - price)
+            held = np.where(dvalue > 0, (held + (dvalue - unrealized)) + unrealized, held + dvalue)
+        return cash + held
+
+
+class _AssetBroker:
+    """Vue d'un actif du PortfolioBroker, avec l'interface de Broker utilisée par les machines."""
+    __slots__ = ('pb', 'asset')
+
+    def __init__(self, pb: PortfolioBroker, asset: int):
+        self.pb = pb
+        self.asset = asset
+
+    @property
+    def cash(self):
+        return self.pb.cash
+
+    @property
+    def size(self):
+        return self.pb.sizes[self.asset]
+
+    def buy(self, size, created_price):
+        book = self.pb.book
+        if book is not None and size:
+            size = book.cap(self.asset, size, created_price, self.pb.cash)
+            if size:
+                book.commit(self.asset, size, created_price)
+        if size:
+            self.pb.submit(self.asset, size, created_price)
+
+    def close(self, created_price, size=None):
+        possize = self.pb.sizes[self.asset]
+        size = abs(size if size is not None else possize)
+        if possize > 0:
+            self.pb.submit(self.asset, -size, created_price)
+        elif possize < 0:
+            self.pb.submit(self.asset, size, created_price)
+
+
+class _Machine:
+    """Base des machines à états : une par stratégie backtrader."""
+    __slots__ = ('p', 'b', 'open', 'high', 'low', 'close', 'volume', 'start', 'ind', 'memo')
+
+    def __init__(self, p, bars, broker, memo=None):
+        self.p = p
+        self.b = broker
+        self.memo = memo
+        self.open, self.high, self.low, self.close, self.volume = (
+            bars[k] for k in ('Open', 'High', 'Low', 'Close', 'Volume'))
+        self.ind = self.indicators(bars)
+        # 1re barre où backtrader appelle next() : tous les indicateurs sont définis
+        self.start = max(vi._first_valid(a) for a in self.ind.values())
+
+    def cached(self, key: tuple, fn, *args) -> np.ndarray:
+        """
+        fn(*args), partagé via `memo` ({clé: tableau}) entre les runs d'un même
+        ticker : un balayage de paramètres ne recalcule pas EMA(20) à chaque combinaison.
+        """
+        if self.memo is None:
+            return fn(*args)
+        out = self.memo.get(key)
+        if out is None:
+            out = self.memo[key] = fn(*args)
+        return out
+
+    def indicators(self, bars):
+        raise NotImplementedError
+
+    def entry_mask(self):
+        """Barres où une entrée est possible (conditions sans état)."""
+        raise NotImplementedError
+
+    def step(self, i):
+        raise NotImplementedError
+
+
+class MomentumMachine(_Machine):
+    __slots__ = ('stop_price', '_c', '_cross', '_rsi', '_atr')
+
+    def indicators(self, bars):
+        p, close = self.p, bars['Close']
+        ind = dict(
+            ema_fast=self.cached(('ema', p['ema_fast']), vi.ema, close, p['ema_fast']),
+            ema_slow=self.cached(('ema', p['ema_slow']), vi.ema, close, p['ema_slow']),
+            rsi=self.cached(('rsi', p['rsi_period']), vi.rsi, close, p['rsi_period']),
+            atr=self.cached(('atr', p['atr_period']), vi.atr, bars['High'], bars['Low'], close, p['atr_period']),
+        )
+        ind['crossover'] = self.cached(('crossover', 'ema', p['ema_fast'], p['ema_slow']),
+                                       vi.crossover, ind['ema_fast'], ind['ema_slow'])
+        self.stop_price = None
+        self._c, self._cross, self._rsi, self._atr = (
+            a.tolist() for a in (close, ind['crossover'], ind['rsi'], ind['atr']))
+        return ind
+
+    def entry_mask(self):
+        with np.errstate(invalid='ignore'):
+            return (self.ind['crossover'] > 0) & (self.ind['rsi'] > self.p['rsi_buy'])
+
+    def step(self, i):
+        b, p = self.b, self.p
+        c, atr = self._c[i], self._atr[i]
+        size = atr_size(b.cash, p['risk_per_trade'], atr)
+        if not b.size:
+            if self._cross[i] > 0 and self._rsi[i] > p['rsi_buy']:
+                b.buy(size, c)
+                self.stop_price = c - atr
+        else:
+            if c < self.stop_price:
+                b.close(c)
+            elif self._cross[i] < 0 or self._rsi[i] < p['rsi_sell']:
+                b.close(c)
+
+
+class DonchianMachine(_Machine):
+    __slots__ = ('pos', '_c', '_up', '_down', '_atr')
+
+    def indicators(self, bars):
+        p = self.p
+        ind = dict(
+            dc_up=self.cached(('dc_up', p['donchian_period']),
+                              lambda n: vi.highest(vi.delay(bars['High']), n), p['donchian_period']),
+            dc_down=self.cached(('dc_down', p['donchian_period']),
+                                lambda n: vi.lowest(vi.delay(bars['Low']), n), p['donchian_period']),
+            atr=self.cached(('atr', p['atr_period']),
+                            vi.atr, bars['High'], bars['Low'], bars['Close'], p['atr_period']),
+        )
+        self.pos = PositionTracker()
+        self._c, self._up, self._down, self._atr = (
+            a.tolist() for a in (bars['Close'], ind['dc_up'], ind['dc_down'], ind['atr']))
+        return ind
+
+    def entry_mask(self):
+        with np.errstate(invalid='ignore'):
+            return self.close > self.ind['dc_up']
+
+    def step(self, i):
+        b, p = self.b, self.p
+        if i + 1 <= p['donchian_period']:
+            return
+        c, atr = self._c[i], self._atr[i]
+        size = atr_size(b.cash, p['risk_per_trade'], atr)
+        if not b.size and c > self._up[i]:
+            b.buy(size, c)
+            self.pos.open(i + 1, c, c - atr)
+        elif b.size:
+            days_held = self.pos.days_held(i + 1)
+            if c < self._down[i]:
+                b.close(c)
+            elif self.pos.stopped(c):
+                b.close(c)
+            elif days_held >= p['max_hold_days']:
+                b.close(c)
+
+
+class EnhancedBreakoutMachine(_Machine):
+    __slots__ = ('pos', 'min_len', '_c', '_h', '_v', '_atr', '_adx', '_volma', '_upper')
+
+    def indicators(self, bars):
+        p = self.p
+        h, l, c = bars['High'], bars['Low'], bars['Close']
+        ind = dict(
+            sma=self.cached(('sma', p['sma_period']), vi.sma, c, p['sma_period']),
+            atr=self.cached(('atr', p['atr_period']), vi.atr, h, l, c, p['atr_period']),
+            vol_ma=self.cached(('vol_sma', p['vol_period']), vi.sma, bars['Volume'], p['vol_period']),
+        )
+        # ADX réutilise l'ATR de même période
+        av_tr = ind['atr'] if p['adx_period'] == p['atr_period'] else None
+        ind['adx'] = self.cached(('adx', p['adx_period']), vi.adx, h, l, c, p['adx_period'], av_tr)
+        ind['upper'] = ind['sma'] + p['tp2_atr'] * ind['atr']
+        ind['lower'] = ind['sma'] - p['tp2_atr'] * ind['atr']
+        self.pos = PositionTracker()
+        self.min_len = max(p['sma_period'], p['atr_period'], p['adx_period'], p['vol_period'])
+        self._c, self._h, self._v, self._atr, self._adx, self._volma, self._upper = (
+            a.tolist() for a in (c, h, bars['Volume'], ind['atr'], ind['adx'], ind['vol_ma'], ind['upper']))
+        return ind
+
+    def entry_mask(self):
+        p, ind = self.p, self.ind
+        with np.errstate(invalid='ignore'):
+            return ((ind['adx'] > p['trend_adx'])
+                    & (self.volume > p['vol_multiplier'] * ind['vol_ma'])
+                    & (self.close > ind['upper']))
+
+    def step(self, i):
+        b, p = self.b, self.p
+        if i + 1 < self.min_len:
+            return
+        atr = self._atr[i]
+        size = atr_size(b.cash, p['risk_per_trade'], atr)
+        if not b.size:
+            cond_trend = self._adx[i] > p['trend_adx']
+            cond_vol = self._v[i] > p['vol_multiplier'] * self._volma[i]
+            cond_price = self._c[i] > self._upper[i]
+            if cond_trend and cond_vol and cond_price:
+                b.buy(size, self._c[i])
+                self.pos.open(i + 1, self._c[i], self._c[i] - atr, peak=self._h[i])
+        else:
+            pos = self.pos
+            days_held = pos.days_held(i + 1)
+            price = self._c[i]
+            pos.mark(self._h[i])
+            order = False
+            if not pos.scaled and price >= pos.entry_price + p['tp1_atr'] * atr:
+                b.close(price, size=b.size * 0.5)
+                pos.scale_out()
+            elif price >= pos.entry_price + p['tp2_atr'] * atr:
+                b.close(price)
+                order = True
+            elif price < pos.trail_stop(atr):
+                b.close(price)
+                order = True
+            if not order and pos.stopped(price):
+                b.close(price)
+                order = True
+            if not order and days_held >= p['max_hold_days']:
+                b.close(price)
+
+
+class RegimeAwareMachine(_Machine):
+    __slots__ = ('pos', '_c', '_atr', '_long', '_upper')
+
+    def indicators(self, bars):
+        p = self.p
+        c = bars['Close']
+        ind = dict(
+            sma_long=self.cached(('sma', p['sma_long']), vi.sma, c, p['sma_long']),
+            sma_short=self.cached(('sma', p['sma_short']), vi.sma, c, p['sma_short']),
+            atr=self.cached(('atr', p['atr_period']), vi.atr, bars['High'], bars['Low'], c, p['atr_period']),
+        )
+        ind['upper'] = ind['sma_short'] + ind['atr']
+        self.pos = PositionTracker()
+        self._c, self._atr, self._long, self._upper = (
+            a.tolist() for a in (c, ind['atr'], ind['sma_long'], ind['upper']))
+        return ind
+
+    def entry_mask(self):
+        ind = self.ind
+        with np.errstate(invalid='ignore'):
+            return (self.close >= ind['sma_long']) & (self.close > ind['upper'])
+
+    def step(self, i):
+        b, p = self.b, self.p
+        price = self._c[i]
+        if price < self._long[i]:
+            if b.size:
+                b.close(price)
+            return
+        atr = self._atr[i]
+        size = atr_size(b.cash, p['risk_bull'], atr)
+        if not b.size and price > self._upper[i] and size > 0:
+            b.buy(size, price)
+            self.pos.open(i + 1, price, price - atr)
+        elif b.size:
+            days_held = self.pos.days_held(i + 1)
+            self.pos.mark(price)
+            if price < self.pos.trail_stop(atr):
+                b.close(price)
+            elif self.pos.stopped(price):
+                b.close(price)
+            elif days_held >= p['max_hold_days']:
+                b.close(price)
+
+
+MACHINES = {
+    'MomentumStrategy':            MomentumMachine,
+    'DonchianBreakoutStrategy':    DonchianMachine,
+    'EnhancedBreakoutStrategy':    EnhancedBreakoutMachine,
+    'RegimeAwareBreakoutStrategy': RegimeAwareMachine,
+}
+
+
+# --- Indicateurs incrémentaux de chaque machine (live.py, checkpoint.py) ---
+# (listes de la machine alimentées, update(o, h, l, c, v) → valeurs à ajouter,
+# indicateurs dont snapshot() / restore() sauvegardent l'état)
+
+def _momentum_streams(p):
+    fast, slow, cross = EMAStream(p['ema_fast']), EMAStream(p['ema_slow']), CrossOverStream()
+    rsi, atr = RSIStream(p['rsi_period']), ATRStream(p['atr_period'])
+
+    def update(o, h, l, c, v):
+        return c, cross.update(fast.update(c), slow.update(c)), rsi.update(c), atr.update(h, l, c)
+    return ('_c', '_cross', '_rsi', '_atr'), update, (fast, slow, cross, rsi, atr)
+
+
+def _donchian_streams(p):
+    # highest(delay(High)) : la barre précédente entre dans la fenêtre
+    up, down, atr = HighestStream(p['donchian_period']), LowestStream(p['donchian_period']), ATRStream(p['atr_period'])
+    prev_h, prev_l = DelayStream(), DelayStream()
+
+    def update(o, h, l, c, v):
+        h1, l1 = prev_h.update(h), prev_l.update(l)
+        u = up.update(h1) if prev_h.count > 1 else np.nan
+        d = down.update(l1) if prev_l.count > 1 else np.nan
+        return c, u, d, atr.update(h, l, c)
+    return ('_c', '_up', '_down', '_atr'), update, (up, down, atr, prev_h, prev_l)
+
+
+def _enhanced_streams(p):
+    sma, atr, vol = SMAStream(p['sma_period']), ATRStream(p['atr_period']), SMAStream(p['vol_period'])
+    adx, k = ADXStream(p['adx_period']), p['tp2_atr']
+
+    def update(o, h, l, c, v):
+        a = atr.update(h, l, c)
+        return c, h, v, a, adx.update(h, l, c), vol.update(v), sma.update(c) + k * a
+    return ('_c', '_h', '_v', '_atr', '_adx', '_volma', '_upper'), update, (sma, atr, vol, adx)
+
+
+def _regime_streams(p):
+    long, short, atr = SMAStream(p['sma_long']), SMAStream(p['sma_short']), ATRStream(p['atr_period'])
+
+    def update(o, h, l, c, v):
+        a = atr.update(h, l, c)
+        return c, a, long.update(c), short.update(c) + a
+    return ('_c', '_atr', '_long', '_upper'), update, (long, short, atr)
+
+
+STREAMS = {
+    MomentumMachine:         _momentum_streams,
+    DonchianMachine:         _donchian_streams,
+    EnhancedBreakoutMachine: _enhanced_streams,
+    RegimeAwareMachine:      _regime_streams,
+}
+
+
+def machine_for(strat_cls):
+    """Machine à états correspondant à une classe de stratégie (ou à un parent)."""
+    for cls in strat_cls.__mro__:
+        if cls.__name__ in MACHINES:
+            return MACHINES[cls.__name__]
+    raise ValueError(f"Stratégie non supportée par le moteur vectorisé : {strat_cls.__name__}")
+
+
+def strategy_params(strat_cls, params=None) -> dict:
+    """Paramètres par défaut de la stratégie backtrader, surchargés par `params`."""
+    p = dict(strat_cls.params._getpairs())
+    for k, v in (params or {}).items():
+        if k not in p:
+            raise ValueError(f"Paramètre inconnu pour {strat_cls.__name__} : {k}")
+        p[k] = v
+    return p
+
+
+def bars_from_df(df: pd.DataFrame) -> dict:
+    return {k: df[k].to_numpy(dtype=np.float64) for k in ('Open', 'High', 'Low', 'Close', 'Volume')}
+
+
+def simulate(machine: _Machine, lo: int, hi: int) -> np.ndarray:
+    """
+    Boucle commune sur les barres [lo, hi) : exécution des ordres et décisions,
+    puis valorisation en bloc. Les indicateurs, calculés sur tout l'historique,
+    sont déjà chauds en lo (fenêtres de walk-forward).
+    """
+    b = machine.b
+    b.states[0] = (lo,) + b.states[0][1:]
+    opens = machine.open.tolist()
+    candidates = np.flatnonzero(machine.entry_mask())
+    candidates = candidates[candidates >= max(machine.start, lo)]
+    i = lo
+    while i < hi:
+        if b.pending:
+            b.execute(i, opens[i])
+        elif not b.size:
+            # Hors position et sans ordre : rien ne bouge jusqu'au prochain signal
+            k = np.searchsorted(candidates, i)
+            i = int(candidates[k]) if k < len(candidates) else hi
+            if i >= hi:
+                break
+        if i >= machine.start:
+            machine.step(i)
+        i += 1
+    return b.values(machine.close[lo:hi], lo)
+
+
+def run_bars(bars: dict, strat_cls, params=None, cash: float = 1.0, memo=None, window=None):
+    """
+    Version tableaux de run(), sans pandas : (valeurs aux clôtures, broker).
+    memo   : dict d'indicateurs déjà calculés pour CES barres (voir _Machine.cached)
+    window : (lo, hi) pour ne trader que les barres [lo, hi) ; valeurs sur [lo, hi)
+    """
+    with phase('vector.indicators'):
+        machine = machine_for(strat_cls)(strategy_params(strat_cls, params), bars, Broker(cash), memo)
+    lo, hi = window if window is not None else (0, len(bars['Close']))
+    with phase('vector.simulation'):
+        values = simulate(machine, lo, hi)
+    return values, machine.b
+
+
+def trade_count(fills) -> int:
+    """Nombre de trades : exécutions qui ouvrent une position depuis zéro."""
+    before = 0.0
+    count = 0
+    for _, size, _ in fills:
+        if not before:
+            count += 1
+        before += size
+    return count
+
+
+def traded_value(fills) -> float:
+    """Montant total échangé (achats + ventes), pour le turnover."""
+    return float(sum(abs(size) * price for _, size, price in fills))
+
+
+def run(df: pd.DataFrame, strat_cls, params=None, cash: float = 1.0, memo=None) -> VectorResult:
+    """
+    Backtest vectorisé d'une stratégie mono-actif sur un DataFrame OHLCV.
+    returns : rendements journaliers (équivalent de l'analyzer TimeReturn)
+    equity  : valeur du portefeuille à chaque clôture
+    fills   : exécutions (Date, Size, Price)
+    """
+    values, broker = run_bars(bars_from_df(df), strat_cls, params, cash, memo)
+    prev = np.empty_like(values)
+    prev[0] = cash
+    prev[1:] = values[:-1]
+    fills = broker.fills
+    return VectorResult(
+        returns=pd.Series(values / prev - 1.0, index=df.index),
+        equity=pd.Series(values, index=df.index),
+        fills=pd.DataFrame({
+            'Date':  df.index[[f[0] for f in fills]],
+            'Size':  [f[1] for f in fills],
+            'Price': [f[2] for f in fills],
+        }),
+    )
+
+
+def simulate_portfolio(machines, ticks, n_steps: int) -> None:
+    """
+    Boucle du mode portefeuille : machines partageant un PortfolioBroker,
+    ticks[a] = pas du calendrier commun de chaque barre de l'actif a. Seuls sont
+    visités les pas où un actif est en position, a un ordre, ou a un signal
+    d'entrée candidat ; à un même pas, les actifs jouent dans leur ordre.
+    """
+    b = machines[0].b.pb
+    opens = [m.open.tolist() for m in machines]
+    closes = [m.close.tolist() for m in machines] if b.book is not None else None
+    steps_of = [t.tolist() for t in ticks]
+    # Signaux candidats de tous les actifs, triés par (pas, actif)
+    cand_steps, cand_assets, cand_bars = [], [], []
+    for a, m in enumerate(machines):
+        c = np.flatnonzero(m.entry_mask())
+        c = c[c >= m.start]
+        cand_steps.append(ticks[a][c])
+        cand_assets.append(np.full(len(c), a))
+        cand_bars.append(c)
+    cs, ca, ci = (np.concatenate(x) if x else np.empty(0, dtype=np.int64)
+                  for x in (cand_steps, cand_assets, cand_bars))
+    order = np.lexsort((ca, cs))
+    cs, ca, ci = cs[order].tolist(), ca[order].tolist(), ci[order].tolist()
+
+    heap = []  # (pas, actif, barre) : prochaine barre des actifs en position ou avec ordre
+    k, nc = 0, len(cs)
+    while heap or k < nc:
+        t = heap[0][0] if heap else n_steps
+        if k < nc and cs[k] < t:
+            t = cs[k]
+        due, cands = {}, set()
+        while heap and heap[0][0] == t:
+            _, a, i = heapq.heappop(heap)
+            due[a] = i
+        while k < nc and cs[k] == t:
+            due[ca[k]] = ci[k]
+            cands.add(ca[k])
+            k += 1
+        # Pas sans exécution entre la soumission et t : contrôler ici revient au même
+        if b.submitted:
+            b.check_submitted()
+        if b.pending:
+            b.execute(t, {a: opens[a][i] for a, i in due.items()})
+        if b.book is not None:
+            # Positions et clôtures du pas connues avant toute décision
+            for a, i in due.items():
+                b.book.mark(a, b.sizes[a], closes[a][i])
+        for a in sorted(due):
+            i = due[a]
+            if b.sizes[a] or a in cands:
+                machines[a].step(i)
+            if (b.sizes[a] or b.open_orders[a]) and i + 1 < len(opens[a]):
+                heapq.heappush(heap, (steps_of[a][i + 1], a, i + 1))
+
+
+def run_portfolio(universe: dict, strat_cls, params=None, cash: float = 1.0, memos=None,
+                  limits: RiskLimits = None) -> PortfolioResult:
+    """
+    Backtest d'une stratégie mono-actif en mode portefeuille sur {ticker: DataFrame} :
+    un seul passage sur l'union des calendriers, un broker et un capital communs.
+    returns / equity : sur le calendrier commun ; fills : (Date, Ticker, Size, Price).
+    memos : {ticker: memo} d'indicateurs (voir _Machine.cached).
+    limits : plafonds d'exposition (risk.RiskLimits) appliqués aux ordres d'achat.
+    """
+    tickers = list(universe)
+    stamps = [universe[tic].index.to_numpy() for tic in tickers]
+    calendar = np.unique(np.concatenate(stamps))
+    ticks = [np.searchsorted(calendar, s) for s in stamps]
+    index = pd.DatetimeIndex(calendar, name=universe[tickers[0]].index.name)
+    broker = PortfolioBroker(cash, len(tickers), limits)
+    p = strategy_params(strat_cls, params)
+    with phase('vector.indicators'):
+        machines = [machine_for(strat_cls)(p, bars_from_df(universe[tic]), broker.view(a),
+                                           (memos or {}).get(tic))
+                    for a, tic in enumerate(tickers)]
+    with phase('vector.simulation'):
+        simulate_portfolio(machines, ticks, len(calendar))
+
+        def closes(a):
+            # Dernière clôture connue de l'actif à chaque pas (0 avant sa 1re barre : position nulle)
+            last = np.searchsorted(ticks[a], np.arange(len(calendar)), side='right') - 1
+            return np.where(last >= 0, machines[a].close[np.maximum(last, 0)], 0.0)
+
+        values = broker.values(len(calendar), closes)
+    prev = np.empty_like(values)
+    prev[0] = cash
+    prev[1:] = values[:-1]
+    fills = broker.fills
+    return PortfolioResult(
+        returns=pd.Series(values / prev - 1.0, index=index),
+        equity=pd.Series(values, index=index),
+        fills=pd.DataFrame({
+            'Date':   index[[f[0] for f in fills]],
+            'Ticker': [tickers[f[1]] for f in fills],
+            'Size':   [f[2] for f in fills],
+            'Price':  [f[3] for f in fills],
+        }),
+        traded=float(sum(abs(f[2]) * f[3] for f in fills)),
+    )
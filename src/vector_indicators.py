@@ -0,0 +1,216 @@
+"""
+Indicateurs NumPy sur tableaux float64, calqués sur backtrader (mode runonce) :
+mêmes graines, mêmes périodes minimales (NaN avant), mêmes formules, pour que
+le moteur vectorisé prenne exactement les mêmes décisions que les stratégies bt.
+
+Une série (barres,) ou une matrice (barres × séries, le temps en axe 0, ex. le
+screener) : chaque colonne donne les valeurs de la série seule, NaN de tête
+(historique plus court) compris.
+"""
+import numpy as np
+
+
+def _nan(shape) -> np.ndarray:
+    return np.full(shape, np.nan)
+
+
+def _first_valid(x: np.ndarray):
+    """Indice de la 1re valeur définie (len(x) si aucune) ; un tableau d'indices par colonne pour une matrice."""
+    valid = ~np.isnan(x)
+    if x.ndim == 1:
+        idx = np.flatnonzero(valid)
+        return int(idx[0]) if len(idx) else len(x)
+    return np.where(valid.any(axis=0), valid.argmax(axis=0), len(x))
+
+
+def rolling_sum(x: np.ndarray, period: int) -> np.ndarray:
+    """
+    Somme glissante compensée (TwoSum) : arrondi identique à math.fsum,
+    utilisé par bt.ind.Average, sans boucle Python par barre. Chaque fenêtre
+    est sommée à part : NaN si elle touche un NaN (de tête ou non).
+    """
+    out = _nan(x.shape)
+    m = len(x) - period + 1
+    if m <= 0:
+        return out
+    s = x[:m].copy()
+    c = np.zeros_like(s)
+    t, bp, tmp = np.empty_like(s), np.empty_like(s), np.empty_like(s)
+    for k in range(1, period):
+        y = x[k:k + m]
+        np.add(s, y, out=t)
+        np.subtract(t, s, out=bp)
+        # erreur d'arrondi de s + y : (s - (t - bp)) + (y - bp)
+        np.subtract(t, bp, out=tmp)
+        np.subtract(s, tmp, out=tmp)
+        np.subtract(y, bp, out=bp)
+        np.add(tmp, bp, out=tmp)
+        c += tmp
+        s, t = t, s
+    out[period - 1:] = s + c
+    return out
+
+
+def sma(x: np.ndarray, period: int) -> np.ndarray:
+    """bt.ind.SMA : fsum(fenêtre) / period."""
+    return rolling_sum(x, period) / period
+
+
+def exp_smoothing(x: np.ndarray, period: int, alpha: float) -> np.ndarray:
+    """
+    bt.ind.ExponentialSmoothing : graine = SMA des `period` premières valeurs,
+    puis prev * (1 - alpha) + x * alpha.
+    """
+    out = _nan(x.shape)
+    start = _first_valid(x) + period - 1
+    alpha1 = 1.0 - alpha
+    if x.ndim > 1:
+        # Matrice : graine sur la 1re fenêtre pleine de chaque colonne, puis une
+        # itération par barre vectorisée sur les colonnes
+        live = start < len(x)
+        if not live.any():
+            return out
+        rows = np.minimum(start, len(x) - 1) - np.arange(period - 1, -1, -1)[:, None]
+        seed = rolling_sum(np.take_along_axis(x, rows, axis=0), period)[-1] / period
+        xs = x * alpha
+        prev = _nan(x.shape[1:])
+        for t in range(int(start[live].min()), len(x)):
+            prev = prev * alpha1 + xs[t]
+            first = start == t
+            prev[first] = seed[first]
+            out[t] = prev
+        return out
+    if start >= len(x):
+        return out
+    seed = rolling_sum(x[start - period + 1:start + 1], period)[-1] / period
+    # x * alpha en NumPy : même arrondi qu'en Python, une multiplication de moins par tour
+    xs = (x[start + 1:] * alpha).tolist()
+    vals = [seed]
+    append = vals.append
+    prev = seed
+    for v in xs:
+        prev = prev * alpha1 + v
+        append(prev)
+    out[start:] = vals
+    return out
+
+
+def ema(x: np.ndarray, period: int) -> np.ndarray:
+    """bt.ind.EMA (alpha = 2 / (1 + period))."""
+    return exp_smoothing(x, period, 2.0 / (1.0 + period))
+
+
+def smma(x: np.ndarray, period: int) -> np.ndarray:
+    """bt.ind.SmoothedMovingAverage (Wilder, alpha = 1 / period)."""
+    return exp_smoothing(x, period, 1.0 / period)
+
+
+def _prev(x: np.ndarray) -> np.ndarray:
+    out = np.empty_like(x)
+    out[:1] = np.nan
+    out[1:] = x[:-1]
+    return out
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """bt.ind.TrueRange : max(high, close[-1]) - min(low, close[-1])."""
+    pclose = _prev(close)
+    with np.errstate(invalid='ignore'):
+        return np.maximum(high, pclose) - np.minimum(low, pclose)
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    """bt.ind.ATR : SMMA du True Range."""
+    return smma(true_range(high, low, close), period)
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """bt.ind.RSI : SMMA des hausses / baisses, 100 - 100 / (1 + rs)."""
+    pclose = _prev(close)
+    with np.errstate(invalid='ignore'):
+        up = np.maximum(close - pclose, 0.0)
+        down = np.maximum(pclose - close, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = smma(up, period) / smma(down, period)
+        return 100.0 - 100.0 / (1.0 + rs)
+
+
+def adx(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14,
+        av_tr: np.ndarray = None) -> np.ndarray:
+    """
+    bt.ind.ADX : 100 × SMMA(|+DI − −DI| / (+DI + −DI)).
+    av_tr : ATR de même période déjà calculé (évite de le recalculer).
+    """
+    if av_tr is None:
+        av_tr = atr(high, low, close, period)
+    upmove = high - _prev(high)
+    downmove = _prev(low) - low
+    with np.errstate(invalid='ignore'):
+        plus_dm = np.where((upmove > downmove) & (upmove > 0.0), upmove, 0.0)
+        minus_dm = np.where((downmove > upmove) & (downmove > 0.0), downmove, 0.0)
+    # 1re barre (et NaN de tête d'une colonne) : mouvements non définis
+    undefined = np.isnan(upmove) | np.isnan(downmove)
+    plus_dm[undefined] = minus_dm[undefined] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        di_plus = 100.0 * smma(plus_dm, period) / av_tr
+        di_minus = 100.0 * smma(minus_dm, period) / av_tr
+        dx = np.abs(di_plus - di_minus) / (di_plus + di_minus)
+    return 100.0 * smma(dx, period)
+
+
+def _rolling_extreme(x: np.ndarray, period: int, fn) -> np.ndarray:
+    # NaN si la fenêtre contient un NaN (fn = np.max / np.min le propagent)
+    out = _nan(x.shape)
+    if len(x) >= period:
+        win = np.lib.stride_tricks.sliding_window_view(x, period, axis=0)
+        out[period - 1:] = fn(win, axis=-1)
+    return out
+
+
+def highest(x: np.ndarray, period: int) -> np.ndarray:
+    """bt.ind.Highest : max sur les `period` dernières valeurs."""
+    return _rolling_extreme(x, period, np.max)
+
+
+def lowest(x: np.ndarray, period: int) -> np.ndarray:
+    """bt.ind.Lowest : min sur les `period` dernières valeurs."""
+    return _rolling_extreme(x, period, np.min)
+
+
+def delay(x: np.ndarray, ago: int = 1) -> np.ndarray:
+    """Équivalent de line(-ago) : valeur d'il y a `ago` barres."""
+    out = _nan(x.shape)
+    out[ago:] = x[:len(x) - ago]
+    return out
+
+
+def _pow(x: np.ndarray, e: float) -> np.ndarray:
+    # pow() de Python (libm) et les fast paths NumPy (x*x, sqrt) diffèrent parfois d'1 ulp
+    return np.fromiter((v ** e for v in x.ravel().tolist()), dtype=np.float64, count=x.size).reshape(x.shape)
+
+
+def stddev(x: np.ndarray, period: int) -> np.ndarray:
+    """bt.ind.StdDev (safepow) : pow(|SMA(x²) − SMA(x)²|, 0.5)."""
+    return _pow(np.abs(sma(_pow(x, 2), period) - _pow(sma(x, period), 2)), 0.5)
+
+
+def crossover(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    bt.ind.CrossOver : +1 croisement haussier, -1 baissier, 0 sinon.
+    La différence de référence est la dernière différence non nulle (NonZeroDifference).
+    """
+    n = len(a)
+    out = _nan(a.shape)
+    d = a - b
+    start = np.maximum(_first_valid(a), _first_valid(b))
+    rows = np.arange(n).reshape((n,) + (1,) * (a.ndim - 1))
+    # Indice de la dernière différence non nulle à chaque barre (à partir de start)
+    idx = np.where(d != 0.0, rows, -1)
+    idx = np.where(rows == start, start, idx)
+    idx = np.where(rows < start, 0, idx)
+    nzd = np.take_along_axis(d, np.maximum.accumulate(idx, axis=0), axis=0)
+    before = nzd[:-1]
+    up = (before < 0.0) & (a[1:] > b[1:])
+    down = (before > 0.0) & (a[1:] < b[1:])
+    out[1:] = np.where(rows[1:] > start, up.astype(np.float64) - down.astype(np.float64), np.nan)
+    return out
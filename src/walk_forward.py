@@ -0,0 +1,169 @@
+"""
+Walk-forward : optimisation in-sample, validation out-of-sample, fenêtre après fenêtre.
+
+• le calendrier commun de l'univers est découpé en plis (train, test), glissants
+  ou ancrés (train qui part toujours du début)
+• sur chaque train, toutes les combinaisons sont évaluées (sweep) et la meilleure
+  selon `metric` est appliquée au test suivant
+• les courbes out-of-sample sont recollées bout à bout
+• les plis sont indépendants et tournent en parallèle ; chaque worker calcule
+  les indicateurs une seule fois sur tout l'historique (moteur vectorisé) et les
+  réutilise pour tous ses plis et combinaisons, seule la fenêtre est tradée
+
+En script :
+    python src/walk_forward.py MomentumStrategy SPY QQQ IWM --period 10y \
+        --grid ema_fast=10,20,30 ema_slow=50,100 --train 504 --test 126
+"""
+import argparse
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+import parallel_runner as pr
+import sweep
+from data_store import from_epoch_seconds, to_epoch_seconds
+from engines import supports_numpy
+from metrics import equity_metrics
+from vector_engine import strategy_params
+
+
+class Fold(NamedTuple):
+    # bornes incluses, secondes epoch
+    train_start: float
+    train_end: float
+    test_start: float
+    test_end: float
+
+
+class WalkForwardResult(NamedTuple):
+    folds: pd.DataFrame   # une ligne par pli : dates, meilleurs params, métriques train/test
+    equity: pd.Series     # courbe out-of-sample recollée (capital initial 1)
+
+
+def make_folds(calendar: np.ndarray, train: int, test: int, step: Optional[int] = None,
+               anchored: bool = False) -> List[Fold]:
+    """
+    Plis sur un calendrier (secondes epoch triées), tailles en barres :
+    • glissant : train = [k·step, k·step + train), test = les `test` barres suivantes
+    • ancré    : train = [0, k·step + train)
+    step vaut `test` par défaut (tests contigus, sans recouvrement).
+    """
+    step = step or test
+    folds = []
+    k = 0
+    while True:
+        train_end = k * step + train
+        test_end = min(train_end + test, len(calendar))
+        if train_end >= len(calendar):
+            break
+        train_start = 0 if anchored else k * step
+        folds.append(Fold(calendar[train_start], calendar[train_end - 1],
+                          calendar[train_end], calendar[test_end - 1]))
+        if test_end == len(calendar):
+            break
+        k += 1
+    return folds
+
+
+def _score(metrics: dict, metric: str) -> float:
+    value = metrics[metric]
+    return -np.inf if value is None or np.isnan(value) else value
+
+
+def _run_fold(fold: Fold, strat_cls, combos: List[dict], vector: bool, cash: float, metric: str) -> dict:
+    train = (fold.train_start, fold.train_end)
+    best, best_metrics = None, None
+    for params in combos:
+        _, equity, trades, traded = sweep.curve(params, strat_cls, vector, cash, train)
+        if len(equity) < 2:
+            continue
+        metrics = {**equity_metrics(equity, traded=traded), 'trades': trades}
+        if best is None or _score(metrics, metric) > _score(best_metrics, metric):
+            best, best_metrics = params, metrics
+    if best is None:
+        raise ValueError("Fenêtre d'entraînement trop courte pour évaluer les combinaisons")
+    stamps, equity, trades, traded = sweep.curve(best, strat_cls, vector, cash, (fold.test_start, fold.test_end))
+    return {'params': best, 'train': best_metrics, 'stamps': stamps, 'equity': equity,
+            'trades': trades, 'traded': traded}
+
+
+def walk_forward(data: Dict[str, pd.DataFrame], strat_cls, combos: List[dict], train: int = 252,
+                 test: int = 63, step: Optional[int] = None, anchored: bool = False,
+                 metric: str = 'sharpe', max_workers: Optional[int] = None,
+                 cash: float = sweep.INITIAL_CAPITAL) -> WalkForwardResult:
+    """
+    Walk-forward d'une stratégie sur l'univers `data`. train / test / step en
+    barres du calendrier commun ; metric : colonne de metrics.equity_metrics à maximiser.
+    """
+    for combo in combos:
+        strategy_params(strat_cls, combo)
+    calendar = np.unique(np.concatenate([to_epoch_seconds(df.index) for df in data.values()]))
+    folds = make_folds(calendar, train, test, step, anchored)
+    if not folds:
+        raise ValueError(f"Historique trop court : {len(calendar)} barres pour train={train}")
+
+    results = list(pr.imap_shared(data, _run_fold, folds, strat_cls, combos,
+                                  supports_numpy(strat_cls, data), cash, metric,
+                                  max_workers=max_workers))
+
+    rows, pieces, level, last = [], [], 1.0, -np.inf
+    for fold, res in zip(folds, results):
+        equity, stamps = res['equity'], res['stamps']
+        rows.append({
+            'train_start': pd.Timestamp(fold.train_start, unit='s'),
+            'train_end':   pd.Timestamp(fold.train_end, unit='s'),
+            'test_start':  pd.Timestamp(fold.test_start, unit='s'),
+            'test_end':    pd.Timestamp(fold.test_end, unit='s'),
+            **res['params'],
+            **{f'train_{k}': v for k, v in res['train'].items()},
+            **({f'test_{k}': v for k, v in equity_metrics(equity, traded=res['traded']).items()}
+               if len(equity) > 1 else {}),
+            'test_trades': res['trades'],
+        })
+        # Recollage : chaque test repart du niveau atteint à la fin du précédent
+        keep = stamps > last
+        if keep.any():
+            pieces.append(pd.Series(level * equity[keep], index=from_epoch_seconds(stamps[keep])))
+            level *= equity[keep][-1]
+            last = stamps[keep][-1]
+    equity = pd.concat(pieces) if pieces else pd.Series(dtype=float)
+    equity.index.name = 'Date'
+    return WalkForwardResult(pd.DataFrame(rows), equity)
+
+
+if __name__ == "__main__":
+    import time
+
+    import strategy, strategy2, strategy3, strategy4, strategy5, strategy_rebalance
+    from data_loader import load_many
+
+    classes = {cls.__name__: cls for cls in (strategy.MomentumStrategy,
+                                             strategy2.DonchianBreakoutStrategy,
+                                             strategy3.EnhancedBreakoutStrategy,
+                                             strategy4.RegimeAwareBreakoutStrategy,
+                                             strategy_rebalance.WeeklyMomentumRebalance,
+                                             strategy5.DynamicSafeRebalance)}
+    parser = argparse.ArgumentParser(description="Walk-forward in-sample / out-of-sample")
+    parser.add_argument('strategy', choices=sorted(classes))
+    parser.add_argument('tickers', nargs='+')
+    parser.add_argument('--period', default='5y')
+    parser.add_argument('--grid', nargs='*', default=[], metavar='NOM=V1,V2')
+    parser.add_argument('--train', type=int, default=252, help="barres d'entraînement")
+    parser.add_argument('--test', type=int, default=63, help="barres de test")
+    parser.add_argument('--step', type=int, default=None)
+    parser.add_argument('--anchored', action='store_true')
+    parser.add_argument('--metric', default='sharpe')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    strat_cls = classes[args.strategy]
+    combos = sweep.grid(sweep.parse_space(args.grid, sweep.param_space(strat_cls), False))
+    data = load_many(args.tickers, period=args.period)
+    t0 = time.perf_counter()
+    res = walk_forward(data, strat_cls, combos, args.train, args.test, args.step, args.anchored,
+                       args.metric, args.workers)
+    print(res.folds.to_string(index=False))
+    oos = equity_metrics(res.equity.to_numpy())
+    print("Out-of-sample : " + ", ".join(f"{k} {v:.2f}" for k, v in oos.items()))
+    print(f"{len(res.folds)} plis × {len(combos)} combinaisons en {time.perf_counter() - t0:.1f}s")
@@ -1,41 +1,27 @@
 import streamlit as st
-import backtrader as bt
-import pandas as pd
+import json
 import sys
 # Pour importer vos modules depuis src/
 sys.path.append("src")
 
-from data_loader                  import download_data
-from indicators                   import EMA, RSI, ATR
-from strategy                     import MomentumStrategy
-from strategy2                    import DonchianBreakoutStrategy
-from strategy3                    import EnhancedBreakoutStrategy
-from strategy4                    import RegimeAwareBreakoutStrategy
-from strategy_rebalance           import WeeklyMomentumRebalance
-from strategy5                    import DynamicSafeRebalance
-
-import altair as alt
+# Registre léger (AST) : ni backtrader ni modules de stratégie avant la sélection
+import strategy_registry as registry
 
 # --- Constantes ---
 INITIAL_CAPITAL = 100000
-TRADING_DAYS    = 252
-
-# Mapping des stratégies
-STRAT_MAP = {
-    "Momentum":              MomentumStrategy,
-    "Donchian Breakout":     DonchianBreakoutStrategy,
-    "Enhanced Breakout":     EnhancedBreakoutStrategy,
-    "Regime‑Aware Breakout": RegimeAwareBreakoutStrategy,
-    "Weekly Rebalance":      WeeklyMomentumRebalance,
-    "Dynamic Safe Rebalance": DynamicSafeRebalance
-}
+ROLLING_WINDOW  = 63
+MC_PATHS        = 10000
+MC_BLOCK        = 20
+
+# Stratégies découvertes une fois par process (en cache d'un rerun à l'autre)
+STRATEGIES = registry.specs()
 
 # Sélecteur de stratégie
 strategy_name = st.sidebar.selectbox(
     "Choisissez la stratégie",
-    options=list(STRAT_MAP.keys())
+    options=list(STRATEGIES.keys())
 )
-StratCls = STRAT_MAP[strategy_name]
+spec = STRATEGIES[strategy_name]
 
 # Univers d'actifs
 CATEGORIES = {
@@ -44,6 +30,11 @@ CATEGORIES = {
     "Crypto":  ["BTC-USD","ETH-USD","BNB-USD","ADA-USD","SOL-USD"]
 }
 
+# Calendriers maîtres (price_panel.CALENDARS)
+CALENDARS = {"union": "Union (toutes les dates)",
+             "intersection": "Intersection (dates communes)",
+             "asset_class": "Par classe d'actifs (jours de bourse)"}
+
 st.title(f"Swing Bot 📈 : {strategy_name}")
 
 # Sélection des actifs
@@ -63,23 +54,89 @@ duration = st.sidebar.selectbox(
     index=2
 )
 
-# Si on utilise la stratégie dynamique with safe asset, on force GLD en refuge
-if strategy_name == "Dynamic Safe Rebalance":
-    if "GLD" not in selected_tickers:
-        selected_tickers.append("GLD")
-
-# Paramètres spécifiques aux rebalances
-if strategy_name in ["Weekly Rebalance", "Dynamic Safe Rebalance"]:
-    lookback_days    = st.sidebar.slider("Fenêtre rendement (jours)", 1, 63, 5, 1)
-    rebalance_period = st.sidebar.slider("Fréquence rebalance (jours)", 1, 63, 5, 1)
-    if strategy_name == "Dynamic Safe Rebalance":
-        vol_lookback = st.sidebar.slider("Fenêtre vol (jours)", 5, 63, 20, 1)
-        stoploss_pct = st.sidebar.slider("Stop‑loss drawdown (%)", 1, 20, 5, 1) / 100
-    else:
-        vol_lookback = None
-        stoploss_pct = None
+# Calendrier maître sur lequel tout l'univers est aligné (crypto 7 j/7, actions 5 j/7)
+calendar = st.sidebar.selectbox(
+    "Calendrier commun",
+    list(CALENDARS),
+    format_func=CALENDARS.get
+)
+
+# Stratégie avec actif refuge (Dynamic Safe Rebalance) : refuge ajouté à l'univers
+safe_asset = spec.defaults().get("safe_asset")
+if safe_asset and safe_asset not in selected_tickers:
+    selected_tickers.append(safe_asset)
+
+def param_sliders(spec):
+    # Un curseur par paramètre exposé du schéma ; les autres gardent leur défaut
+    values = {}
+    for p in spec.params:
+        s = p.slider
+        if s is None:
+            continue
+        shown = type(s.step)(round(p.default * s.scale, 6))
+        v = st.slider(s.label, s.lo, s.hi, shown, s.step, key=f"{spec.name}.{p.name}")
+        values[p.name] = v / s.scale if s.scale != 1 else v
+    return values
+
+# Paramètres de la stratégie (ouverts par défaut pour les rebalances)
+with st.sidebar.expander("Paramètres de la stratégie", expanded=spec.portfolio):
+    strat_params = param_sliders(spec)
+
+# Communs à tous les chemins, chargés une fois par process après le rendu des
+# premiers widgets : pandas, données, panel, métriques ; backtrader vient avec la
+# classe de stratégie (seule celle choisie est importée). Moteurs (engines,
+# vector_engine, panel_engine, parallel_runner) et options (risque, Monte Carlo,
+# profil) : importés dans la branche qui s'en sert
+import pandas as pd
+
+from data_loader                  import load_many
+from metrics                      import TRADING_DAYS, equity_metrics, rolling_sharpe
+from price_panel                  import from_frames as build_panel
+
+StratCls = registry.load(spec)
+
+# Moteur de backtest (vectorisé pour le mono-actif, panel NumPy pour les rebalances) :
+# mêmes ordres et même courbe que Backtrader ; support lu dans le registre
+if spec.numpy_engine():
+    engine = st.sidebar.radio(
+        "Moteur de backtest",
+        ["vector", "backtrader"],
+        format_func=lambda e: {"vector": "Panel NumPy" if spec.portfolio else "Vectorisé (NumPy)",
+                               "backtrader": "Backtrader"}[e],
+        help="Même courbe que Backtrader ; rebalances : seulement si tous les actifs cotent les mêmes "
+             "jours (calendrier intersection ou une seule classe d'actifs), sinon Backtrader"
+    )
+else:
+    engine = "backtrader"
+
+# Stratégies mono-actif : un portefeuille à capital commun, ou un backtest par actif
+if not spec.portfolio:
+    allocation = st.sidebar.radio(
+        "Allocation du capital",
+        ["per_asset", "shared"],
+        format_func=lambda a: {"shared": "Capital partagé (un seul passage, nouveau)",
+                               "per_asset": "Capital réparti par actif"}[a],
+        help="Réparti par actif : un backtest par actif, courbes sommées (comportement historique, "
+             "par défaut). Partagé : un seul broker, le cash engagé sur un actif manque aux autres — "
+             "résultats différents"
+    )
+else:
+    allocation = None
+
+# Plafonds d'exposition du book commun (100 % : pas de plafond)
+if allocation == "shared":
+    from risk import RiskLimits
+    max_gross = st.sidebar.slider("Exposition brute max (% du capital)", 10, 100, 100, 5)
+    max_position = st.sidebar.slider("Position max par actif (% du capital)", 5, 100, 100, 5)
+    limits = RiskLimits(max_gross=max_gross / 100 if max_gross < 100 else None,
+                        max_position=max_position / 100 if max_position < 100 else None)
 else:
-    lookback_days = rebalance_period = vol_lookback = stoploss_pct = None
+    limits = None
+
+monte_carlo_run = st.sidebar.checkbox("Monte Carlo (bootstrap par blocs)", value=False,
+                                      help=f"{MC_PATHS} trajectoires rééchantillonnées des rendements du portefeuille")
+profile_run = st.sidebar.checkbox("Profiler le backtest", value=False,
+                                  help="Temps et mémoire par phase (exécution dans ce process)")
 
 if not selected_tickers:
     st.sidebar.error("Veuillez sélectionner au moins un actif.")
@@ -88,14 +145,22 @@ if not selected_tickers:
 # --- Helpers ---
 
 @st.cache_data
+def load_universe(tickers, period):
+    # Un seul chargement groupé (store local + fetch en masse) pour tout l'univers
+    return load_many(list(tickers), period=period, interval="1d")
+
 def load_and_prep(ticker, period):
-    df = download_data(ticker, period=period, interval="1d")
-    if hasattr(df.columns, "nlevels") and df.columns.nlevels > 1:
-        df.columns = df.columns.get_level_values(0)
-    df.index = pd.to_datetime(df.index)
-    return df
+    return load_universe(tuple(selected_tickers), period)[ticker]
+
+@st.cache_resource
+def load_panel(tickers, period, calendar):
+    # Univers aligné une seule fois sur le calendrier maître, même objet (lecture
+    # seule) d'un rerun à l'autre : buy & hold, rebalances et métriques le lisent
+    return build_panel({tic: load_and_prep(tic, period) for tic in tickers}, calendar)
 
 def plot_interactive(df, title, y_label="Equity"):
+    import altair as alt  # importé au premier graphique, puis en cache
+
     df0      = df.reset_index()
     date_col = df0.columns[0]
     dfm      = df0.melt(id_vars=date_col, var_name="Series", value_name=y_label)
@@ -112,82 +177,142 @@ def plot_interactive(df, title, y_label="Equity"):
     )
     st.altair_chart(chart, use_container_width=True)
 
-def backtest_returns(df, StratClass):
-    cerebro = bt.Cerebro(stdstats=False)
-    cerebro.adddata(bt.feeds.PandasData(dataname=df))
-    cerebro.addstrategy(StratClass)
-    cerebro.broker.setcash(1.0)
-    cerebro.addanalyzer(
-        bt.analyzers.TimeReturn,
-        timeframe=bt.TimeFrame.Days,
-        _name="timereturn"
-    )
-    result = cerebro.run()[0]
-    ret = result.analyzers.timereturn.get_analysis()
-    return pd.Series(ret).sort_index().astype(float)
-
-def backtest_portfolio(strategy_cls, tickers, duration):
-    cerebro = bt.Cerebro(stdstats=False)
+def portfolio_order(tickers):
     # For rebalance strategies ensure SPY first, GLD last
-    if strategy_cls in [WeeklyMomentumRebalance, DynamicSafeRebalance]:
+    if spec.portfolio:
         # place SPY first if present
         if "SPY" in tickers:
             tickers = ["SPY"] + [t for t in tickers if t != "SPY"]
         # ensure GLD is last
         if "GLD" in tickers:
             tickers = [t for t in tickers if t != "GLD"] + ["GLD"]
-    for tic in tickers:
-        df = load_and_prep(tic, duration)
-        data = bt.feeds.PandasData(dataname=df, name=tic)
-        cerebro.adddata(data)
-    # pass dynamic params
-    if strategy_cls is WeeklyMomentumRebalance:
-        cerebro.addstrategy(
-            strategy_cls,
-            lookback_days=lookback_days,
-            rebalance_period=rebalance_period
-        )
-    elif strategy_cls is DynamicSafeRebalance:
-        cerebro.addstrategy(
-            strategy_cls,
-            lookback_days=lookback_days,
-            rebalance_period=rebalance_period,
-            vol_lookback=vol_lookback,
-            stoploss_pct=stoploss_pct,
-            safe_asset="GLD"
-        )
-    else:
-        cerebro.addstrategy(strategy_cls)
+    return tickers
+
+def backtest_panel(strategy_cls, tickers, duration):
+    # Moteur panel : tout l'univers en matrices (panel déjà aligné), poids calculés en bloc
+    from panel_engine import run_panel
+    from result_cache import Result, cached_result
+
+    order = tuple(portfolio_order(tickers))
+    universe = {tic: load_and_prep(tic, duration) for tic in order}
+    params = strat_params
+
+    def compute():
+        panel = load_panel(order, duration, calendar)
+        values, _, _, trades, traded = run_panel(panel, strategy_cls, params, INITIAL_CAPITAL)
+        return Result.from_series(pd.Series(values, index=panel.dates), traded=traded, trades=trades)
+
+    # Déjà calculé pour ces données et ces paramètres : servi par le cache disque
+    res = cached_result(strategy_cls, params, universe, "panel", compute, cash=INITIAL_CAPITAL, calendar=calendar)
+    return res.series(), res.meta["traded"]
+
+def panel_exact(panel):
+    # Moteur panel == Backtrader seulement si tous les actifs cotent chaque date du calendrier
+    from panel_engine import same_calendar
+    return same_calendar(panel)
+
+def backtest_portfolio(strategy_cls, tickers, duration):
+    from result_cache import Result, cached_result
+
+    order = tuple(portfolio_order(tickers))
+    universe = {tic: load_and_prep(tic, duration) for tic in order}
+    params = strat_params
+
+    def compute():
+        return Result.from_series(run_portfolio(strategy_cls, load_panel(order, duration, calendar), params))
+
+    return cached_result(strategy_cls, params, universe, "backtrader", compute,
+                         cash=INITIAL_CAPITAL, calendar=calendar).series()
+
+def backtest_shared(strategy_cls, tickers, duration, engine, limits=None):
+    # Mode portefeuille : tous les actifs en un seul passage, broker et capital communs
+    from engines import portfolio_backtest
+
+    universe = {tic: load_and_prep(tic, duration) for tic in tickers}
+    res = portfolio_backtest(universe, strategy_cls, strat_params, cash=INITIAL_CAPITAL, engine=engine,
+                             limits=limits)
+    return (1 + res.series()).cumprod() * INITIAL_CAPITAL, res.meta["traded"]
+
+def run_portfolio(strategy_cls, panel, params):
+    import backtrader as bt
+    from feeds import feed_from_arrays
+    from instrumentation import instrument
+
+    cerebro = bt.Cerebro(stdstats=False)
+    for tic in panel.tickers:
+        # Barres de l'actif retenues par le calendrier maître
+        ts, bars = panel.bars(tic)
+        cerebro.adddata(feed_from_arrays(ts, bars, tic))
+    cerebro.addstrategy(strategy_cls, **params)
     cerebro.broker.setcash(INITIAL_CAPITAL)
     cerebro.addanalyzer(
         bt.analyzers.TimeReturn,
         timeframe=bt.TimeFrame.Days,
         _name="timereturn"
     )
+    instrument(cerebro)
     strat = cerebro.run()[0]
     ret = strat.analyzers.timereturn.get_analysis()
     series = pd.Series(ret).sort_index().astype(float)
     return (1 + series).cumprod() * INITIAL_CAPITAL
 
+def show_metrics(eq_port, traded=None, periods=TRADING_DAYS):
+    # Mêmes formules que backtest.py, sweep et walk-forward (metrics.py),
+    # annualisées sur le calendrier du panel
+    m = equity_metrics(eq_port.to_numpy(), periods, traded=traded)
+    st.write(f"**Total Return**: {m['total_return']:.2f}%")
+    st.write(f"**CAGR**: {m['cagr']:.2f}%")
+    st.write(f"**Volatilité ann.**: {m['volatility']:.2f}%")
+    st.write(f"**Sharpe Ratio**: {m['sharpe']:.2f}")
+    st.write(f"**Sortino Ratio**: {m['sortino']:.2f}")
+    st.write(f"**Max Drawdown**: {m['max_dd']:.2f}% ({m['max_dd_duration']:.0f} jours sous le plus haut)")
+    st.write(f"**Calmar Ratio**: {m['calmar']:.2f}")
+    if traded is not None:
+        st.write(f"**Turnover ann.**: {m['turnover']:.2f}")
+    values = eq_port.to_numpy()
+    if len(values) > 2:
+        # Risque sur une barre du calendrier, à 95 %
+        from risk import var_cvar
+        rets = (values[1:] / values[:-1] - 1.0)[:, None]
+        h_var, h_cvar = var_cvar(rets, [1.0])
+        p_var, p_cvar = var_cvar(rets, [1.0], method="parametric")
+        st.write(f"**VaR 95 % (1 j)**: {100 * h_var[0]:.2f}% historique, {100 * p_var[0]:.2f}% normale")
+        st.write(f"**CVaR 95 % (1 j)**: {100 * h_cvar[0]:.2f}% historique, {100 * p_cvar[0]:.2f}% normale")
+    if len(eq_port) > ROLLING_WINDOW:
+        rs = pd.DataFrame({f"Sharpe {ROLLING_WINDOW} j": rolling_sharpe(eq_port.to_numpy(), ROLLING_WINDOW, periods)[0]},
+                          index=eq_port.index[1:])
+        plot_interactive(rs.dropna(), "Sharpe glissant", y_label="Sharpe")
+
 # --- Logique principale ---
 
-if strategy_name in ["Weekly Rebalance", "Dynamic Safe Rebalance"]:
-    eq_port = backtest_portfolio(StratCls, selected_tickers, duration)
+# Profil propre à ce rerun : ContextVar du thread de la session, les autres
+# sessions (et leurs profils) ne sont pas touchées
+if profile_run:
+    from instrumentation import disable, enable
+    enable()
 
-    # Build Buy & Hold curves for comparison
-    bh_curves = {}
-    for tic in selected_tickers:
-        df_t = load_and_prep(tic, duration)
-        bh = (df_t["Close"] / df_t["Close"].iloc[0]) * (INITIAL_CAPITAL / len(selected_tickers))
-        bh.index = pd.to_datetime(bh.index)
-        bh_curves[tic] = bh
-    df_bh = pd.DataFrame(bh_curves)
-    idx   = eq_port.index.union(df_bh.index).sort_values()
-    df_bh = df_bh.reindex(idx).ffill()
-    bh_port = df_bh.sum(axis=1)
+# Univers aligné sur le calendrier maître (une fois, partagé entre reruns)
+panel = load_panel(tuple(portfolio_order(selected_tickers)), duration, calendar)
+
+# Buy & Hold de chaque actif, directement sur le panel
+df_bh   = pd.DataFrame(panel.buy_and_hold(INITIAL_CAPITAL), index=panel.dates, columns=panel.tickers)
+bh_port = df_bh.sum(axis=1)
+
+if spec.portfolio or allocation == "shared":
+    if allocation == "shared":
+        eq_port, traded = backtest_shared(StratCls, selected_tickers, duration, engine, limits)
+    elif engine == "vector" and panel_exact(panel):
+        eq_port, traded = backtest_panel(StratCls, selected_tickers, duration)
+    else:
+        if engine == "vector":
+            st.caption("Actifs sans barre à certaines dates du calendrier : le moteur panel n'y reproduit "
+                       "pas Backtrader, backtest lancé sur Backtrader.")
+        eq_port, traded = backtest_portfolio(StratCls, selected_tickers, duration), None
+    # Courbe ramenée sur le calendrier maître (identité pour le moteur panel)
+    eq_port = pd.Series(panel.sample(eq_port), index=panel.dates).dropna()
 
     if eq_port.empty:
-        st.warning("Pas assez de données pour le rebalancement.")
+        st.warning("Pas assez de données pour le backtest du portefeuille.")
     else:
         st.subheader("Buy & Hold par actif")
         plot_interactive(df_bh, "Buy & Hold par actif")
@@ -197,47 +322,27 @@ if strategy_name in ["Weekly Rebalance", "Dynamic Safe Rebalance"]:
             f"{strategy_name} Portfolio": eq_port,
             "Buy & Hold Portfolio":       bh_port
         })
-        plot_interactive(port_df, "Portefeuille : Rebalance vs Buy & Hold", y_label="Valorisation")
-
-        # Métriques agrégées
-        first, last = eq_port.iloc[0], eq_port.iloc[-1]
-        total_ret = (last / first - 1) * 100
-        cagr      = (last / first) ** (TRADING_DAYS / len(eq_port)) - 1
-        rets      = eq_port.pct_change().dropna()
-        vol       = rets.std() * (TRADING_DAYS**0.5) * 100
-        sharpe    = rets.mean() / rets.std() * (TRADING_DAYS**0.5)
-        max_dd    = ((eq_port.cummax() - eq_port) / eq_port.cummax()).max() * 100
+        plot_interactive(port_df, "Portefeuille : Stratégie vs Buy & Hold", y_label="Valorisation")
 
         st.subheader("Métriques agrégées")
-        st.write(f"**Total Return**: {total_ret:.2f}%")
-        st.write(f"**CAGR**: {cagr*100:.2f}%")
-        st.write(f"**Volatilité ann.**: {vol:.2f}%")
-        st.write(f"**Sharpe Ratio**: {sharpe:.2f}")
-        st.write(f"**Max Drawdown**: {max_dd:.2f}%")
+        show_metrics(eq_port, traded, panel.periods_per_year)
 
 else:
-    # Backtest et Buy & Hold par actif
-    strat_curves, bh_curves = {}, {}
+    # Backtest par actif, courbes reportées sur le calendrier du panel
+    from parallel_runner import backtest_universe
+
+    strat_curves = {}
+    universe = {tic: load_and_prep(tic, duration) for tic in selected_tickers}
+    # Backtrader : un process par cœur ; le moteur vectorisé va plus vite en local
+    # (et le profil ne voit que ce process)
+    returns = backtest_universe(universe, StratCls, strat_params, engine=engine,
+                                max_workers=1 if engine == "vector" or profile_run else None)
     for tic in selected_tickers:
-        df_t = load_and_prep(tic, duration)
-
-        sr = backtest_returns(df_t, StratCls)
-        eq = (1 + sr).cumprod() * (INITIAL_CAPITAL / len(selected_tickers))
-        eq.index = pd.to_datetime(eq.index)
-        strat_curves[tic] = eq
-
-        bh = (df_t["Close"] / df_t["Close"].iloc[0]) * (INITIAL_CAPITAL / len(selected_tickers))
-        bh.index = pd.to_datetime(bh.index)
-        bh_curves[tic] = bh
-
-    df_strat = pd.DataFrame(strat_curves)
-    df_bh    = pd.DataFrame(bh_curves)
-    idx      = df_strat.index.union(df_bh.index).sort_values()
-    df_strat = df_strat.reindex(idx).ffill()
-    df_bh    = df_bh.reindex(idx).ffill()
+        eq = (1 + returns[tic]).cumprod() * (INITIAL_CAPITAL / len(selected_tickers))
+        strat_curves[tic] = panel.take(eq.to_numpy(), tic)
 
-    eq_port = df_strat.sum(axis=1)
-    bh_port = df_bh.sum(axis=1)
+    df_strat = pd.DataFrame(strat_curves, index=panel.dates)
+    eq_port  = df_strat.sum(axis=1)
 
     st.subheader(f"Performance cumulative par actif ({strategy_name})")
     plot_interactive(df_strat, f"{strategy_name} par actif")
@@ -253,18 +358,38 @@ else:
     plot_interactive(port_df, "Portefeuille : Stratégie vs Buy & Hold", y_label="Valorisation")
 
     st.subheader("Métriques agrégées du portefeuille")
-    rets   = eq_port.pct_change().dropna()
-    sharpe = rets.mean() / rets.std() * (TRADING_DAYS**0.5)
-    vol    = rets.std() * (TRADING_DAYS**0.5) * 100
-    total_ret = (eq_port.iloc[-1] / eq_port.iloc[0] - 1) * 100
-    cagr      = (eq_port.iloc[-1] / eq_port.iloc[0]) ** (TRADING_DAYS / len(eq_port)) - 1
-    max_dd    = ((eq_port.cummax() - eq_port) / eq_port.cummax()).max() * 100
-
-    st.write(f"**Total Return**: {total_ret:.2f}%")
-    st.write(f"**CAGR**: {cagr*100:.2f}%")
-    st.write(f"**Volatilité ann.**: {vol:.2f}%")
-    st.write(f"**Sharpe Ratio**: {sharpe:.2f}")
-    st.write(f"**Max Drawdown**: {max_dd:.2f}%")
+    show_metrics(eq_port, periods=panel.periods_per_year)
+
+if monte_carlo_run and len(eq_port.dropna()) > 2:
+    # Distributions du capital final, du max drawdown et du Sharpe
+    from monte_carlo import simulate as monte_carlo, summary as monte_carlo_summary
+
+    values = eq_port.dropna().to_numpy()
+    mc = monte_carlo(values[1:] / values[:-1] - 1.0, MC_PATHS, "block", MC_BLOCK,
+                     panel.periods_per_year, capital=values[0])
+    st.subheader(f"Monte Carlo ({MC_PATHS} trajectoires, blocs de {MC_BLOCK} barres)")
+    st.dataframe(monte_carlo_summary(mc))
+
+prof = disable() if profile_run else None
+if prof is not None:
+    report = prof.to_dict()
+    with st.expander(f"Profil : {report['wall']:.2f}s, pic RSS {report['peak_rss_mb']:.0f} Mo", expanded=True):
+        st.dataframe(pd.DataFrame.from_dict(report["phases"], orient="index"))
+        st.download_button("Télécharger le profil (JSON)", json.dumps(report, indent=2),
+                           file_name="profile.json", mime="application/json")
+
+# État des caches en fin de rerun (modules chargés par le backtest)
+from indicator_cache import get_cache
+from result_cache import get_result_cache
+
+cache_stats = get_cache().stats() if get_cache() is not None else None
+if cache_stats:
+    st.sidebar.caption(f"Cache indicateurs : {cache_stats['entries']} séries, "
+                       f"{cache_stats['bytes'] / 2**20:.1f} Mo, {cache_stats['hits']} hits")
+result_stats = get_result_cache().stats() if get_result_cache() is not None else None
+if result_stats:
+    st.sidebar.caption(f"Cache résultats : {result_stats['entries']} backtests, "
+                       f"{result_stats['bytes'] / 2**20:.1f} Mo, {result_stats['hits']} hits")
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,34 @@
+"""
+Tests de parité sur données synthétiques (SyntheticProvider, graine fixe) :
+les modules de src/ s'importent par leur nom, comme dans les scripts.
+Caches disque coupés et pas de réseau.
+"""
+import os
+import sys
+
+os.environ.setdefault('DATA_PROVIDER', 'synthetic')
+os.environ.setdefault('RESULT_CACHE_MB', '0')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+import pytest
+
+from providers import SyntheticProvider
+
+END = '2024-06-28'
+
+
+@pytest.fixture(scope='session')
+def provider():
+    return SyntheticProvider(end=END)
+
+
+@pytest.fixture(scope='session')
+def universe(provider):
+    """Actions et ETF (jours ouvrés) sur 4 ans : {ticker: DataFrame OHLCV}."""
+    return {tic: provider.generate(tic, start='2020-06-01') for tic in ('SPY', 'QQQ', 'TLT', 'GLD')}
+
+
+def same(a, b) -> bool:
+    """Égalité bit à bit (NaN compris)."""
+    return np.array_equal(np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64), equal_nan=True)
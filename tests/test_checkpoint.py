@@ -0,0 +1,47 @@
+"""Reprise sur checkpoint == passage complet, après ajout de barres au store."""
+import pytest
+
+import strategy, strategy2, strategy3, strategy4, strategy5, strategy_rebalance
+from checkpoint import CheckpointStore, refresh, refresh_panel
+from conftest import same
+from data_store import OHLCVStore
+
+TAIL = 60
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    return OHLCVStore(str(tmp_path / 'store')), CheckpointStore(str(tmp_path / 'ck')), CheckpointStore(str(tmp_path / 'full'))
+
+
+@pytest.mark.parametrize('strat_cls', [strategy.MomentumStrategy, strategy2.DonchianBreakoutStrategy,
+                                       strategy3.EnhancedBreakoutStrategy, strategy4.RegimeAwareBreakoutStrategy],
+                         ids=lambda c: c.__name__)
+def test_single_resume_matches_full_run(universe, dirs, strat_cls):
+    store, checkpoints, empty = dirs
+    df = universe['SPY']
+    store.write('SPY', '1d', df.iloc[:-TAIL])
+    first = refresh(strat_cls, 'SPY', cash=100_000.0, store=store, checkpoints=checkpoints)
+    assert not first.resumed
+    store.append('SPY', '1d', df.iloc[-TAIL:])
+    resumed = refresh(strat_cls, 'SPY', cash=100_000.0, store=store, checkpoints=checkpoints)
+    full = refresh(strat_cls, 'SPY', cash=100_000.0, store=store, checkpoints=empty)
+    assert resumed.resumed and resumed.processed == TAIL + 1
+    assert same(resumed.equity, full.equity)
+    assert (resumed.trades, resumed.traded) == (full.trades, full.traded)
+
+
+@pytest.mark.parametrize('strat_cls', [strategy_rebalance.WeeklyMomentumRebalance, strategy5.DynamicSafeRebalance],
+                         ids=lambda c: c.__name__)
+def test_panel_resume_matches_full_run(universe, dirs, strat_cls):
+    store, checkpoints, empty = dirs
+    for tic, df in universe.items():
+        store.write(tic, '1d', df.iloc[:-TAIL])
+    refresh_panel(strat_cls, list(universe), store=store, checkpoints=checkpoints)
+    for tic, df in universe.items():
+        store.append(tic, '1d', df.iloc[-TAIL:])
+    resumed = refresh_panel(strat_cls, list(universe), store=store, checkpoints=checkpoints)
+    full = refresh_panel(strat_cls, list(universe), store=store, checkpoints=empty)
+    assert resumed.resumed and full.trades > 0
+    assert same(resumed.equity, full.equity)
+    assert (resumed.trades, resumed.traded) == (full.trades, full.traded)
@@ -0,0 +1,54 @@
+"""Store OHLCV : ajout incrémental (dernière bougie remplacée) et lectures par plage."""
+import pandas as pd
+import pytest
+
+from data_store import OHLCVStore
+
+
+@pytest.fixture
+def spy(provider):
+    return provider.generate('SPY', start='2023-01-01')
+
+
+def test_write_read_round_trip(tmp_path, spy):
+    store = OHLCVStore(str(tmp_path))
+    assert store.write('SPY', '1d', spy) == len(spy)
+    back = store.read('SPY')
+    assert back.index.equals(spy.index)
+    assert back.equals(spy[list(back.columns)].astype('float64'))
+    assert store.meta('SPY')['rows'] == len(spy)
+    assert store.last_bar('SPY') == spy.index[-1]
+    assert store.tickers() == ['SPY']
+
+
+def test_append_replaces_overlap(tmp_path, spy):
+    store = OHLCVStore(str(tmp_path))
+    store.write('SPY', '1d', spy.iloc[:-10])
+    # La dernière bougie stockée était incomplète : la queue la réécrit
+    partial = spy.iloc[:-10].copy()
+    partial.iloc[-1, partial.columns.get_loc('Close')] = -1.0
+    store.write('SPY', '1d', partial)
+    assert store.append('SPY', '1d', spy.iloc[-11:]) == 10
+    back = store.read('SPY')
+    assert back.index.equals(spy.index) and (back['Close'] == spy['Close']).all()
+    assert store.append('SPY', '1d', spy.iloc[:0]) == 0
+    assert store.meta('SPY')['rows'] == len(spy)
+
+
+def test_append_to_missing_ticker_writes(tmp_path, spy):
+    store = OHLCVStore(str(tmp_path))
+    assert store.append('SPY', '1d', spy) == len(spy)
+    assert store.read('SPY').index.equals(spy.index)
+
+
+def test_range_reads_are_inclusive(tmp_path, spy):
+    store = OHLCVStore(str(tmp_path))
+    store.write('SPY', '1d', spy)
+    start, end = spy.index[20], spy.index[60]
+    part = store.read('SPY', start=start, end=end)
+    assert part.index.equals(spy.index[20:61])
+    # Bornes entre deux bougies, ou hors de l'historique
+    assert store.read('SPY', start=start - pd.Timedelta(hours=12), end=end + pd.Timedelta(hours=12)).index.equals(part.index)
+    assert store.read('SPY', end=spy.index[0] - pd.Timedelta(days=1)).empty
+    arr = store.arrays('SPY', start=start, end=end)
+    assert arr.shape == (6, 41) and (arr[4] == spy['Close'].to_numpy()[20:61]).all()
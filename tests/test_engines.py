@@ -0,0 +1,20 @@
+"""Moteur vectorisé == backtrader : mêmes rendements, bit à bit."""
+import pytest
+
+import strategy, strategy2, strategy3, strategy4
+from conftest import same
+from engines import backtest_returns
+
+STRATEGIES = (strategy.MomentumStrategy, strategy2.DonchianBreakoutStrategy,
+              strategy3.EnhancedBreakoutStrategy, strategy4.RegimeAwareBreakoutStrategy)
+
+
+@pytest.mark.parametrize('ticker', ['SPY', 'BTC-USD'])
+@pytest.mark.parametrize('strat_cls', STRATEGIES, ids=lambda c: c.__name__)
+def test_vector_matches_backtrader(provider, strat_cls, ticker):
+    df = provider.generate(ticker, start='2019-01-01')
+    bt_ret = backtest_returns(df, strat_cls, None, 100_000.0, 'backtrader')
+    vec_ret = backtest_returns(df, strat_cls, None, 100_000.0, 'vector')
+    assert (bt_ret != 0).any()
+    assert bt_ret.index.equals(vec_ret.index)
+    assert same(bt_ret, vec_ret)
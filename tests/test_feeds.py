@@ -0,0 +1,72 @@
+"""ArrayData == bt.feeds.PandasData : mêmes dates, mêmes rendements, buffers partagés entre runs."""
+import datetime
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+import pytest
+from backtrader.utils import date2num
+
+import feeds
+import strategy, strategy2, strategy3, strategy4
+from conftest import same
+from data_store import OHLCVStore, to_epoch_seconds
+
+STRATEGIES = [strategy.MomentumStrategy, strategy2.DonchianBreakoutStrategy,
+              strategy3.EnhancedBreakoutStrategy, strategy4.RegimeAwareBreakoutStrategy]
+
+
+def _returns(feed, strat_cls) -> pd.Series:
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(feed)
+    cerebro.addstrategy(strat_cls)
+    cerebro.broker.setcash(1e5)
+    cerebro.addanalyzer(bt.analyzers.TimeReturn, timeframe=bt.TimeFrame.Days, _name='timereturn')
+    return pd.Series(cerebro.run()[0].analyzers.timereturn.get_analysis()).sort_index()
+
+
+@pytest.fixture(scope='module')
+def spy(provider):
+    return provider.generate('SPY', start='2019-01-01')
+
+
+def test_datenums_match_date2num():
+    stamps = pd.DatetimeIndex(['1970-01-01', '2024-02-29 09:30', '2024-02-29 15:59:59', '2099-12-31 23:59:59',
+                               '1400-06-01 12:00'])                       # hors du binade courant
+    minutes = pd.date_range('2024-01-02 14:30', periods=2000, freq='min')
+    for index in (stamps, minutes):
+        expected = [date2num(ts.to_pydatetime()) for ts in index]
+        assert same(feeds.bt_datenums(to_epoch_seconds(index)), expected)
+
+
+@pytest.mark.parametrize('strat_cls', STRATEGIES, ids=lambda cls: cls.__name__)
+def test_array_feed_matches_pandas_feed(spy, strat_cls):
+    ref = _returns(bt.feeds.PandasData(dataname=spy), strat_cls)
+    got = _returns(feeds.feed_from_frame(spy), strat_cls)
+    assert (ref != 0).any()
+    assert ref.index.equals(got.index) and same(ref, got)
+
+
+def test_bar_by_bar_path_matches(spy):
+    # fromdate : chargement classique barre à barre sur les mêmes buffers
+    start = datetime.datetime(2021, 3, 1)
+    ref = _returns(bt.feeds.PandasData(dataname=spy, fromdate=start), strategy.MomentumStrategy)
+    got = _returns(feeds.feed_from_frame(spy, fromdate=start), strategy.MomentumStrategy)
+    assert ref.index.equals(got.index) and same(ref, got)
+
+
+def test_buffers_shared_and_untouched(spy):
+    first, second = feeds.feed_from_frame(spy), feeds.feed_from_frame(spy)
+    assert first.p.buffers is second.p.buffers
+    before = {k: np.array(v) for k, v in first.p.buffers.lines.items()}
+    _returns(first, strategy2.DonchianBreakoutStrategy)
+    _returns(second, strategy2.DonchianBreakoutStrategy)
+    assert all(same(before[k], v) for k, v in first.p.buffers.lines.items())
+
+
+def test_store_feed_matches_frame(tmp_path, spy):
+    store = OHLCVStore(str(tmp_path))
+    store.write('SPY', '1d', spy)
+    ref = _returns(feeds.feed_from_frame(spy), strategy.MomentumStrategy)
+    got = _returns(feeds.feed_from_store('SPY', store=store), strategy.MomentumStrategy)
+    assert ref.index.equals(got.index) and same(ref, got)
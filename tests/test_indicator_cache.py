@@ -0,0 +1,73 @@
+"""Cache d'indicateurs : LRU en octets, empreintes, une entrée partagée par les moteurs et l'app."""
+import numpy as np
+import pytest
+
+import engines
+import indicators as ind
+import strategy, strategy2, strategy3, strategy4
+from conftest import same
+from data_store import to_epoch_seconds
+from indicator_cache import IndicatorCache, fingerprint, fingerprint_bars, get_cache, set_cache
+
+STRATEGIES = [strategy.MomentumStrategy, strategy2.DonchianBreakoutStrategy,
+              strategy3.EnhancedBreakoutStrategy, strategy4.RegimeAwareBreakoutStrategy]
+
+
+@pytest.fixture
+def fresh_cache():
+    previous = get_cache()
+    set_cache(IndicatorCache())
+    yield get_cache()
+    set_cache(previous)
+
+
+def test_lru_bounded_in_bytes():
+    cache = IndicatorCache(max_bytes=3 * 800)
+    for key in 'abc':
+        cache[key] = np.zeros(100)                    # 800 octets chacun
+    assert cache.get('a') is not None                 # a redevient le plus récent
+    cache['d'] = np.zeros(100)
+    assert cache.get('b') is None and len(cache) == 3 and cache.nbytes == 2400
+    assert cache.stats()['evictions'] == 1 and (cache.hits, cache.misses) == (1, 1)
+    with pytest.raises(ValueError):
+        cache.get('a')[0] = 1.0                       # partagé : lecture seule
+    assert cache.compute('e', np.ones, 5).sum() == 5 and cache.compute('e', np.zeros, 5).sum() == 5
+
+
+def test_fingerprint(universe):
+    df = universe['SPY']
+    fp = fingerprint(df)
+    assert fingerprint(df.assign(Signal=1.0)) == fp   # colonnes ajoutées ignorées
+    bars = {col: df[col].to_numpy() for col in df.columns}
+    assert fingerprint_bars(to_epoch_seconds(df.index), bars) == fp
+    changed = df.copy()
+    changed.iloc[-1, changed.columns.get_loc('Volume')] += 1
+    assert fingerprint(changed) != fp
+    assert fingerprint(df.iloc[:-1]) != fp
+
+
+def test_backtrader_reuses_vector_entries(universe, fresh_cache):
+    df = universe['SPY']
+    for strat_cls in STRATEGIES:
+        engines.backtest_returns(df, strat_cls, engine='vector')
+    entries, misses = len(fresh_cache), fresh_cache.misses
+    for strat_cls in STRATEGIES:
+        engines.backtest_returns(df, strat_cls, engine='backtrader')
+    assert len(fresh_cache) == entries and fresh_cache.misses == misses
+    # Les indicateurs de l'app lisent les mêmes entrées
+    hits = fresh_cache.hits
+    ind.EMA(df, 20), ind.RSI(df, 14), ind.ATR(df, 14)
+    assert fresh_cache.hits == hits + 3 and len(fresh_cache) == entries
+
+
+@pytest.mark.parametrize('strat_cls', STRATEGIES, ids=lambda cls: cls.__name__)
+def test_cache_off_same_results(universe, strat_cls):
+    df = universe['QQQ']
+    with_cache = engines.backtest_returns(df, strat_cls, engine='backtrader')
+    previous = get_cache()
+    set_cache(None)                                   # bt.ind.* d'origine
+    try:
+        without = engines.backtest_returns(df, strat_cls, engine='backtrader')
+    finally:
+        set_cache(previous)
+    assert with_cache.index.equals(without.index) and same(with_cache, without)
@@ -0,0 +1,92 @@
+"""Indicateurs incrémentaux (*Stream) et versions pandas == vector_indicators ; matrices == colonnes seules."""
+import numpy as np
+import pytest
+
+import indicators as ind
+import vector_indicators as vi
+from conftest import same
+
+
+@pytest.fixture(scope='module')
+def bars(provider):
+    df = provider.generate('SPY', start='2018-01-01')
+    return df, {col: df[col].to_numpy() for col in ('High', 'Low', 'Close')}
+
+
+def _stream(stream, *columns):
+    return [stream.update(*row) for row in zip(*columns)]
+
+
+CASES = {
+    'sma':      (lambda: ind.SMAStream(20), lambda h, l, c: vi.sma(c, 20), 'c'),
+    'ema':      (lambda: ind.EMAStream(20), lambda h, l, c: vi.ema(c, 20), 'c'),
+    'smma':     (lambda: ind.SMMAStream(14), lambda h, l, c: vi.smma(c, 14), 'c'),
+    'rsi':      (lambda: ind.RSIStream(14), lambda h, l, c: vi.rsi(c, 14), 'c'),
+    'atr':      (lambda: ind.ATRStream(14), lambda h, l, c: vi.atr(h, l, c, 14), 'hlc'),
+    'adx':      (lambda: ind.ADXStream(14), lambda h, l, c: vi.adx(h, l, c, 14), 'hlc'),
+    'stddev':   (lambda: ind.StdDevStream(20), lambda h, l, c: vi.stddev(c, 20), 'c'),
+    'highest':  (lambda: ind.HighestStream(20), lambda h, l, c: vi.highest(h, 20), 'h'),
+    'lowest':   (lambda: ind.LowestStream(20), lambda h, l, c: vi.lowest(l, 20), 'l'),
+    'delay':    (lambda: ind.DelayStream(), lambda h, l, c: vi.delay(c), 'c'),
+}
+
+
+@pytest.mark.parametrize('name', CASES)
+def test_stream_matches_vector(bars, name):
+    _, b = bars
+    make, batch, cols = CASES[name]
+    h, l, c = b['High'], b['Low'], b['Close']
+    columns = [{'h': h, 'l': l, 'c': c}[k] for k in cols]
+    assert same(_stream(make(), *columns), batch(h, l, c))
+
+
+def test_crossover_stream_matches_vector(bars):
+    _, b = bars
+    fast, slow = vi.ema(b['Close'], 5), vi.ema(b['Close'], 20)
+    assert same(_stream(ind.CrossOverStream(), fast, slow), vi.crossover(fast, slow))
+
+
+def test_snapshot_restore_resumes(bars):
+    _, b = bars
+    h, l, c = b['High'], b['Low'], b['Close']
+    first = ind.ADXStream(14)
+    first.extend(h[:300], l[:300], c[:300])
+    resumed = ind.ADXStream(14).restore(first.snapshot())
+    assert same(_stream(resumed, h[300:], l[300:], c[300:]), vi.adx(h, l, c, 14)[300:])
+
+
+def test_pandas_wrappers_match_vector(bars):
+    df, b = bars
+    assert same(ind.EMA(df, 20), vi.ema(b['Close'], 20))
+    assert same(ind.RSI(df, 14), vi.rsi(b['Close'], 14))
+    assert same(ind.ATR(df, 14), vi.atr(b['High'], b['Low'], b['Close'], 14))
+
+
+def test_pandas_wrappers_need_only_their_columns(bars):
+    # EMA / RSI sur la clôture seule, ATR sur High / Low / Close (sans Open ni Volume)
+    df, b = bars
+    close = df[['Close']]
+    assert same(ind.EMA(close, 10), vi.ema(b['Close'], 10))
+    assert same(ind.RSI(close, 14), vi.rsi(b['Close'], 14))
+    assert same(ind.ATR(df[['High', 'Low', 'Close']], 14), vi.atr(b['High'], b['Low'], b['Close'], 14))
+
+
+def test_matrix_columns_match_single_series(provider):
+    # Historiques de longueurs différentes, alignés sur la dernière barre (NaN de tête)
+    frames = [provider.generate(tic, start=start) for tic, start in
+              (('SPY', '2019-01-01'), ('QQQ', '2022-01-01'), ('TLT', '2024-05-01'))]
+    n = len(frames[0])
+    block = {col: np.full((n, len(frames)), np.nan) for col in ('High', 'Low', 'Close')}
+    for j, df in enumerate(frames):
+        for col in block:
+            block[col][n - len(df):, j] = df[col].to_numpy()
+    h, l, c = block['High'], block['Low'], block['Close']
+    funcs = [lambda h, l, c: vi.sma(c, 50), lambda h, l, c: vi.ema(c, 20), lambda h, l, c: vi.rsi(c, 14),
+             lambda h, l, c: vi.adx(h, l, c, 14), lambda h, l, c: vi.stddev(c, 20),
+             lambda h, l, c: vi.highest(vi.delay(h), 20), lambda h, l, c: vi.crossover(vi.ema(c, 5), vi.ema(c, 20))]
+    for fn in funcs:
+        out = fn(h, l, c)
+        for j, df in enumerate(frames):
+            single = fn(*(df[col].to_numpy() for col in ('High', 'Low', 'Close')))
+            assert same(out[n - len(df):, j], single)
+            assert np.isnan(out[:n - len(df), j]).all()
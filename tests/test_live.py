@@ -0,0 +1,33 @@
+"""
+Paper trading rejoué (MockExchange local) == backtest portefeuille en bloc, ordre
+par ordre : le live démarre à plat, juste avant la 1re exécution du backtest.
+"""
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import strategy, strategy2, strategy3, strategy4
+from live import paper
+from vector_engine import run_portfolio
+
+
+@pytest.mark.parametrize('strat_cls', [strategy.MomentumStrategy, strategy2.DonchianBreakoutStrategy,
+                                       strategy3.EnhancedBreakoutStrategy, strategy4.RegimeAwareBreakoutStrategy],
+                         ids=lambda c: c.__name__)
+def test_replay_matches_batch_portfolio(universe, strat_cls):
+    data = {tic: universe[tic] for tic in ('SPY', 'QQQ', 'GLD')}
+    ref = run_portfolio(data, strat_cls, cash=100_000.0)
+    calendar = np.unique(np.concatenate([df.index.to_numpy() for df in data.values()]))
+    warmup = int(np.searchsorted(calendar, ref.fills['Date'].min().to_datetime64())) - 1
+    rt, _ = asyncio.run(paper(data, strat_cls, cash=100_000.0, warmup=warmup))
+
+    batch = ref.fills
+    live = pd.DataFrame(rt.fills, columns=['t', 'Ticker', 'Size', 'Price'])
+    assert len(batch) > 0
+    assert len(live) == len(batch)
+    assert (pd.to_datetime(live['t'], unit='s').to_numpy() == batch['Date'].to_numpy()).all()
+    assert (live['Ticker'].to_numpy() == batch['Ticker'].to_numpy()).all()
+    assert np.array_equal(live['Size'].to_numpy(), batch['Size'].to_numpy())
+    assert np.array_equal(live['Price'].to_numpy(), batch['Price'].to_numpy())
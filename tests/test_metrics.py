@@ -0,0 +1,61 @@
+"""Métriques vectorisées == calcul à la main, une courbe à la fois."""
+import math
+import statistics
+
+import numpy as np
+import pytest
+
+import metrics
+from metrics import batch_metrics, equity_metrics, rolling_sharpe
+
+CURVE = [100.0, 110.0, 99.0, 121.0, 110.0]
+
+
+def test_small_curve_by_hand():
+    m = equity_metrics(CURVE, periods=4, traded=50.0)
+    r = [CURVE[i + 1] / CURVE[i] - 1 for i in range(4)]            # +10 %, -10 %, +22.2 %, -9.1 %
+    mean, std = statistics.mean(r), statistics.stdev(r)
+    downside = math.sqrt(sum(min(x, 0.0) ** 2 for x in r) / 4)
+    assert m['total_return'] == pytest.approx(10.0)
+    assert m['cagr'] == pytest.approx((1.1 ** (4 / 5) - 1) * 100)   # 5 barres = 1.25 an
+    assert m['volatility'] == pytest.approx(std * 2 * 100)
+    assert m['sharpe'] == pytest.approx(mean / std * 2)
+    assert m['sortino'] == pytest.approx(mean / downside * 2)
+    assert m['max_dd'] == pytest.approx(10.0)                        # 110 → 99
+    assert m['max_dd_duration'] == 1
+    assert m['calmar'] == pytest.approx(m['cagr'] / 10.0)
+    assert m['turnover'] == pytest.approx(50.0 / 2 / 1.25 / statistics.mean(CURVE))
+
+
+def test_flat_curve_has_no_ratios():
+    m = equity_metrics([100.0] * 10)
+    assert m['total_return'] == 0 and m['max_dd'] == 0 and m['volatility'] == 0
+    assert all(math.isnan(m[k]) for k in ('sharpe', 'sortino', 'calmar', 'turnover'))
+
+
+def test_batch_rows_match_single_curves():
+    rng = np.random.default_rng(0)
+    curves = 100 * np.cumprod(1 + rng.normal(0.0005, 0.01, size=(6, 400)), axis=1)
+    batch = batch_metrics(curves, traded=np.arange(6) * 1e3)
+    for i, row in enumerate(curves):
+        single = equity_metrics(row, traded=i * 1e3)
+        for name in metrics.METRICS:
+            assert batch[name][i] == pytest.approx(single[name], nan_ok=True)
+        # Durée de drawdown : boucle naïve
+        peak, since, longest = -np.inf, 0, 0
+        for v in row:
+            since = 0 if v >= peak else since + 1
+            peak = max(peak, v)
+            longest = max(longest, since)
+        assert batch['max_dd_duration'][i] == longest
+
+
+def test_rolling_sharpe_matches_window_loop():
+    rng = np.random.default_rng(1)
+    curve = 100 * np.cumprod(1 + rng.normal(0.0005, 0.01, size=300))
+    r = curve[1:] / curve[:-1] - 1
+    out = rolling_sharpe(curve, window=20)[0]
+    assert np.isnan(out[:19]).all()
+    expected = [statistics.mean(r[i - 19:i + 1]) / statistics.stdev(r[i - 19:i + 1]) * math.sqrt(252)
+                for i in range(19, len(r))]
+    assert out[19:] == pytest.approx(expected, rel=1e-9)
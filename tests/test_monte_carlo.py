@@ -0,0 +1,60 @@
+"""Monte Carlo : trades fermés, mesures == metrics.py, tirages indépendants des lots et des workers."""
+import numpy as np
+import pytest
+
+import monte_carlo as mc
+from metrics import batch_metrics
+
+RETURNS = np.random.default_rng(3).normal(0.0005, 0.01, size=500)
+
+
+def test_trade_returns_by_hand():
+    equity = [100, 100, 110, 121, 121, 121, 110, 99, 99, 105]
+    position = [0, 1, 1, 1, 0, 0, 2, 2, 0, 3]                     # 2 trades fermés, 1 ouvert
+    assert [list(b) for b in mc.trade_bounds(position)] == [[1, 6], [4, 8]]
+    assert mc.trade_returns(equity, position) == pytest.approx([0.21, 99 / 121 - 1])
+    fills = [(1, 1.0, 0), (4, -1.0, 0), (6, 2.0, 0), (8, -2.0, 0), (9, 3.0, 0)]
+    assert list(mc.position_from_fills(10, fills)) == position
+
+
+def test_path_stats_match_metrics():
+    paths = np.vstack([RETURNS, RETURNS[::-1], RETURNS * 2])
+    stats = mc.path_stats(paths, capital=1.0)
+    equity = np.hstack([np.ones((3, 1)), np.cumprod(1 + paths, axis=1)])
+    expected = batch_metrics(equity)
+    assert stats['final'] == pytest.approx(equity[:, -1])
+    assert stats['max_dd'] == pytest.approx(expected['max_dd'])
+    assert stats['sharpe'] == pytest.approx(expected['sharpe'])
+
+
+def test_same_draws_whatever_batches_and_workers():
+    ref = mc.simulate(RETURNS, 2500, seed=7, max_workers=1)
+    small = mc.simulate(RETURNS, 2500, seed=7, max_workers=1, memory_mb=0.5)
+    pooled = mc.simulate(RETURNS, 2500, seed=7, max_workers=2)
+    for k in mc.STATS:
+        assert np.array_equal(getattr(ref, k), getattr(small, k))
+        assert np.array_equal(getattr(ref, k), getattr(pooled, k))
+    assert not np.array_equal(ref.final, mc.simulate(RETURNS, 2500, seed=8, max_workers=1).final)
+
+
+def test_method_invariants():
+    final = np.prod(1 + RETURNS)
+    # Ordre mélangé ou blocs couvrant tout l'historique (rotations) : capital final inchangé
+    shuffled = mc.simulate(RETURNS, 300, method='shuffle', max_workers=1)
+    rotated = mc.simulate(RETURNS, 300, method='block', block=len(RETURNS), max_workers=1)
+    assert shuffled.final == pytest.approx(final) and rotated.final == pytest.approx(final)
+    assert shuffled.historical['final'] == pytest.approx(final)
+    assert np.ptp(shuffled.max_dd) > 0
+    drawn = mc.simulate(RETURNS, 300, method='trades', max_workers=1)
+    assert np.ptp(drawn.final) > 0
+    table = mc.summary(drawn)
+    assert list(table.index) == list(mc.STATS) and (table['q5'] <= table['q95']).all()
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        mc.simulate(RETURNS, 10, method='garch')
+    with pytest.raises(ValueError):
+        mc.simulate(RETURNS[:1], 10)
+    with pytest.raises(ValueError):
+        mc.simulate(RETURNS, 10, block=0)
@@ -0,0 +1,34 @@
+"""Mode portefeuille : multi_asset (backtrader) == vector_engine.run_portfolio, plafonds compris."""
+import pytest
+
+import engines
+import strategy, strategy2, strategy3, strategy4
+from conftest import same
+from risk import RiskLimits
+
+STRATEGIES = [strategy.MomentumStrategy, strategy2.DonchianBreakoutStrategy,
+              strategy3.EnhancedBreakoutStrategy, strategy4.RegimeAwareBreakoutStrategy]
+
+
+@pytest.fixture(scope='module')
+def mixed(provider):
+    # Calendriers différents : actions 5 j, crypto 7 j
+    return {tic: provider.generate(tic, start='2021-01-01') for tic in ('SPY', 'QQQ', 'BTC-USD')}
+
+
+@pytest.mark.parametrize('limits', [None, RiskLimits(max_gross=0.8, max_position=0.3)], ids=['libre', 'plafonds'])
+@pytest.mark.parametrize('strat_cls', STRATEGIES, ids=lambda cls: cls.__name__)
+def test_portfolio_engines_agree(mixed, strat_cls, limits):
+    bt_res = engines.portfolio_backtest(mixed, strat_cls, None, 1e5, 'backtrader', limits)
+    vec_res = engines.portfolio_backtest(mixed, strat_cls, None, 1e5, 'vector', limits)
+    bt_ret, vec_ret = bt_res.series(), vec_res.series()
+    assert (bt_ret != 0).any()
+    assert bt_ret.index.equals(vec_ret.index) and same(bt_ret, vec_ret)
+    assert bt_res.meta['traded'] == vec_res.meta['traded']
+
+
+def test_limits_reduce_trading(mixed):
+    free = engines.portfolio_backtest(mixed, strategy.MomentumStrategy, None, 1e5, 'vector')
+    capped = engines.portfolio_backtest(mixed, strategy.MomentumStrategy, None, 1e5, 'vector',
+                                        RiskLimits(max_gross=0.8, max_position=0.3))
+    assert capped.meta['traded'] < free.meta['traded']
@@ -0,0 +1,36 @@
+"""Successive halving : paliers, candidates retenues, barres simulées."""
+import pytest
+
+import strategy
+import sweep
+from optimizer import rungs, successive_halving
+
+
+def test_rungs():
+    assert rungs(900, 1 / 9, 3) == [100, 300, 900]
+    assert rungs(1000, 1 / 9, 3) == [112, 336, 1000]         # arrondi au-dessus, dernier palier = n
+    assert rungs(10, 0.01, 2) == [2, 4, 8, 10]               # au moins 2 barres
+    assert rungs(500, 1.0, 3) == [500]
+
+
+def test_halving_keeps_top_third(universe):
+    data = {tic: universe[tic] for tic in ('SPY', 'QQQ')}
+    combos = sweep.grid({'ema_fast': [5, 10, 20], 'ema_slow': [40, 60, 80]})
+    res = successive_halving(data, strategy.MomentumStrategy, combos, eta=3, min_fraction=1 / 9, max_workers=1)
+    n = len(data['SPY'])
+    sizes = res.report['rungs']
+    assert sizes == rungs(n, 1 / 9, 3) and len(sizes) == 3
+    assert res.report['evaluations'] == 9 + 3 + 1
+    assert res.report['bars'] == 9 * sizes[0] + 3 * sizes[1] + n
+    table = res.table
+    assert table['rung'].value_counts().sort_index().tolist() == [6, 2, 1]
+    # Les survivantes d'un palier sont les meilleures du palier précédent
+    first = table[f'sharpe@{sizes[0]}']
+    assert first[table['rung'] >= 1].min() >= first[table['rung'] == 0].max()
+    top = table.iloc[0]
+    assert top['rung'] == 2 and {k: top[k] for k in res.best} == res.best
+
+
+def test_eta_must_exceed_one(universe):
+    with pytest.raises(ValueError):
+        successive_halving({'SPY': universe['SPY']}, strategy.MomentumStrategy, [{}], eta=1)
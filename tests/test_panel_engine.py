@@ -0,0 +1,52 @@
+"""Moteur panel == backtrader quand tous les actifs cotent chaque date (calendrier intersection)."""
+import backtrader as bt
+import pandas as pd
+import pytest
+
+import panel_engine
+import price_panel
+import strategy5, strategy_rebalance
+from conftest import same
+from feeds import feed_from_arrays
+
+
+def _backtrader(panel, strat_cls, params, cash):
+    cerebro = bt.Cerebro(stdstats=False)
+    for tic in panel.tickers:
+        ts, bars = panel.bars(tic)
+        cerebro.adddata(feed_from_arrays(ts, bars, tic))
+    cerebro.addstrategy(strat_cls, **params)
+    cerebro.broker.setcash(cash)
+    cerebro.addanalyzer(bt.analyzers.TimeReturn, timeframe=bt.TimeFrame.Days, _name='timereturn')
+    strat = cerebro.run()[0]
+    return pd.Series(strat.analyzers.timereturn.get_analysis()).sort_index().astype(float)
+
+
+@pytest.fixture(scope='module')
+def panel(provider, universe):
+    # Une crypto (7 j/7) parmi les actions : l'intersection retire ses week-ends
+    data = {**universe, 'BTC-USD': provider.generate('BTC-USD', start='2020-06-01')}
+    return price_panel.from_frames(data, 'intersection')
+
+
+@pytest.mark.parametrize('strat_cls, params', [
+    (strategy_rebalance.WeeklyMomentumRebalance, {}),
+    (strategy_rebalance.WeeklyMomentumRebalance, {'lookback_days': 20, 'rebalance_period': 10}),
+    (strategy5.DynamicSafeRebalance, {}),
+    (strategy5.DynamicSafeRebalance, {'stoploss_pct': 0.15, 'lookback_days': 20}),
+    (strategy5.DynamicSafeRebalance, {'safe_asset': 'TLT', 'vol_lookback': 10}),
+], ids=lambda v: getattr(v, '__name__', None) or str(v))
+@pytest.mark.parametrize('cash', [1e5, 1e7])
+def test_panel_matches_backtrader(panel, strat_cls, params, cash):
+    assert panel_engine.same_calendar(panel)
+    res = panel_engine.run(panel, strat_cls, params, cash)
+    ref = _backtrader(panel, strat_cls, params, cash)
+    assert res.trades > 0
+    assert len(res.returns) == len(ref)
+    assert same(res.returns, ref)
+
+
+def test_gapped_calendar_is_not_numpy(provider, universe):
+    # Union : pas de barre actions le week-end, le moteur panel n'est plus exact
+    data = {**universe, 'BTC-USD': provider.generate('BTC-USD', start='2020-06-01')}
+    assert not panel_engine.same_calendar(price_panel.from_frames(data, 'union'))
@@ -0,0 +1,25 @@
+"""Pool de processus (mémoire partagée) == exécution dans le processus courant."""
+import pytest
+
+import parallel_runner
+import strategy, strategy2
+from parallel_runner import Job, run_jobs
+from conftest import same
+
+JOBS = [Job(tic, cls) for tic in ('SPY', 'QQQ') for cls in (strategy.MomentumStrategy, strategy2.DonchianBreakoutStrategy)]
+
+
+@pytest.mark.parametrize('engine', ['vector', 'backtrader'])
+def test_pool_matches_serial(universe, engine):
+    serial = run_jobs(universe, JOBS, engine, max_workers=1)
+    pooled = run_jobs(universe, JOBS, engine, max_workers=2)
+    assert all(a.index.equals(b.index) and same(a, b) for a, b in zip(serial, pooled))
+
+
+def test_no_warmup_without_fork(universe, monkeypatch):
+    # Workers spawn / forkserver : le cache du parent ne leur sert à rien
+    def warm(*args):
+        raise AssertionError('indicateurs calculés dans le parent')
+    monkeypatch.setattr(parallel_runner.multiprocessing, 'get_start_method', lambda: 'spawn')
+    monkeypatch.setattr(parallel_runner, 'warm_indicators', warm)
+    assert len(run_jobs(universe, JOBS[:2], 'backtrader', max_workers=2)) == 2
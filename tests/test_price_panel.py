@@ -0,0 +1,70 @@
+"""Panel de prix : calendriers maîtres, report des clôtures, vues sans copie."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import price_panel
+from conftest import same
+from price_panel import from_frames, master_calendar
+
+
+def _bars(dates, start_price: float) -> pd.DataFrame:
+    close = start_price + np.arange(len(dates), dtype=float)
+    return pd.DataFrame({'Open': close - 0.5, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                         'Volume': 100.0}, index=pd.DatetimeIndex(dates, name='Date'))
+
+
+@pytest.fixture(scope='module')
+def data():
+    # Lundi 1er → vendredi 12 janvier 2024 ; crypto 7 j / 7 dès le 3 ; C cotée à partir du 8
+    return {'A': _bars(pd.bdate_range('2024-01-01', '2024-01-12'), 10.0),
+            'B-USD': _bars(pd.date_range('2024-01-03', '2024-01-12'), 100.0),
+            'C': _bars(pd.bdate_range('2024-01-08', '2024-01-12'), 50.0)}
+
+
+def test_master_calendars(data):
+    panels = {policy: from_frames(data, policy) for policy in price_panel.CALENDARS}
+    assert panels['union'].dates.equals(pd.date_range('2024-01-01', '2024-01-12'))
+    assert panels['intersection'].dates.equals(pd.bdate_range('2024-01-08', '2024-01-12'))
+    # Jours de bourse (actions), sans attendre C ; la crypto ne cote qu'à partir du 3
+    assert panels['asset_class'].dates.equals(pd.bdate_range('2024-01-03', '2024-01-12'))
+    with pytest.raises(ValueError):
+        master_calendar({'A': np.zeros(1)}, 'weekly')
+
+
+def test_union_fills(data):
+    panel = from_frames(data, 'union')
+    a = panel.frame('Close')['A']
+    # Week-end : dernière clôture du vendredi, bougie plate, volume nul
+    assert a['2024-01-06'] == a['2024-01-07'] == a['2024-01-05'] == 14.0
+    sat = panel.dates.get_loc(pd.Timestamp('2024-01-06'))
+    j = panel.tickers.index('A')
+    assert panel.open[sat, j] == panel.high[sat, j] == panel.low[sat, j] == 14.0 and panel.volume[sat, j] == 0
+    assert not panel.bar[sat, j] and panel.listed[sat, j]
+    # Avant la cotation : NaN, pas coté
+    c = panel.series('C')
+    assert c[:'2024-01-07'].isna().all() and not panel.listed[:7, panel.tickers.index('C')].any()
+    # Barres propres : l'historique d'origine
+    ts, bars = panel.bars('C')
+    assert same(bars['Close'], data['C']['Close']) and len(ts) == 5
+
+
+def test_alignment_helpers(data):
+    panel = from_frames(data, 'union')
+    sma = data['A']['Close'].rolling(2).mean()
+    taken = panel.take(sma.to_numpy(), 'A')
+    assert same(taken, panel.sample(sma))
+    assert taken[5] == taken[6] == sma['2024-01-05']
+    hold = panel.buy_and_hold(3.0)
+    assert same(hold[0], [1.0, np.nan, np.nan])                       # capital / 3 par actif
+    assert hold[-1, 2] == pytest.approx(54 / 50)
+    with pytest.raises(ValueError):
+        panel.close[0, 0] = 1.0                                       # lecture seule
+
+
+def test_periods_per_year(provider):
+    equity = {'SPY': provider.generate('SPY', start='2020-01-01')}
+    mixed = {**equity, 'BTC-USD': provider.generate('BTC-USD', start='2020-01-01')}
+    assert from_frames(equity).periods_per_year == 261                # jours ouvrés, pas de fériés
+    assert from_frames(mixed).periods_per_year == 365
+    assert from_frames(mixed, 'asset_class').periods_per_year == 261
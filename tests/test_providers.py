@@ -0,0 +1,71 @@
+"""Fournisseurs : normalisation commune, synthétique déterministe, rejeu disque, lots yfinance."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_store import OHLCVStore
+from providers import (OHLCV, ReplayProvider, SyntheticProvider, YFinanceProvider, make_provider,
+                       normalize_ohlcv)
+
+
+def test_normalize_ohlcv():
+    index = pd.DatetimeIndex(['2024-01-03', '2024-01-02', '2024-01-03', '2024-01-04'], tz='America/New_York')
+    columns = pd.MultiIndex.from_product([['Open', 'High', 'Low', 'Close'], ['SPY']])
+    raw = pd.DataFrame(np.arange(16, dtype=float).reshape(4, 4), index=index, columns=columns)
+    raw.iloc[3, 0] = np.nan
+    df = normalize_ohlcv(raw)
+    assert list(df.columns) == OHLCV and (df.dtypes == np.float64).all()
+    assert df.index.tz is None and df.index.name == 'Date'
+    # Trié, doublon : dernière ligne gardée, ligne incomplète retirée, volume absent = 0
+    assert list(df.index) == [pd.Timestamp('2024-01-02 05:00'), pd.Timestamp('2024-01-03 05:00')]
+    assert df['Open'].tolist() == [4.0, 8.0] and (df['Volume'] == 0).all()
+
+
+def test_synthetic_tail_extends_history():
+    provider = SyntheticProvider(end='2024-06-28')
+    full = provider.generate('SPY')
+    tail = provider.fetch(['SPY'], start='2024-01-01')['SPY']
+    assert tail.equals(full[full.index >= '2024-01-01'])
+    # Crypto 7 j / 7, actions en jours ouvrés
+    assert (tail.index.dayofweek < 5).all()
+    assert (provider.generate('BTC-USD', start='2024-01-01').index.dayofweek >= 5).any()
+    with pytest.raises(ValueError):
+        provider.generate('SPY', interval='1w')
+
+
+def test_replay_reads_csv_and_store(tmp_path):
+    provider = SyntheticProvider(end='2024-06-28')
+    spy, qqq = provider.generate('SPY', start='2024-01-01'), provider.generate('QQQ', start='2024-01-01')
+    # Export yfinance : lignes d'en-tête en plus sous les noms de colonnes
+    with open(tmp_path / 'SPY.csv', 'w') as f:
+        f.write('Price,' + ','.join(OHLCV) + '\nTicker' + ',SPY' * 5 + '\nDate,,,,,\n')
+        spy.to_csv(f, header=False, float_format='%.17g')
+    OHLCVStore(str(tmp_path)).write('QQQ', '1d', qqq)
+    out = ReplayProvider(str(tmp_path)).fetch(['SPY', 'QQQ', 'IWM'], start='2024-03-01')
+    assert sorted(out) == ['QQQ', 'SPY']
+    # read_csv (float_precision par défaut) peut s'écarter d'1 ulp
+    pd.testing.assert_frame_equal(out['SPY'], spy[spy.index >= '2024-03-01'], check_index_type=False,
+                                  rtol=1e-14)
+    assert out['QQQ'].equals(qqq[qqq.index >= '2024-03-01'])
+
+
+def test_yfinance_fetch_in_batches(monkeypatch):
+    provider = YFinanceProvider(batch_size=3, max_workers=2)
+    seen = []
+
+    def fake_batch(batch, interval, period, start):
+        seen.append(batch)
+        return {tic: tic for tic in batch if tic != 'DEAD'}
+
+    monkeypatch.setattr(provider, '_fetch_batch', fake_batch)
+    tickers = ['A', 'B', 'C', 'A', 'D', 'DEAD', 'E']
+    out = provider.fetch(tickers, period='1y')
+    assert sorted(map(len, seen)) == [3, 3]                       # doublon retiré avant le découpage
+    assert sorted(out) == ['A', 'B', 'C', 'D', 'E']
+
+
+def test_make_provider(tmp_path):
+    assert isinstance(make_provider('synthetic'), SyntheticProvider)
+    assert make_provider(f'replay:{tmp_path}').root == str(tmp_path)
+    with pytest.raises(ValueError):
+        make_provider('bloomberg')
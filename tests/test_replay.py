@@ -0,0 +1,50 @@
+"""
+Rejeu barre par barre du store (exactbars=1) == backtest portefeuille en bloc,
+calendriers mêlés (actions 5 j, crypto 7 j) compris ; latence et exécutions partielles.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import strategy, strategy2, strategy3, strategy4
+from data_store import OHLCVStore
+from replay import replay
+from vector_engine import run_portfolio
+
+TICKERS = ['SPY', 'QQQ', 'BTC-USD']
+
+
+@pytest.fixture(scope='module')
+def store(provider, tmp_path_factory):
+    store = OHLCVStore(str(tmp_path_factory.mktemp('store')))
+    for tic in TICKERS:
+        store.write(tic, '1d', provider.generate(tic, start='2022-01-01'))
+    return store
+
+
+@pytest.mark.parametrize('strat_cls', [strategy.MomentumStrategy, strategy2.DonchianBreakoutStrategy,
+                                       strategy3.EnhancedBreakoutStrategy, strategy4.RegimeAwareBreakoutStrategy],
+                         ids=lambda c: c.__name__)
+def test_replay_matches_batch_portfolio(store, strat_cls):
+    res = replay(strat_cls, TICKERS, '1d', store=store)
+    ref = run_portfolio({tic: store.read(tic) for tic in TICKERS}, strat_cls, cash=100_000.0)
+    assert set(ref.fills['Ticker']) == set(TICKERS) or strat_cls is strategy3.EnhancedBreakoutStrategy
+    assert len(res.fills) == len(ref.fills) > 0
+    for col in ('Date', 'Ticker', 'Size', 'Price'):
+        assert np.array_equal(res.fills[col].to_numpy(), ref.fills[col].to_numpy())
+    assert res.equity.index.equals(ref.equity.index)
+    assert np.allclose(res.equity.to_numpy(), ref.equity.to_numpy(), rtol=1e-12)
+    assert not res.fills['Partial'].any()
+
+
+def test_chunk_size_irrelevant(store):
+    full = replay(strategy2.DonchianBreakoutStrategy, TICKERS, '1d', store=store)
+    small = replay(strategy2.DonchianBreakoutStrategy, TICKERS, '1d', store=store, chunk=7)
+    assert small.fills.equals(full.fills) and small.equity.equals(full.equity)
+
+
+def test_latency_and_partial_fills(store):
+    res = replay(strategy2.DonchianBreakoutStrategy, TICKERS, '1d', store=store,
+                 latency=1.5 * 86400, fill_pct=0.05)
+    assert len(res.fills) and (res.fills['Delay'] >= 1.5 * 86400).all()
+    assert res.fills['Partial'].any()
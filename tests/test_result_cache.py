@@ -0,0 +1,90 @@
+"""Cache de résultats : la clé suit le code dont dépend le résultat, éviction LRU bornée en octets."""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import result_cache
+import strategy, strategy5
+from result_cache import Result, ResultCache, result_key
+
+
+@pytest.fixture
+def edit(monkeypatch):
+    """Simule la modification du fichier source d'un module (digest remplacé)."""
+    def apply(module_name):
+        result_cache._source_hash(module_name)
+        monkeypatch.setitem(result_cache._sources, module_name, 'modifié')
+    return apply
+
+
+@pytest.mark.parametrize('strat_cls, module, engine', [
+    (strategy5.DynamicSafeRebalance, 'strategy_rebalance', 'backtrader'),  # order_target_weights
+    (strategy5.DynamicSafeRebalance, 'price_panel', 'backtrader'),
+    (strategy.MomentumStrategy, 'bt_indicators', 'backtrader'),
+    (strategy.MomentumStrategy, 'data_store', 'vector'),
+    (strategy.MomentumStrategy, 'vector_engine', 'vector'),
+])
+def test_key_changes_with_dependency(universe, edit, strat_cls, module, engine):
+    before = result_key(strat_cls, None, universe, engine, cash=1.0)
+    edit(module)
+    assert result_key(strat_cls, None, universe, engine, cash=1.0) != before
+
+
+def test_key_ignores_unrelated_module(universe, edit):
+    before = result_key(strategy.MomentumStrategy, None, universe['SPY'], 'vector', cash=1.0)
+    edit('strategy_rebalance')
+    assert result_key(strategy.MomentumStrategy, None, universe['SPY'], 'vector', cash=1.0) == before
+
+
+def test_key_follows_params_and_data(universe):
+    key = result_key(strategy.MomentumStrategy, None, universe['SPY'], 'vector')
+    assert key == result_key(strategy.MomentumStrategy, {'ema_fast': 20}, universe['SPY'], 'vector')  # défaut
+    assert key != result_key(strategy.MomentumStrategy, {'ema_fast': 10}, universe['SPY'], 'vector')
+    assert key != result_key(strategy.MomentumStrategy, None, universe['SPY'].iloc[:-1], 'vector')
+    assert key != result_key(strategy.MomentumStrategy, None, universe['SPY'], 'backtrader')
+
+
+def _result(seed: int) -> Result:
+    index = pd.date_range('2024-01-01', periods=500, name='Date')
+    return Result.from_series(pd.Series(np.random.default_rng(seed).normal(size=500), index=index), trades=seed)
+
+
+def test_round_trip(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    res = _result(1)
+    cache.put('a', res)
+    back = cache.get('a')
+    assert back.series().equals(res.series()) and back.meta['trades'] == 1
+    assert cache.get('absent') is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_lru_eviction_under_size_cap(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=10 * 2**20)
+    for i, key in enumerate('abc'):
+        cache.put(key, _result(i))
+        os.utime(cache.path(key), (1_000 + i, 1_000 + i))   # a le plus ancien, c le plus récent
+    size = os.path.getsize(cache.path('a'))
+    cache.max_bytes = int(3.5 * size)                       # place pour 3 résultats
+    assert cache.get('a') is not None                        # a redevient le plus récent
+    cache.put('d', _result(3))                               # 4 résultats : le moins récent (b) part
+    assert cache.evictions == 1
+    assert cache.get('b') is None
+    assert all(cache.get(k) is not None for k in 'acd')
+    assert cache.stats()['bytes'] <= cache.max_bytes
+
+
+def test_compute_calls_once(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    calls = []
+
+    def fn():
+        calls.append(1)
+        return _result(0)
+
+    first = cache.compute('k', fn)
+    second = cache.compute('k', fn)
+    assert len(calls) == 1
+    assert first.series().equals(second.series())
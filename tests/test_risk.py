@@ -0,0 +1,59 @@
+"""VaR / CVaR sur des distributions connues ; plafonds de RiskBook."""
+import numpy as np
+import pytest
+
+from risk import (RiskBook, RiskLimits, historical_cvar, historical_var, parametric_cvar,
+                  parametric_var, var_cvar)
+
+
+def test_historical_on_uniform_grid():
+    # -50 % … +49 % par pas de 1 % : les 5 pires (5 % de 100) vont de -50 % à -46 %
+    pnl = (np.arange(100) - 50) / 100
+    rng = np.random.default_rng(0)
+    pnl = np.column_stack([rng.permutation(pnl), 2 * pnl])          # l'ordre ne compte pas
+    assert historical_var(pnl, 0.95) == pytest.approx([0.46, 0.92])
+    assert historical_cvar(pnl, 0.95) == pytest.approx([0.48, 0.96])
+    assert historical_var(pnl, 0.99) == pytest.approx([0.50, 1.00])   # une seule observation
+
+
+def test_parametric_standard_normal():
+    assert parametric_var(0.0, 1.0, 0.95) == pytest.approx(1.6448536, abs=1e-7)
+    assert parametric_var(0.0, 1.0, 0.99) == pytest.approx(2.3263479, abs=1e-7)
+    assert parametric_cvar(0.0, 1.0, 0.95) == pytest.approx(2.0627128, abs=1e-7)
+    # Translation et échelle
+    assert parametric_var(0.01, 0.02, 0.95) == pytest.approx(0.02 * 1.6448536 - 0.01)
+
+
+def test_historical_converges_to_normal():
+    pnl = np.random.default_rng(1).normal(0.001, 0.02, size=400_000)
+    assert historical_var(pnl) == pytest.approx(parametric_var(0.001, 0.02), rel=0.01)
+    assert historical_cvar(pnl) == pytest.approx(parametric_cvar(0.001, 0.02), rel=0.01)
+
+
+def test_var_cvar_books():
+    rets = np.random.default_rng(2).normal(0.0005, 0.01, size=(1000, 3))
+    weights = np.array([[1.0, 0.0, 0.0], [0.5, 0.5, 0.0], [0.2, 0.3, 0.5]])
+    var, cvar = var_cvar(rets, weights)
+    for i, w in enumerate(weights):
+        pnl = rets @ w
+        assert var[i] == pytest.approx(historical_var(pnl))
+        assert cvar[i] == pytest.approx(historical_cvar(pnl))
+    var, cvar = var_cvar(rets, weights, method='parametric')
+    for i, w in enumerate(weights):
+        mu, sigma = rets.mean(axis=0) @ w, np.sqrt(w @ np.cov(rets, rowvar=False) @ w)
+        assert var[i] == pytest.approx(parametric_var(mu, sigma))
+        assert cvar[i] == pytest.approx(parametric_cvar(mu, sigma))
+    with pytest.raises(ValueError):
+        var_cvar(rets, weights, method='montecarlo')
+
+
+def test_riskbook_caps_orders():
+    book = RiskBook(2, RiskLimits(max_gross=1.0, max_position=0.5))
+    book.mark(0, 0.0, 80.0)
+    book.mark(1, 0.0, 10.0)
+    assert book.cap(0, 1.0, 80.0, cash=100.0) == pytest.approx(50 / 80)    # 50 % du capital
+    assert book.cap(1, 4.0, 10.0, cash=100.0) == 4.0                        # tient dans les plafonds
+    book.mark(0, 0.5, 80.0)                                                 # 40 de position, 60 de cash
+    book.commit(1, 5.0, 10.0)                                               # 50 en attente
+    assert book.cap(0, 1.0, 80.0, cash=60.0) == pytest.approx(10 / 80)     # brut : 100 - 90
+    assert book.cap(0, -0.5, 80.0, cash=60.0) == -0.5                      # une réduction passe toujours
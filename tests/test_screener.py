@@ -0,0 +1,50 @@
+"""Screener sur l'univers du store == entry_mask() de chaque machine du moteur vectorisé."""
+import numpy as np
+import pytest
+
+import screener
+import strategy, strategy2, strategy3, strategy4
+import vector_engine as ve
+from data_store import OHLCVStore
+
+STARTS = {'SPY': '2019-01-01', 'QQQ': '2021-01-01', 'IWM': '2022-06-01', 'GLD': '2023-03-01', 'BTC-USD': '2021-06-01'}
+
+
+@pytest.fixture(scope='module')
+def store(provider, tmp_path_factory):
+    store = OHLCVStore(str(tmp_path_factory.mktemp('store')))
+    for tic, start in STARTS.items():
+        store.write(tic, '1d', provider.generate(tic, start=start))
+    return store
+
+
+@pytest.mark.parametrize('strat_cls, params', [
+    (strategy.MomentumStrategy, None),
+    (strategy.MomentumStrategy, {'ema_fast': 5, 'ema_slow': 12, 'rsi_buy': 50}),
+    (strategy2.DonchianBreakoutStrategy, {'donchian_period': 10}),
+    (strategy3.EnhancedBreakoutStrategy, {'trend_adx': 10, 'vol_multiplier': 0.5, 'adx_period': 10}),
+    (strategy4.RegimeAwareBreakoutStrategy, None),
+], ids=lambda v: getattr(v, '__name__', None) or str(v))
+def test_entries_match_entry_mask(store, strat_cls, params):
+    # Fenêtre = tout l'historique : mêmes graines que le moteur
+    window = max(store.arrays(tic).shape[1] for tic in STARTS)
+    kept, _, f = screener.load_window(list(STARTS), window=window, store=store)
+    p = ve.strategy_params(strat_cls, params)
+    masks = [ve.machine_for(strat_cls)(p, ve.bars_from_df(store.read(tic)), ve.Broker(1.0)).entry_mask()
+             for tic in kept]
+    hits = 0
+    # Plusieurs « dernières barres » : la matrice tronquée, chaque colonne à sa propre date
+    for back in range(0, 300, 5):
+        rows = {k: v[:window - back] for k, v in f.items()}
+        entry, _, _ = screener.screen_for(strat_cls)(p, rows, screener._Indicators(rows))
+        for j, mask in enumerate(masks):
+            if len(mask) > back:
+                assert bool(entry[j]) == bool(mask[len(mask) - 1 - back])
+                hits += bool(entry[j])
+    assert hits > 0
+
+
+def test_screen_table(store):
+    table = screener.screen([strategy4.RegimeAwareBreakoutStrategy], store=store, signals_only=False)
+    assert sorted(table['Ticker']) == sorted(STARTS)
+    assert np.isfinite(table['Close']).all()
@@ -0,0 +1,34 @@
+"""Registre AST : stratégies et moteurs NumPy trouvés sans importer backtrader ni les moteurs."""
+import subprocess
+import sys
+
+import pytest
+
+import engines
+import panel_engine
+import strategy_registry as registry
+import vector_engine
+
+
+def test_numpy_engines_match_engine_tables():
+    assert {n for n, e in registry.NUMPY_ENGINES.items() if e == 'vector'} == set(vector_engine.MACHINES)
+    assert {n for n, e in registry.NUMPY_ENGINES.items() if e == 'panel'} == set(panel_engine.PORTFOLIOS)
+
+
+@pytest.mark.parametrize('spec', list(registry.specs().values()), ids=lambda s: s.name)
+def test_spec_matches_loaded_class(spec):
+    cls = registry.load(spec)
+    assert spec.defaults() == dict(cls.params._getitems())
+    assert spec.numpy_engine() == ('vector' if engines.supports_vector(cls) else
+                                   'panel' if engines.supports_panel(cls) else None)
+    assert spec.portfolio == engines.supports_panel(cls)
+
+
+def test_discovery_imports_nothing_heavy():
+    code = ("import sys; sys.path.insert(0, 'src'); import strategy_registry as r; "
+            "[s.numpy_engine() for s in r.specs().values()]; "
+            "print(sorted(m for m in ('backtrader', 'pandas', 'engines', 'vector_engine', 'panel_engine') "
+            "if m in sys.modules))")
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                         cwd=registry.SRC_DIR + '/..', check=True)
+    assert out.stdout.strip() == '[]'
@@ -0,0 +1,62 @@
+"""Balayage : espaces de recherche, lignes == backtests isolés, panel == backtrader, cache de résultats."""
+import numpy as np
+import pytest
+
+import engines
+import parallel_runner as pr
+import strategy, strategy5
+import sweep
+from metrics import equity_metrics
+from result_cache import ResultCache, get_result_cache, set_result_cache
+
+
+def test_search_spaces():
+    assert sweep.grid({'a': [1, 2], 'b': [3, 4, 5]})[:2] == [{'a': 1, 'b': 3}, {'a': 1, 'b': 4}]
+    assert len(sweep.grid({'a': [1, 2], 'b': [3, 4, 5]})) == 6
+    combos = sweep.random_sample({'a': (1, 3), 'b': (0.0, 1.0), 'c': ['x', 'y']}, 20, seed=1)
+    assert len({tuple(c.values()) for c in combos}) == 20
+    assert all(c['a'] in (1, 2, 3) and 0.0 <= c['b'] <= 1.0 and c['c'] in 'xy' for c in combos)
+    assert combos == sorted(combos, key=lambda c: tuple(c.values()))   # regroupées par préfixe
+    assert sweep.random_sample({'a': [1, 2]}, 5) == [{'a': 1}, {'a': 2}]  # pas plus que l'espace
+    defaults = sweep.param_space(strategy.MomentumStrategy)
+    assert sweep.parse_space(['ema_fast=5:30', 'rsi_period=7,14'], defaults, True) == \
+        {'ema_fast': (5, 30), 'rsi_period': [7, 14]}
+    with pytest.raises(SystemExit):
+        sweep.parse_space(['inconnu=1'], defaults, False)
+
+
+def test_rows_match_single_backtests(universe):
+    data = {'SPY': universe['SPY']}
+    combos = sweep.grid({'ema_fast': [10, 20], 'ema_slow': [50, 80]})
+    for combo, row in zip(combos, sweep.sweep(data, strategy.MomentumStrategy, combos, max_workers=1)):
+        ret = engines.backtest_returns(data['SPY'], strategy.MomentumStrategy, combo, 1.0, 'vector')
+        expected = equity_metrics((1 + ret).cumprod().to_numpy())
+        assert {k: row[k] for k in combo} == combo
+        for name in ('total_return', 'sharpe', 'max_dd', 'calmar'):
+            assert row[name] == pytest.approx(expected[name], rel=1e-9)
+
+
+def test_panel_rows_match_backtrader(universe):
+    combos = sweep.grid({'lookback_days': [5, 20], 'vol_lookback': [10, 20]})
+    args = (combos, strategy5.DynamicSafeRebalance)
+    panel = list(pr.imap_shared(universe, sweep._evaluate, *args, True, 1e5, max_workers=1))
+    bt_rows = list(pr.imap_shared(universe, sweep._evaluate, *args, False, 1e5, max_workers=1))
+    for a, b in zip(panel, bt_rows):
+        assert a['trades'] == b['trades'] > 0
+        for name in ('total_return', 'sharpe', 'max_dd'):
+            assert a[name] == pytest.approx(b[name], rel=1e-9)
+
+
+def test_cached_rows_replayed(universe, tmp_path):
+    data = {'SPY': universe['SPY']}
+    previous = get_result_cache()
+    set_result_cache(ResultCache(str(tmp_path)))
+    try:
+        combos = sweep.grid({'ema_fast': [10, 20]})
+        first = list(sweep.sweep(data, strategy.MomentumStrategy, combos, max_workers=1))
+        wider = combos + [{'ema_fast': 30}]
+        second = list(sweep.sweep(data, strategy.MomentumStrategy, wider, max_workers=1))
+        assert get_result_cache().hits == 2
+        assert second[:2] == first and second[2]['ema_fast'] == 30
+    finally:
+        set_result_cache(previous)
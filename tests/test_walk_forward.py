@@ -0,0 +1,45 @@
+"""Plis du walk-forward (glissants, ancrés) et courbe out-of-sample recollée."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import strategy
+from data_store import to_epoch_seconds
+from walk_forward import Fold, make_folds, walk_forward
+
+# Calendrier = indices des barres : les bornes des plis se lisent directement
+CALENDAR = np.arange(20, dtype=np.float64)
+
+
+def test_rolling_folds():
+    assert make_folds(CALENDAR, train=8, test=4) == [
+        Fold(0, 7, 8, 11), Fold(4, 11, 12, 15), Fold(8, 15, 16, 19)]
+
+
+def test_anchored_folds():
+    assert make_folds(CALENDAR, train=8, test=4, anchored=True) == [
+        Fold(0, 7, 8, 11), Fold(0, 11, 12, 15), Fold(0, 15, 16, 19)]
+
+
+def test_step_and_short_last_test():
+    # Pas de 2 : tests qui se recouvrent ; dernier test tronqué à la fin du calendrier
+    folds = make_folds(CALENDAR[:17], train=8, test=4, step=2)
+    assert folds[0] == Fold(0, 7, 8, 11)
+    assert folds[-1] == Fold(6, 13, 14, 16)
+    assert [f.train_start for f in folds] == [0, 2, 4, 6]
+    assert make_folds(CALENDAR, train=20, test=4) == []
+
+
+def test_walk_forward_stitches_test_windows(universe):
+    data = {tic: universe[tic] for tic in ('SPY', 'QQQ')}
+    combos = [{'ema_fast': 10}, {'ema_fast': 30}]
+    res = walk_forward(data, strategy.MomentumStrategy, combos, train=252, test=126, max_workers=1)
+    calendar = data['SPY'].index
+    assert len(res.folds) == len(make_folds(to_epoch_seconds(calendar), 252, 126))
+    assert set(res.folds['ema_fast']) <= {10, 30}
+    # Out-of-sample seulement, sans doublon ni trou entre plis
+    eq = res.equity
+    assert eq.index.is_monotonic_increasing and eq.index.is_unique
+    assert eq.index[0] == res.folds['test_start'].iloc[0] == calendar[252]
+    assert eq.index[-1] == calendar[-1]
+    assert eq.index.equals(pd.DatetimeIndex(calendar[252:], name='Date'))